@@ -0,0 +1,76 @@
+"""Benchmark batch validation and bundling across worker processes.
+
+Orders mix valid lines with unknown SKUs, whose similar-product search scans
+the catalog, so the work is CPU-bound. Run from the project root with
+``python -m benchmarks.bench_batch_runner``.
+"""
+
+import argparse
+import os
+import random
+import time
+
+from processing.batch_runner import DEFAULT_CHUNK_SIZE, BatchOrderRunner
+from processing.bootstrap import DEFAULT_CATALOG_PATH
+
+
+def make_orders(count: int, catalog_skus: list[str]) -> list[dict]:
+    """Create orders of eight lines, a quarter of them with unknown SKUs."""
+    rng = random.Random(0)
+    orders = []
+    for n in range(count):
+        items = []
+        for _ in range(8):
+            sku = rng.choice(catalog_skus)
+            if rng.random() < 0.25:
+                sku = sku[:4] + "9" + sku[5:]
+            items.append({"sku": sku, "quantity": rng.randint(1, 40)})
+        orders.append(
+            {
+                "customer": f"Customer {n}",
+                "address": "123 Main Street",
+                "delivery_date": "2025-06-20",
+                "items": items,
+            }
+        )
+    return orders
+
+
+def measure(catalog_path: str, orders: list[dict], processes: int, chunk_size: int):
+    """Return orders per second for one configuration, excluding start-up."""
+    with BatchOrderRunner(catalog_path, processes, chunk_size) as runner:
+        # Warm up: load the catalog and start the workers
+        list(runner.run(orders[: processes * chunk_size]))
+        start = time.perf_counter()
+        count = sum(1 for _ in runner.run(orders))
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    """Report throughput for an increasing number of processes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    from data_sources.catalog_csv import CsvCatalogDataSource
+
+    skus = list(CsvCatalogDataSource(args.catalog).get_all_products())
+    orders = make_orders(args.orders, skus)
+
+    baseline = measure(args.catalog, orders, 1, args.chunk_size)
+    print(f"1 process (in-process): {baseline:8.0f} orders/s")
+    processes = 2
+    while processes <= args.max_processes:
+        rate = measure(args.catalog, orders, processes, args.chunk_size)
+        print(
+            f"{processes} processes:           {rate:8.0f} orders/s "
+            f"({rate / baseline:.2f}x, {rate / baseline / processes:.0%} efficiency)"
+        )
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main()
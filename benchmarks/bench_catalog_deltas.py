@@ -0,0 +1,69 @@
+"""Benchmark incremental catalog updates against reloading the CSV.
+
+Run from the project root with ``python -m benchmarks.bench_catalog_deltas``.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from data_sources.catalog_csv import CsvCatalogDataSource
+from data_sources.catalog_delta import CatalogDelta
+from processing.bootstrap import DEFAULT_CATALOG_PATH
+
+
+def make_deltas(count: int, skus: list[str]) -> list[CatalogDelta]:
+    """Create small stock movements, with occasional MOQ and price changes."""
+    rng = random.Random(0)
+    deltas = []
+    for _ in range(count):
+        sku = rng.choice(skus)
+        if rng.random() < 0.05:
+            deltas.append(CatalogDelta(sku, price=round(rng.uniform(50, 900), 2)))
+        elif rng.random() < 0.05:
+            deltas.append(CatalogDelta(sku, moq=rng.randint(1, 5)))
+        else:
+            deltas.append(CatalogDelta(sku, stock_change=rng.randint(1, 3)))
+    return deltas
+
+
+def main():
+    """Time one batch of deltas, with and without the durable log."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--deltas", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = os.path.join(directory, "catalog.csv")
+        shutil.copy(args.catalog, catalog_path)
+
+        start = time.perf_counter()
+        catalog = CsvCatalogDataSource(catalog_path)
+        print(f"full reload:          {(time.perf_counter() - start) * 1000:7.1f} ms")
+        deltas = make_deltas(args.deltas, list(catalog.get_all_products()))
+
+        start = time.perf_counter()
+        catalog.apply_deltas(deltas)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{args.deltas} deltas in memory: {elapsed:7.1f} ms")
+
+        logged = CsvCatalogDataSource(
+            catalog_path, delta_log_path=os.path.join(directory, "catalog.deltas")
+        )
+        start = time.perf_counter()
+        logged.apply_deltas(deltas)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{args.deltas} deltas with log:  {elapsed:7.1f} ms")
+
+        start = time.perf_counter()
+        logged.compact()
+        print(f"compaction:           {(time.perf_counter() - start) * 1000:7.1f} ms")
+        logged.close()
+
+
+if __name__ == "__main__":
+    main()
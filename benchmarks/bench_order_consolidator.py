@@ -0,0 +1,80 @@
+"""Benchmark cross-order consolidation on growing batches.
+
+Each delivery is spread over up to three emails whose customer and address
+spellings differ, so every order is normalized and most groups are merged
+and validated again. The time per order should stay flat as the batch grows.
+Run from the project root with ``python -m benchmarks.bench_order_consolidator``.
+"""
+
+import argparse
+import gc
+import random
+import time
+from datetime import date, timedelta
+
+from core.records import OrderItemRecord, OrderRecord
+from data_sources.catalog_csv import CsvCatalogDataSource
+from processing.bootstrap import DEFAULT_CATALOG_PATH
+from processing.order_consolidator import OrderConsolidator
+from validation.catalog_validator import CatalogValidator
+
+SPELLINGS = (
+    lambda text: text,
+    str.upper,
+    lambda text: text.replace("Street", "St.").replace(" ", "  "),
+)
+
+
+def make_orders(count: int, catalog_skus: list[str]) -> list[OrderRecord]:
+    """Create orders of three lines for about ``count / 2`` deliveries."""
+    rng = random.Random(0)
+    deliveries = max(1, count // 2)
+    orders = []
+    for _ in range(count):
+        n = rng.randrange(deliveries)
+        spell = rng.choice(SPELLINGS)
+        items = [
+            OrderItemRecord(rng.choice(catalog_skus), rng.randint(1, 20))
+            for _ in range(3)
+        ]
+        orders.append(
+            OrderRecord(
+                spell(f"Customer {n}"),
+                spell(f"{n} Main Street"),
+                date(2025, 6, 1) + timedelta(days=n % 30),
+                items,
+            )
+        )
+    return orders
+
+
+def main():
+    """Report consolidation time per order for doubling batch sizes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--orders", type=int, default=50_000)
+    parser.add_argument("--doublings", type=int, default=3)
+    args = parser.parse_args()
+
+    catalog = CsvCatalogDataSource(args.catalog)
+    consolidator = OrderConsolidator(CatalogValidator(catalog))
+    skus = list(catalog.get_all_products())
+
+    count = args.orders
+    for _ in range(args.doublings + 1):
+        orders = make_orders(count, skus)
+        # Collect the previous batch so it does not slow this one's GC passes
+        gc.collect()
+        start = time.perf_counter()
+        consolidated = consolidator.consolidate(orders)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{count:8d} orders -> {len(consolidated):8d} deliveries: "
+            f"{elapsed:6.2f}s ({elapsed / count * 1e6:5.1f} us/order)"
+        )
+        del orders, consolidated
+        count *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark per-order overhead of Pydantic models versus slotted records.
+
+Each variant performs the work the pipeline does on an order outside the LLM
+call: build it from parsed data, write validation results onto every item and
+serialize it once for output, either through the Pydantic model (interactive
+path) or straight to a dictionary (batch path). Run from the project root
+with ``python -m benchmarks.bench_order_records``.
+"""
+
+import argparse
+import time
+from datetime import date
+
+from core.models import Order, OrderItem
+from core.records import OrderItemRecord, OrderRecord
+
+PARSED_ITEMS = [{"sku": f"DSK-{n:04d}", "quantity": n + 1} for n in range(10)]
+SUGGESTIONS = [{"type": "stock_limit", "available_quantity": 3}]
+
+
+def run_models():
+    """Build, validate and dump an order using Pydantic models throughout."""
+    order = Order(
+        customer="John Smith",
+        address="123 Main Street",
+        delivery_date=date(2025, 6, 20),
+        items=[OrderItem(sku=i["sku"], quantity=i["quantity"]) for i in PARSED_ITEMS],
+    )
+    for item in order.items:
+        item.valid = False
+        item.notes = "Requested quantity exceeds available stock"
+        item.suggestions = SUGGESTIONS
+    return order.model_dump()
+
+
+def build_record() -> OrderRecord:
+    """Build and validate an order record."""
+    order = OrderRecord(
+        customer="John Smith",
+        address="123 Main Street",
+        delivery_date=date(2025, 6, 20),
+        items=[OrderItemRecord(i["sku"], i["quantity"]) for i in PARSED_ITEMS],
+    )
+    for item in order.items:
+        item.valid = False
+        item.notes = "Requested quantity exceeds available stock"
+        item.suggestions = SUGGESTIONS
+    return order
+
+
+def run_records_to_model():
+    """Use records internally and convert to a model for output."""
+    return build_record().to_model().model_dump()
+
+
+def run_records_to_dict():
+    """Use records internally and serialize them directly for output."""
+    return build_record().to_dict()
+
+
+def measure(func, iterations: int) -> float:
+    """Return microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    """Run each variant and report the per-order overhead saved."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    models = measure(run_models, args.iterations)
+    print(f"pydantic models throughout: {models:6.1f} us/order")
+    for label, func in (
+        ("records, model at output", run_records_to_model),
+        ("records, dict at output", run_records_to_dict),
+    ):
+        records = measure(func, args.iterations)
+        saved = models - records
+        print(
+            f"{label + ':':27} {records:6.1f} us/order "
+            f"(saves {saved:.1f} us, {saved / models:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark batch quoting throughput.
+
+Run from the project root with ``python -m benchmarks.bench_quote_engine``.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date
+
+from core.models import Order, OrderItem
+from data_sources.catalog_csv import CsvCatalogDataSource
+from processing.quote_engine import QuoteEngine
+
+CATALOG_PATH = "rezaqaround2zaqathon/Product Catalog.csv"
+TARGET_LINES_PER_SECOND = 100_000
+
+
+def build_orders(
+    skus: list[str], order_count: int, lines_per_order: int
+) -> list[Order]:
+    """Create random orders over the catalog SKUs."""
+    rng = random.Random(42)
+    return [
+        Order(
+            customer=f"Customer {n}",
+            address="123 Main Street",
+            delivery_date=date(2025, 6, 20),
+            items=[
+                OrderItem(sku=rng.choice(skus), quantity=rng.randint(1, 60))
+                for _ in range(lines_per_order)
+            ],
+        )
+        for n in range(order_count)
+    ]
+
+
+def main():
+    """Run the benchmark and report lines per second."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--lines-per-order", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = CsvCatalogDataSource(CATALOG_PATH)
+    engine = QuoteEngine.from_catalog(catalog)
+    orders = build_orders(
+        list(catalog.get_all_products()), args.orders, args.lines_per_order
+    )
+    line_count = args.orders * args.lines_per_order
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        engine.quote_orders(orders)
+        best = min(best, time.perf_counter() - start)
+
+    rate = line_count / best
+    print(
+        f"quote_orders: {line_count} lines in {best * 1000:.1f} ms ({rate:,.0f} lines/s)"
+    )
+    if rate < TARGET_LINES_PER_SECOND:
+        print(f"below target of {TARGET_LINES_PER_SECOND:,} lines/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark the result sinks against fsync-per-order and model dumps.
+
+Run from the project root with ``python -m benchmarks.bench_result_sinks``.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+from core.records import OrderItemRecord, OrderRecord
+from sinks.jsonl_sink import JsonlResultSink
+
+
+def make_order(n: int) -> OrderRecord:
+    """Create an order of five lines, one of them invalid with a suggestion."""
+    items = [OrderItemRecord(f"DSK-{n % 1000:04d}", 2) for _ in range(4)]
+    items.append(
+        OrderItemRecord(
+            "CHR-0002",
+            1,
+            valid=False,
+            notes="Below MOQ",
+            suggestions=[{"sku": "CHR-0002", "suggested_quantity": 4}],
+        )
+    )
+    return OrderRecord(f"Customer {n}", "123 Main Street", date(2025, 6, 20), items)
+
+
+def fsync_per_order(path: str, orders: list[OrderRecord], writers: int) -> float:
+    """Orders per second when every order is written and synced on its own."""
+    lock = threading.Lock()
+    with open(path, "ab") as f:
+
+        def write(chunk):
+            for order in chunk:
+                line = json.dumps(order.to_dict()).encode() + b"\n"
+                with lock:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        return run_writers(write, orders, writers)
+
+
+def group_commit(path: str, orders: list[OrderRecord], writers: int) -> float:
+    """Orders per second through the sink with every write durable."""
+    with JsonlResultSink(path) as sink:
+
+        def write(chunk):
+            for order in chunk:
+                sink.write(order, durable=True)
+
+        rate = run_writers(write, orders, writers)
+        print(f"  group commit batches: {sink.batches_written}")
+        return rate
+
+
+def buffered(path: str, orders: list[OrderRecord], writers: int) -> float:
+    """Orders per second through the sink, synced by size or time."""
+    with JsonlResultSink(path) as sink:
+
+        def write(chunk):
+            for order in chunk:
+                sink.write(order)
+
+        start = time.perf_counter()
+        run_writers(write, orders, writers)
+        sink.flush()
+        return len(orders) / (time.perf_counter() - start)
+
+
+def parquet(directory: str, orders: list[OrderRecord], writers: int) -> float:
+    """Orders per second into Parquet, including the final file footer."""
+    from sinks.parquet_sink import ParquetResultSink
+
+    start = time.perf_counter()
+    with ParquetResultSink(directory) as sink:
+
+        def write(chunk):
+            for order in chunk:
+                sink.write(order)
+
+        run_writers(write, orders, writers)
+    return len(orders) / (time.perf_counter() - start)
+
+
+def run_writers(write, orders: list[OrderRecord], writers: int) -> float:
+    """Split orders between writer threads and return orders per second."""
+    threads = [
+        threading.Thread(target=write, args=(orders[n::writers],))
+        for n in range(writers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(orders) / (time.perf_counter() - start)
+
+
+def main():
+    """Compare the write strategies."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=5_000)
+    parser.add_argument("--writers", type=int, default=8)
+    args = parser.parse_args()
+    orders = [make_order(n) for n in range(args.orders)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, strategy in (
+            ("fsync per order", fsync_per_order),
+            ("group commit", group_commit),
+            ("buffered", buffered),
+            ("parquet", parquet),
+        ):
+            target = os.path.join(directory, name.replace(" ", "_"))
+            rate = strategy(target, orders, args.writers)
+            print(f"{name:16} {rate:10.0f} orders/s")
+        size = os.path.getsize(os.path.join(directory, "buffered"))
+        print(f"JSON Lines: {size / args.orders:.0f} bytes/order")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Load-test the HTTP service in-process against the fake LLM provider.
+
+Run from the project root with ``python -m benchmarks.bench_service``. Use
+``--llm-latency`` to mimic a remote model's response time.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from processing.bootstrap import create_processor
+from processing.fake_llm import register_fake_provider
+from service.order_service import OrderService
+from service.server import OrderHttpServer
+
+EMAIL = (
+    "Hello,\n\nPlease send 3 x DSK-0001, 2 x DSK-0002 and 5 units of CHR-0003 "
+    "by 2025-06-20.\nShip to: 123 Maple Street, Springfield\n\nThanks,\nJohn Smith"
+)
+
+
+async def client(port: int, requests: int, latencies: list[float]):
+    """Send requests sequentially over one keep-alive connection."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps({"email": EMAIL}).encode()
+    head = (
+        f"POST /orders HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode()
+    for _ in range(requests):
+        start = time.perf_counter()
+        writer.write(head + body)
+        response_head = await reader.readuntil(b"\r\n\r\n")
+        length = next(
+            int(line.split(b":")[1])
+            for line in response_head.split(b"\r\n")
+            if line.lower().startswith(b"content-length")
+        )
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def run(args: argparse.Namespace):
+    """Start the server, run the clients and report throughput and latency."""
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    register_fake_provider()
+    service = OrderService(create_processor("fake"), args.max_concurrency)
+    server = OrderHttpServer(service, port=0)
+    await server.start()
+
+    latencies: list[float] = []
+    per_client = args.requests // args.clients
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(client(server.bound_port, per_client, latencies) for _ in range(args.clients))
+    )
+    elapsed = time.perf_counter() - start
+    await server.shutdown()
+
+    latencies.sort()
+    print(
+        f"{len(latencies)} requests in {elapsed:.2f}s: {len(latencies) / elapsed:.0f} req/s"
+    )
+    print(
+        f"latency p50 {statistics.median(latencies) * 1000:.1f}ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms"
+    )
+
+
+def main():
+    """Parse options and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark stock reservations from concurrent threads.
+
+Each thread reserves orders of a few random catalog SKUs and settles them,
+committing most and releasing the rest, as the service and job workers do.
+On-hand stock is large enough that reservations never run short, so the
+numbers measure the ledger's locking rather than stock-outs. Run from the
+project root with ``python -m benchmarks.bench_stock_ledger``.
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from data_sources.catalog_csv import CsvCatalogDataSource
+from processing.bootstrap import DEFAULT_CATALOG_PATH
+from validation.stock_ledger import StockLedger
+
+LINES_PER_ORDER = 3
+# Share of reservations released instead of committed
+RELEASE_RATE = 0.1
+
+
+def reserve_orders(ledger: StockLedger, skus: list[str], orders: int, seed: int):
+    """Reserve and settle ``orders`` orders on the calling thread."""
+    rng = random.Random(seed)
+    for _ in range(orders):
+        quantities = {
+            sku: rng.randint(1, 5) for sku in rng.sample(skus, LINES_PER_ORDER)
+        }
+        reservation = ledger.reserve(quantities)
+        if rng.random() < RELEASE_RATE:
+            ledger.release(reservation.reservation_id)
+        else:
+            ledger.commit([reservation.reservation_id])
+
+
+def run(skus: list[str], threads: int, orders: int, stripes: int) -> float:
+    """Reserve ``orders`` orders per thread, returning the elapsed seconds."""
+    ledger = StockLedger(dict.fromkeys(skus, 10**9), stripes=stripes)
+    workers = [
+        threading.Thread(target=reserve_orders, args=(ledger, skus, orders, n))
+        for n in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def main():
+    """Report reservations per second for doubling thread counts."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--orders", type=int, default=20_000, help="per thread")
+    parser.add_argument("--max-threads", type=int, default=16)
+    parser.add_argument("--stripes", type=int, default=64)
+    args = parser.parse_args()
+
+    skus = list(CsvCatalogDataSource(args.catalog).get_all_products())
+
+    threads = 1
+    while threads <= args.max_threads:
+        elapsed = run(skus, threads, args.orders, args.stripes)
+        total = threads * args.orders
+        print(
+            f"{threads:3d} threads: {total:8d} reservations in {elapsed:6.2f}s "
+            f"({total / elapsed:9.0f}/s)"
+        )
+        threads *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark memory and time of re-validating a large store of order items.
+
+Run from the project root with ``python -m benchmarks.bench_validation_results``.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from core.records import OrderItemRecord, OrderRecord
+from validation.catalog_validator import CatalogValidator
+
+PRODUCTS = {
+    f"DSK-{n:04d}": {"name": f"Desk {n}", "stock": 100 + n % 7, "moq": 1 + n % 3}
+    for n in range(500)
+}
+
+
+class DictCatalog:
+    """Minimal in-memory catalog source."""
+
+    def get_product_details(self, sku):
+        return PRODUCTS.get(sku)
+
+    def find_similar_products(self, sku):
+        return []
+
+
+def make_orders(order_count: int, invalid_every: int) -> list[OrderRecord]:
+    """Create orders of ten lines, every ``invalid_every``-th line over stock."""
+    skus = list(PRODUCTS)
+    orders = []
+    for n in range(order_count):
+        items = []
+        for line in range(10):
+            position = n * 10 + line
+            quantity = 1000 if position % invalid_every == 0 else 5
+            items.append(OrderItemRecord(skus[position % len(skus)], quantity))
+        orders.append(OrderRecord("Customer", "Address", None, items))
+    return orders
+
+
+def main():
+    """Validate every order and report time and retained result memory."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--invalid-every", type=int, default=20)
+    args = parser.parse_args()
+
+    validator = CatalogValidator(DictCatalog())
+    orders = make_orders(args.orders, args.invalid_every)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = [validator.validate_order(order) for order in orders]
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lines = sum(len(order_results) for order_results in results)
+    print(f"validated {lines} lines in {elapsed:.2f}s (traced)")
+    print(f"retained: {retained / lines:.0f} bytes/line")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@
 from .exceptions import ParsingError, ValidationError
 from .interfaces import EmailParser, OrderProcessor, OrderValidator
 from .models import Order, OrderItem
+from .records import OrderItemRecord, OrderRecord
 
 __all__ = [
     "Order",
     "OrderItem",
+    "OrderRecord",
+    "OrderItemRecord",
     "EmailParser",
     "OrderValidator",
     "OrderProcessor",
@@ -29,3 +29,27 @@ class LLMError(OrderProcessingError):
     """Exception raised when LLM operations fail."""
 
     pass
+
+
+class StockReservationError(OrderProcessingError):
+    """Exception raised when stock cannot be reserved for an order."""
+
+    def __init__(self, message: str, available: dict[str, int]):
+        super().__init__(message)
+        # Units still available for each SKU that could not be reserved
+        self.available = available
+
+
+class QueueFullError(OrderProcessingError):
+    """Exception raised when a job queue is at its depth limit."""
+
+    def __init__(self, depth: int, max_depth: int):
+        super().__init__(f"Queue depth {depth} has reached its limit of {max_depth}")
+        self.depth = depth
+        self.max_depth = max_depth
+
+
+class ResultSinkError(OrderProcessingError):
+    """Exception raised when processed orders cannot be written to a sink."""
+
+    pass
@@ -1,11 +1,18 @@
 """Core interfaces and protocols for the order processing system."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Optional, Protocol
 
 from .models import Order, OrderItem
+from .records import OrderLike
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+    from data_sources.category_index import CategoryIndex
+    from ingestion.checkpoint import IngestionCheckpoint
+    from ingestion.sources import MailMessage
     from validation.result import ValidationResult
 
 
@@ -24,6 +31,20 @@ class OrderValidator(Protocol):
         """Validate a single order item."""
         ...
 
+    def validate_order(
+        self, order: OrderLike, held: Optional["Mapping[str, int]"] = None
+    ) -> list["ValidationResult"]:
+        """Validate all items of an order, returning one result per item.
+
+        ``held`` maps SKUs to stock already reserved for this order, which
+        counts as available to it.
+        """
+        ...
+
+    async def avalidate_order(self, order: OrderLike) -> list["ValidationResult"]:
+        """Async variant of ``validate_order``, run on a worker thread by default."""
+        return await asyncio.to_thread(self.validate_order, order)
+
 
 class OrderProcessor(Protocol):
     """Protocol for order processing implementations."""
@@ -40,10 +61,39 @@ class CatalogDataSource(Protocol):
         """Get product details by SKU."""
         ...
 
+    def get_many(self, skus: "Iterable[str]") -> dict[str, Optional[dict]]:
+        """Get product details for several SKUs, mapping unknown SKUs to None.
+
+        The default looks SKUs up one at a time; remote sources override it
+        to fetch them in as few round trips as possible.
+        """
+        return {sku: self.get_product_details(sku) for sku in dict.fromkeys(skus)}
+
+    async def aget_many(self, skus: "Iterable[str]") -> dict[str, Optional[dict]]:
+        """Async variant of ``get_many``."""
+        return await asyncio.to_thread(self.get_many, list(skus))
+
     def find_similar_products(self, sku: str) -> list[dict]:
         """Find similar products by SKU pattern."""
         ...
 
+    def get_category_index(self) -> "CategoryIndex":
+        """Get the index of product categories in the catalog."""
+        ...
+
+
+class MailSource(Protocol):
+    """Protocol for mailboxes read incrementally by the ingestor."""
+
+    # Stable identifier used to store the source's position in checkpoints
+    name: str
+
+    def iter_messages(
+        self, checkpoint: "IngestionCheckpoint"
+    ) -> "Iterator[MailMessage]":
+        """Yield messages the checkpoint has not recorded as processed."""
+        ...
+
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
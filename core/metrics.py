@@ -0,0 +1,431 @@
+"""Process-local metrics with OpenMetrics text export.
+
+Counters, gauges and histograms are registered once, usually at module
+level, and updated from the hot path. A labelled metric caches one series
+per label set, so an update is a dictionary lookup plus an uncontended lock.
+The number of series per metric is capped; label sets beyond the cap are
+folded into a single ``__overflow__`` series instead of growing without
+bound.
+
+Metrics live in the process that updates them: counts made in batch worker
+processes are not visible to the parent.
+"""
+
+import bisect
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_MAX_SERIES = 50
+OVERFLOW_LABEL_VALUE = "__overflow__"
+# Seconds, spanning cache hits to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+NAME_PATTERN = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+LABEL_PATTERN = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+
+def format_value(value: float) -> str:
+    """Format a sample value as OpenMetrics expects."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    """Escape backslashes, quotes and newlines in a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format ``{name="value",...}``, or nothing without labels."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+class CounterSeries:
+    """One monotonically increasing series."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        """Add a non-negative amount."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+
+class GaugeSeries:
+    """One series that can go up and down."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        """Set the current value."""
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1.0):
+        """Increase the value."""
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        """Decrease the value."""
+        with self._lock:
+            self.value -= amount
+
+
+class HistogramSeries:
+    """Bucketed observations of one series."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # Per-bucket counts; the last slot holds observations above every bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        """Get consistent per-bucket counts and sum."""
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Metric(ABC):
+    """A named metric family with a fixed set of label names.
+
+    ``labels(...)`` returns the series for one label set, creating it on
+    first use. Unlabelled metrics are updated directly.
+    """
+
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        max_series: int = DEFAULT_MAX_SERIES,
+        unit: str = "",
+    ):
+        if not NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid metric name: {name}")
+        for label in labelnames:
+            if not LABEL_PATTERN.match(label) or label == "le":
+                raise ValueError(f"Invalid label name: {label}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self.unit = unit
+        self._series: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self._overflowed = False
+
+    def labels(self, *values: str, **labels: str):
+        """Get the series for a label set, by position or by name."""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        series = self._series.get(values)
+        if series is not None:
+            return series
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        return self._add_series(key)
+
+    def _add_series(self, key: tuple[str, ...]):
+        """Create a series, or fold it into the overflow series past the cap."""
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                return series
+            if len(self._series) >= self.max_series:
+                if not self._overflowed:
+                    logger.warning(
+                        "Metric %s exceeded %d series; folding new label sets into %s",
+                        self.name,
+                        self.max_series,
+                        OVERFLOW_LABEL_VALUE,
+                    )
+                    self._overflowed = True
+                key = (OVERFLOW_LABEL_VALUE,) * len(self.labelnames)
+                series = self._series.get(key)
+                if series is not None:
+                    return series
+            series = self._series[key] = self._new_series()
+            return series
+
+    @abstractmethod
+    def _new_series(self):
+        """Create an empty series."""
+
+    def _default(self):
+        """Get the only series of an unlabelled metric."""
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self.labels()
+
+    def series(self) -> list[tuple[tuple[str, ...], object]]:
+        """Get every label set with its series."""
+        with self._lock:
+            return list(self._series.items())
+
+    def render(self) -> Iterator[str]:
+        """Render the metric family as OpenMetrics lines."""
+        yield f"# TYPE {self.name} {self.type_name}"
+        if self.unit:
+            yield f"# UNIT {self.name} {self.unit}"
+        yield f"# HELP {self.name} {self.documentation}"
+        for values, series in sorted(self.series()):
+            yield from self._render_series(values, series)
+
+    @abstractmethod
+    def _render_series(self, values: tuple[str, ...], series) -> Iterator[str]:
+        """Render the samples of one series."""
+
+
+class Counter(Metric):
+    """Counts events; exported as ``<name>_total``."""
+
+    type_name = "counter"
+
+    def _new_series(self) -> CounterSeries:
+        return CounterSeries()
+
+    def inc(self, amount: float = 1.0):
+        """Increment an unlabelled counter."""
+        self._default().inc(amount)
+
+    def _render_series(self, values, series) -> Iterator[str]:
+        labels = format_labels(self.labelnames, values)
+        yield f"{self.name}_total{labels} {format_value(series.value)}"
+
+
+class Gauge(Metric):
+    """Reports a current value, set directly or read from a callback."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_series(self) -> GaugeSeries:
+        return GaugeSeries()
+
+    def set(self, value: float):
+        """Set an unlabelled gauge."""
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        """Increase an unlabelled gauge."""
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        """Decrease an unlabelled gauge."""
+        self._default().dec(amount)
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """Read an unlabelled gauge from ``function`` at export time."""
+        self._default()
+        self._function = function
+
+    def _render_series(self, values, series) -> Iterator[str]:
+        value = self._function() if self._function is not None else series.value
+        labels = format_labels(self.labelnames, values)
+        yield f"{self.name}{labels} {format_value(value)}"
+
+
+class Histogram(Metric):
+    """Counts observations into cumulative ``le`` buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_series: int = DEFAULT_MAX_SERIES,
+        unit: str = "",
+    ):
+        super().__init__(name, documentation, labelnames, max_series, unit)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def _new_series(self) -> HistogramSeries:
+        return HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        """Record an observation on an unlabelled histogram."""
+        self._default().observe(value)
+
+    def _render_series(self, values, series) -> Iterator[str]:
+        counts, total = series.snapshot()
+        names = (*self.labelnames, "le")
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            cumulative += count
+            labels = format_labels(names, (*values, format_value(bound)))
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = format_labels(self.labelnames, values)
+        yield f"{self.name}_count{labels} {cumulative}"
+        yield f"{self.name}_sum{labels} {format_value(total)}"
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in OpenMetrics text format.
+
+    Registering a name again returns the existing metric when its type and
+    labels match, so modules can declare their metrics at import time.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        max_series: int = DEFAULT_MAX_SERIES,
+    ) -> Counter:
+        """Register a counter; ``name`` excludes the ``_total`` suffix."""
+        return self._register(Counter(name, documentation, labelnames, max_series))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        max_series: int = DEFAULT_MAX_SERIES,
+    ) -> Gauge:
+        """Register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames, max_series))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_series: int = DEFAULT_MAX_SERIES,
+        unit: str = "",
+    ) -> Histogram:
+        """Register a histogram."""
+        return self._register(
+            Histogram(name, documentation, labelnames, buckets, max_series, unit)
+        )
+
+    def _register(self, metric: Metric):
+        """Add a metric, or return the compatible one already registered."""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or (
+            existing.labelnames != metric.labelnames
+        ):
+            raise ValueError(f"Metric {metric.name} is already registered differently")
+        return existing
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Get a registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every metric, terminated by ``# EOF``."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = [line for metric in metrics for line in metric.render()]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Atomically write the rendered metrics, e.g. for a textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class TextfileExporter:
+    """Rewrites a metrics textfile every ``interval`` seconds until stopped."""
+
+    def __init__(
+        self,
+        path: str,
+        registry: Optional[MetricsRegistry] = None,
+        interval: float = 15.0,
+    ):
+        self.path = path
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start writing in a background thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-textfile", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread after writing the final values."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._write()
+
+    def _run(self):
+        """Write the file periodically."""
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        """Write the file, logging rather than raising on I/O errors."""
+        try:
+            self.registry.write_textfile(self.path)
+        except OSError as e:
+            logger.warning("Could not write metrics to %s: %s", self.path, e)
+
+
+# Registry shared by the pipeline's modules
+REGISTRY = MetricsRegistry()
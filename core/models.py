@@ -25,6 +25,9 @@ class Order(BaseModel):
     address: str = Field(description="Delivery address")
     delivery_date: date = Field(description="Requested delivery date")
     items: list[OrderItem] = Field(description="List of ordered items")
+    reservation_id: Optional[str] = Field(
+        default=None, description="Stock reservation held for the valid items"
+    )
 
     class Config:
         json_schema_extra = {
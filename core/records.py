@@ -0,0 +1,152 @@
+"""Slotted order records used inside the pipeline between the model boundaries."""
+
+from datetime import date
+from typing import Any, Optional, Union
+
+from .models import Order, OrderItem
+
+
+class OrderItemRecord:
+    """Slotted counterpart of ``OrderItem`` without per-assignment validation.
+
+    Notes may be held as a ``str.format`` template and its arguments, set
+    with ``set_notes``; they are formatted when first read, which normally
+    happens only in ``to_model`` or ``to_dict``.
+    """
+
+    __slots__ = ("sku", "quantity", "valid", "_notes", "_notes_args", "suggestions")
+
+    def __init__(
+        self,
+        sku: str,
+        quantity: int,
+        valid: bool = True,
+        notes: Optional[str] = None,
+        suggestions: Optional[list[dict]] = None,
+    ):
+        self.sku = sku
+        self.quantity = quantity
+        self.valid = valid
+        self._notes = notes
+        self._notes_args: tuple = ()
+        self.suggestions = suggestions
+
+    @property
+    def notes(self) -> Optional[str]:
+        """Get the notes, formatting a template on first access."""
+        if self._notes_args:
+            self._notes = self._notes.format(*self._notes_args)
+            self._notes_args = ()
+        return self._notes
+
+    @notes.setter
+    def notes(self, notes: Optional[str]):
+        self._notes = notes
+        self._notes_args = ()
+
+    def set_notes(self, template: str, args: tuple = ()):
+        """Set notes to be formatted from ``template`` and ``args`` when read."""
+        self._notes = template
+        self._notes_args = args
+
+    @classmethod
+    def from_model(cls, item: OrderItem) -> "OrderItemRecord":
+        """Create a record from a validated model."""
+        return cls(item.sku, item.quantity, item.valid, item.notes, item.suggestions)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OrderItemRecord":
+        """Create a record from the output of ``to_dict``."""
+        return cls(
+            data["sku"],
+            data["quantity"],
+            data.get("valid", True),
+            data.get("notes"),
+            data.get("suggestions"),
+        )
+
+    def to_model(self) -> OrderItem:
+        """Build the model at an output boundary."""
+        return OrderItem.model_validate(self.to_dict())
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the fields as a JSON-compatible dictionary."""
+        return {
+            "sku": self.sku,
+            "quantity": self.quantity,
+            "valid": self.valid,
+            "notes": self.notes,
+            "suggestions": self.suggestions,
+        }
+
+
+class OrderRecord:
+    """Slotted counterpart of ``Order``."""
+
+    __slots__ = ("customer", "address", "delivery_date", "items", "reservation_id")
+
+    def __init__(
+        self,
+        customer: str,
+        address: str,
+        delivery_date: date,
+        items: list[OrderItemRecord],
+        reservation_id: Optional[str] = None,
+    ):
+        self.customer = customer
+        self.address = address
+        self.delivery_date = delivery_date
+        self.items = items
+        self.reservation_id = reservation_id
+
+    @classmethod
+    def from_model(cls, order: Order) -> "OrderRecord":
+        """Create a record from a validated model."""
+        return cls(
+            order.customer,
+            order.address,
+            order.delivery_date,
+            [OrderItemRecord.from_model(item) for item in order.items],
+            order.reservation_id,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OrderRecord":
+        """Create a record from the output of ``to_dict``."""
+        return cls(
+            data["customer"],
+            data["address"],
+            date.fromisoformat(data["delivery_date"]),
+            [OrderItemRecord.from_dict(item) for item in data["items"]],
+            data.get("reservation_id"),
+        )
+
+    def to_model(self) -> Order:
+        """Build the model at an output boundary.
+
+        Validating from plain dictionaries runs in Pydantic's compiled core and
+        is faster than ``model_construct`` for nested models.
+        """
+        return Order.model_validate(
+            {
+                "customer": self.customer,
+                "address": self.address,
+                "delivery_date": self.delivery_date,
+                "items": [item.to_dict() for item in self.items],
+                "reservation_id": self.reservation_id,
+            }
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the fields as a JSON-compatible dictionary."""
+        return {
+            "customer": self.customer,
+            "address": self.address,
+            "delivery_date": self.delivery_date.isoformat(),
+            "items": [item.to_dict() for item in self.items],
+            "reservation_id": self.reservation_id,
+        }
+
+
+# Anything the pipeline stages accept as an order
+OrderLike = Union[Order, OrderRecord]
@@ -1,5 +1,20 @@
 """Data sources module for catalog and product information."""
 
+from .caching import CachingCatalogDataSource
 from .catalog_csv import CsvCatalogDataSource
+from .catalog_delta import CatalogDelta, CatalogSnapshot
+from .category_index import CategoryIndex, ProductCategory
+from .http_inventory import HttpInventoryDataSource
+from .lookup import afetch_products, fetch_products
 
-__all__ = ["CsvCatalogDataSource"]
+__all__ = [
+    "CsvCatalogDataSource",
+    "CatalogDelta",
+    "CatalogSnapshot",
+    "CategoryIndex",
+    "ProductCategory",
+    "HttpInventoryDataSource",
+    "CachingCatalogDataSource",
+    "fetch_products",
+    "afetch_products",
+]
@@ -0,0 +1,321 @@
+"""Read-through cache in front of a slower catalog data source."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass
+from typing import Any, Callable, NamedTuple, Optional
+
+from core.interfaces import CatalogDataSource
+from core.metrics import REGISTRY
+
+from .category_index import CategoryIndex
+from .lookup import Products, afetch_products, fetch_products
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 10_000
+DEFAULT_TTL = 60.0
+DEFAULT_STALE_TTL = 300.0
+DEFAULT_NEGATIVE_TTL = 30.0
+
+FRESH = "fresh"
+STALE = "stale"
+MISSING = "missing"
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "catalog_cache_lookups",
+    "Catalog cache lookups by result: hit, negative_hit, stale or miss.",
+    ("result",),
+)
+CACHE_HITS = CACHE_LOOKUPS.labels("hit")
+CACHE_NEGATIVE_HITS = CACHE_LOOKUPS.labels("negative_hit")
+CACHE_STALE_HITS = CACHE_LOOKUPS.labels("stale")
+CACHE_MISSES = CACHE_LOOKUPS.labels("miss")
+CACHE_REFRESHES = REGISTRY.counter(
+    "catalog_cache_refreshes",
+    "Background refreshes of stale catalog entries, by outcome: ok or error.",
+    ("outcome",),
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "catalog_cache_evictions",
+    "Catalog cache entries evicted to stay within capacity.",
+)
+
+
+class CacheEntry(NamedTuple):
+    """A cached value and the times it turns stale and expires."""
+
+    value: Any
+    stale_at: float
+    expires_at: float
+
+
+class TtlLruCache:
+    """Bounded mapping that evicts least recently used entries.
+
+    Entries are fresh until ``stale_at`` and may be served while a refresh
+    is pending until ``expires_at``. Not thread-safe; callers hold a lock.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._entries: OrderedDict[Any, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any, now: float) -> tuple[str, Any]:
+        """Get the state of ``key``, fresh, stale or missing, and its value."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING, None
+        if now >= entry.expires_at:
+            del self._entries[key]
+            return MISSING, None
+        self._entries.move_to_end(key)
+        return (FRESH if now < entry.stale_at else STALE), entry.value
+
+    def put(
+        self, key: Any, value: Any, now: float, ttl: float, stale_ttl: float
+    ) -> int:
+        """Store a value, returning the number of entries evicted for it."""
+        self._entries[key] = CacheEntry(value, now + ttl, now + ttl + stale_ttl)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def invalidate(self, keys: Iterable[Any]):
+        """Drop the given keys."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+
+@dataclass
+class CacheStats:
+    """Running totals of cache lookups and background refreshes."""
+
+    hits: int = 0
+    negative_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of SKU lookups answered without waiting for the source."""
+        served = self.hits + self.negative_hits + self.stale_hits
+        total = served + self.misses
+        return served / total if total else 0.0
+
+
+class CachingCatalogDataSource(CatalogDataSource):
+    """Caches product lookups of another catalog data source.
+
+    Products are fresh for ``ttl`` seconds. For ``stale_ttl`` seconds after
+    that a cached product is still returned while a background thread
+    fetches the current one. Unknown SKUs are cached for ``negative_ttl``
+    seconds, so repeated typos do not reach the source; their similar
+    products are cached alongside. At most ``capacity`` products are kept.
+
+    Sources that publish updates, like ``CsvCatalogDataSource`` or an
+    ``HttpInventoryDataSource`` wrapping one, invalidate the changed SKUs as
+    soon as an update is applied.
+    """
+
+    def __init__(
+        self,
+        source: CatalogDataSource,
+        capacity: int = DEFAULT_CAPACITY,
+        ttl: float = DEFAULT_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.source = source
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._products = TtlLruCache(capacity)
+        self._similar = TtlLruCache(capacity)
+        self._refreshing: set[str] = set()
+        self._pending: set[Future] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Bumped by invalidation so fetches started before it are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        if hasattr(source, "add_update_listener"):
+            source.add_update_listener(lambda _snapshot, skus: self.invalidate(skus))
+
+    def get_product_details(self, sku: str) -> Optional[dict[str, Any]]:
+        """Get product details by SKU, from the cache when possible."""
+        return self.get_many([sku])[sku]
+
+    def get_many(self, skus: Iterable[str]) -> Products:
+        """Get product details for several SKUs, fetching only the misses."""
+        products, misses, generation = self._lookup(skus)
+        if misses:
+            products.update(
+                self._store(fetch_products(self.source, misses), generation)
+            )
+        return products
+
+    async def aget_many(self, skus: Iterable[str]) -> Products:
+        """Async variant of ``get_many``."""
+        products, misses, generation = self._lookup(skus)
+        if misses:
+            products.update(
+                self._store(await afetch_products(self.source, misses), generation)
+            )
+        return products
+
+    def find_similar_products(self, sku: str) -> list[dict[str, Any]]:
+        """Find similar products, cached like a missing SKU."""
+        with self._lock:
+            state, suggestions = self._similar.get(sku, self.clock())
+        if state == FRESH:
+            return suggestions
+        suggestions = self.source.find_similar_products(sku)
+        with self._lock:
+            self._similar.put(sku, suggestions, self.clock(), self.negative_ttl, 0.0)
+        return suggestions
+
+    def get_category_index(self) -> CategoryIndex:
+        """Get the index of product categories in the source."""
+        return self.source.get_category_index()
+
+    def invalidate(self, skus: Optional[Iterable[str]] = None):
+        """Drop cached products for ``skus``, or everything if None.
+
+        Similar-product suggestions embed stock levels, so they are always
+        dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            if skus is None:
+                self._products.clear()
+            else:
+                self._products.invalidate(skus)
+            self._similar.clear()
+
+    def wait_for_refreshes(self, timeout: Optional[float] = None) -> bool:
+        """Wait for scheduled background refreshes, returning whether all ended."""
+        with self._lock:
+            pending = set(self._pending)
+        return not wait_futures(pending, timeout).not_done
+
+    def close(self):
+        """Finish pending refreshes and stop the refresh thread."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _lookup(self, skus: Iterable[str]) -> tuple[Products, list[str], int]:
+        """Answer SKUs from the cache, returning them, the misses and the generation.
+
+        Misses map to None until fetched, keeping the requested order. Stale
+        SKUs are answered and scheduled for refresh.
+        """
+        products: Products = {}
+        misses = []
+        stale = []
+        now = self.clock()
+        with self._lock:
+            for sku in dict.fromkeys(skus):
+                state, product = self._products.get(sku, now)
+                products[sku] = product
+                if state == MISSING:
+                    misses.append(sku)
+                    continue
+                if state == STALE:
+                    self.stats.stale_hits += 1
+                    CACHE_STALE_HITS.inc()
+                    if sku not in self._refreshing:
+                        self._refreshing.add(sku)
+                        stale.append(sku)
+                elif product is None:
+                    self.stats.negative_hits += 1
+                    CACHE_NEGATIVE_HITS.inc()
+                else:
+                    self.stats.hits += 1
+                    CACHE_HITS.inc()
+            self.stats.misses += len(misses)
+            generation = self._generation
+        if stale:
+            self._schedule_refresh(stale, generation)
+        if misses:
+            CACHE_MISSES.inc(len(misses))
+        return products, misses, generation
+
+    def _store(self, products: Products, generation: int) -> Products:
+        """Cache fetched products, unknown SKUs with the negative TTL.
+
+        Products fetched before an invalidation are returned but not cached.
+        """
+        now = self.clock()
+        evicted = 0
+        with self._lock:
+            if generation != self._generation:
+                return products
+            for sku, product in products.items():
+                # Unknown SKUs are never served stale
+                if product:
+                    ttl, stale_ttl = self.ttl, self.stale_ttl
+                else:
+                    ttl, stale_ttl = self.negative_ttl, 0.0
+                evicted += self._products.put(sku, product, now, ttl, stale_ttl)
+            self.stats.evictions += evicted
+        if evicted:
+            CACHE_EVICTIONS.inc(evicted)
+        return products
+
+    def _schedule_refresh(self, skus: list[str], generation: int):
+        """Fetch stale SKUs in one background lookup."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="catalog-cache-refresh"
+                )
+            future = self._executor.submit(self._refresh, skus, generation)
+            self._pending.add(future)
+        # Runs at once if the refresh already ended, so not under the lock
+        future.add_done_callback(self._refresh_done)
+
+    def _refresh(self, skus: list[str], generation: int):
+        """Replace stale entries; on failure they are served until they expire."""
+        try:
+            self._store(fetch_products(self.source, skus), generation)
+        except Exception as e:
+            logger.warning("Catalog cache refresh of %d SKUs failed: %s", len(skus), e)
+            CACHE_REFRESHES.labels("error").inc()
+            with self._lock:
+                self.stats.refresh_errors += 1
+        else:
+            CACHE_REFRESHES.labels("ok").inc()
+            with self._lock:
+                self.stats.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(skus)
+
+    def _refresh_done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
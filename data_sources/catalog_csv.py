@@ -1,23 +1,199 @@
 """CSV-based catalog data source implementation."""
 
-from typing import Any, Optional
-
-import pandas as pd
+import csv
+import os
+import threading
+from collections.abc import Iterable
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from core.exceptions import CatalogError
 from core.interfaces import CatalogDataSource
 
+from .catalog_delta import (
+    DELTA_FIELDS,
+    CatalogDelta,
+    CatalogSnapshot,
+    apply_to_product,
+)
+from .category_index import CategoryIndex
+from .delta_log import CatalogDeltaLog
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Accepted column names per product field, preferred spelling first
+COLUMN_NAMES = {
+    "sku": ("Product Code", "Product_Code"),
+    "name": ("Product Name", "Product_Name"),
+    "price": ("Price",),
+    "stock": ("Available Stock", "Available_in_Stock"),
+    "moq": ("Minimum Order Quantity", "Min_Order_Quantity"),
+    "description": ("Description",),
+}
+
+# Called with the new snapshot and the SKUs an update changed
+UpdateListener = Callable[[CatalogSnapshot, frozenset], None]
+
 
 class CsvCatalogDataSource(CatalogDataSource):
-    """CSV file-based catalog data source."""
+    """CSV file-based catalog data source.
+
+    Stock, MOQ and price changes are applied with ``apply_deltas`` without
+    reloading the file. Each update publishes a new immutable snapshot, so a
+    reader holding ``snapshot()`` sees one version throughout. With a
+    ``delta_log_path`` updates are logged durably and replayed on start-up,
+    and the log is folded into the CSV by ``compact``, automatically once it
+    holds ``compact_every`` entries.
+    """
 
-    def __init__(self, catalog_path: str):
+    def __init__(
+        self,
+        catalog_path: str,
+        delta_log_path: Optional[str] = None,
+        compact_every: Optional[int] = None,
+    ):
         self.catalog_path = catalog_path
+        self.compact_every = compact_every
         self._catalog = self._load_catalog()
-        self._sku_map = self._create_sku_map()
+        self._columns = {
+            field: next((n for n in names if n in self._catalog.columns), names[0])
+            for field, names in COLUMN_NAMES.items()
+        }
+        products = self._create_sku_map()
+        self._update_lock = threading.Lock()
+        self._listeners: list[UpdateListener] = []
+        self._delta_log: Optional[CatalogDeltaLog] = None
+        version = 0
+        if delta_log_path is not None:
+            self._delta_log = CatalogDeltaLog(delta_log_path)
+            for entry_version, values in self._delta_log.replay():
+                version = entry_version
+                for sku, fields in values.items():
+                    if sku in products:
+                        products[sku] = {**products[sku], **fields}
+        self._snapshot = CatalogSnapshot(
+            version, MappingProxyType(products), CategoryIndex.from_products(products)
+        )
+
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot, incremented by each update."""
+        return self._snapshot.version
 
-    def _load_catalog(self) -> pd.DataFrame:
+    def snapshot(self) -> CatalogSnapshot:
+        """Get the current catalog version for consistent multi-step reads."""
+        return self._snapshot
+
+    def add_update_listener(self, listener: UpdateListener):
+        """Call ``listener`` after each update with the snapshot and changed SKUs."""
+        self._listeners.append(listener)
+
+    def apply_deltas(self, deltas: Iterable[CatalogDelta]) -> CatalogSnapshot:
+        """Apply a batch of deltas atomically and publish the new snapshot.
+
+        Changed products are copied and the product mapping is copied
+        shallowly; the category index is updated only for the categories
+        whose stock changed. Raises ``CatalogError`` without
+        changing anything if a delta names an unknown SKU or would leave a
+        product with negative stock, an MOQ below one or a negative price.
+        """
+        with self._update_lock:
+            current = self._snapshot
+            changed: dict[str, dict[str, Any]] = {}
+            errors = []
+            for delta in deltas:
+                product = changed.get(delta.sku)
+                if product is None:
+                    base = current.products.get(delta.sku)
+                    if base is None:
+                        errors.append(f"unknown SKU {delta.sku}")
+                        continue
+                    product = changed[delta.sku] = dict(base)
+                error = apply_to_product(product, delta)
+                if error is not None:
+                    errors.append(error)
+            if errors:
+                raise CatalogError(f"Rejected catalog update: {'; '.join(errors)}")
+            if not changed:
+                return current
+
+            products = dict(current.products)
+            products.update(changed)
+            stock_changes = {
+                sku: product["stock"] - current.products[sku]["stock"]
+                for sku, product in changed.items()
+                if product["stock"] != current.products[sku]["stock"]
+            }
+            snapshot = CatalogSnapshot(
+                current.version + 1,
+                MappingProxyType(products),
+                current.category_index.with_stock_changes(stock_changes)
+                if stock_changes
+                else current.category_index,
+            )
+            if self._delta_log is not None:
+                self._delta_log.append(
+                    snapshot.version,
+                    {
+                        sku: {field: product[field] for field in DELTA_FIELDS}
+                        for sku, product in changed.items()
+                    },
+                )
+            self._snapshot = snapshot
+            if (
+                self._delta_log is not None
+                and self.compact_every
+                and self._delta_log.entries >= self.compact_every
+            ):
+                self._compact_locked()
+
+        for listener in self._listeners:
+            listener(snapshot, frozenset(changed))
+        return snapshot
+
+    def compact(self):
+        """Rewrite the CSV with the current values and empty the delta log."""
+        with self._update_lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        """Atomically replace the CSV, then reset the log."""
+        columns = [self._columns[field] for field in COLUMN_NAMES]
+        temporary_path = f"{self.catalog_path}.compacting"
+        with open(temporary_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for sku, product in self._snapshot.products.items():
+                writer.writerow(
+                    [
+                        sku,
+                        product["name"],
+                        "" if product["price"] is None else product["price"],
+                        product["stock"],
+                        product["moq"],
+                        # Missing descriptions are written as empty cells
+                        product["description"]
+                        if isinstance(product["description"], str)
+                        else "",
+                    ]
+                )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.catalog_path)
+        if self._delta_log is not None:
+            self._delta_log.reset()
+
+    def close(self):
+        """Close the delta log."""
+        if self._delta_log is not None:
+            self._delta_log.close()
+
+    def _load_catalog(self) -> "pd.DataFrame":
         """Load catalog data from CSV file."""
+        # pandas is imported on first load to keep package import cheap
+        import pandas as pd
+
         try:
             return pd.read_csv(self.catalog_path)
         except Exception as e:
@@ -27,27 +203,42 @@ class CsvCatalogDataSource(CatalogDataSource):
 
     def _create_sku_map(self) -> dict[str, dict[str, Any]]:
         """Create mapping of SKUs to product details."""
+        import pandas as pd
+
+        columns = self._columns
         sku_map = {}
         for _, row in self._catalog.iterrows():
-            # Handle different column name formats
-            product_code = row.get("Product Code") or row.get("Product_Code")
-            product_name = row.get("Product Name") or row.get("Product_Name")
-            stock = row.get("Available Stock") or row.get("Available_in_Stock")
-            moq = row.get("Minimum Order Quantity") or row.get("Min_Order_Quantity")
-            description = row.get("Description", "")
-
-            if product_code:
+            product_code = row.get(columns["sku"])
+            stock = row.get(columns["stock"])
+            moq = row.get(columns["moq"])
+            price = row.get(columns["price"])
+            description = row.get(columns["description"])
+
+            if pd.notna(product_code) and product_code:
                 sku_map[product_code] = {
-                    "name": product_name,
-                    "stock": int(stock) if stock is not None else 0,
-                    "moq": int(moq) if moq is not None else 1,
-                    "description": description,
+                    "name": row.get(columns["name"]),
+                    "stock": int(stock) if pd.notna(stock) else 0,
+                    "moq": int(moq) if pd.notna(moq) else 1,
+                    "price": float(price) if pd.notna(price) else None,
+                    # pandas reads empty cells as NaN
+                    "description": description if pd.notna(description) else "",
                 }
         return sku_map
 
     def get_product_details(self, sku: str) -> Optional[dict[str, Any]]:
         """Get product details by SKU."""
-        return self._sku_map.get(sku)
+        return self._snapshot.products.get(sku)
+
+    def get_many(self, skus: Iterable[str]) -> dict[str, Optional[dict[str, Any]]]:
+        """Get product details for several SKUs from one snapshot version."""
+        products = self._snapshot.products
+        return {sku: products.get(sku) for sku in skus}
+
+    async def aget_many(
+        self, skus: Iterable[str]
+    ) -> dict[str, Optional[dict[str, Any]]]:
+        """Async variant of ``get_many``; in-memory, so it does not block."""
+        return self.get_many(skus)
 
     def find_similar_products(self, sku: str) -> list[dict[str, Any]]:
         """Find similar products based on SKU pattern or product name."""
@@ -57,7 +248,7 @@ class CsvCatalogDataSource(CatalogDataSource):
         suggestions = []
         sku_upper = sku.upper()
 
-        for catalog_sku, details in self._sku_map.items():
+        for catalog_sku, details in self._snapshot.products.items():
             # Skip exact matches
             if catalog_sku == sku:
                 continue
@@ -85,6 +276,10 @@ class CsvCatalogDataSource(CatalogDataSource):
 
         return suggestions[:5]  # Return top 5 suggestions
 
+    def get_category_index(self) -> CategoryIndex:
+        """Get the category index of the current catalog version."""
+        return self._snapshot.category_index
+
     def get_all_products(self) -> dict[str, dict[str, Any]]:
         """Get all products in the catalog."""
-        return self._sku_map.copy()
+        return dict(self._snapshot.products)
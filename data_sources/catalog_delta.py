@@ -0,0 +1,69 @@
+"""Incremental catalog changes and the versioned snapshots they produce."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .category_index import CategoryIndex
+
+# Product fields a delta can change
+DELTA_FIELDS = ("stock", "moq", "price")
+
+
+@dataclass(frozen=True)
+class CatalogDelta:
+    """A change to one product.
+
+    ``stock_change`` adjusts stock relative to its current level, e.g. -3 for
+    three units shipped; ``stock``, ``moq`` and ``price`` replace the current
+    values when given. A relative change applies after an absolute stock.
+    """
+
+    sku: str
+    stock_change: int = 0
+    stock: Optional[int] = None
+    moq: Optional[int] = None
+    price: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CatalogDelta":
+        """Create a delta from a dictionary with the same keys as the fields."""
+        return cls(
+            data["sku"],
+            int(data.get("stock_change", 0)),
+            data.get("stock"),
+            data.get("moq"),
+            data.get("price"),
+        )
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """A consistent, immutable view of the catalog at one version.
+
+    Product dictionaries are shared between snapshots and must not be
+    modified; updates replace the changed products with copies.
+    """
+
+    version: int
+    products: Mapping[str, dict[str, Any]]
+    category_index: CategoryIndex
+
+
+def apply_to_product(product: dict[str, Any], delta: CatalogDelta) -> Optional[str]:
+    """Apply a delta to a product copy, returning an error message if invalid."""
+    if delta.stock is not None:
+        product["stock"] = int(delta.stock)
+    product["stock"] += delta.stock_change
+    if delta.moq is not None:
+        product["moq"] = int(delta.moq)
+    if delta.price is not None:
+        product["price"] = float(delta.price)
+
+    if product["stock"] < 0:
+        return f"stock of {delta.sku} would become {product['stock']}"
+    if product["moq"] < 1:
+        return f"minimum order quantity of {delta.sku} must be at least 1"
+    if product["price"] is not None and product["price"] < 0:
+        return f"price of {delta.sku} must not be negative"
+    return None
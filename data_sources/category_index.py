@@ -0,0 +1,102 @@
+"""Product category index derived from catalog SKUs."""
+
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional
+
+KNOWN_CATEGORY_NAMES = {
+    "DSK": "Desk",
+    "CHR": "Chair",
+    "DTB": "Dining Table",
+    "DCH": "Dining Chair",
+    "BSF": "Bookshelf",
+    "SFA": "Sofa",
+    "CFT": "Coffee Table",
+    "TVS": "TV Stand",
+    "BDF": "Bed Frame",
+    "NST": "Nightstand",
+    "WRD": "Wardrobe",
+    "BST": "Bar Stool",
+    "SDB": "Sideboard",
+    "OFC": "Office Chair",
+    "ODC": "Outdoor Chair",
+    "ODT": "Outdoor Table",
+    "RCL": "Recliner",
+    "LVS": "Loveseat",
+    "OTM": "Ottoman",
+    "CST": "Console Table",
+}
+
+
+def category_code(sku: str) -> str:
+    """Get the category code of a SKU, e.g. ``"DSK"`` for ``"DSK-0001"``."""
+    prefix, separator, _ = sku.partition("-")
+    return prefix if separator else sku[:3]
+
+
+@dataclass
+class ProductCategory:
+    """A product category with its member SKUs and aggregate stock."""
+
+    code: str
+    name: str
+    skus: list[str] = field(default_factory=list)
+    total_stock: int = 0
+
+
+class CategoryIndex:
+    """Maps category codes to names, member SKUs and aggregate stock."""
+
+    def __init__(self, categories: Mapping[str, ProductCategory]):
+        self._categories = dict(categories)
+
+    @classmethod
+    def from_products(cls, products: Mapping[str, dict[str, Any]]) -> "CategoryIndex":
+        """Build the index in one pass over a SKU-to-product mapping."""
+        categories: dict[str, ProductCategory] = {}
+        first_words: dict[str, str] = {}
+        for sku, details in products.items():
+            code = category_code(sku)
+            category = categories.get(code)
+            if category is None:
+                category = categories[code] = ProductCategory(code=code, name=code)
+                words = str(details.get("name") or "").split()
+                first_words[code] = words[0] if words else code
+            category.skus.append(sku)
+            category.total_stock += details.get("stock", 0)
+
+        for code, category in categories.items():
+            category.name = KNOWN_CATEGORY_NAMES.get(code, first_words[code])
+        return cls(categories)
+
+    def with_stock_changes(self, changes: Mapping[str, int]) -> "CategoryIndex":
+        """Get a new index with SKU stock adjusted by the given differences.
+
+        Only the categories of changed SKUs are copied; the others, and all
+        member lists, are shared with this index.
+        """
+        categories = dict(self._categories)
+        for sku, difference in changes.items():
+            code = category_code(sku)
+            category = categories[code]
+            if category is self._categories[code]:
+                category = categories[code] = replace(category)
+            category.total_stock += difference
+        return CategoryIndex(categories)
+
+    def __iter__(self) -> Iterator[ProductCategory]:
+        return iter(self._categories.values())
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def get(self, code: str) -> Optional[ProductCategory]:
+        """Get a category by code."""
+        return self._categories.get(code)
+
+    def name_for(self, code: str) -> str:
+        """Get the human-readable name of a category code."""
+        category = self._categories.get(code)
+        if category is not None:
+            return category.name
+        return KNOWN_CATEGORY_NAMES.get(code, code)
@@ -0,0 +1,69 @@
+"""Append-only log of catalog updates, replayed over the base catalog file."""
+
+import json
+import os
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+
+class CatalogDeltaLog:
+    """JSON Lines log of the product values produced by each catalog update.
+
+    Entries hold the resulting ``stock``, ``moq`` and ``price`` of every
+    product an update changed rather than the relative changes, so
+    replaying an entry twice is harmless. That keeps compaction safe: if the
+    process dies after the base file is rewritten but before the log is
+    reset, replaying the old entries over the new base changes nothing.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self.entries = 0
+        self._file = None
+
+    def replay(self) -> Iterator[tuple[int, dict[str, dict[str, Any]]]]:
+        """Yield (version, products) for each complete entry, in order.
+
+        A partial last line left by a crash is dropped from the file.
+        """
+        if not os.path.exists(self.path):
+            return
+        end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                entry = json.loads(line)
+                end += len(line)
+                self.entries += 1
+                yield entry["version"], entry["products"]
+        if end != os.path.getsize(self.path):
+            os.truncate(self.path, end)
+
+    def append(self, version: int, products: Mapping[str, Mapping[str, Any]]):
+        """Durably append the values produced by one update."""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        line = json.dumps(
+            {"version": version, "products": products}, separators=(",", ":")
+        )
+        self._file.write(line.encode("utf-8") + b"\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.entries += 1
+
+    def reset(self):
+        """Empty the log once its entries are part of the base file."""
+        self.close()
+        with open(self.path, "wb") as f:
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.entries = 0
+
+    def close(self):
+        """Close the log file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,268 @@
+"""Catalog data source with stock levels from a remote inventory service."""
+
+import asyncio
+import http.client
+import json
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future
+from typing import Any, Optional
+from urllib.parse import urlencode, urlsplit
+
+from core.exceptions import CatalogError
+from core.interfaces import CatalogDataSource
+from core.metrics import REGISTRY
+
+from .catalog_csv import UpdateListener
+from .category_index import CategoryIndex
+from .lookup import fetch_products
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 5.0
+
+# Raised when a pooled connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+INVENTORY_REQUESTS = REGISTRY.counter(
+    "inventory_requests",
+    "Stock requests sent to the inventory service, by outcome: ok or error.",
+    ("outcome",),
+)
+INVENTORY_REQUEST_SECONDS = REGISTRY.histogram(
+    "inventory_request_duration_seconds",
+    "Time for one batched stock request to the inventory service.",
+    unit="seconds",
+)
+INVENTORY_SKUS = REGISTRY.counter(
+    "inventory_skus",
+    "SKUs whose stock was needed, by how it was served: fetched or coalesced.",
+    ("source",),
+)
+FETCHED_SKUS = INVENTORY_SKUS.labels("fetched")
+COALESCED_SKUS = INVENTORY_SKUS.labels("coalesced")
+
+
+class ConnectionPool:
+    """Keep-alive HTTP connections to one server, shared between threads.
+
+    At most ``size`` connections are open; callers beyond that wait for one
+    to be returned. A reused connection the server has closed in the
+    meantime is replaced and the request sent again once.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Expected an http(s) URL, got {base_url!r}")
+        self._connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle: list[http.client.HTTPConnection] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def request(self, method: str, path: str) -> tuple[int, bytes]:
+        """Send a request and return the response status and body."""
+        with self._slots:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            reused = connection is not None
+            if connection is None:
+                connection = self._open()
+            try:
+                try:
+                    response = self._send(connection, method, path)
+                except STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    connection.close()
+                    connection = self._open()
+                    response = self._send(connection, method, path)
+                body = response.read()
+            except BaseException:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                with self._lock:
+                    self._idle.append(connection)
+            return response.status, body
+
+    def close(self):
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _open(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        return self._connection_class(self.host, self.port, timeout=self.timeout)
+
+    @staticmethod
+    def _send(
+        connection: http.client.HTTPConnection, method: str, path: str
+    ) -> http.client.HTTPResponse:
+        connection.request(method, path, headers={"Accept": "application/json"})
+        return connection.getresponse()
+
+
+class HttpInventoryDataSource(CatalogDataSource):
+    """Catalog whose stock levels come from an inventory service.
+
+    Names, MOQs and prices come from ``catalog``; stock comes from
+    ``GET {base_url}/stock?skus=A,B``, answered with
+    ``{"stock": {"A": 3, "B": 0}}``. SKUs the service leaves out are out of
+    stock, and SKUs unknown to ``catalog`` are never requested.
+
+    Lookups are sent in batches of up to ``batch_size`` SKUs over a pool of
+    ``pool_size`` keep-alive connections. A SKU that another caller is
+    already fetching is waited for instead of requested again.
+    """
+
+    def __init__(
+        self,
+        catalog: CatalogDataSource,
+        base_url: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.catalog = catalog
+        self.batch_size = batch_size
+        self.pool = ConnectionPool(base_url, pool_size, timeout)
+        self._path = urlsplit(base_url).path.rstrip("/") + "/stock"
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_product_details(self, sku: str) -> Optional[dict[str, Any]]:
+        """Get product details by SKU, with live stock."""
+        return self.get_many([sku])[sku]
+
+    def get_many(self, skus: Iterable[str]) -> dict[str, Optional[dict[str, Any]]]:
+        """Get product details for several SKUs, with live stock."""
+        products = fetch_products(self.catalog, skus)
+        stock = self._stock([sku for sku, product in products.items() if product])
+        return {
+            sku: dict(product, stock=stock[sku]) if product else None
+            for sku, product in products.items()
+        }
+
+    async def aget_many(
+        self, skus: Iterable[str]
+    ) -> dict[str, Optional[dict[str, Any]]]:
+        """Async variant of ``get_many``, run in a worker thread."""
+        return await asyncio.to_thread(self.get_many, list(skus))
+
+    def find_similar_products(self, sku: str) -> list[dict[str, Any]]:
+        """Find similar products in the catalog, with live stock."""
+        suggestions = self.catalog.find_similar_products(sku)
+        stock = self._stock([suggestion["sku"] for suggestion in suggestions])
+        return [
+            dict(suggestion, stock=stock[suggestion["sku"]])
+            for suggestion in suggestions
+        ]
+
+    def get_category_index(self) -> CategoryIndex:
+        """Get the index of product categories in the catalog."""
+        return self.catalog.get_category_index()
+
+    def add_update_listener(self, listener: UpdateListener):
+        """Register ``listener`` for updates published by the wrapped catalog.
+
+        Stock from the inventory service is not published, so catalogs
+        without updates never call the listener.
+        """
+        add_update_listener = getattr(self.catalog, "add_update_listener", None)
+        if add_update_listener is not None:
+            add_update_listener(listener)
+
+    def close(self):
+        """Close the pooled connections."""
+        self.pool.close()
+
+    def _stock(self, skus: list[str]) -> dict[str, int]:
+        """Get stock levels, fetching only SKUs no other caller is fetching."""
+        waiting: dict[str, Future] = {}
+        owned = []
+        with self._lock:
+            for sku in dict.fromkeys(skus):
+                future = self._in_flight.get(sku)
+                if future is None:
+                    future = self._in_flight[sku] = Future()
+                    owned.append(sku)
+                waiting[sku] = future
+        if len(waiting) > len(owned):
+            COALESCED_SKUS.inc(len(waiting) - len(owned))
+
+        for start in range(0, len(owned), self.batch_size):
+            batch = owned[start : start + self.batch_size]
+            try:
+                levels = self._fetch(batch)
+            except BaseException as e:
+                # Waiters on the unfetched SKUs get the same error
+                self._settle(owned[start:], error=e)
+                raise
+            self._settle(batch, levels)
+        return {sku: future.result() for sku, future in waiting.items()}
+
+    def _settle(
+        self,
+        skus: list[str],
+        levels: Optional[dict[str, int]] = None,
+        error: Optional[BaseException] = None,
+    ):
+        """Resolve the futures of fetched SKUs and stop coalescing onto them."""
+        with self._lock:
+            futures = [self._in_flight.pop(sku) for sku in skus]
+        for sku, future in zip(skus, futures):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(levels[sku])
+
+    def _fetch(self, skus: list[str]) -> dict[str, int]:
+        """Request the stock of one batch of SKUs."""
+        started = time.perf_counter()
+        path = f"{self._path}?{urlencode({'skus': ','.join(skus)})}"
+        try:
+            status, body = self.pool.request("GET", path)
+            if status != 200:
+                raise CatalogError(f"Inventory service answered HTTP {status}")
+            levels = json.loads(body)["stock"]
+            stock = {sku: int(levels.get(sku) or 0) for sku in skus}
+        except (OSError, http.client.HTTPException) as e:
+            INVENTORY_REQUESTS.labels("error").inc()
+            raise CatalogError(f"Inventory service unreachable: {e}") from e
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            INVENTORY_REQUESTS.labels("error").inc()
+            raise CatalogError(f"Malformed inventory response: {e}") from e
+        except CatalogError:
+            INVENTORY_REQUESTS.labels("error").inc()
+            raise
+        INVENTORY_REQUESTS.labels("ok").inc()
+        INVENTORY_REQUEST_SECONDS.observe(time.perf_counter() - started)
+        FETCHED_SKUS.inc(len(skus))
+        return stock
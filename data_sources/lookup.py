@@ -0,0 +1,36 @@
+"""Batched product lookups that also work with single-SKU catalog sources.
+
+``CatalogDataSource`` is a structural protocol, so a source written against
+it need not inherit ``get_many``. These helpers use the source's own
+``get_many`` when its class defines one and fall back to per-SKU lookups.
+"""
+
+import asyncio
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from core.interfaces import CatalogDataSource
+
+Products = dict[str, Optional[dict[str, Any]]]
+
+
+def normalize_sku(sku: str) -> str:
+    """Get a SKU as catalogs key it, trimmed and upper-case."""
+    return sku.strip().upper()
+
+
+def fetch_products(source: CatalogDataSource, skus: Iterable[str]) -> Products:
+    """Get the details of each distinct SKU, with None for unknown ones."""
+    skus = list(dict.fromkeys(skus))
+    # Looked up on the class so mocks only support what their spec declares
+    if getattr(type(source), "get_many", None) is not None:
+        return source.get_many(skus)
+    return {sku: source.get_product_details(sku) for sku in skus}
+
+
+async def afetch_products(source: CatalogDataSource, skus: Iterable[str]) -> Products:
+    """Async variant of ``fetch_products``."""
+    skus = list(dict.fromkeys(skus))
+    if getattr(type(source), "aget_many", None) is not None:
+        return await source.aget_many(skus)
+    return await asyncio.to_thread(fetch_products, source, skus)
@@ -0,0 +1,15 @@
+"""Incremental ingestion of order emails from mailboxes."""
+
+from .checkpoint import IngestionCheckpoint
+from .ingestor import MailboxIngestor
+from .mime_text import message_text
+from .sources import MaildirSource, MailMessage, MboxSource
+
+__all__ = [
+    "IngestionCheckpoint",
+    "MailboxIngestor",
+    "MaildirSource",
+    "MboxSource",
+    "MailMessage",
+    "message_text",
+]
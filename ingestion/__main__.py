@@ -0,0 +1,58 @@
+"""Ingest a Maildir or mbox into the job queue.
+
+Examples::
+
+    python -m ingestion --mbox orders.mbox --queue jobs.db
+    python -m ingestion --maildir ~/Maildir/orders --queue jobs.db --follow
+"""
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from jobs.sqlite_queue import SqliteJobQueue
+
+from .checkpoint import IngestionCheckpoint
+from .ingestor import DEFAULT_POLL_INTERVAL, MailboxIngestor
+from .sources import MaildirSource, MboxSource
+
+
+def main() -> int:
+    """Run one ingestion pass, or keep polling with ``--follow``."""
+    parser = argparse.ArgumentParser(description="Mailbox ingestion")
+    mailbox = parser.add_mutually_exclusive_group(required=True)
+    mailbox.add_argument("--maildir")
+    mailbox.add_argument("--mbox")
+    parser.add_argument("--queue", default="jobs.db", help="Job queue database")
+    parser.add_argument(
+        "--checkpoint", default="ingestion.db", help="Checkpoint database"
+    )
+    parser.add_argument("--follow", action="store_true", help="Keep polling")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    source = MaildirSource(args.maildir) if args.maildir else MboxSource(args.mbox)
+    ingestor = MailboxIngestor(
+        source, IngestionCheckpoint(args.checkpoint), SqliteJobQueue(args.queue)
+    )
+
+    if not args.follow:
+        print(f"Enqueued {ingestor.poll()} messages")
+        return 0
+
+    def report(count: int):
+        if count:
+            print(f"Enqueued {count} messages", flush=True)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    ingestor.run(stop, args.interval, on_poll=report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
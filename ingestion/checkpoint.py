@@ -0,0 +1,105 @@
+"""Persistent record of which mailbox messages have been ingested."""
+
+import sqlite3
+from collections.abc import Iterable
+from typing import Optional
+
+# Keys are checked in chunks below SQLite's default host-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_messages (
+    message_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS source_positions (
+    source TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_sizes (
+    source TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+
+class IngestionCheckpoint:
+    """SQLite-backed set of processed message IDs plus per-source positions.
+
+    The ID set lives on disk, so checkpoints of mailboxes with millions of
+    messages cost no memory. Positions let append-only sources such as mbox
+    files resume reading where they stopped, and the size each source was
+    last seen at lets them tell a finished file from one still being written,
+    across separate runs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def filter_new(self, message_ids: Iterable[str]) -> list[str]:
+        """Get the IDs that have not been processed, in their original order."""
+        message_ids = list(message_ids)
+        seen: set[str] = set()
+        for start in range(0, len(message_ids), LOOKUP_CHUNK_SIZE):
+            chunk = message_ids[start : start + LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            seen.update(
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT message_id FROM processed_messages"
+                    f" WHERE message_id IN ({placeholders})",
+                    chunk,
+                )
+            )
+        return [message_id for message_id in message_ids if message_id not in seen]
+
+    def is_processed(self, message_id: str) -> bool:
+        """Check whether a message has been processed."""
+        return not self.filter_new([message_id])
+
+    def record(
+        self,
+        message_ids: Iterable[str],
+        source: Optional[str] = None,
+        position: Optional[int] = None,
+    ):
+        """Mark messages processed and optionally move a source's position, atomically."""
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO processed_messages (message_id) VALUES (?)",
+                ((message_id,) for message_id in message_ids),
+            )
+            if source is not None and position is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO source_positions (source, position)"
+                    " VALUES (?, ?)",
+                    (source, position),
+                )
+
+    def position(self, source: str) -> int:
+        """Get the saved position of a source, or 0 if it has none."""
+        row = self._connection.execute(
+            "SELECT position FROM source_positions WHERE source = ?", (source,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def size(self, source: str) -> Optional[int]:
+        """Get the size a source was last seen at, or None if it never was."""
+        row = self._connection.execute(
+            "SELECT size FROM source_sizes WHERE source = ?", (source,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record_size(self, source: str, size: int):
+        """Save the size a source was seen at."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO source_sizes (source, size) VALUES (?, ?)",
+            (source, size),
+        )
+
+    def close(self):
+        """Close the database connection."""
+        self._connection.close()
@@ -0,0 +1,84 @@
+"""Streaming of new mailbox messages into the durable job queue."""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from core.exceptions import QueueFullError
+from core.interfaces import MailSource
+from jobs.sqlite_queue import SqliteJobQueue
+
+from .checkpoint import IngestionCheckpoint
+from .sources import MailMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+class MailboxIngestor:
+    """Moves new messages from a mailbox onto the job queue.
+
+    Messages are enqueued in batches and recorded in the checkpoint only
+    after their batch is on the queue, so a crash can at worst enqueue a
+    batch twice and never loses one. When the queue is full, ingestion stops
+    and resumes from the checkpoint on the next poll.
+    """
+
+    def __init__(
+        self,
+        source: MailSource,
+        checkpoint: IngestionCheckpoint,
+        queue: SqliteJobQueue,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.source = source
+        self.checkpoint = checkpoint
+        self.queue = queue
+        self.batch_size = batch_size
+
+    def poll(self) -> int:
+        """Enqueue every new message, returning how many were enqueued."""
+        enqueued = 0
+        batch: list[MailMessage] = []
+        batch_ids: set[str] = set()
+        try:
+            for message in self.source.iter_messages(self.checkpoint):
+                # Copies of a message within one batch are not yet checkpointed
+                if message.message_id in batch_ids:
+                    continue
+                batch.append(message)
+                batch_ids.add(message.message_id)
+                if len(batch) >= self.batch_size:
+                    enqueued += self._enqueue(batch)
+                    batch, batch_ids = [], set()
+            enqueued += self._enqueue(batch)
+        except QueueFullError as e:
+            logger.warning("Pausing ingestion from %s: %s", self.source.name, e)
+        return enqueued
+
+    def run(
+        self,
+        stop: threading.Event,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        on_poll: Optional[Callable[[int], None]] = None,
+    ):
+        """Poll until ``stop`` is set, reporting each poll's count to ``on_poll``."""
+        while not stop.is_set():
+            count = self.poll()
+            if on_poll is not None:
+                on_poll(count)
+            stop.wait(poll_interval)
+
+    def _enqueue(self, batch: list[MailMessage]) -> int:
+        """Enqueue a batch and then record it in the checkpoint."""
+        if not batch:
+            return 0
+        self.queue.enqueue_many(message.text for message in batch)
+        self.checkpoint.record(
+            (message.message_id for message in batch),
+            self.source.name,
+            batch[-1].position,
+        )
+        return len(batch)
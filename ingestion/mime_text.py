@@ -0,0 +1,117 @@
+"""Selection and decoding of the readable text of a MIME message."""
+
+import codecs
+from email.header import decode_header, make_header
+from email.message import Message
+from html.parser import HTMLParser
+from typing import Optional
+
+FALLBACK_CHARSET = "latin-1"
+# Headers worth keeping in front of the body for the extraction prompt
+CONTEXT_HEADERS = ("From", "Subject", "Date")
+
+
+class _HtmlTextExtractor(HTMLParser):
+    """Collects visible text from HTML, keeping line breaks at block tags."""
+
+    BLOCK_TAGS = {"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "table"}
+    SKIPPED_TAGS = {"script", "style", "head"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """Convert HTML to plain text with one line per block element."""
+    extractor = _HtmlTextExtractor()
+    extractor.feed(html)
+    lines = (line.strip() for line in "".join(extractor.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def decode_part(part: Message) -> str:
+    """Decode a text part's payload, tolerating wrong or unknown charsets."""
+    payload = part.get_payload(decode=True) or b""
+    charset = part.get_content_charset() or "utf-8"
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = "utf-8"
+    try:
+        return payload.decode(charset)
+    except UnicodeDecodeError:
+        # Mislabelled parts are common; latin-1 decodes any byte sequence
+        return payload.decode(FALLBACK_CHARSET)
+
+
+def best_text_part(message: Message) -> Optional[Message]:
+    """Get the part a reader would see: plain text first, then HTML.
+
+    Attachments are never chosen, even when they are text.
+    """
+    fallback = None
+    for part in message.walk():
+        if part.get_content_maintype() != "text" or is_attachment(part):
+            continue
+        subtype = part.get_content_subtype()
+        if subtype == "plain":
+            return part
+        if fallback is None or subtype == "html":
+            fallback = part
+    return fallback
+
+
+def is_attachment(part: Message) -> bool:
+    """Check whether a part is marked as an attachment."""
+    disposition = part.get("Content-Disposition", "")
+    return disposition.split(";", 1)[0].strip().lower() == "attachment"
+
+
+def decode_header_value(value: str) -> str:
+    """Decode RFC 2047 encoded words in a header value."""
+    try:
+        return str(make_header(decode_header(value)))
+    except (LookupError, UnicodeDecodeError, ValueError):
+        return value
+
+
+def message_text(message: Message) -> str:
+    """Get the text to process for a message: context headers plus the body.
+
+    Expects ``compat32`` messages, which parse several times faster than
+    ones using ``email.policy.default``.
+    """
+    lines = [
+        f"{name}: {decode_header_value(message[name])}"
+        for name in CONTEXT_HEADERS
+        if message[name] is not None
+    ]
+
+    part = best_text_part(message)
+    body = ""
+    if part is not None:
+        body = decode_part(part)
+        if part.get_content_subtype() == "html":
+            body = html_to_text(body)
+
+    if not lines:
+        return body.strip()
+    return "\n".join(lines) + "\n\n" + body.strip()
@@ -0,0 +1,162 @@
+"""Incremental readers for Maildir directories and mbox files."""
+
+import email
+import os
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from email.message import Message
+from typing import Optional
+
+from .checkpoint import IngestionCheckpoint
+from .mime_text import message_text
+
+# Directory entries are checked against the checkpoint in batches of this size
+MAILDIR_SCAN_BATCH = 1000
+MBOXRD_QUOTED_FROM = re.compile(rb"^>(>*From )", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class MailMessage:
+    """A message ready for processing.
+
+    ``position`` is where the source can resume reading once this message
+    has been handed over, or None for sources that do not track positions.
+    """
+
+    message_id: str
+    text: str
+    position: Optional[int] = None
+
+
+def parse_message(raw: bytes) -> Message:
+    """Parse raw RFC 5322 bytes."""
+    return email.message_from_bytes(raw)
+
+
+def header_message_id(message: Message) -> Optional[str]:
+    """Get the normalized Message-ID header, if any."""
+    value = message.get("Message-ID")
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+class MaildirSource:
+    """Reads messages from the ``new`` and ``cur`` folders of a Maildir.
+
+    Messages are identified by their Maildir unique name, which survives the
+    move from ``new`` to ``cur``. Directory entries are streamed with
+    ``os.scandir`` and checked against the checkpoint in batches, so
+    processed messages are never opened and the listing is never held in
+    memory in full.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"maildir:{os.path.abspath(path)}"
+
+    def iter_messages(self, checkpoint: IngestionCheckpoint) -> Iterator[MailMessage]:
+        """Yield unprocessed messages."""
+        batch: dict[str, str] = {}
+        for subdirectory in ("new", "cur"):
+            directory = os.path.join(self.path, subdirectory)
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or not entry.is_file():
+                        continue
+                    batch[entry.name.split(":", 1)[0]] = entry.path
+                    if len(batch) >= MAILDIR_SCAN_BATCH:
+                        yield from self._read_new(batch, checkpoint)
+                        batch = {}
+        yield from self._read_new(batch, checkpoint)
+
+    def _read_new(
+        self, batch: dict[str, str], checkpoint: IngestionCheckpoint
+    ) -> Iterator[MailMessage]:
+        """Read the messages of a batch that the checkpoint has not seen."""
+        for key in checkpoint.filter_new(batch):
+            try:
+                with open(batch[key], "rb") as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                # Moved from new/ to cur/ by a mail client; seen again later
+                continue
+            yield MailMessage(key, message_text(parse_message(raw)))
+
+
+class MboxSource:
+    """Tails an mbox file, resuming from the byte offset in the checkpoint.
+
+    The file is read forward line by line and split on ``From `` separator
+    lines, so only the current message is held in memory. Messages are
+    identified by their Message-ID header, falling back to their offset.
+    A message is complete once the next ``From `` separator follows it; the
+    last message in the file is only read once the file size is unchanged
+    since the previous poll, so a message still being appended is not split.
+    That size is kept in the checkpoint, so a later one-shot run reads the
+    message too. If the file shrinks (rotation) reading restarts from the beginning,
+    relying on the processed IDs to skip messages already seen.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"mbox:{os.path.abspath(path)}"
+
+    def iter_messages(self, checkpoint: IngestionCheckpoint) -> Iterator[MailMessage]:
+        """Yield messages after the saved offset that have not been processed."""
+        offset = checkpoint.position(self.name)
+        if not os.path.exists(self.path):
+            return
+        size = os.path.getsize(self.path)
+        stable = size == checkpoint.size(self.name)
+        checkpoint.record_size(self.name, size)
+        if size < offset:
+            offset = 0
+
+        for start, end, raw in self._iter_raw(offset, size, stable):
+            message = parse_message(MBOXRD_QUOTED_FROM.sub(rb"\1", raw))
+            message_id = header_message_id(message) or f"{self.name}@{start}"
+            if checkpoint.is_processed(message_id):
+                continue
+            yield MailMessage(message_id, message_text(message), end)
+
+    def _iter_raw(
+        self, offset: int, size: int, stable: bool
+    ) -> Iterator[tuple[int, int, bytes]]:
+        """Yield (start, end, bytes) for each complete message after ``offset``.
+
+        Only the first ``size`` bytes are read. The message they end with is
+        yielded only when ``stable`` says the size has not changed since the
+        previous poll and it still has not grown. A ``From `` line only
+        separates messages at the start of the file or after a blank line,
+        so unescaped body lines do not split a message.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            start: Optional[int] = None
+            lines: list[bytes] = []
+            position = offset
+            previous_blank = True
+            while position < size:
+                line = f.readline(size - position)
+                if not line:
+                    break
+                if line.startswith(b"From ") and previous_blank:
+                    if start is not None:
+                        yield start, position, b"".join(lines)
+                    start, lines = position, []
+                elif start is not None:
+                    lines.append(line)
+                previous_blank = line in (b"\n", b"\r\n")
+                position += len(line)
+
+            if (
+                start is not None
+                and lines
+                and stable
+                and os.path.getsize(self.path) == size
+            ):
+                yield start, position, b"".join(lines)
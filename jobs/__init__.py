@@ -0,0 +1,6 @@
+"""Durable job queue and workers for email ingestion."""
+
+from .sqlite_queue import DeadLetter, Job, QueueStats, SqliteJobQueue
+from .worker_pool import QueueWorkerPool
+
+__all__ = ["SqliteJobQueue", "Job", "DeadLetter", "QueueStats", "QueueWorkerPool"]
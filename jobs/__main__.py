@@ -0,0 +1,147 @@
+"""Command-line access to the durable job queue.
+
+Examples::
+
+    python -m jobs --db queue.db enqueue emails/*.txt
+    python -m jobs --db queue.db work --provider fake --workers 8
+    python -m jobs --db queue.db work --results orders.jsonl --parquet-dir orders/
+    python -m jobs --db queue.db work --metrics-file /var/lib/node_exporter/orders.prom
+    python -m jobs --db queue.db stats
+"""
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+from dataclasses import asdict
+
+from core.exceptions import QueueFullError
+
+from .sqlite_queue import SqliteJobQueue
+from .worker_pool import DEFAULT_WORKERS, QueueWorkerPool
+
+
+def enqueue(queue: SqliteJobQueue, args: argparse.Namespace) -> int:
+    """Enqueue one job per email file."""
+    payloads = []
+    for path in args.paths:
+        with open(path, encoding="utf-8") as f:
+            payloads.append(f.read())
+    try:
+        job_ids = queue.enqueue_many(payloads)
+    except QueueFullError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Enqueued {len(job_ids)} jobs")
+    return 0
+
+
+def work(queue: SqliteJobQueue, args: argparse.Namespace) -> int:
+    """Drain the queue until interrupted, writing each order to the outputs.
+
+    Orders go to a JSON Lines file and Parquet directory when given, or are
+    printed as JSON lines otherwise. A job completes only once its order is
+    synced to the JSON Lines file. With ``--metrics-file``, pipeline metrics
+    are rewritten there in OpenMetrics text format for a textfile collector.
+    """
+    from core.metrics import TextfileExporter
+    from processing.bootstrap import create_processor
+    from processing.fake_llm import register_fake_provider
+
+    register_fake_provider()
+    journal = analytics = None
+    if args.results:
+        from sinks.jsonl_sink import JsonlResultSink
+
+        journal = JsonlResultSink(args.results)
+    if args.parquet_dir:
+        from sinks.parquet_sink import ParquetResultSink
+
+        analytics = ParquetResultSink(args.parquet_dir)
+    output_lock = threading.Lock()
+
+    def handle_result(job, order):
+        if journal is not None:
+            journal.write(order, str(job.job_id), durable=True)
+        if analytics is not None:
+            analytics.write(order, str(job.job_id))
+        if journal is None and analytics is None:
+            line = json.dumps({"job_id": job.job_id, "order": order.to_dict()})
+            with output_lock:
+                print(line, flush=True)
+
+    pool = QueueWorkerPool(
+        queue,
+        create_processor(args.provider, args.catalog),
+        workers=args.workers,
+        result_handler=handle_result,
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    exporter = None
+    if args.metrics_file:
+        exporter = TextfileExporter(args.metrics_file, interval=args.metrics_interval)
+        exporter.start()
+
+    pool.start()
+    stop.wait()
+    pool.stop()
+    if exporter is not None:
+        exporter.stop()
+    for sink in (journal, analytics):
+        if sink is not None:
+            sink.close()
+    return 0
+
+
+def stats(queue: SqliteJobQueue, args: argparse.Namespace) -> int:
+    """Print queue metrics as JSON."""
+    print(json.dumps(asdict(queue.stats())))
+    return 0
+
+
+def main() -> int:
+    """Run a queue command."""
+    parser = argparse.ArgumentParser(description="Durable email job queue")
+    parser.add_argument("--db", default="jobs.db", help="SQLite database path")
+    parser.add_argument("--max-depth", type=int, default=None)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="Enqueue email files")
+    enqueue_parser.add_argument("paths", nargs="+")
+    enqueue_parser.set_defaults(handler=enqueue)
+
+    work_parser = commands.add_parser("work", help="Run a worker pool")
+    work_parser.add_argument("--provider", default=None)
+    work_parser.add_argument("--catalog", default=None)
+    work_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    work_parser.add_argument("--results", default=None, help="JSON Lines output path")
+    work_parser.add_argument(
+        "--parquet-dir", default=None, help="Parquet output directory"
+    )
+    work_parser.add_argument(
+        "--metrics-file", default=None, help="OpenMetrics textfile output path"
+    )
+    work_parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=15.0,
+        help="Seconds between metrics textfile writes",
+    )
+    work_parser.set_defaults(handler=work)
+
+    stats_parser = commands.add_parser("stats", help="Show queue metrics")
+    stats_parser.set_defaults(handler=stats)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    options = {} if args.max_depth is None else {"max_depth": args.max_depth}
+    return args.handler(SqliteJobQueue(args.db, **options), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
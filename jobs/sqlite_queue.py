@@ -0,0 +1,289 @@
+"""Durable SQLite-backed job queue with leases, retries and dead letters."""
+
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from core.exceptions import QueueFullError
+
+DEFAULT_MAX_DEPTH = 10_000
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_BASE = 2.0
+DEFAULT_BACKOFF_MAX = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_available_at ON jobs (available_at, id);
+CREATE TABLE IF NOT EXISTS dead_letters (
+    id INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    enqueued_at REAL NOT NULL,
+    failed_at REAL NOT NULL,
+    last_error TEXT
+);
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    """A leased job; ``lease_token`` identifies this particular lease."""
+
+    job_id: int
+    payload: str
+    attempts: int
+    enqueued_at: float
+    lease_token: str
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    """A job that exhausted its attempts."""
+
+    job_id: int
+    payload: str
+    attempts: int
+    enqueued_at: float
+    failed_at: float
+    last_error: Optional[str]
+
+
+@dataclass(frozen=True)
+class QueueStats:
+    """Point-in-time queue metrics."""
+
+    depth: int
+    ready: int
+    leased: int
+    delayed: int
+    dead_letters: int
+    oldest_ready_age: float
+
+
+class SqliteJobQueue:
+    """Durable queue of email payloads stored in a SQLite database.
+
+    A job stays in the ``jobs`` table until it is completed. Leasing a job
+    hides it for ``visibility_timeout`` seconds; if the worker crashes or
+    stalls, the job becomes visible again and is leased by another worker.
+    Failed jobs are retried with exponential backoff and moved to the
+    ``dead_letters`` table after ``max_attempts`` attempts. Enqueueing
+    raises ``QueueFullError`` once ``max_depth`` jobs are waiting, so
+    producers slow down instead of growing the queue without bound.
+
+    Each thread uses its own connection; WAL mode lets workers lease and
+    complete jobs while producers enqueue.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_depth = max_depth
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _lease_timeout(self, visibility_timeout: Optional[float]) -> float:
+        """Get the visibility timeout for a lease, falling back to the default."""
+        if visibility_timeout is None:
+            return self.visibility_timeout
+        return visibility_timeout
+
+    def _transaction(self) -> "_ImmediateTransaction":
+        """Start a write transaction that takes the database lock up front."""
+        return _ImmediateTransaction(self._connection())
+
+    def enqueue(self, payload: str, delay: float = 0.0) -> int:
+        """Add a job and return its id, or raise QueueFullError."""
+        return self.enqueue_many([payload], delay)[0]
+
+    def enqueue_many(self, payloads: Iterable[str], delay: float = 0.0) -> list[int]:
+        """Add jobs in one transaction; all are rejected if they would not fit."""
+        payloads = list(payloads)
+        now = self._clock()
+        with self._transaction() as connection:
+            (depth,) = connection.execute("SELECT COUNT(*) FROM jobs").fetchone()
+            if depth + len(payloads) > self.max_depth:
+                raise QueueFullError(depth, self.max_depth)
+            return [
+                connection.execute(
+                    "INSERT INTO jobs (payload, enqueued_at, available_at)"
+                    " VALUES (?, ?, ?)",
+                    (payload, now, now + delay),
+                ).lastrowid
+                for payload in payloads
+            ]
+
+    def lease(
+        self, limit: int = 1, visibility_timeout: Optional[float] = None
+    ) -> list[Job]:
+        """Lease up to ``limit`` visible jobs, oldest first."""
+        now = self._clock()
+        timeout = self._lease_timeout(visibility_timeout)
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT id, payload, attempts, enqueued_at FROM jobs"
+                " WHERE available_at <= ? ORDER BY available_at, id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            jobs = []
+            for job_id, payload, attempts, enqueued_at in rows:
+                token = uuid.uuid4().hex
+                connection.execute(
+                    "UPDATE jobs SET attempts = attempts + 1, available_at = ?,"
+                    " lease_token = ? WHERE id = ?",
+                    (now + timeout, token, job_id),
+                )
+                jobs.append(Job(job_id, payload, attempts + 1, enqueued_at, token))
+            return jobs
+
+    def extend(self, job: Job, visibility_timeout: Optional[float] = None) -> bool:
+        """Extend a lease; False if the lease was lost to another worker."""
+        timeout = self._lease_timeout(visibility_timeout)
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET available_at = ? WHERE id = ? AND lease_token = ?",
+                (self._clock() + timeout, job.job_id, job.lease_token),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job: Job) -> bool:
+        """Remove a finished job; False if the lease was lost to another worker."""
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "DELETE FROM jobs WHERE id = ? AND lease_token = ?",
+                (job.job_id, job.lease_token),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job: Job, error: str, retry: bool = True) -> bool:
+        """Schedule a retry with backoff, or dead-letter the job when out of attempts.
+
+        Jobs failed with ``retry=False`` are dead-lettered at once. Returns
+        False if the lease was lost to another worker.
+        """
+        now = self._clock()
+        with self._transaction() as connection:
+            if not retry or job.attempts >= self.max_attempts:
+                cursor = connection.execute(
+                    "INSERT INTO dead_letters"
+                    " (id, payload, attempts, enqueued_at, failed_at, last_error)"
+                    " SELECT id, payload, attempts, enqueued_at, ?, ? FROM jobs"
+                    " WHERE id = ? AND lease_token = ?",
+                    (now, error, job.job_id, job.lease_token),
+                )
+                if cursor.rowcount == 1:
+                    connection.execute("DELETE FROM jobs WHERE id = ?", (job.job_id,))
+                return cursor.rowcount == 1
+
+            cursor = connection.execute(
+                "UPDATE jobs SET available_at = ?, lease_token = NULL, last_error = ?"
+                " WHERE id = ? AND lease_token = ?",
+                (now + self.backoff(job.attempts), error, job.job_id, job.lease_token),
+            )
+            return cursor.rowcount == 1
+
+    def backoff(self, attempts: int) -> float:
+        """Get the delay before retrying a job that has failed ``attempts`` times."""
+        return min(self.backoff_max, self.backoff_base**attempts)
+
+    def dead_letters(self, limit: int = 100) -> list[DeadLetter]:
+        """Get dead-lettered jobs, most recent failure first."""
+        rows = self._connection().execute(
+            "SELECT id, payload, attempts, enqueued_at, failed_at, last_error"
+            " FROM dead_letters ORDER BY failed_at DESC LIMIT ?",
+            (limit,),
+        )
+        return [DeadLetter(*row) for row in rows]
+
+    def requeue_dead_letter(self, job_id: int) -> bool:
+        """Move a dead-lettered job back onto the queue with fresh attempts."""
+        now = self._clock()
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO jobs (id, payload, enqueued_at, available_at)"
+                " SELECT id, payload, enqueued_at, ? FROM dead_letters WHERE id = ?",
+                (now, job_id),
+            )
+            connection.execute("DELETE FROM dead_letters WHERE id = ?", (job_id,))
+            return cursor.rowcount == 1
+
+    def stats(self) -> QueueStats:
+        """Get queue depth, lease counts and the age of the oldest ready job."""
+        now = self._clock()
+        connection = self._connection()
+        depth, ready, leased, oldest_ready = connection.execute(
+            "SELECT COUNT(*),"
+            " COALESCE(SUM(available_at <= ?), 0),"
+            " COALESCE(SUM(available_at > ? AND lease_token IS NOT NULL), 0),"
+            " MIN(CASE WHEN available_at <= ? THEN enqueued_at END)"
+            " FROM jobs",
+            (now, now, now),
+        ).fetchone()
+        (dead_letters,) = connection.execute(
+            "SELECT COUNT(*) FROM dead_letters"
+        ).fetchone()
+        return QueueStats(
+            depth=depth,
+            ready=ready,
+            leased=leased,
+            delayed=depth - ready - leased,
+            dead_letters=dead_letters,
+            oldest_ready_age=0.0 if oldest_ready is None else now - oldest_ready,
+        )
+
+    def close(self):
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class _ImmediateTransaction:
+    """Context manager running a ``BEGIN IMMEDIATE`` transaction."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,132 @@
+"""Thread pool draining the job queue through the order processor."""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+from core.exceptions import ParsingError, ValidationError
+from core.records import OrderRecord
+from processing.order_processor import SmartOrderProcessor
+
+from .sqlite_queue import Job, SqliteJobQueue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_POLL_INTERVAL = 0.5
+
+ResultHandler = Callable[[Job, OrderRecord], None]
+
+# Provider SDK errors, matched by name since the SDKs are optional imports
+TRANSIENT_ERROR_NAMES = frozenset(
+    {
+        "APIConnectionError",
+        "APITimeoutError",
+        "RateLimitError",
+        "InternalServerError",
+        "OverloadedError",
+    }
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a job that raised ``error`` may succeed if processed again.
+
+    Parsing and validation errors come from the email itself, unless they
+    wrap a network failure, timeout or provider overload.
+    """
+    if not isinstance(error, (ParsingError, ValidationError)):
+        return True
+    cause = error.__cause__
+    return cause is not None and (
+        isinstance(cause, (OSError, TimeoutError))
+        or any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(cause).__mro__)
+    )
+
+
+class QueueWorkerPool:
+    """Runs worker threads that lease, process and complete queued emails.
+
+    A job is completed only after ``result_handler`` has accepted its order,
+    so a crash at any point before that leaves the email on the queue to be
+    leased again once its visibility timeout passes. Any exception from
+    processing or from the handler fails the job: transient errors are
+    retried, while emails that cannot be parsed or validated are
+    dead-lettered at once. A failed job's reserved stock is released; stock
+    is deducted once the handler has accepted the order.
+    """
+
+    def __init__(
+        self,
+        queue: SqliteJobQueue,
+        processor: SmartOrderProcessor,
+        workers: int = DEFAULT_WORKERS,
+        result_handler: Optional[ResultHandler] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.queue = queue
+        self.processor = processor
+        self.workers = workers
+        self.result_handler = result_handler
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        """Start the worker threads."""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"queue-worker-{n}", daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Ask workers to stop after their current job and wait for them."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_until_empty(self):
+        """Process jobs on the calling thread until none are ready."""
+        while self.process_next():
+            pass
+
+    def process_next(self) -> bool:
+        """Lease and process one job, returning False if none was ready."""
+        jobs = self.queue.lease()
+        if not jobs:
+            return False
+        self._process(jobs[0])
+        return True
+
+    def _run(self):
+        """Worker loop: process jobs, sleeping while the queue is empty."""
+        try:
+            while not self._stop.is_set():
+                if not self.process_next():
+                    self._stop.wait(self.poll_interval)
+        finally:
+            self.queue.close()
+
+    def _process(self, job: Job):
+        """Process one leased job and record its outcome."""
+        order = None
+        try:
+            order = self.processor.process_order_record(job.payload)
+            if self.result_handler is not None:
+                self.result_handler(job, order)
+        except Exception as e:
+            logger.warning("Job %d attempt %d failed: %s", job.job_id, job.attempts, e)
+            if order is not None:
+                self.processor.release_reservation(order)
+            self.queue.fail(job, str(e) or type(e).__name__, retry=is_retryable(e))
+            return
+
+        # The handler has the order, so its stock is spent even if the
+        # lease expired and the job is processed again
+        self.processor.commit_reservations([order])
+        if not self.queue.complete(job):
+            logger.warning("Job %d finished after its lease expired", job.job_id)
@@ -1,39 +1,19 @@
 """Main application entry point."""
 
-import os
-
 import streamlit as st
-from dotenv import load_dotenv
 
-from core.interfaces import EmailParser, OrderValidator
-from parsing.email_parser import LangChainEmailParser
-from processing.llm_factory import LLMFactory
+from processing.bootstrap import create_processor
 from processing.order_processor import SmartOrderProcessor
+from ui.batch import BatchUploadDisplay
 from ui.config import ConfigurationDisplay
 from ui.display import OrderDisplay
-from validation.catalog_validator import CatalogValidator
-
-
-def initialize_components(selected_provider: str) -> tuple[EmailParser, OrderValidator]:
-    """Initialize application components."""
-    load_dotenv()
-
-    # Get LLM configuration
-    llm_config = {
-        "model": os.getenv("DEFAULT_MODEL", "gpt-4-turbo-preview"),
-        "temperature": float(os.getenv("TEMPERATURE", "0.0")),
-    }
-
-    # Create LLM instance
-    llm = LLMFactory.create_llm(provider=selected_provider, **llm_config)
-
-    # Initialize parser
-    parser = LangChainEmailParser(llm)
+from ui.session_store import SessionResultStore
 
-    # Initialize validator
-    validator = CatalogValidator.from_csv("rezaqaround2zaqathon/Product Catalog.csv")
 
-    return parser, validator
+@st.cache_resource(show_spinner="Loading catalog and model...")
+def load_processor(selected_provider: str) -> SmartOrderProcessor:
+    """Build the processor once per provider instead of on every rerun."""
+    return create_processor(selected_provider)
 
 
 def main():
@@ -46,8 +26,7 @@ def main():
 
     # Initialize components
     try:
-        parser, validator = initialize_components(selected_provider)
-        processor = SmartOrderProcessor(parser, validator)
+        processor = load_processor(selected_provider)
         display = OrderDisplay()
 
     except Exception as e:
@@ -55,6 +34,23 @@ def main():
         st.info("Please check your environment configuration and API keys.")
         return
 
+    single_tab, batch_tab = st.tabs(["Single Email", "Batch Upload"])
+    with single_tab:
+        process_single_email(processor, display, selected_provider)
+    with batch_tab:
+        BatchUploadDisplay.show(processor)
+
+
+def process_single_email(
+    processor: SmartOrderProcessor, display: OrderDisplay, selected_provider: str
+):
+    """Process one pasted email and display the order.
+
+    Orders are kept in the session's result store, so reruns caused by
+    other widgets, and resubmitting an email, re-render without new LLM calls.
+    """
+    store = SessionResultStore(st.session_state)
+
     # Show input section
     email_text, process_button = ConfigurationDisplay.show_input_section()
 
@@ -63,19 +59,26 @@ def main():
             st.error("Please enter an email")
             return
 
-        try:
-            with st.spinner(f"Processing with {selected_provider}..."):
-                # Process order
-                order = processor.process_order(email_text)
-
-                # Display results
-                display.show_order_details(order)
-                display.show_validation_results(order)
-                display.show_processing_summary(order)
+        order = store.get(email_text, selected_provider)
+        if order is None:
+            try:
+                with st.spinner(f"Processing with {selected_provider}..."):
+                    order = processor.process_order(email_text)
+                processor.commit_reservations([order])
+            except Exception as e:
+                st.error(f"Error processing order: {str(e)}")
+                st.info("Please check your email format and try again.")
+                return
+        store.put(email_text, selected_provider, order)
+    else:
+        order = store.current(email_text, selected_provider)
+        if order is None:
+            return
 
-        except Exception as e:
-            st.error(f"Error processing order: {str(e)}")
-            st.info("Please check your email format and try again.")
+    # Display results
+    display.show_order_details(order)
+    display.show_validation_results(order)
+    display.show_processing_summary(order)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,20 @@
 """Parsing module for email processing."""
 
+from .cascading_parser import CascadeStats, CascadingEmailParser
+from .dedup_parser import NearDuplicateEmailParser
 from .email_data import EmailData
 from .email_parser import LangChainEmailParser
+from .simhash_index import SimHashIndex
+from .token_budget import BudgetedEmailParser, ModelBudget, TokenEstimator
 
-__all__ = ["LangChainEmailParser", "EmailData"]
+__all__ = [
+    "LangChainEmailParser",
+    "CascadingEmailParser",
+    "CascadeStats",
+    "EmailData",
+    "NearDuplicateEmailParser",
+    "SimHashIndex",
+    "BudgetedEmailParser",
+    "ModelBudget",
+    "TokenEstimator",
+]
@@ -0,0 +1,253 @@
+"""Email parser that tries a cheap model before escalating to a strong one."""
+
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from core.exceptions import ParsingError
+from core.interfaces import CatalogDataSource, EmailParser
+from core.metrics import REGISTRY
+from core.models import Order
+from core.records import OrderRecord
+from data_sources.lookup import afetch_products, fetch_products, normalize_sku
+
+from .email_parser import LangChainEmailParser
+
+CHEAP = "cheap"
+STRONG = "strong"
+
+CASCADE_PARSES = REGISTRY.counter(
+    "cascade_parses",
+    "Cascading parser calls, by model tier and outcome: accepted, escalated or failed.",
+    ("tier", "outcome"),
+)
+CASCADE_ESCALATIONS = REGISTRY.counter(
+    "cascade_escalations",
+    "Cheap-model extractions escalated to the strong model, by reason.",
+    ("reason",),
+)
+CASCADE_EMAIL_SECONDS = REGISTRY.histogram(
+    "cascade_email_duration_seconds",
+    "Time to parse one email through the cascade, by the tier that answered.",
+    ("tier",),
+    unit="seconds",
+)
+CASCADE_COST = REGISTRY.counter(
+    "cascade_cost",
+    "Estimated model spend, in the unit of the configured per-call costs.",
+    ("tier",),
+)
+
+
+def find_rejection(
+    record: OrderRecord, catalog_source: CatalogDataSource
+) -> Optional[str]:
+    """Get the reason a cheap extraction cannot be trusted, or None.
+
+    The date was already parsed when the record was built; this checks that
+    there are items, that every quantity is positive and that every SKU
+    is in the catalog.
+    """
+    reason = find_line_rejection(record)
+    if reason is not None:
+        return reason
+    products = fetch_products(
+        catalog_source, (normalize_sku(item.sku) for item in record.items)
+    )
+    return None if all(products.values()) else "unknown_sku"
+
+
+async def afind_rejection(
+    record: OrderRecord, catalog_source: CatalogDataSource
+) -> Optional[str]:
+    """Async variant of ``find_rejection``, so catalog lookups never block the loop."""
+    reason = find_line_rejection(record)
+    if reason is not None:
+        return reason
+    products = await afetch_products(
+        catalog_source, (normalize_sku(item.sku) for item in record.items)
+    )
+    return None if all(products.values()) else "unknown_sku"
+
+
+def find_line_rejection(record: OrderRecord) -> Optional[str]:
+    """Get the reason the lines alone make an extraction untrustworthy, or None."""
+    if not record.items:
+        return "no_items"
+    if any(item.quantity <= 0 for item in record.items):
+        return "non_positive_quantity"
+    return None
+
+
+@dataclass
+class CascadeStats:
+    """Running totals for reporting the cascade's escalation rate and cost."""
+
+    emails: int = 0
+    escalations: int = 0
+    failures: int = 0
+    total_seconds: float = 0.0
+    total_cost: float = 0.0
+    escalation_reasons: Counter = field(default_factory=Counter)
+
+    @property
+    def escalation_rate(self) -> float:
+        """Share of emails sent on to the strong model."""
+        return self.escalations / self.emails if self.emails else 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        """Blended parsing latency per email."""
+        return self.total_seconds / self.emails if self.emails else 0.0
+
+    @property
+    def mean_cost(self) -> float:
+        """Blended model cost per email."""
+        return self.total_cost / self.emails if self.emails else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the totals as plain values."""
+        return {
+            "emails": self.emails,
+            "escalations": self.escalations,
+            "failures": self.failures,
+            "escalation_rate": self.escalation_rate,
+            "mean_seconds": self.mean_seconds,
+            "mean_cost": self.mean_cost,
+            "escalation_reasons": dict(self.escalation_reasons),
+        }
+
+
+class CascadingEmailParser(EmailParser):
+    """Parses with a cheap model and escalates failed extractions.
+
+    The cheap extraction is accepted when it parses and passes
+    ``find_rejection`` against the catalog; otherwise the email is parsed
+    again by the strong model, whose answer is final. ``cheap_cost`` and
+    ``strong_cost`` are the estimated cost of one call to each model and
+    only feed the reported blended cost.
+    """
+
+    def __init__(
+        self,
+        cheap_parser: LangChainEmailParser,
+        strong_parser: LangChainEmailParser,
+        catalog_source: CatalogDataSource,
+        cheap_cost: float = 0.0,
+        strong_cost: float = 0.0,
+    ):
+        self.cheap_parser = cheap_parser
+        self.strong_parser = strong_parser
+        self.catalog_source = catalog_source
+        self.costs = {CHEAP: cheap_cost, STRONG: strong_cost}
+        self.stats = CascadeStats()
+        self._stats_lock = threading.Lock()
+
+    def parse_email(self, email_text: str) -> Order:
+        """Parse email text and return structured Order object."""
+        return self.parse_email_record(email_text).to_model()
+
+    def parse_email_record(self, email_text: str) -> OrderRecord:
+        """Parse with the cheap model, escalating if its answer is rejected."""
+        started = time.perf_counter()
+        try:
+            record = self.cheap_parser.parse_email_record(email_text)
+        except ParsingError:
+            record = None
+        reason = self._judge(record)
+        if reason is None:
+            self._record(started, CHEAP)
+            return record
+
+        try:
+            record = self.strong_parser.parse_email_record(email_text)
+        except ParsingError:
+            self._record(started, STRONG, reason, failed=True)
+            raise
+        self._record(started, STRONG, reason)
+        return record
+
+    async def aparse_email_record(self, email_text: str) -> OrderRecord:
+        """Async variant of ``parse_email_record``."""
+        started = time.perf_counter()
+        try:
+            record = await self.cheap_parser.aparse_email_record(email_text)
+        except ParsingError:
+            record = None
+        reason = await self._ajudge(record)
+        if reason is None:
+            self._record(started, CHEAP)
+            return record
+
+        try:
+            record = await self.strong_parser.aparse_email_record(email_text)
+        except ParsingError:
+            self._record(started, STRONG, reason, failed=True)
+            raise
+        self._record(started, STRONG, reason)
+        return record
+
+    def revise_order(self, previous: Order, email_diff: str) -> Order:
+        """Revise a prior extraction, escalating like a fresh parse."""
+        started = time.perf_counter()
+        try:
+            order = self.cheap_parser.revise_order(previous, email_diff)
+        except ParsingError:
+            order = None
+        reason = self._judge(OrderRecord.from_model(order) if order else None)
+        if reason is None:
+            self._record(started, CHEAP)
+            return order
+
+        try:
+            order = self.strong_parser.revise_order(previous, email_diff)
+        except ParsingError:
+            self._record(started, STRONG, reason, failed=True)
+            raise
+        self._record(started, STRONG, reason)
+        return order
+
+    def _judge(self, record: Optional[OrderRecord]) -> Optional[str]:
+        """Get the reason to escalate, or None to accept the cheap answer."""
+        if record is None:
+            return "parse_error"
+        return find_rejection(record, self.catalog_source)
+
+    async def _ajudge(self, record: Optional[OrderRecord]) -> Optional[str]:
+        """Async variant of ``_judge``."""
+        if record is None:
+            return "parse_error"
+        return await afind_rejection(record, self.catalog_source)
+
+    def _record(
+        self,
+        started: float,
+        tier: str,
+        reason: Optional[str] = None,
+        failed: bool = False,
+    ):
+        """Update the stats and metrics for one email answered by ``tier``."""
+        elapsed = time.perf_counter() - started
+        cost = self.costs[CHEAP] + (self.costs[STRONG] if tier == STRONG else 0.0)
+
+        if reason is None:
+            CASCADE_PARSES.labels(CHEAP, "accepted").inc()
+        else:
+            CASCADE_PARSES.labels(CHEAP, "escalated").inc()
+            CASCADE_ESCALATIONS.labels(reason).inc()
+            CASCADE_PARSES.labels(STRONG, "failed" if failed else "accepted").inc()
+            CASCADE_COST.labels(STRONG).inc(self.costs[STRONG])
+        CASCADE_COST.labels(CHEAP).inc(self.costs[CHEAP])
+        CASCADE_EMAIL_SECONDS.labels(tier).observe(elapsed)
+
+        with self._stats_lock:
+            self.stats.emails += 1
+            self.stats.total_seconds += elapsed
+            self.stats.total_cost += cost
+            if reason is not None:
+                self.stats.escalations += 1
+                self.stats.escalation_reasons[reason] += 1
+            if failed:
+                self.stats.failures += 1
@@ -0,0 +1,137 @@
+"""Email parser that reuses prior extractions for near-duplicate emails."""
+
+import asyncio
+import difflib
+import itertools
+import threading
+from typing import Optional
+
+from core.interfaces import EmailParser
+from core.metrics import REGISTRY
+from core.models import Order
+from core.records import OrderRecord
+
+from .email_parser import LangChainEmailParser
+from .simhash_index import IndexMatch, SimHashIndex, stored_body
+
+# Rewriting the index costs time proportional to its size, so saves are batched
+DEFAULT_SAVE_EVERY = 100
+
+NEAR_DUPLICATE_LOOKUPS = REGISTRY.counter(
+    "near_duplicate_lookups",
+    "Near-duplicate index lookups by result: exact, near or miss.",
+    ("result",),
+)
+
+
+class NearDuplicateEmailParser(EmailParser):
+    """Parser decorator that short-circuits extraction for repeat orders.
+
+    When a prior email is found within the index's similarity threshold, only
+    the line diff between the two email bodies, as written, is sent to the
+    LLM together with the prior extraction. Emails whose bodies differ only
+    in whitespace are answered from the index without any LLM call.
+
+    The index is saved after every ``save_every`` new extractions and by
+    ``close``, which should be called on shutdown.
+    """
+
+    def __init__(
+        self,
+        parser: LangChainEmailParser,
+        index: SimHashIndex,
+        save_every: int = DEFAULT_SAVE_EVERY,
+    ):
+        self.parser = parser
+        self.index = index
+        self.save_every = save_every
+        self._unsaved_changes = 0
+        self._save_lock = threading.Lock()
+
+    def parse_email(self, email_text: str) -> Order:
+        """Parse email text, reusing a near-duplicate extraction when possible."""
+        return self.parse_email_record(email_text).to_model()
+
+    def parse_email_record(self, email_text: str) -> OrderRecord:
+        """Parse into a record, reusing a near-duplicate extraction when possible."""
+        match, email_diff = self._lookup(email_text)
+        if match is None:
+            record = self.parser.parse_email_record(email_text)
+        elif email_diff:
+            previous = Order.model_validate(match.payload)
+            record = OrderRecord.from_model(
+                self.parser.revise_order(previous, email_diff)
+            )
+        else:
+            record = OrderRecord.from_dict(match.payload)
+        self._remember(email_text, record)
+        return record
+
+    async def aparse_email_record(self, email_text: str) -> OrderRecord:
+        """Async variant of ``parse_email_record``.
+
+        New emails are parsed with the wrapped parser's async path; revisions
+        of near-duplicates, which have no async variant, run on a thread.
+        """
+        match, email_diff = self._lookup(email_text)
+        if match is None:
+            record = await self.parser.aparse_email_record(email_text)
+        elif email_diff:
+            previous = Order.model_validate(match.payload)
+            record = OrderRecord.from_model(
+                await asyncio.to_thread(self.parser.revise_order, previous, email_diff)
+            )
+        else:
+            record = OrderRecord.from_dict(match.payload)
+        # A due save rewrites the index file, so it is kept off the loop
+        await asyncio.to_thread(self._remember, email_text, record)
+        return record
+
+    def close(self):
+        """Save extractions indexed since the last save."""
+        with self._save_lock:
+            if self._unsaved_changes:
+                self.index.save()
+                self._unsaved_changes = 0
+
+    def _lookup(self, email_text: str) -> tuple[Optional[IndexMatch], str]:
+        """Find the closest prior email and diff its body against this one."""
+        match = self.index.find(email_text)
+        if match is None:
+            NEAR_DUPLICATE_LOOKUPS.labels("miss").inc()
+            return None, ""
+        # Both bodies are truncated alike, so long emails do not differ at the cut
+        email_diff = self._diff(match.text, stored_body(email_text))
+        NEAR_DUPLICATE_LOOKUPS.labels("near" if email_diff else "exact").inc()
+        return match, email_diff
+
+    def _remember(self, email_text: str, record: OrderRecord):
+        """Index the extraction and persist the index periodically."""
+        self.index.add(email_text, record.to_dict())
+        with self._save_lock:
+            self._unsaved_changes += 1
+            if self._unsaved_changes >= self.save_every:
+                self.index.save()
+                self._unsaved_changes = 0
+
+    @staticmethod
+    def _diff(previous_text: str, current_text: str) -> str:
+        """Build a context-free unified diff between two email bodies.
+
+        Lines are compared with surrounding whitespace stripped and blank
+        lines skipped; case and content are kept for the LLM.
+        """
+        diff_lines = difflib.unified_diff(
+            diff_lines_of(previous_text),
+            diff_lines_of(current_text),
+            lineterm="",
+            n=0,
+        )
+        # Skip the "---"/"+++" file header and keep only changed lines
+        body = itertools.islice(diff_lines, 2, None)
+        return "\n".join(line for line in body if not line.startswith("@@"))
+
+
+def diff_lines_of(text: str) -> list[str]:
+    """Get the non-blank lines of a body with surrounding whitespace stripped."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
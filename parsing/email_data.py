@@ -64,9 +64,17 @@ class EmailData(BaseModel):
             normalized_item["sku"] = item[sku_key]
             normalized_item["quantity"] = item[quantity_key]
 
+            # Validate types here, since records are built without a model
+            if (
+                not isinstance(normalized_item["sku"], str)
+                or not normalized_item["sku"].strip()
+            ):
+                raise ValueError("SKU must be a non-empty string")
+
             # Validate quantity
             if (
                 not isinstance(normalized_item["quantity"], int)
+                or isinstance(normalized_item["quantity"], bool)
                 or normalized_item["quantity"] <= 0
             ):
                 raise ValueError("Quantity must be a positive integer")
@@ -1,25 +1,110 @@
 """LangChain-based email parser implementation."""
 
+import json
+import threading
+import time
 from datetime import date
+from typing import TYPE_CHECKING, Any, Optional
 
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.output_parsers import PydanticOutputParser
 
 from core.exceptions import ParsingError
 from core.interfaces import EmailParser
-from core.models import Order, OrderItem
+from core.metrics import REGISTRY
+from core.models import Order
+from core.records import OrderItemRecord, OrderRecord
+from data_sources.lookup import normalize_sku
 from prompts.email_extraction import EmailExtractionPrompt
 
 from .email_data import EmailData
+from .json_repair import (
+    RepairStats,
+    SalvagedReply,
+    extract_json_text,
+    merge_completion,
+    message_text,
+    salvage_reply,
+)
+
+if TYPE_CHECKING:
+    from .token_budget import TokenEstimator
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds",
+    "Latency of LLM calls made by the email parser.",
+    ("operation", "outcome"),
+    unit="seconds",
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens",
+    "Tokens reported in LLM usage metadata.",
+    ("operation", "direction"),
+)
+LLM_ESTIMATED_TOKENS = REGISTRY.counter(
+    "llm_estimated_input_tokens",
+    "Prompt tokens estimated locally before sending, for comparison with "
+    "llm_tokens_total.",
+    ("operation",),
+)
+LLM_TOKEN_ESTIMATE_RATIO = REGISTRY.histogram(
+    "llm_token_estimate_ratio",
+    "Reported over locally estimated prompt tokens, per request.",
+    buckets=(0.5, 0.75, 0.9, 0.95, 1.0, 1.05, 1.1, 1.25, 1.5, 2.0),
+)
+LLM_REPLY_REPAIRS = REGISTRY.counter(
+    "llm_reply_repairs",
+    "Malformed LLM replies by outcome: repaired locally (a full retry "
+    "avoided), completed by a follow-up call, or failed.",
+    ("outcome",),
+)
+
+
+def record_token_usage(message: Any, operation: str):
+    """Count the tokens a chat model reports in ``usage_metadata``, if any."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    for direction in ("input", "output"):
+        tokens = usage.get(f"{direction}_tokens")
+        if tokens:
+            LLM_TOKENS.labels(operation, direction).inc(tokens)
+
+
+def parse_reply(message: Any) -> EmailData:
+    """Parse a reply strictly, raising ``ValueError`` if it is not exact JSON.
+
+    Unlike the LangChain output parser, this does not complete truncated
+    JSON, so a reply cut off inside a number cannot be read as a smaller one.
+    """
+    json_text = extract_json_text(message_text(message))
+    if json_text is None:
+        raise ValueError("No JSON object in the reply")
+    return EmailData.model_validate(json.loads(json_text))
 
 
 class LangChainEmailParser(EmailParser):
-    """Email parser implementation using LangChain."""
+    """Email parser implementation using LangChain.
+
+    The output parser supplies the format instructions; replies are parsed
+    strictly with ``parse_reply`` and repaired locally where possible.
+    With a ``token_estimator``, each prompt's estimated tokens are recorded
+    against the count the model reports.
+    When only some fields can be salvaged from an extraction reply, the LLM
+    is asked for just the missing ones instead of the whole email again.
+    """
 
-    def __init__(self, llm: BaseLanguageModel):
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        token_estimator: Optional["TokenEstimator"] = None,
+    ):
         self.llm = llm
+        self.token_estimator = token_estimator
         self.output_parser = PydanticOutputParser(pydantic_object=EmailData)
         self.prompt = self._create_prompt()
+        self.revision_prompt = self._create_revision_prompt()
+        self.completion_prompt = EmailExtractionPrompt.create_completion_prompt()
+        self.repair_stats = RepairStats()
+        self._stats_lock = threading.Lock()
 
     def _create_prompt(self):
         """Create prompt template with format instructions."""
@@ -28,33 +113,223 @@ class LangChainEmailParser(EmailParser):
             format_instructions=self.output_parser.get_format_instructions()
         )
 
+    def _create_revision_prompt(self):
+        """Create revision prompt template with format instructions."""
+        base_prompt = EmailExtractionPrompt.create_revision_prompt()
+        return base_prompt.partial(
+            format_instructions=self.output_parser.get_format_instructions()
+        )
+
     def parse_email(self, email_text: str) -> Order:
         """Parse email text and return structured Order object."""
+        return self.parse_email_record(email_text).to_model()
+
+    def parse_email_record(self, email_text: str) -> OrderRecord:
+        """Parse email text into the pipeline's internal order record."""
         try:
-            # Create the chain using LangChain syntax
-            chain = self.prompt | self.llm | self.output_parser
+            parsed_data = self._invoke(
+                self.prompt, {"email_text": email_text}, "extract"
+            )
+
+            # Convert parsed data to an order record
+            return self._create_record(parsed_data)
 
-            # Execute the chain
-            parsed_data = chain.invoke({"email_text": email_text})
+        except Exception as e:
+            raise ParsingError(f"Failed to parse email: {e}") from e
 
-            # Convert parsed data to Order object
-            return self._create_order(parsed_data)
+    async def aparse_email_record(self, email_text: str) -> OrderRecord:
+        """Async variant of ``parse_email_record``.
+
+        Cancelling the awaiting task aborts the LLM request.
+        """
+        try:
+            parsed_data = await self._ainvoke(
+                self.prompt, {"email_text": email_text}, "extract"
+            )
+            return self._create_record(parsed_data)
 
         except Exception as e:
             raise ParsingError(f"Failed to parse email: {e}") from e
 
-    def _create_order(self, data: EmailData) -> Order:
-        """Create Order object from parsed data."""
+    def revise_order(self, previous: Order, email_diff: str) -> Order:
+        """Update a prior extraction using only the diff to a near-duplicate email."""
+        try:
+            parsed_data = self._invoke(
+                self.revision_prompt,
+                {
+                    "previous_extraction": self._to_email_data(
+                        previous
+                    ).model_dump_json(indent=2),
+                    "email_diff": email_diff,
+                },
+                "revise",
+            )
+            return self._create_record(parsed_data).to_model()
+
+        except Exception as e:
+            raise ParsingError(f"Failed to revise extraction: {e}") from e
+
+    def _invoke(self, prompt, inputs: dict[str, Any], operation: str) -> EmailData:
+        """Call the LLM and parse its reply, repairing it if malformed."""
+        message = self._call_llm(prompt, inputs, operation)
+        try:
+            return parse_reply(message)
+        except ValueError as e:
+            salvaged = self._salvage(message, e)
+            email_text = inputs.get("email_text")
+            if salvaged.missing and email_text is not None:
+                reply = self._call_llm(
+                    self.completion_prompt,
+                    self._completion_inputs(salvaged, email_text),
+                    "complete",
+                )
+                merge_completion(salvaged, message_text(reply))
+                return self._finish_repair(salvaged, e, followup=True)
+            return self._finish_repair(salvaged, e)
+
+    async def _ainvoke(
+        self, prompt, inputs: dict[str, Any], operation: str
+    ) -> EmailData:
+        """Async variant of ``_invoke``."""
+        message = await self._acall_llm(prompt, inputs, operation)
+        try:
+            return parse_reply(message)
+        except ValueError as e:
+            salvaged = self._salvage(message, e)
+            email_text = inputs.get("email_text")
+            if salvaged.missing and email_text is not None:
+                reply = await self._acall_llm(
+                    self.completion_prompt,
+                    self._completion_inputs(salvaged, email_text),
+                    "complete",
+                )
+                merge_completion(salvaged, message_text(reply))
+                return self._finish_repair(salvaged, e, followup=True)
+            return self._finish_repair(salvaged, e)
+
+    def render_prompt(self, email_text: str) -> str:
+        """Render the extraction prompt as sent for ``email_text``."""
+        return self.prompt.format(email_text=email_text)
+
+    def _call_llm(self, prompt, inputs: dict[str, Any], operation: str) -> Any:
+        """Call the LLM, recording its latency and token usage."""
+        prompt_value = prompt.invoke(inputs)
+        estimated = self._estimate(prompt_value, operation)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            message = self.llm.invoke(prompt_value)
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_SECONDS.labels(operation, outcome).observe(
+                time.perf_counter() - started
+            )
+        self._record_usage(message, operation, estimated)
+        return message
+
+    async def _acall_llm(self, prompt, inputs: dict[str, Any], operation: str) -> Any:
+        """Async variant of ``_call_llm``."""
+        prompt_value = prompt.invoke(inputs)
+        estimated = self._estimate(prompt_value, operation)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            message = await self.llm.ainvoke(prompt_value)
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_SECONDS.labels(operation, outcome).observe(
+                time.perf_counter() - started
+            )
+        self._record_usage(message, operation, estimated)
+        return message
+
+    def _estimate(self, prompt_value: Any, operation: str) -> Optional[int]:
+        """Estimate the prompt's tokens when an estimator is configured."""
+        if self.token_estimator is None:
+            return None
+        estimated = self.token_estimator.estimate(prompt_value.to_string())
+        LLM_ESTIMATED_TOKENS.labels(operation).inc(estimated)
+        return estimated
+
+    def _record_usage(self, message: Any, operation: str, estimated: Optional[int]):
+        """Count reported tokens and compare them with the estimate."""
+        record_token_usage(message, operation)
+        usage = getattr(message, "usage_metadata", None) or {}
+        actual = usage.get("input_tokens")
+        if estimated and actual:
+            self.token_estimator.record(estimated, actual)
+            LLM_TOKEN_ESTIMATE_RATIO.observe(actual / estimated)
+
+    def _salvage(self, message: Any, error: ValueError) -> SalvagedReply:
+        """Salvage a malformed reply, re-raising ``error`` if nothing is usable."""
+        salvaged = salvage_reply(message_text(message))
+        with self._stats_lock:
+            self.repair_stats.malformed += 1
+            if salvaged is not None:
+                self.repair_stats.dropped_items += salvaged.dropped_items
+        if salvaged is None:
+            self._count_repair("failed")
+            raise error
+        return salvaged
+
+    @staticmethod
+    def _completion_inputs(salvaged: SalvagedReply, email_text: str) -> dict[str, Any]:
+        """Build the follow-up prompt inputs for the fields still missing."""
+        return {
+            "extracted": json.dumps(salvaged.fields, indent=2),
+            "missing_fields": ", ".join(salvaged.missing),
+            "email_text": email_text,
+        }
+
+    def _finish_repair(
+        self,
+        salvaged: SalvagedReply,
+        error: ValueError,
+        followup: bool = False,
+    ) -> EmailData:
+        """Build the extraction from repaired fields, counting the outcome."""
+        if salvaged.missing:
+            self._count_repair("failed", followup)
+            raise error
+        self._count_repair("completed" if followup else "repaired", followup)
+        return EmailData(**salvaged.fields)
+
+    def _count_repair(self, outcome: str, followup: bool = False):
+        """Record how a malformed reply was handled."""
+        LLM_REPLY_REPAIRS.labels(outcome).inc()
+        with self._stats_lock:
+            setattr(
+                self.repair_stats,
+                outcome,
+                getattr(self.repair_stats, outcome) + 1,
+            )
+            if followup:
+                self.repair_stats.followup_calls += 1
+
+    @staticmethod
+    def _to_email_data(order: Order) -> EmailData:
+        """Convert an Order back into the extraction schema."""
+        return EmailData(
+            customer_name=order.customer,
+            delivery_address=order.address,
+            delivery_date=order.delivery_date.isoformat(),
+            items=[
+                {"sku": item.sku, "quantity": item.quantity} for item in order.items
+            ],
+        )
+
+    def _create_record(self, data: EmailData) -> OrderRecord:
+        """Create an order record from parsed data already validated by EmailData."""
         order_items = [
-            OrderItem(
-                sku=item["sku"],
+            OrderItemRecord(
+                sku=normalize_sku(item["sku"]),
                 quantity=item["quantity"],
                 valid=True,  # Will be validated later
             )
             for item in data.items
         ]
 
-        return Order(
+        return OrderRecord(
             customer=data.customer_name,
             address=data.delivery_address,
             delivery_date=date.fromisoformat(data.delivery_date),
@@ -0,0 +1,273 @@
+"""Local repair of malformed LLM JSON replies and salvage of their valid parts.
+
+Replies that fail strict parsing are often nearly right: the object is
+wrapped in prose or a code fence, has trailing commas, or was cut off
+mid-array. These helpers recover what is usable without another LLM call
+and report which fields still have to be asked for.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+# Replies cut off far from any complete element are not worth many attempts
+MAX_REPAIR_ATTEMPTS = 50
+
+SCALAR_FIELDS = ("customer_name", "delivery_address", "delivery_date")
+ITEMS_FIELD = "items"
+
+
+def message_text(message: Any) -> str:
+    """Get the text of a chat message, a content block list or a plain string."""
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+        )
+    return str(content)
+
+
+def extract_json_text(text: str) -> Optional[str]:
+    """Get the first JSON object in ``text``, or all that follows its ``{``.
+
+    Surrounding prose and code fences are dropped. A truncated object is
+    returned up to the end of the text.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return text[start:]
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Drop commas directly followed by a closing bracket, outside strings."""
+    out = []
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            following = text[i + 1 :].lstrip()
+            if not following or following[0] in "}]":
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def repair_json(text: str) -> tuple[Optional[Any], bool]:
+    """Parse JSON leniently, returning the value and whether it was truncated.
+
+    Text cut off before its closing brackets is closed after its last
+    complete element. The partial element is dropped rather than guessed,
+    since a cut-off ``12`` would otherwise read as ``1``.
+    """
+    text = strip_trailing_commas(text)
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    # Points where every value before them is complete, with the brackets
+    # still open there
+    cuts: list[tuple[int, str]] = []
+    stack: list[str] = []
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack and stack[-1] == ch:
+                stack.pop()
+                cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(stack))))
+
+    truncated = bool(stack) or in_string
+    if not truncated:
+        return None, False
+    for cut, closers in reversed(cuts[-MAX_REPAIR_ATTEMPTS:]):
+        try:
+            return json.loads(strip_trailing_commas(text[:cut]) + closers), True
+        except ValueError:
+            continue
+    return None, True
+
+
+def salvage_items(value: Any) -> tuple[list[dict[str, Any]], int]:
+    """Keep the well-formed items, returning them and the number dropped.
+
+    SKU and quantity keys are matched case-insensitively, and quantities
+    written as digit strings are accepted.
+    """
+    if not isinstance(value, list):
+        return [], 0
+    items = []
+    dropped = 0
+    for item in value:
+        fields = (
+            {key.lower(): v for key, v in item.items() if isinstance(key, str)}
+            if isinstance(item, dict)
+            else {}
+        )
+        sku = fields.get("sku")
+        quantity = fields.get("quantity")
+        if isinstance(quantity, str) and quantity.strip().isdigit():
+            quantity = int(quantity)
+        if (
+            isinstance(sku, str)
+            and sku.strip()
+            and isinstance(quantity, int)
+            and not isinstance(quantity, bool)
+            and quantity > 0
+        ):
+            items.append({"sku": sku.strip(), "quantity": quantity})
+        else:
+            dropped += 1
+    return items, dropped
+
+
+@dataclass
+class SalvagedReply:
+    """The usable fields of a malformed reply and the fields still missing.
+
+    ``items`` is listed as missing when the reply was cut off, when items
+    had to be dropped or when none were found, since the salvaged list may
+    then be incomplete.
+    """
+
+    fields: dict[str, Any]
+    missing: list[str]
+    truncated: bool = False
+    dropped_items: int = 0
+
+
+def salvage_reply(text: str) -> Optional[SalvagedReply]:
+    """Salvage an extraction reply, or None if no JSON object can be read."""
+    json_text = extract_json_text(text)
+    if json_text is None:
+        return None
+    data, truncated = repair_json(json_text)
+    if not isinstance(data, dict):
+        return None
+
+    fields: dict[str, Any] = {}
+    missing = []
+    for name in SCALAR_FIELDS:
+        value = valid_scalar(name, data.get(name))
+        if value is None:
+            missing.append(name)
+        else:
+            fields[name] = value
+
+    items, dropped = salvage_items(data.get(ITEMS_FIELD))
+    fields[ITEMS_FIELD] = items
+    if truncated or dropped or not items:
+        missing.append(ITEMS_FIELD)
+    return SalvagedReply(fields, missing, truncated, dropped)
+
+
+def valid_scalar(name: str, value: Any) -> Optional[str]:
+    """Get a usable, stripped scalar field value, or None."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if name == "delivery_date":
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return None
+    return value
+
+
+def merge_completion(salvaged: SalvagedReply, text: str) -> list[str]:
+    """Fill missing fields from a follow-up reply, returning those still missing.
+
+    Follow-up items add to the salvaged ones, skipping SKUs already there.
+    """
+    json_text = extract_json_text(text)
+    data = repair_json(json_text)[0] if json_text is not None else None
+    if not isinstance(data, dict):
+        return salvaged.missing
+
+    still_missing = []
+    for name in salvaged.missing:
+        if name == ITEMS_FIELD:
+            items, _ = salvage_items(data.get(ITEMS_FIELD))
+            known = {item["sku"] for item in salvaged.fields[ITEMS_FIELD]}
+            salvaged.fields[ITEMS_FIELD].extend(
+                item for item in items if item["sku"] not in known
+            )
+            if not salvaged.fields[ITEMS_FIELD]:
+                still_missing.append(name)
+            continue
+        value = valid_scalar(name, data.get(name))
+        if value is None:
+            still_missing.append(name)
+        else:
+            salvaged.fields[name] = value
+    salvaged.missing = still_missing
+    return still_missing
+
+
+@dataclass
+class RepairStats:
+    """Counts of malformed replies and how they were recovered.
+
+    ``repaired`` replies were fixed locally, avoiding a retry of the whole
+    email; ``completed`` ones needed a follow-up call for missing fields.
+    """
+
+    malformed: int = 0
+    repaired: int = 0
+    completed: int = 0
+    failed: int = 0
+    followup_calls: int = 0
+    dropped_items: int = 0
+
+    @property
+    def repair_rate(self) -> float:
+        """Share of malformed replies recovered, with or without a follow-up."""
+        recovered = self.repaired + self.completed
+        return recovered / self.malformed if self.malformed else 0.0
+
+    @property
+    def calls_avoided(self) -> int:
+        """Full re-extractions avoided by repairing replies locally."""
+        return self.repaired
@@ -0,0 +1,249 @@
+"""SimHash-based near-duplicate index over email bodies."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+FINGERPRINT_BITS = 64
+MIN_BAND_BITS = 6
+SHINGLE_SIZE = 2
+MAX_STORED_TEXT_CHARS = 20_000
+# Version 2 stores the original email body instead of its cleaned form
+INDEX_FORMAT_VERSION = 2
+
+# An RFC 822 header field name: printable ASCII except space and colon
+_HEADER_FIELD = re.compile(r"^([!-9;-~]+):")
+# A block must contain one of these to be taken for headers and not prose
+_MESSAGE_HEADERS = frozenset({"from", "to", "cc", "subject", "date", "message-id"})
+_TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+_NO_MATCHES: frozenset[int] = frozenset()
+
+
+def strip_header_block(email_text: str) -> str:
+    """Drop a leading RFC 822 header block and the blank line ending it.
+
+    Only a block of header fields and their continuation lines before the
+    first blank line is removed, so body lines such as "Date: July 1" stay.
+    Text that does not start with such a block is returned unchanged.
+    """
+    lines = email_text.lstrip("\r\n").splitlines()
+    names = set()
+    for i, line in enumerate(lines):
+        if not line.strip():
+            if names & _MESSAGE_HEADERS:
+                return "\n".join(lines[i + 1 :])
+            return email_text
+        field = _HEADER_FIELD.match(line)
+        if field:
+            names.add(field.group(1).lower())
+        elif not (i and line[0] in " \t"):
+            return email_text
+    return email_text
+
+
+def stored_body(email_text: str) -> str:
+    """Get the body as it is stored in the index: without headers, truncated."""
+    return strip_header_block(email_text)[:MAX_STORED_TEXT_CHARS]
+
+
+def clean_email_body(email_text: str) -> str:
+    """Normalize an email body so that formatting noise does not affect hashing.
+
+    The header block and quoted replies are dropped, text is lowercased and
+    runs of whitespace are collapsed. Used for fingerprints only; diffs are
+    built from the original text, whose case and lines the LLM needs.
+    """
+    lines = []
+    for raw_line in strip_header_block(email_text).splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith(">"):
+            continue
+        lines.append(" ".join(line.lower().split()))
+    return "\n".join(lines)
+
+
+def simhash(text: str) -> int:
+    """Compute a 64-bit SimHash fingerprint from word shingles of the text."""
+    tokens = _TOKEN.findall(text)
+    if len(tokens) >= SHINGLE_SIZE:
+        shingles = [
+            " ".join(tokens[i : i + SHINGLE_SIZE])
+            for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        ]
+    else:
+        shingles = tokens
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+@dataclass(frozen=True)
+class IndexMatch:
+    """A prior email found within the similarity threshold."""
+
+    fingerprint: int
+    distance: int
+    text: str
+    payload: dict[str, Any]
+
+    @property
+    def similarity(self) -> float:
+        """Fraction of fingerprint bits shared with the query."""
+        return 1.0 - self.distance / FINGERPRINT_BITS
+
+
+class SimHashIndex:
+    """Bounded, persistent index of email fingerprints and their extractions.
+
+    Lookups use banded LSH: the fingerprint is split into ``max_distance + 1``
+    bands and any entry sharing a band is a candidate, so by the pigeonhole
+    principle every entry within ``max_distance`` bits is found. The least
+    recently used entry is evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 10_000,
+        max_distance: int = 8,
+    ):
+        max_bands = FINGERPRINT_BITS // MIN_BAND_BITS
+        if not 0 <= max_distance < max_bands:
+            raise ValueError(f"max_distance must be between 0 and {max_bands - 1}")
+        self.path = path
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._band_slices = self._create_band_slices(max_distance + 1)
+        self._entries: OrderedDict[int, tuple[str, dict[str, Any]]] = OrderedDict()
+        self._bands: list[dict[int, set[int]]] = [{} for _ in self._band_slices]
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def find(self, email_text: str) -> Optional[IndexMatch]:
+        """Return the closest prior entry within ``max_distance``, if any."""
+        cleaned = clean_email_body(email_text)
+        fingerprint = simhash(cleaned)
+        with self._lock:
+            best: Optional[tuple[int, int]] = None
+            for candidate in self._candidates(fingerprint):
+                distance = bin(candidate ^ fingerprint).count("1")
+                if distance <= self.max_distance and (
+                    best is None or distance < best[1]
+                ):
+                    best = (candidate, distance)
+
+            if best is None:
+                return None
+
+            self._entries.move_to_end(best[0])
+            stored_text, payload = self._entries[best[0]]
+            return IndexMatch(best[0], best[1], stored_text, payload)
+
+    def add(self, email_text: str, payload: dict[str, Any]) -> int:
+        """Index an email with its extraction payload and return its fingerprint.
+
+        The body is stored as written, without its header block, so later
+        near-duplicates can be diffed against it.
+        """
+        fingerprint = simhash(clean_email_body(email_text))
+        body = stored_body(email_text)
+        with self._lock:
+            self._insert(fingerprint, body, payload)
+        return fingerprint
+
+    def save(self):
+        """Atomically persist the index to ``path``."""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "version": INDEX_FORMAT_VERSION,
+                "entries": [
+                    {"fingerprint": fp, "text": text, "payload": payload}
+                    for fp, (text, payload) in self._entries.items()
+                ],
+            }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self):
+        """Load a previously saved index from ``path``."""
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            return
+
+        with self._lock:
+            for entry in data["entries"]:
+                self._insert(entry["fingerprint"], entry["text"], entry["payload"])
+
+    def _candidates(self, fingerprint: int) -> set[int]:
+        """Collect fingerprints sharing at least one band with the query."""
+        candidates: set[int] = set()
+        for band, buckets in enumerate(self._bands):
+            candidates |= buckets.get(self._band_key(fingerprint, band), _NO_MATCHES)
+        return candidates
+
+    def _insert(self, fingerprint: int, text: str, payload: dict[str, Any]):
+        """Insert or refresh an entry, evicting the least recently used one."""
+        if fingerprint in self._entries:
+            self._entries.move_to_end(fingerprint)
+        else:
+            for band, buckets in enumerate(self._bands):
+                buckets.setdefault(self._band_key(fingerprint, band), set()).add(
+                    fingerprint
+                )
+        self._entries[fingerprint] = (text, payload)
+
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            for band, buckets in enumerate(self._bands):
+                key = self._band_key(evicted, band)
+                bucket = buckets[key]
+                bucket.discard(evicted)
+                if not bucket:
+                    del buckets[key]
+
+    def _band_key(self, fingerprint: int, band: int) -> int:
+        """Extract one band of the fingerprint."""
+        shift, mask = self._band_slices[band]
+        return fingerprint >> shift & mask
+
+    @staticmethod
+    def _create_band_slices(band_count: int) -> list[tuple[int, int]]:
+        """Split the fingerprint into contiguous (shift, mask) bands."""
+        slices = []
+        shift = 0
+        for band in range(band_count):
+            width = (FINGERPRINT_BITS - shift) // (band_count - band)
+            slices.append((shift, (1 << width) - 1))
+            shift += width
+        return slices
@@ -0,0 +1,321 @@
+"""Local prompt token estimates, model selection by prompt size, and chunking.
+
+Emails are measured before they are sent, so an over-long email is routed
+to a model with a larger context, trimmed or split instead of being
+rejected or truncated by the provider.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from core.exceptions import ParsingError
+from core.interfaces import EmailParser
+from core.metrics import REGISTRY
+from core.models import Order
+from core.records import OrderRecord
+
+from .email_parser import LangChainEmailParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_TOKENS = 8192
+# Room left for the extraction reply, which grows with the number of items
+DEFAULT_OUTPUT_TOKENS = 2048
+# Typical for English prose with BPE tokenizers; corrected by calibration
+DEFAULT_CHARS_PER_TOKEN = 4.0
+CALIBRATION_WEIGHT = 0.1
+
+KNOWN_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16_385,
+    "gpt-4": 8_192,
+    "gpt-4-turbo": 128_000,
+    "gpt-4-turbo-preview": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+    "claude-3-haiku-20240307": 200_000,
+    "claude-3-sonnet-20240229": 200_000,
+    "claude-3-opus-20240229": 200_000,
+}
+
+_QUOTE_HEADER = re.compile(r"^on .+ wrote:$", re.IGNORECASE)
+_FORWARD_OR_SIGNATURE = re.compile(
+    r"^(-- ?|-{2,} ?original message ?-{2,}|-{2,} ?forwarded message ?-{2,})$",
+    re.IGNORECASE,
+)
+# Numeric dates, month names next to a day, and relative days; a chunk
+# without one leaves the model to guess the delivery date
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?"
+    r"|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b"
+)
+_DATE_MENTION = re.compile(
+    r"\b(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}"
+    rf"|{_MONTH} \d{{1,2}}\b|\d{{1,2}}(?:st|nd|rd|th)? {_MONTH}"
+    r"|today|tomorrow|(?:mon|tues|wednes|thurs|fri|satur|sun)day)",
+    re.IGNORECASE,
+)
+
+BUDGET_DECISIONS = REGISTRY.counter(
+    "token_budget_decisions",
+    "Emails by how they were fitted to a model's context: fit, trimmed or chunked.",
+    ("action",),
+)
+
+
+def context_window(model: str, default: int = DEFAULT_CONTEXT_TOKENS) -> int:
+    """Get the known context window of a model, or ``default``."""
+    return KNOWN_CONTEXT_WINDOWS.get(model, default)
+
+
+def load_tokenizer(model: Optional[str]) -> Optional[Callable[[str], list]]:
+    """Get the model's tiktoken encoder, or None if it is not available offline.
+
+    Needs the optional ``tiktoken`` package and its cached encoding files;
+    models tiktoken does not know use its ``cl100k_base`` encoding.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails offline
+        logger.info("Using heuristic token counts; tiktoken unavailable: %s", e)
+        return None
+    return encoding.encode
+
+
+class TokenEstimator:
+    """Estimates prompt tokens, calibrated against the counts models report.
+
+    Counts come from the model's tokenizer when available and from the
+    character count otherwise. ``record`` feeds reported counts back as a
+    running scale factor, which also absorbs chat formatting overhead.
+    """
+
+    def __init__(self, model: Optional[str] = None, use_tokenizer: bool = True):
+        self.model = model
+        self._encode = load_tokenizer(model) if use_tokenizer else None
+        self.scale = 1.0
+        self.samples = 0
+        self.total_estimated = 0
+        self.total_actual = 0
+        self._lock = threading.Lock()
+
+    @property
+    def method(self) -> str:
+        """How raw counts are made: ``tokenizer`` or ``heuristic``."""
+        return "tokenizer" if self._encode is not None else "heuristic"
+
+    def estimate(self, text: str) -> int:
+        """Estimate the tokens in ``text``."""
+        if self._encode is not None:
+            raw = len(self._encode(text))
+        else:
+            raw = len(text) / DEFAULT_CHARS_PER_TOKEN
+        return math.ceil(raw * self.scale)
+
+    def record(self, estimated: int, actual: int):
+        """Record the count a model reported for a prompt estimated earlier."""
+        if estimated <= 0 or actual <= 0:
+            return
+        with self._lock:
+            self.samples += 1
+            self.total_estimated += estimated
+            self.total_actual += actual
+            self.scale *= 1 + CALIBRATION_WEIGHT * (actual / estimated - 1)
+
+    @property
+    def error_ratio(self) -> float:
+        """Reported over estimated tokens across every recorded prompt."""
+        if not self.total_estimated:
+            return 1.0
+        return self.total_actual / self.total_estimated
+
+
+@dataclass(frozen=True)
+class ModelBudget:
+    """Token limits of one model."""
+
+    model: str
+    context_tokens: int
+    output_tokens: int = DEFAULT_OUTPUT_TOKENS
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Tokens the prompt may use while leaving room for the reply."""
+        return self.context_tokens - self.output_tokens
+
+
+def trim_email(email_text: str) -> str:
+    """Drop quoted replies, forwarded history, signatures and blank runs.
+
+    Order details in the new message are kept verbatim, unlike
+    ``clean_email_body``, which also lowercases for hashing.
+    """
+    lines = []
+    for raw_line in email_text.splitlines():
+        line = raw_line.strip()
+        if _QUOTE_HEADER.match(line) or _FORWARD_OR_SIGNATURE.match(line):
+            break
+        if line.startswith(">"):
+            continue
+        if line or (lines and lines[-1]):
+            lines.append(" ".join(line.split()))
+    return "\n".join(lines).strip()
+
+
+def split_email(
+    email_text: str, max_tokens: int, estimate: Callable[[str], int]
+) -> list[str]:
+    """Split an email on line boundaries into parts of at most ``max_tokens``.
+
+    Lines longer than the limit are split between words. Parts are sized by
+    summing per-piece estimates plus one token per separator, which slightly
+    overestimates and avoids re-counting the growing part.
+    """
+    pieces: list[tuple[str, int]] = []
+    for line in email_text.splitlines():
+        tokens = estimate(line)
+        if tokens <= max_tokens:
+            pieces.append((line, tokens))
+            continue
+        words: list[str] = []
+        used = 0
+        for word in line.split():
+            word_tokens = estimate(word) + 1
+            if words and used + word_tokens > max_tokens:
+                pieces.append((" ".join(words), used))
+                words, used = [], 0
+            words.append(word)
+            used += word_tokens
+        if words:
+            pieces.append((" ".join(words), used))
+
+    chunks = []
+    current: list[str] = []
+    used = 0
+    for piece, tokens in pieces:
+        if current and used + tokens + 1 > max_tokens:
+            chunks.append("\n".join(current))
+            current, used = [], 0
+        current.append(piece)
+        used += tokens + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def merge_chunk_records(
+    records: list[OrderRecord], parts: Optional[list[str]] = None
+) -> OrderRecord:
+    """Combine the extractions of an email's chunks into one order.
+
+    Items are concatenated in order; customer and address come from the
+    first chunk that names them. The date comes from the first of ``parts``,
+    the chunk texts, that mentions one, or from the first chunk.
+    """
+
+    def first_known(values: list[str]) -> str:
+        return next(
+            (value for value in values if value.strip().lower() not in ("", "unknown")),
+            values[0],
+        )
+
+    return OrderRecord(
+        customer=first_known([record.customer for record in records]),
+        address=first_known([record.address for record in records]),
+        delivery_date=next(
+            (
+                record.delivery_date
+                for record, part in zip(records, parts or ())
+                if _DATE_MENTION.search(part)
+            ),
+            records[0].delivery_date,
+        ),
+        items=[item for record in records for item in record.items],
+    )
+
+
+class BudgetedEmailParser(EmailParser):
+    """Sends each email to the smallest-context model whose budget it fits.
+
+    ``tiers`` pair each model's budget with a parser for that model. An
+    email too long for every tier is trimmed, and if still too long, split
+    into chunks parsed separately by the largest tier and merged.
+    """
+
+    def __init__(
+        self,
+        tiers: list[tuple[ModelBudget, LangChainEmailParser]],
+        estimator: TokenEstimator,
+    ):
+        if not tiers:
+            raise ValueError("At least one model tier is required")
+        self.tiers = sorted(tiers, key=lambda tier: tier[0].prompt_tokens)
+        self.estimator = estimator
+
+    def parse_email(self, email_text: str) -> Order:
+        """Parse email text and return structured Order object."""
+        return self.parse_email_record(email_text).to_model()
+
+    def parse_email_record(self, email_text: str) -> OrderRecord:
+        """Parse with a model that fits, trimming or chunking if none does."""
+        parser, parts = self._plan(email_text)
+        if len(parts) == 1:
+            return parser.parse_email_record(parts[0])
+        return merge_chunk_records([parser.parse_email_record(p) for p in parts], parts)
+
+    async def aparse_email_record(self, email_text: str) -> OrderRecord:
+        """Async variant of ``parse_email_record``; chunks are parsed concurrently."""
+        parser, parts = self._plan(email_text)
+        if len(parts) == 1:
+            return await parser.aparse_email_record(parts[0])
+        records = await asyncio.gather(*(parser.aparse_email_record(p) for p in parts))
+        return merge_chunk_records(list(records), parts)
+
+    def revise_order(self, previous: Order, email_diff: str) -> Order:
+        """Revise with the smallest model; diffs of near-duplicates are short."""
+        return self.tiers[0][1].revise_order(previous, email_diff)
+
+    def _plan(self, email_text: str) -> tuple[LangChainEmailParser, list[str]]:
+        """Choose the parser and the text, or texts, to send it."""
+        parser = self._select(email_text)
+        if parser is not None:
+            BUDGET_DECISIONS.labels("fit").inc()
+            return parser, [email_text]
+
+        trimmed = trim_email(email_text)
+        parser = self._select(trimmed)
+        if parser is not None:
+            BUDGET_DECISIONS.labels("trimmed").inc()
+            return parser, [trimmed]
+
+        budget, parser = self.tiers[-1]
+        overhead = self.estimator.estimate(parser.render_prompt(""))
+        limit = budget.prompt_tokens - overhead
+        if limit <= 0:
+            raise ParsingError(f"The prompt alone exceeds the budget of {budget.model}")
+        chunks = split_email(trimmed, limit, self.estimator.estimate)
+        BUDGET_DECISIONS.labels("chunked").inc()
+        logger.info(
+            "Split a long email into %d chunks for %s", len(chunks), budget.model
+        )
+        return parser, chunks
+
+    def _select(self, email_text: str) -> Optional[LangChainEmailParser]:
+        """Get the parser of the smallest tier the rendered prompt fits, if any."""
+        for budget, parser in self.tiers:
+            tokens = self.estimator.estimate(parser.render_prompt(email_text))
+            if tokens <= budget.prompt_tokens:
+                return parser
+        return None
@@ -1,6 +1,35 @@
-"""Processing module for order processing logic."""
+"""Processing module for order processing logic.
 
-from .llm_factory import LLMFactory
-from .order_processor import SmartOrderProcessor
+Submodules are imported on first attribute access so that importing the
+package does not load NumPy or LLM provider SDKs.
+"""
 
-__all__ = ["SmartOrderProcessor", "LLMFactory"]
+import importlib
+
+_EXPORTS = {
+    "SmartOrderProcessor": ".order_processor",
+    "LLMFactory": ".llm_factory",
+    "OrderBundler": ".order_bundler",
+    "QuoteEngine": ".quote_engine",
+    "OrderConsolidator": ".order_consolidator",
+}
+
+__all__ = [
+    "SmartOrderProcessor",
+    "LLMFactory",
+    "OrderBundler",
+    "QuoteEngine",
+    "OrderConsolidator",
+]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,202 @@
+"""Batch validation and bundling of parsed orders across worker processes."""
+
+import gc
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Optional
+
+from core.interfaces import CatalogDataSource
+from core.records import OrderRecord
+from data_sources.catalog_csv import CsvCatalogDataSource
+from validation.catalog_validator import CatalogValidator
+
+from .order_bundler import OrderBundler
+from .order_consolidator import OrderConsolidator
+from .order_processor import apply_validation_results
+from .profiling import RequestProfiler
+
+DEFAULT_CHUNK_SIZE = 64
+# Chunks kept in flight per worker, so workers never wait on the parent
+CHUNKS_PER_WORKER = 2
+
+# Pipeline used by pool workers. With the fork start method it is built in the
+# parent before the workers start, so they share its catalog pages instead of
+# loading or unpickling their own copy.
+_worker_pipeline: Optional["BatchPipeline"] = None
+
+
+class BatchPipeline:
+    """Validates and bundles parsed orders against one catalog in-process.
+
+    Bulk suggestions are priced from CSV catalogs, following their updates.
+    Chunks are profiled one in N as set by ``ORDER_PROFILE_EVERY``; in pool
+    workers each process writes its own profiles.
+    """
+
+    def __init__(
+        self,
+        catalog_source: CatalogDataSource,
+        profiler: Optional[RequestProfiler] = None,
+    ):
+        self.validator = CatalogValidator(catalog_source)
+        self.bundler = OrderBundler(catalog_source)
+        if isinstance(catalog_source, CsvCatalogDataSource):
+            self.bundler.follow_prices(catalog_source)
+        self.profiler = profiler or RequestProfiler.from_env()
+
+    @classmethod
+    def from_csv(cls, catalog_path: str) -> "BatchPipeline":
+        """Create a pipeline over a CSV catalog."""
+        return cls(CsvCatalogDataSource(catalog_path))
+
+    def process(self, order: dict[str, Any]) -> dict[str, Any]:
+        """Validate and bundle one order given in ``OrderRecord.to_dict`` form."""
+        record = OrderRecord.from_dict(order)
+        apply_validation_results(record, self.validator.validate_order(record))
+        return {
+            "order": record.to_dict(),
+            "bundles": self.bundler.analyze_and_suggest_bundles(record),
+        }
+
+    def process_chunk(self, orders: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Process a chunk of orders."""
+        with self.profiler.session("batch_chunk"):
+            return [self.process(order) for order in orders]
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Split an iterable into lists of at most ``size`` items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _init_worker(catalog_path: str):
+    """Load the catalog in a worker that did not inherit it from the parent."""
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        _worker_pipeline = BatchPipeline.from_csv(catalog_path)
+
+
+def _process_chunk(orders: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Process a chunk in a pool worker."""
+    return _worker_pipeline.process_chunk(orders)
+
+
+class BatchOrderRunner:
+    """Runs validation and bundling over large batches of parsed orders.
+
+    With ``processes`` greater than one, orders are sent to a process pool in
+    chunks of ``chunk_size`` to amortize IPC, and results are yielded in input
+    order. On platforms with ``fork`` the catalog is loaded once in the parent
+    and inherited by every worker; elsewhere each worker loads it from
+    ``catalog_path`` once at start-up. Orders and results cross process
+    boundaries as plain dictionaries.
+    """
+
+    def __init__(
+        self,
+        catalog_path: str,
+        processes: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.catalog_path = catalog_path
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pipeline: Optional[BatchPipeline] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "BatchOrderRunner":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def run(self, orders: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """Process orders lazily, yielding one result per order in input order."""
+        if self.processes == 1:
+            pipeline = self._local_pipeline()
+            for chunk in chunked(orders, self.chunk_size):
+                yield from pipeline.process_chunk(chunk)
+            return
+
+        executor = self._start_pool()
+        pending: deque[Future] = deque()
+        for chunk in chunked(orders, self.chunk_size):
+            pending.append(executor.submit(_process_chunk, chunk))
+            if len(pending) >= self.processes * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def run_consolidated(
+        self, orders: Iterable[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Process a batch and merge the orders for each delivery.
+
+        Results are in order of each delivery's first order. ``sources``
+        lists the input positions of the orders a result was made from and
+        ``resolved_skus`` the SKUs that only pass combined. Merged orders are
+        validated and bundled again in this process.
+        """
+        results = list(self.run(orders))
+        pipeline = self._local_pipeline()
+        deliveries = OrderConsolidator(pipeline.validator).consolidate(
+            OrderRecord.from_dict(result["order"]) for result in results
+        )
+        return [
+            {
+                "order": delivery.order.to_dict(),
+                "bundles": pipeline.bundler.analyze_and_suggest_bundles(delivery.order)
+                if delivery.merged
+                else results[delivery.sources[0]]["bundles"],
+                "sources": delivery.sources,
+                "resolved_skus": delivery.resolved_skus,
+            }
+            for delivery in deliveries
+        ]
+
+    def close(self):
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _local_pipeline(self) -> BatchPipeline:
+        """Get the pipeline used in this process, loading the catalog once."""
+        if self._pipeline is None:
+            self._pipeline = BatchPipeline.from_csv(self.catalog_path)
+        return self._pipeline
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Start the pool, sharing the parent's catalog with forked workers."""
+        global _worker_pipeline
+        if self._executor is not None:
+            return self._executor
+
+        forking = "fork" in multiprocessing.get_all_start_methods()
+        if forking:
+            _worker_pipeline = self._local_pipeline()
+            # Keep the inherited catalog out of the workers' garbage collection
+            # so its pages stay shared instead of being copied on write
+            gc.freeze()
+        context = multiprocessing.get_context("fork" if forking else "spawn")
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.catalog_path,),
+        )
+        if forking:
+            try:
+                # Forking pools start every worker on the first submission
+                self._executor.submit(int).result()
+            finally:
+                # Workers keep their frozen copy; the parent collects as usual
+                gc.unfreeze()
+        return self._executor
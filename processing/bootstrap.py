@@ -0,0 +1,180 @@
+"""Construction of the shared parser, validator, processor and bundler."""
+
+import atexit
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from core.interfaces import CatalogDataSource, EmailParser, OrderValidator
+from data_sources.caching import CachingCatalogDataSource
+from data_sources.catalog_csv import CsvCatalogDataSource
+from data_sources.http_inventory import HttpInventoryDataSource
+from validation.catalog_validator import CatalogValidator
+from validation.stock_ledger import StockLedger
+
+from .llm_factory import LLMFactory
+from .order_bundler import OrderBundler
+from .order_processor import SmartOrderProcessor
+
+DEFAULT_CATALOG_PATH = "rezaqaround2zaqathon/Product Catalog.csv"
+
+
+def initialize_components(
+    selected_provider: str, catalog_path: Optional[str] = None
+) -> tuple[EmailParser, OrderValidator]:
+    """Initialize application components."""
+    # Parsing pulls in LangChain, so it is only imported when components are built
+    from parsing.cascading_parser import CascadingEmailParser
+    from parsing.dedup_parser import NearDuplicateEmailParser
+    from parsing.email_parser import LangChainEmailParser
+    from parsing.simhash_index import SimHashIndex
+    from parsing.token_budget import (
+        BudgetedEmailParser,
+        ModelBudget,
+        TokenEstimator,
+    )
+
+    load_dotenv()
+
+    # Get LLM configuration
+    llm_config = {
+        "model": os.getenv("DEFAULT_MODEL", "gpt-4-turbo-preview"),
+        "temperature": float(os.getenv("TEMPERATURE", "0.0")),
+    }
+
+    # Create LLM instance
+    llm = LLMFactory.create_llm(provider=selected_provider, **llm_config)
+
+    # Initialize parser, measuring prompts so long emails can be routed,
+    # trimmed or chunked before they are sent
+    model = llm_config["model"]
+    estimator = TokenEstimator(model)
+    tiers = [
+        (
+            ModelBudget(model, model_context_tokens("DEFAULT_MODEL", model)),
+            LangChainEmailParser(llm, estimator),
+        )
+    ]
+    long_context_model = os.getenv("LONG_CONTEXT_MODEL")
+    if long_context_model:
+        long_context_llm = LLMFactory.create_llm(
+            provider=selected_provider, **{**llm_config, "model": long_context_model}
+        )
+        tiers.append(
+            (
+                ModelBudget(
+                    long_context_model,
+                    model_context_tokens("LONG_CONTEXT_MODEL", long_context_model),
+                ),
+                LangChainEmailParser(long_context_llm, estimator),
+            )
+        )
+    parser = BudgetedEmailParser(tiers, estimator)
+
+    # Initialize validator, with live stock when an inventory service is configured
+    csv_source, catalog_source = create_catalog_sources(catalog_path)
+
+    # Hold stock for processed orders until they are accepted or released
+    stock_ledger = None
+    if os.getenv("STOCK_LEDGER", "").lower() in ("1", "true", "yes"):
+        stock_ledger = StockLedger.from_catalog(
+            csv_source,
+            default_ttl=float(os.getenv("STOCK_RESERVATION_TTL", "300")),
+        )
+        stock_ledger.follow_updates(csv_source)
+    validator = CatalogValidator(catalog_source, stock_ledger)
+
+    # Try a cheaper model first when one is configured
+    cascade_model = os.getenv("CASCADE_MODEL")
+    if cascade_model:
+        cheap_llm = LLMFactory.create_llm(
+            provider=selected_provider, **{**llm_config, "model": cascade_model}
+        )
+        parser = CascadingEmailParser(
+            LangChainEmailParser(cheap_llm, TokenEstimator(cascade_model)),
+            parser,
+            validator.catalog_source,
+            cheap_cost=float(os.getenv("CASCADE_MODEL_COST", "0")),
+            strong_cost=float(os.getenv("DEFAULT_MODEL_COST", "0")),
+        )
+
+    # Reuse prior extractions for near-duplicate emails when an index is configured
+    index_path = os.getenv("NEAR_DUPLICATE_INDEX_PATH")
+    if index_path:
+        parser = NearDuplicateEmailParser(
+            parser,
+            SimHashIndex(index_path),
+            save_every=int(os.getenv("NEAR_DUPLICATE_SAVE_EVERY", "100")),
+        )
+        # Extractions since the last periodic save are written on exit
+        atexit.register(parser.close)
+
+    return parser, validator
+
+
+def create_catalog_sources(
+    catalog_path: Optional[str] = None,
+) -> tuple[CsvCatalogDataSource, CatalogDataSource]:
+    """Create the CSV catalog and the configured stack of sources over it.
+
+    The stack adds live stock from ``INVENTORY_URL`` and a lookup cache when
+    ``CATALOG_CACHE_TTL`` is set; without either it is the CSV catalog itself.
+    """
+    load_dotenv()
+
+    csv_source = CsvCatalogDataSource(
+        catalog_path or os.getenv("CATALOG_PATH", DEFAULT_CATALOG_PATH)
+    )
+    catalog_source: CatalogDataSource = csv_source
+    inventory_url = os.getenv("INVENTORY_URL")
+    if inventory_url:
+        catalog_source = HttpInventoryDataSource(
+            catalog_source,
+            inventory_url,
+            batch_size=int(os.getenv("INVENTORY_BATCH_SIZE", "100")),
+            pool_size=int(os.getenv("INVENTORY_POOL_SIZE", "4")),
+        )
+    cache_ttl = float(os.getenv("CATALOG_CACHE_TTL", "0"))
+    if cache_ttl > 0:
+        catalog_source = CachingCatalogDataSource(
+            catalog_source,
+            capacity=int(os.getenv("CATALOG_CACHE_SIZE", "10000")),
+            ttl=cache_ttl,
+            stale_ttl=float(os.getenv("CATALOG_CACHE_STALE_TTL", "300")),
+            negative_ttl=float(os.getenv("CATALOG_CACHE_NEGATIVE_TTL", "30")),
+        )
+    return csv_source, catalog_source
+
+
+def model_context_tokens(variable: str, model: str) -> int:
+    """Get a model's context window, configured or from the known models.
+
+    ``<variable>_CONTEXT_TOKENS`` overrides the table in ``token_budget``.
+    """
+    from parsing.token_budget import context_window
+
+    configured = os.getenv(f"{variable}_CONTEXT_TOKENS")
+    return int(configured) if configured else context_window(model)
+
+
+def create_processor(
+    selected_provider: str, catalog_path: Optional[str] = None
+) -> SmartOrderProcessor:
+    """Create a processor with a freshly initialized parser and validator.
+
+    The processor reserves stock in the validator's ledger when
+    ``STOCK_LEDGER`` is enabled.
+    """
+    parser, validator = initialize_components(selected_provider, catalog_path)
+    return SmartOrderProcessor(
+        parser, validator, getattr(validator, "stock_ledger", None)
+    )
+
+
+def create_bundler(catalog_path: Optional[str] = None) -> OrderBundler:
+    """Create a bundler over the configured catalog, pricing from the CSV."""
+    csv_source, catalog_source = create_catalog_sources(catalog_path)
+    bundler = OrderBundler(catalog_source)
+    bundler.follow_prices(csv_source)
+    return bundler
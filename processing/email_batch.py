@@ -0,0 +1,151 @@
+"""Background processing of a batch of emails with progress and cancellation."""
+
+import asyncio
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from core.records import OrderRecord
+
+from .order_consolidator import ConsolidatedOrder, OrderConsolidator
+from .order_processor import SmartOrderProcessor
+
+DEFAULT_BATCH_CONCURRENCY = 8
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class BatchEmail:
+    """One email of a batch and its outcome so far."""
+
+    name: str
+    text: str
+    status: str = PENDING
+    order: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class EmailBatch:
+    """Processes emails on a background event loop, at most ``max_concurrency`` at once.
+
+    The caller's thread is never blocked: it starts the batch and polls
+    ``items`` and ``progress``, e.g. from a periodically rerun UI fragment.
+    ``cancel`` stops emails that have not started and cancels in-flight
+    ones, which aborts their LLM requests when the parser is async.
+    Stock reserved for an order is deducted as soon as it is done.
+    """
+
+    def __init__(
+        self,
+        processor: SmartOrderProcessor,
+        emails: list[tuple[str, str]],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ):
+        self.processor = processor
+        self.max_concurrency = max_concurrency
+        self.items = [BatchEmail(name, text) for name, text in emails]
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: list[asyncio.Task] = []
+        self._thread: Optional[threading.Thread] = None
+        self._consolidated: Optional[list[ConsolidatedOrder]] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether every email has finished, failed or been cancelled."""
+        return self._finished.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the batch was cancelled."""
+        return self._cancelled.is_set()
+
+    def progress(self) -> Counter:
+        """Count the emails in each status."""
+        return Counter(item.status for item in self.items)
+
+    def start(self):
+        """Start processing on a daemon thread and return immediately."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=asyncio.run, args=(self._run(),), name="email-batch", daemon=True
+            )
+            self._thread.start()
+
+    def cancel(self):
+        """Cancel every email that has not finished."""
+        self._cancelled.set()
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._cancel_tasks)
+            except RuntimeError:
+                # The loop closed after the batch finished
+                pass
+
+    def consolidated(self) -> list[ConsolidatedOrder]:
+        """Merge the done orders for each delivery, once the batch has finished.
+
+        ``sources`` are positions in ``items``. Empty while the batch runs.
+        """
+        if not self.finished:
+            return []
+        if self._consolidated is None:
+            done = [i for i, item in enumerate(self.items) if item.status == DONE]
+            self._consolidated = OrderConsolidator(
+                self.processor.validator
+            ).consolidate(OrderRecord.from_dict(self.items[i].order) for i in done)
+            for delivery in self._consolidated:
+                delivery.sources = [done[i] for i in delivery.sources]
+        return self._consolidated
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the batch finishes, returning False on timeout."""
+        return self._finished.wait(timeout)
+
+    async def _run(self):
+        """Process every email, bounded by the concurrency limit."""
+        self._loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_concurrency)
+        self._tasks = [
+            asyncio.ensure_future(self._process(item, slots)) for item in self.items
+        ]
+        if self._cancelled.is_set():
+            self._cancel_tasks()
+        try:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            # Tasks cancelled before they started never updated their item
+            for item in self.items:
+                if item.status in (PENDING, RUNNING):
+                    item.status = CANCELLED
+            self._finished.set()
+
+    async def _process(self, item: BatchEmail, slots: asyncio.Semaphore):
+        """Process one email and record its outcome on the item."""
+        try:
+            async with slots:
+                item.status = RUNNING
+                order = await self.processor.aprocess_order_record(item.text)
+        except asyncio.CancelledError:
+            item.status = CANCELLED
+            raise
+        except Exception as e:
+            item.error = str(e) or type(e).__name__
+            item.status = FAILED
+        else:
+            self.processor.commit_reservations([order])
+            item.order = order.to_dict()
+            item.status = DONE
+
+    def _cancel_tasks(self):
+        """Cancel unfinished tasks; runs on the batch's event loop."""
+        for task in self._tasks:
+            task.cancel()
@@ -0,0 +1,115 @@
+"""Deterministic offline LLM provider for local load testing."""
+
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import date
+from typing import Any
+
+from core.interfaces import LLMProvider
+
+from .llm_factory import LLMFactory
+
+# The extraction prompt ends with the email, introduced by this line
+EMAIL_TEXT_MARKER = "Email text:\n"
+
+SKU_PATTERN = re.compile(r"\b[A-Z]{2,4}-\d{3,4}\b")
+QUANTITY_PATTERN = re.compile(r"\b(\d{1,6})\b")
+ISO_DATE_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+ADDRESS_PATTERN = re.compile(
+    r"^(?:ship to|send to|delivery address|address)\s*:\s*(.*)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def extract_order_fields(email_text: str) -> dict[str, Any]:
+    """Extract order fields from an email with regular expressions.
+
+    Every SKU becomes an item whose quantity is the closest other number on
+    its line, defaulting to 1.
+    """
+    items = []
+    for line in email_text.splitlines():
+        skus = list(SKU_PATTERN.finditer(line))
+        if not skus:
+            continue
+        # Blank out SKUs and dates so their digits are not read as quantities
+        numbers_only = ISO_DATE_PATTERN.sub(
+            lambda m: " " * len(m.group(0)),
+            SKU_PATTERN.sub(lambda m: " " * len(m.group(0)), line),
+        )
+        quantities = list(QUANTITY_PATTERN.finditer(numbers_only))
+        for sku in skus:
+            closest = min(
+                quantities,
+                key=lambda q, sku=sku: min(
+                    abs(q.start() - sku.end()), abs(sku.start() - q.end())
+                ),
+                default=None,
+            )
+            items.append(
+                {
+                    "sku": sku.group(0),
+                    "quantity": int(closest.group(1)) if closest else 1,
+                }
+            )
+
+    lines = [line.strip() for line in email_text.splitlines() if line.strip()]
+    address = ADDRESS_PATTERN.search(email_text)
+    delivery_date = ISO_DATE_PATTERN.search(email_text)
+    return {
+        "customer_name": lines[-1] if lines else "Unknown",
+        "delivery_address": address.group(1).strip() if address else "Unknown",
+        "delivery_date": delivery_date.group(0)
+        if delivery_date
+        else date.today().isoformat(),
+        "items": items,
+    }
+
+
+class FakeProvider(LLMProvider):
+    """Provider whose model answers instantly from regex extraction.
+
+    Needs no API key or network access, so the service can be load-tested
+    locally. ``latency`` (or ``FAKE_LLM_LATENCY`` in seconds) adds a fixed
+    delay per call to mimic a remote model.
+    """
+
+    def create_llm(self, **kwargs):
+        """Create a runnable that returns extracted fields as a JSON message."""
+        from langchain_core.messages import AIMessage
+        from langchain_core.runnables import RunnableLambda
+
+        config = self.get_default_config()
+        config.update(kwargs)
+        latency = float(config["latency"])
+
+        def answer(prompt_value) -> AIMessage:
+            text = prompt_value.to_string()
+            _, marker, email_text = text.partition(EMAIL_TEXT_MARKER)
+            fields = extract_order_fields(email_text if marker else text)
+            return AIMessage(content=json.dumps(fields))
+
+        def respond(prompt_value) -> AIMessage:
+            if latency:
+                time.sleep(latency)
+            return answer(prompt_value)
+
+        async def arespond(prompt_value) -> AIMessage:
+            # Sleeps on the event loop so cancelling a call interrupts it
+            if latency:
+                await asyncio.sleep(latency)
+            return answer(prompt_value)
+
+        return RunnableLambda(respond, afunc=arespond)
+
+    def get_default_config(self) -> dict[str, Any]:
+        """Get default fake model configuration."""
+        return {"latency": os.getenv("FAKE_LLM_LATENCY", "0")}
+
+
+def register_fake_provider():
+    """Make ``--provider fake`` available to a command-line entry point."""
+    LLMFactory.register_provider("fake", FakeProvider)
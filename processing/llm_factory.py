@@ -1,20 +1,41 @@
-"""LLM factory for creating language model instances."""
+"""LLM factory for creating language model instances.
 
-import os
-from typing import Any, Optional
+Provider SDKs are imported when a model is first created, so importing this
+module does not pay for them.
+"""
 
-from langchain_core.language_models import BaseLanguageModel
-from langchain_openai import ChatOpenAI
+import os
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 
 from core.exceptions import LLMError
 from core.interfaces import LLMProvider
+from core.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseLanguageModel
+
+ProviderFactory = Callable[[], LLMProvider]
+
+LLM_INSTANCES_CREATED = REGISTRY.counter(
+    "llm_instances_created",
+    "LLM clients created by the factory, by provider and outcome.",
+    ("provider", "outcome"),
+    max_series=20,
+)
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI LLM provider."""
 
-    def create_llm(self, **kwargs) -> BaseLanguageModel:
+    def create_llm(self, **kwargs) -> "BaseLanguageModel":
         """Create OpenAI LLM instance."""
+        try:
+            from langchain_openai import ChatOpenAI
+        except ImportError as e:
+            raise LLMError(
+                "langchain-openai package is required for OpenAI provider"
+            ) from e
+
         config = self.get_default_config()
         config.update(kwargs)
 
@@ -35,7 +56,7 @@ class OpenAIProvider(LLMProvider):
 class AnthropicProvider(LLMProvider):
     """Anthropic LLM provider."""
 
-    def create_llm(self, **kwargs) -> BaseLanguageModel:
+    def create_llm(self, **kwargs) -> "BaseLanguageModel":
         """Create Anthropic LLM instance."""
         try:
             from langchain_anthropic import ChatAnthropic
@@ -62,29 +83,59 @@ class AnthropicProvider(LLMProvider):
 
 
 class LLMFactory:
-    """Factory for creating LLM instances."""
+    """Factory for creating LLM instances.
 
-    _providers: dict[str, LLMProvider] = {
-        "openai": OpenAIProvider(),
-        "anthropic": AnthropicProvider(),
+    The registry holds provider factories; each provider is instantiated on
+    first use and reused afterwards. The offline ``fake`` provider is only
+    registered by the service, job and benchmark entry points.
+    """
+
+    _providers: dict[str, ProviderFactory] = {
+        "openai": OpenAIProvider,
+        "anthropic": AnthropicProvider,
     }
+    _instances: dict[str, LLMProvider] = {}
 
     @classmethod
-    def create_llm(cls, provider: Optional[str] = None, **kwargs) -> BaseLanguageModel:
+    def create_llm(
+        cls, provider: Optional[str] = None, **kwargs
+    ) -> "BaseLanguageModel":
         """Create LLM instance from specified provider."""
         provider = provider or os.getenv("DEFAULT_LLM_PROVIDER", "openai")
+        try:
+            llm = cls.get_provider(provider).create_llm(**kwargs)
+        except LLMError:
+            # Unknown names are not used as labels, keeping the series bounded
+            label = provider if provider in cls._providers else "unknown"
+            LLM_INSTANCES_CREATED.labels(label, "error").inc()
+            raise
+        LLM_INSTANCES_CREATED.labels(provider, "ok").inc()
+        return llm
 
-        if provider not in cls._providers:
+    @classmethod
+    def get_provider(cls, name: str) -> LLMProvider:
+        """Get a provider, instantiating it on first use."""
+        if name not in cls._providers:
             raise LLMError(
-                f"Unknown provider: {provider}. Available: {list(cls._providers.keys())}"
+                f"Unknown provider: {name}. Available: {list(cls._providers.keys())}"
             )
 
-        return cls._providers[provider].create_llm(**kwargs)
+        instance = cls._instances.get(name)
+        if instance is None:
+            instance = cls._instances[name] = cls._providers[name]()
+        return instance
 
     @classmethod
-    def register_provider(cls, name: str, provider: LLMProvider):
-        """Register a new LLM provider."""
-        cls._providers[name] = provider
+    def register_provider(
+        cls, name: str, provider: Union[LLMProvider, ProviderFactory]
+    ):
+        """Register a new LLM provider instance or provider factory."""
+        if isinstance(provider, LLMProvider):
+            cls._providers[name] = lambda: provider
+            cls._instances[name] = provider
+        else:
+            cls._providers[name] = provider
+            cls._instances.pop(name, None)
 
     @classmethod
     def get_available_providers(cls) -> list[str]:
@@ -0,0 +1,228 @@
+"""Branch-and-bound solver for redistributing quantities to meet MOQs."""
+
+import bisect
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_TIME_LIMIT_SECONDS = 0.05
+DEFAULT_NODE_LIMIT = 100_000
+DEADLINE_CHECK_INTERVAL = 256
+
+
+@dataclass(frozen=True)
+class RedistributionLine:
+    """One order line taking part in a redistribution."""
+
+    sku: str
+    requested: int
+    moq: int
+    stock: int
+
+
+@dataclass(frozen=True)
+class RedistributionPlan:
+    """Suggested quantities for a group of lines sharing a total.
+
+    ``quantities`` and ``satisfied`` are aligned with the solver's input lines.
+    """
+
+    quantities: list[int]
+    satisfied: list[bool]
+    deviation: int
+    optimal: bool
+
+    @property
+    def satisfied_count(self) -> int:
+        """Number of lines meeting their MOQ."""
+        return sum(self.satisfied)
+
+
+class MoqRedistributionSolver:
+    """Finds the quantity split that satisfies the most MOQs.
+
+    The combined quantity of the lines is kept fixed (capped by the combined
+    stock). Among splits that satisfy the maximum number of MOQs, the one
+    with the smallest total deviation from the requested quantities wins.
+
+    For a fixed set of satisfied lines the optimal split has a closed form:
+    each line is clamped into its allowed range and the remaining difference
+    costs one unit of deviation per unit moved. The solver therefore only
+    searches over which lines to satisfy, using depth-first branch-and-bound
+    with lines ordered by ascending MOQ. The search stops at ``time_limit``
+    seconds or ``node_limit`` nodes and returns the best plan found so far.
+    """
+
+    def __init__(
+        self,
+        time_limit: float = DEFAULT_TIME_LIMIT_SECONDS,
+        node_limit: int = DEFAULT_NODE_LIMIT,
+    ):
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+
+    def solve(
+        self, lines: Sequence[RedistributionLine]
+    ) -> Optional[RedistributionPlan]:
+        """Return the best redistribution plan, or None if no split exists."""
+        if not lines:
+            return None
+
+        total = min(
+            sum(line.requested for line in lines),
+            sum(max(line.stock, 0) for line in lines),
+        )
+        candidates = sorted(
+            (i for i, line in enumerate(lines) if 0 < line.moq <= line.stock),
+            key=lambda i: lines[i].moq,
+        )
+        fixed = [line for line in lines if not 0 < line.moq <= line.stock]
+
+        chosen, optimal = self._search([lines[i] for i in candidates], fixed, total)
+        if chosen is None:
+            return None
+
+        satisfied = [False] * len(lines)
+        for position in chosen:
+            satisfied[candidates[position]] = True
+        quantities = self._allocate(lines, satisfied, total)
+        return RedistributionPlan(
+            quantities=quantities,
+            satisfied=satisfied,
+            deviation=sum(
+                abs(quantity - line.requested)
+                for quantity, line in zip(quantities, lines)
+            ),
+            optimal=optimal,
+        )
+
+    def _search(
+        self,
+        candidates: list[RedistributionLine],
+        fixed: list[RedistributionLine],
+        total: int,
+    ) -> tuple[Optional[tuple[int, ...]], bool]:
+        """Branch and bound over which candidate lines meet their MOQ."""
+        count = len(candidates)
+        moq_prefix = [0]
+        for line in candidates:
+            moq_prefix.append(moq_prefix[-1] + line.moq)
+        stock_suffix = [0] * (count + 1)
+        for i in range(count - 1, -1, -1):
+            stock_suffix[i] = stock_suffix[i + 1] + candidates[i].stock
+
+        fixed_hi = fixed_dev = fixed_clamp = 0
+        for line in fixed:
+            low, high = self._unsatisfied_range(line)
+            quantity, deviation = self._clamp_cost(line, low, high)
+            fixed_hi += high
+            fixed_dev += deviation
+            fixed_clamp += quantity
+
+        best: Optional[tuple[int, int, tuple[int, ...]]] = None
+        deadline = time.perf_counter() + self.time_limit
+        nodes = 0
+        # Each stack entry: index, chosen indexes, sum of lower bounds,
+        # sum of upper bounds, deviation of clamped quantities, clamped total
+        stack = [(0, (), 0, fixed_hi, fixed_dev, fixed_clamp)]
+
+        while stack:
+            nodes += 1
+            if nodes > self.node_limit or (
+                nodes % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline
+            ):
+                return (best[2] if best else None), False
+
+            index, chosen, lo, hi, dev, clamped = stack.pop()
+            if lo > total or hi + stock_suffix[index] < total:
+                continue
+
+            # Upper bound on satisfiable lines: cheapest remaining MOQs that still fit
+            reachable = (
+                bisect.bisect_right(moq_prefix, moq_prefix[index] + total - lo)
+                - 1
+                - index
+            )
+            bound = len(chosen) + reachable
+            if best is not None and (
+                bound < best[0] or (bound == best[0] and dev >= best[1])
+            ):
+                continue
+
+            if index == count:
+                if hi >= total:
+                    cost = dev + abs(total - clamped)
+                    if best is None or (len(chosen), -cost) > (best[0], -best[1]):
+                        best = (len(chosen), cost, chosen)
+                continue
+
+            line = candidates[index]
+            skip_lo, skip_hi = self._unsatisfied_range(line)
+            skip_clamp, skip_dev = self._clamp_cost(line, skip_lo, skip_hi)
+            take_clamp, take_dev = self._clamp_cost(line, line.moq, line.stock)
+            # Push the "skip" branch first so the "satisfy" branch is explored first
+            stack.append(
+                (
+                    index + 1,
+                    chosen,
+                    lo,
+                    hi + skip_hi,
+                    dev + skip_dev,
+                    clamped + skip_clamp,
+                )
+            )
+            stack.append(
+                (
+                    index + 1,
+                    (*chosen, index),
+                    lo + line.moq,
+                    hi + line.stock,
+                    dev + take_dev,
+                    clamped + take_clamp,
+                )
+            )
+
+        return (best[2] if best else None), True
+
+    def _allocate(
+        self,
+        lines: Sequence[RedistributionLine],
+        satisfied: list[bool],
+        total: int,
+    ) -> list[int]:
+        """Clamp each line into its range and spread the remaining difference."""
+        ranges = [
+            (line.moq, line.stock) if meets else self._unsatisfied_range(line)
+            for line, meets in zip(lines, satisfied)
+        ]
+        quantities = [
+            self._clamp_cost(line, low, high)[0]
+            for line, (low, high) in zip(lines, ranges)
+        ]
+
+        difference = total - sum(quantities)
+        if difference > 0:
+            # Add units to satisfied lines first, where extra units are useful
+            for i in sorted(range(len(lines)), key=lambda i: not satisfied[i]):
+                step = min(difference, ranges[i][1] - quantities[i])
+                quantities[i] += step
+                difference -= step
+        elif difference < 0:
+            # Take units from lines that cannot meet their MOQ first
+            for i in sorted(range(len(lines)), key=lambda i: satisfied[i]):
+                step = min(-difference, quantities[i] - ranges[i][0])
+                quantities[i] -= step
+                difference += step
+        return quantities
+
+    @staticmethod
+    def _unsatisfied_range(line: RedistributionLine) -> tuple[int, int]:
+        """Allowed quantities for a line that stays below its MOQ."""
+        return 0, max(0, min(line.moq - 1, line.stock))
+
+    @staticmethod
+    def _clamp_cost(line: RedistributionLine, low: int, high: int) -> tuple[int, int]:
+        """Clamp the requested quantity into a range and return it with its deviation."""
+        quantity = min(max(line.requested, low), high)
+        return quantity, abs(quantity - line.requested)
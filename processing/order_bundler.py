@@ -1,233 +1,306 @@
 """Smart order bundling to optimize quantities and meet MOQ requirements."""
 
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, NamedTuple, Optional, Union
 
 from core.interfaces import CatalogDataSource
-from core.models import Order
+from core.metrics import REGISTRY
+from core.models import Order, OrderItem
+from core.records import OrderItemRecord, OrderLike
+from data_sources.catalog_csv import CsvCatalogDataSource
+from data_sources.catalog_delta import CatalogSnapshot
+from data_sources.category_index import CategoryIndex, category_code
+from data_sources.lookup import fetch_products, normalize_sku
+
+from .moq_solver import MoqRedistributionSolver, RedistributionLine
+from .quote_engine import QuoteEngine
+
+BULK_QUANTITIES = (5, 10, 25, 50)
+MAX_BULK_INCREASE_PERCENT = 50
+
+BUNDLE_ANALYSIS_SECONDS = REGISTRY.histogram(
+    "bundle_analysis_duration_seconds",
+    "Time spent analyzing an order for bundles.",
+    unit="seconds",
+)
+BUNDLE_SUGGESTIONS = REGISTRY.counter(
+    "bundle_suggestions",
+    "Bundle suggestions made, by kind.",
+    ("kind",),
+)
 
 
 class BundleAnalysisResult:
     """Container for bundling analysis results."""
 
-    def __init__(self, order: Order, bundle_suggestions: Dict[str, Any]):
+    def __init__(self, order: Order, bundle_suggestions: dict[str, Any]):
         self.order = order
         self.bundle_suggestions = bundle_suggestions
 
 
-class OrderBundler:
-    """Analyzes orders and suggests bundling to meet MOQ requirements."""
+class BundleLine(NamedTuple):
+    """An order item joined with its catalog product and category.
+
+    ``sku`` is the item's SKU normalized as the catalog keys it.
+    """
+
+    item: Union[OrderItem, OrderItemRecord]
+    sku: str
+    product: Optional[dict[str, Any]]
+    category: str
 
-    def __init__(self, catalog_source: CatalogDataSource):
+
+class OrderBundler:
+    """Analyzes orders and suggests bundling to meet MOQ requirements.
+
+    Items are joined to their products and grouped by category in a single
+    pass; every suggestion is then derived from those groups, so the cost is
+    linear in the number of items regardless of catalog size.
+
+    Category names and stock come from ``category_index`` when one is given,
+    otherwise from the catalog's current index on each analysis, so stock
+    updates are reflected without rebuilding the bundler.
+    """
+
+    def __init__(
+        self,
+        catalog_source: CatalogDataSource,
+        solver: Optional[MoqRedistributionSolver] = None,
+        category_index: Optional[CategoryIndex] = None,
+        quote_engine: Optional[QuoteEngine] = None,
+    ):
         self.catalog_source = catalog_source
+        self.solver = solver or MoqRedistributionSolver()
+        self.category_index = category_index
+        self.quote_engine = quote_engine
+        self._priced_version = 0
+        self._quote_lock = threading.Lock()
+
+    def follow_prices(self, catalog_source: CsvCatalogDataSource):
+        """Price bulk suggestions from a catalog, repricing after each update.
+
+        The tiers of an engine given at construction are kept.
+        """
+        snapshot = catalog_source.snapshot()
+        with self._quote_lock:
+            if self.quote_engine is None:
+                self.quote_engine = QuoteEngine(snapshot.products)
+            else:
+                self.quote_engine = QuoteEngine(
+                    snapshot.products, self.quote_engine.bulk_tiers
+                )
+            self._priced_version = snapshot.version
+        catalog_source.add_update_listener(self._reprice)
 
-    def analyze_and_suggest_bundles(self, order: Order) -> Dict[str, Any]:
+    def analyze_and_suggest_bundles(self, order: OrderLike) -> dict[str, Any]:
         """Analyze order and suggest bundling opportunities."""
-        try:
-            bundle_suggestions = {
-                "moq_bundles": self._suggest_moq_bundles(order),
-                "category_bundles": self._suggest_category_bundles(order),
-                "bulk_discounts": self._suggest_bulk_optimizations(order),
-                "summary": self._create_bundle_summary(order),
-            }
-            return bundle_suggestions
-        except Exception as e:
-            return {
-                "moq_bundles": [],
-                "category_bundles": [],
-                "bulk_discounts": [],
-                "summary": {"error": str(e)},
-            }
-
-    def _suggest_moq_bundles(self, order: Order) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        lines, groups = self._join_products(order)
+        category_index = self.category_index or self.catalog_source.get_category_index()
+        suggestions = {
+            "moq_bundles": self._suggest_moq_bundles(groups),
+            "category_bundles": self._suggest_category_bundles(groups, category_index),
+            "bulk_discounts": self._suggest_bulk_optimizations(lines),
+            "summary": self._create_bundle_summary(order, groups),
+        }
+        for kind in ("moq_bundles", "category_bundles", "bulk_discounts"):
+            if suggestions[kind]:
+                BUNDLE_SUGGESTIONS.labels(kind).inc(len(suggestions[kind]))
+        BUNDLE_ANALYSIS_SECONDS.observe(time.perf_counter() - started)
+        return suggestions
+
+    def _reprice(self, snapshot: CatalogSnapshot, skus: frozenset[str]):
+        """Update prices after a catalog update.
+
+        Listeners of concurrent updates may run out of order, so anything but
+        the next version reprices the whole catalog from its snapshot.
+        """
+        with self._quote_lock:
+            if snapshot.version <= self._priced_version:
+                return
+            if snapshot.version == self._priced_version + 1:
+                engine = self.quote_engine.reprice(snapshot.products, skus)
+            else:
+                engine = QuoteEngine(snapshot.products, self.quote_engine.bulk_tiers)
+            self.quote_engine = engine
+            self._priced_version = snapshot.version
+
+    def _join_products(
+        self, order: OrderLike
+    ) -> tuple[list[BundleLine], dict[str, list[BundleLine]]]:
+        """Fetch the distinct SKUs in one lookup and group the lines by category."""
+        skus = [normalize_sku(item.sku) for item in order.items]
+        products = fetch_products(self.catalog_source, skus)
+        lines = []
+        groups: dict[str, list[BundleLine]] = {}
+
+        for item, sku in zip(order.items, skus):
+            line = BundleLine(item, sku, products[sku], category_code(sku))
+            lines.append(line)
+            groups.setdefault(line.category, []).append(line)
+
+        return lines, groups
+
+    def _suggest_moq_bundles(
+        self, groups: dict[str, list[BundleLine]]
+    ) -> list[dict[str, Any]]:
         """Suggest combining items to meet MOQ requirements."""
         moq_suggestions = []
-        moq_violations = []
-
-        for item in order.items:
-            try:
-                product = self.catalog_source.get_product_details(item.sku)
-                if product and item.quantity < product["moq"]:
-                    moq_violations.append(
-                        {
-                            "item": item,
-                            "product": product,
-                            "shortfall": product["moq"] - item.quantity,
-                        }
-                    )
-            except Exception:
-                continue
 
-        if not moq_violations:
-            return []
+        for category, lines in groups.items():
+            violations = [
+                line
+                for line in lines
+                if line.product and line.item.quantity < line.product["moq"]
+            ]
+            if len(violations) < 2:
+                continue
 
-        category_groups = {}
-        for violation in moq_violations:
-            category = violation["item"].sku[:3]
-            if category not in category_groups:
-                category_groups[category] = []
-            category_groups[category].append(violation)
-
-        for category, violations in category_groups.items():
-            if len(violations) > 1:
-                total_quantity = sum(v["item"].quantity for v in violations)
-                max_moq = max(v["product"]["moq"] for v in violations)
-
-                if total_quantity >= max_moq:
-                    moq_suggestions.append(
-                        {
-                            "type": "moq_bundle",
-                            "category": category,
-                            "items": [v["item"].sku for v in violations],
-                            "current_total": total_quantity,
-                            "suggested_redistribution": self._suggest_redistribution(
-                                violations
-                            ),
-                            "benefit": "Meet MOQ requirements by redistributing quantities",
-                        }
-                    )
+            redistribution = self._suggest_redistribution(violations)
+            if redistribution:
+                moq_suggestions.append(
+                    {
+                        "type": "moq_bundle",
+                        "category": category,
+                        "items": [line.sku for line in violations],
+                        "current_total": sum(line.item.quantity for line in violations),
+                        "suggested_redistribution": redistribution,
+                        "benefit": "Meet MOQ requirements by redistributing quantities",
+                    }
+                )
 
         return moq_suggestions
 
-    def _suggest_category_bundles(self, order: Order) -> List[Dict[str, Any]]:
+    def _suggest_category_bundles(
+        self, groups: dict[str, list[BundleLine]], category_index: CategoryIndex
+    ) -> list[dict[str, Any]]:
         """Suggest bundling items from the same category for better deals."""
         category_bundles = []
-        category_items = {}
-
-        for item in order.items:
-            category = item.sku[:3]
-            if category not in category_items:
-                category_items[category] = []
-            category_items[category].append(item)
 
-        for category, items in category_items.items():
-            if len(items) > 1:
-                total_quantity = sum(item.quantity for item in items)
-                category_name = self._get_category_name(category)
+        for category, lines in groups.items():
+            if len(lines) < 2:
+                continue
 
-                category_bundles.append(
-                    {
-                        "type": "category_bundle",
-                        "category": category,
-                        "category_name": category_name,
-                        "items": [item.sku for item in items],
-                        "total_quantity": total_quantity,
-                        "suggestion": f"You're ordering {len(items)} different {category_name} items",
-                        "benefit": "Potential bulk discounts and shipping efficiency",
-                    }
-                )
+            category_name = category_index.name_for(category)
+            indexed_category = category_index.get(category)
+            category_bundles.append(
+                {
+                    "type": "category_bundle",
+                    "category": category,
+                    "category_name": category_name,
+                    "items": [line.sku for line in lines],
+                    "total_quantity": sum(line.item.quantity for line in lines),
+                    "category_stock": indexed_category.total_stock
+                    if indexed_category
+                    else 0,
+                    "suggestion": f"You're ordering {len(lines)} different {category_name} items",
+                    "benefit": "Potential bulk discounts and shipping efficiency",
+                }
+            )
 
         return category_bundles
 
-    def _suggest_bulk_optimizations(self, order: Order) -> List[Dict[str, Any]]:
+    def _suggest_bulk_optimizations(
+        self, lines: list[BundleLine]
+    ) -> list[dict[str, Any]]:
         """Suggest bulk quantity optimizations."""
         bulk_suggestions = []
 
-        for item in order.items:
-            try:
-                product = self.catalog_source.get_product_details(item.sku)
-                if not product:
-                    continue
-
-                current_qty = item.quantity
-                bulk_quantities = [5, 10, 25, 50]
-
-                for bulk_qty in bulk_quantities:
-                    if bulk_qty > current_qty and bulk_qty <= product["stock"]:
-                        efficiency_gain = (bulk_qty - current_qty) / current_qty * 100
-                        if efficiency_gain <= 50:
-                            bulk_suggestions.append(
-                                {
-                                    "type": "bulk_optimization",
-                                    "sku": item.sku,
-                                    "current_quantity": current_qty,
-                                    "suggested_quantity": bulk_qty,
-                                    "additional_units": bulk_qty - current_qty,
-                                    "benefit": "Better bulk pricing and reduced ordering frequency",
-                                }
-                            )
-                        break
-            except Exception:
+        for line in lines:
+            if not line.product:
                 continue
 
+            current_qty = line.item.quantity
+            for bulk_qty in BULK_QUANTITIES:
+                if current_qty < bulk_qty <= line.product["stock"]:
+                    increase = (bulk_qty - current_qty) / current_qty * 100
+                    if increase <= MAX_BULK_INCREASE_PERCENT:
+                        bulk_suggestions.append(
+                            {
+                                "type": "bulk_optimization",
+                                "sku": line.sku,
+                                "current_quantity": current_qty,
+                                "suggested_quantity": bulk_qty,
+                                "additional_units": bulk_qty - current_qty,
+                                "benefit": "Better bulk pricing and reduced ordering frequency",
+                            }
+                        )
+                    break
+
+        if self.quote_engine is not None and bulk_suggestions:
+            self._add_bulk_pricing(bulk_suggestions)
         return bulk_suggestions
 
-    def _suggest_redistribution(
-        self, violations: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Suggest how to redistribute quantities to meet MOQ."""
-        redistributions = []
-
-        try:
-            violations_sorted = sorted(
-                violations, key=lambda x: x["product"]["moq"], reverse=True
+    def _add_bulk_pricing(self, bulk_suggestions: list[dict[str, Any]]):
+        """Price current and suggested quantities in one batch and add savings."""
+        skus = [s["sku"] for s in bulk_suggestions]
+        quotes = self.quote_engine.quote_lines(
+            skus + skus,
+            [s["current_quantity"] for s in bulk_suggestions]
+            + [s["suggested_quantity"] for s in bulk_suggestions],
+        )
+        count = len(bulk_suggestions)
+
+        for i, suggestion in enumerate(bulk_suggestions):
+            if not quotes.priced[i]:
+                continue
+            current_unit = quotes.unit_prices[i] * (1 - quotes.discount_rates[i])
+            suggested_unit = quotes.unit_prices[i] * (
+                1 - quotes.discount_rates[count + i]
+            )
+            suggestion.update(
+                {
+                    "current_total": round(float(quotes.line_totals[i]), 2),
+                    "suggested_total": round(float(quotes.line_totals[count + i]), 2),
+                    "unit_savings": round(float(current_unit - suggested_unit), 2),
+                    "savings": round(
+                        float(
+                            suggestion["suggested_quantity"]
+                            * (current_unit - suggested_unit)
+                        ),
+                        2,
+                    ),
+                }
             )
-            primary_item = violations_sorted[0]
-
-            total_available = sum(v["item"].quantity for v in violations)
-            primary_moq = primary_item["product"]["moq"]
-
-            if total_available >= primary_moq:
-                remaining = total_available - primary_moq
 
-                redistributions.append(
-                    {
-                        "sku": primary_item["item"].sku,
-                        "current": primary_item["item"].quantity,
-                        "suggested": primary_moq,
-                        "reason": "Prioritize meeting highest MOQ requirement",
-                    }
-                )
+    def _suggest_redistribution(
+        self, violations: list[BundleLine]
+    ) -> list[dict[str, Any]]:
+        """Suggest how to redistribute quantities to meet the most MOQs."""
+        lines = [
+            RedistributionLine(
+                sku=line.sku,
+                requested=line.item.quantity,
+                moq=line.product["moq"],
+                stock=line.product["stock"],
+            )
+            for line in violations
+        ]
+        plan = self.solver.solve(lines)
+        if plan is None or plan.satisfied_count == 0:
+            return []
 
-                other_violations = violations_sorted[1:]
-                if other_violations and remaining > 0:
-                    per_item = max(1, remaining // len(other_violations))
-                    for violation in other_violations:
-                        suggested_qty = min(per_item, violation["product"]["stock"])
-                        redistributions.append(
-                            {
-                                "sku": violation["item"].sku,
-                                "current": violation["item"].quantity,
-                                "suggested": suggested_qty,
-                                "reason": "Distribute remaining quantity efficiently",
-                            }
-                        )
-        except Exception:
-            pass
-
-        return redistributions
-
-    def _get_category_name(self, category_code: str) -> str:
-        """Get human-readable category name from code."""
-        category_map = {
-            "DSK": "Desk",
-            "CHR": "Chair",
-            "DTB": "Dining Table",
-            "DCH": "Dining Chair",
-            "BSF": "Bookshelf",
-            "SFA": "Sofa",
-            "CFT": "Coffee Table",
-            "TVS": "TV Stand",
-        }
-        return category_map.get(category_code, category_code)
+        return [
+            {
+                "sku": line.sku,
+                "current": line.requested,
+                "suggested": quantity,
+                "reason": f"Meets minimum order quantity of {line.moq}"
+                if meets_moq
+                else f"Cannot reach minimum order quantity of {line.moq} within this bundle",
+            }
+            for line, quantity, meets_moq in zip(lines, plan.quantities, plan.satisfied)
+        ]
 
-    def _create_bundle_summary(self, order: Order) -> Dict[str, Any]:
+    def _create_bundle_summary(
+        self, order: OrderLike, groups: dict[str, list[BundleLine]]
+    ) -> dict[str, Any]:
         """Create a summary of bundling opportunities."""
-        try:
-            total_items = len(order.items)
-            invalid_items = sum(1 for item in order.items if not item.valid)
-
-            categories = {}
-            for item in order.items:
-                category = item.sku[:3]
-                categories[category] = categories.get(category, 0) + 1
-
-            return {
-                "total_items": total_items,
-                "invalid_items": invalid_items,
-                "categories_represented": len(categories),
-                "bundling_potential": "High"
-                if len(categories) < total_items
-                else "Low",
-            }
-        except Exception as e:
-            return {"error": str(e)}
+        total_items = len(order.items)
+        return {
+            "total_items": total_items,
+            "invalid_items": sum(1 for item in order.items if not item.valid),
+            "categories_represented": len(groups),
+            "bundling_potential": "High" if len(groups) < total_items else "Low",
+        }
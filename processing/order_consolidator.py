@@ -0,0 +1,201 @@
+"""Consolidation of separately emailed orders for the same delivery."""
+
+import re
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Optional, Union
+
+from core.interfaces import OrderValidator
+from core.metrics import REGISTRY
+from core.models import Order
+from core.records import OrderItemRecord, OrderLike, OrderRecord
+from data_sources.lookup import normalize_sku
+
+from .order_processor import apply_validation_results
+
+ADDRESS_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "boulevard": "blvd",
+    "drive": "dr",
+    "lane": "ln",
+    "court": "ct",
+    "place": "pl",
+    "suite": "ste",
+    "apartment": "apt",
+    "floor": "fl",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+}
+# Placeholders the parser uses when an email does not say
+UNKNOWN_VALUES = frozenset({"", "unknown", "n a", "none"})
+# Customers and addresses repeat across a batch, so normalizations are cached
+NORMALIZE_CACHE_SIZE = 65_536
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+CONSOLIDATED_ORDERS = REGISTRY.counter(
+    "consolidated_orders",
+    "Orders seen by consolidation, by result: merged or single.",
+    ("result",),
+)
+CONSOLIDATION_RESOLVED_SKUS = REGISTRY.counter(
+    "consolidation_resolved_skus",
+    "SKUs invalid in an individual order that were valid once orders were merged.",
+)
+
+ConsolidationKey = tuple[str, str, date]
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_name(value: str) -> str:
+    """Casefold, fold compatibility characters and reduce punctuation to spaces."""
+    text = unicodedata.normalize("NFKC", value).casefold()
+    return " ".join(_SEPARATORS.sub(" ", text).split())
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_address(value: str) -> str:
+    """Normalize like ``normalize_name`` and abbreviate common street words."""
+    return " ".join(
+        ADDRESS_ABBREVIATIONS.get(word, word) for word in normalize_name(value).split()
+    )
+
+
+def consolidation_key(order: OrderLike) -> Optional[ConsolidationKey]:
+    """Get the key of orders for one delivery, or None if it is not known."""
+    customer = normalize_name(order.customer)
+    address = normalize_address(order.address)
+    if customer in UNKNOWN_VALUES or address in UNKNOWN_VALUES:
+        return None
+    return customer, address, order.delivery_date
+
+
+def merge_orders(orders: list[OrderLike]) -> OrderRecord:
+    """Combine orders into one with the quantities of each SKU summed.
+
+    SKUs are normalized as the validator looks them up and keep the order
+    they first appear in; customer and address are written as in the first
+    order. Stock reservations belong to the individual orders and are not
+    carried over; see ``held_stock``.
+    """
+    quantities: dict[str, int] = {}
+    for order in orders:
+        for item in order.items:
+            sku = normalize_sku(item.sku)
+            quantities[sku] = quantities.get(sku, 0) + item.quantity
+    first = orders[0]
+    return OrderRecord(
+        first.customer,
+        first.address,
+        first.delivery_date,
+        [OrderItemRecord(sku, quantity) for sku, quantity in quantities.items()],
+    )
+
+
+def held_stock(orders: list[OrderLike]) -> dict[str, int]:
+    """Sum the stock the orders reserved, by normalized SKU.
+
+    Only the valid items of orders holding a reservation were reserved.
+    """
+    held: dict[str, int] = {}
+    for order in orders:
+        if not order.reservation_id:
+            continue
+        for item in order.items:
+            if item.valid:
+                sku = normalize_sku(item.sku)
+                held[sku] = held.get(sku, 0) + item.quantity
+    return held
+
+
+def as_record(order: OrderLike) -> OrderRecord:
+    """Get an order as a record, converting models."""
+    return OrderRecord.from_model(order) if isinstance(order, Order) else order
+
+
+@dataclass
+class ConsolidatedOrder:
+    """One delivery and the batch positions of the orders it was made from.
+
+    ``resolved_skus`` lists SKUs that failed validation in an individual
+    order but pass for the combined quantity.
+    """
+
+    order: OrderRecord
+    sources: list[int]
+    resolved_skus: list[str] = field(default_factory=list)
+
+    @property
+    def merged(self) -> bool:
+        """Whether several orders were combined."""
+        return len(self.sources) > 1
+
+
+class OrderConsolidator:
+    """Merges processed orders for the same customer, address and date.
+
+    Orders are grouped in one pass by a dictionary keyed on the normalized
+    customer, address and delivery date, so the cost is linear in the size
+    of the batch. Each group of several orders is merged and validated
+    again, since quantities below MOQ in every email may meet it combined.
+    Orders with nobody to merge with are passed through unchanged.
+    """
+
+    def __init__(self, validator: OrderValidator):
+        self.validator = validator
+
+    def consolidate(self, orders: Iterable[OrderLike]) -> list[ConsolidatedOrder]:
+        """Consolidate a batch, in order of each delivery's first order."""
+        batch: list[OrderLike] = []
+        # Orders without a usable key are grouped by their position alone
+        groups: dict[Union[ConsolidationKey, int], list[int]] = {}
+        for index, order in enumerate(orders):
+            batch.append(order)
+            key = consolidation_key(order)
+            groups.setdefault(index if key is None else key, []).append(index)
+
+        consolidated = []
+        for indexes in groups.values():
+            if len(indexes) == 1:
+                consolidated.append(
+                    ConsolidatedOrder(as_record(batch[indexes[0]]), indexes)
+                )
+                continue
+            consolidated.append(self._merge([batch[i] for i in indexes], indexes))
+
+        merged = sum(len(c.sources) for c in consolidated if c.merged)
+        if merged:
+            CONSOLIDATED_ORDERS.labels("merged").inc(merged)
+        if len(batch) > merged:
+            CONSOLIDATED_ORDERS.labels("single").inc(len(batch) - merged)
+        return consolidated
+
+    def _merge(self, orders: list[OrderLike], indexes: list[int]) -> ConsolidatedOrder:
+        """Merge one group and validate the combined quantities.
+
+        Stock the original orders already reserved is counted as available
+        to the merged order, since it only needs what they did not hold.
+        """
+        record = merge_orders(orders)
+        results = self.validator.validate_order(record, held=held_stock(orders))
+        apply_validation_results(record, results)
+
+        failed = {
+            normalize_sku(item.sku)
+            for order in orders
+            for item in order.items
+            if not item.valid
+        }
+        resolved = [
+            item.sku for item in record.items if item.valid and item.sku in failed
+        ]
+        if resolved:
+            CONSOLIDATION_RESOLVED_SKUS.inc(len(resolved))
+        return ConsolidatedOrder(record, indexes, resolved)
@@ -1,26 +1,194 @@
 """Order processing implementation."""
 
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+from core.exceptions import OrderProcessingError, StockReservationError
 from core.interfaces import EmailParser, OrderProcessor, OrderValidator
+from core.metrics import REGISTRY
 from core.models import Order
+from core.records import OrderItemRecord, OrderLike, OrderRecord
+from data_sources.lookup import normalize_sku
+from validation.result import ValidationResult
+from validation.stock_ledger import StockLedger
+
+from .profiling import RequestProfiler
+
+MAX_RESERVATION_ATTEMPTS = 3
+
+ORDERS_PROCESSED = REGISTRY.counter(
+    "orders_processed",
+    "Emails processed, by outcome: ok or the pipeline error raised.",
+    ("outcome",),
+)
+ORDER_PROCESSING_SECONDS = REGISTRY.histogram(
+    "order_processing_duration_seconds",
+    "End-to-end time to parse, validate and reserve one email.",
+    ("outcome",),
+    unit="seconds",
+)
+
+
+@contextmanager
+def observe_order() -> Iterator[None]:
+    """Count an order and time it, labelled with how it ended."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except OrderProcessingError as e:
+        # Pipeline errors are a small fixed set of classes
+        outcome = type(e).__name__
+        raise
+    finally:
+        ORDERS_PROCESSED.labels(outcome).inc()
+        ORDER_PROCESSING_SECONDS.labels(outcome).observe(time.perf_counter() - started)
 
 
 class SmartOrderProcessor(OrderProcessor):
-    """Main order processor implementation."""
+    """Main order processor implementation.
+
+    Requests are profiled when ``profiler`` selects them, one in N as set by
+    ``ORDER_PROFILE_EVERY`` by default, or when called with ``profile=True``.
 
-    def __init__(self, parser: EmailParser, validator: OrderValidator):
+    With a ``stock_ledger``, the valid items of each order are reserved.
+    Callers commit the reservation once the order is accepted or release it
+    when it is not; reservations left unsettled expire after the ledger's TTL.
+    """
+
+    def __init__(
+        self,
+        parser: EmailParser,
+        validator: OrderValidator,
+        stock_ledger: Optional[StockLedger] = None,
+        profiler: Optional[RequestProfiler] = None,
+    ):
         self.parser = parser
         self.validator = validator
+        self.stock_ledger = stock_ledger
+        self.profiler = profiler or RequestProfiler.from_env()
 
-    def process_order(self, email_text: str) -> Order:
+    def process_order(self, email_text: str, profile: bool = False) -> Order:
         """Process email text and return validated order."""
-        # Parse email
-        order = self.parser.parse_email(email_text)
+        with self.profiler.session("process_order", force=profile):
+            return self._process_record(email_text).to_model()
 
-        # Validate each item
-        for item in order.items:
-            validation_result = self.validator.validate_item(item)
-            item.valid = validation_result.is_valid
-            item.notes = validation_result.notes
-            item.suggestions = validation_result.suggestions
+    def process_order_record(
+        self, email_text: str, profile: bool = False
+    ) -> OrderRecord:
+        """Process email text and return the validated internal order record."""
+        with self.profiler.session("process_order", force=profile):
+            return self._process_record(email_text)
+
+    def _process_record(self, email_text: str) -> OrderRecord:
+        """Parse, validate and reserve stock for one email."""
+        with observe_order():
+            # Parse email
+            order = self._parse(email_text)
+
+            # Validate items with repeated SKUs checked against their combined quantity
+            self._validate(order)
+
+            # Hold stock so concurrent orders cannot oversell it
+            if self.stock_ledger is not None:
+                self._reserve_stock(order)
+
+        return order
 
+    async def aprocess_order_record(self, email_text: str) -> OrderRecord:
+        """Async variant of ``process_order_record`` whose LLM call can be cancelled.
+
+        Parsers without ``aparse_email_record`` run on a worker thread, where
+        cancellation abandons the call rather than stopping it. Validation
+        likewise uses ``avalidate_order`` when the validator has it and a
+        worker thread otherwise, so catalog lookups never block the loop.
+        """
+        aparse_email_record = getattr(self.parser, "aparse_email_record", None)
+        with observe_order():
+            if aparse_email_record is not None:
+                order = await aparse_email_record(email_text)
+            else:
+                order = await asyncio.to_thread(self._parse, email_text)
+
+            await self._avalidate(order)
+            if self.stock_ledger is not None:
+                # A lost reservation race re-validates synchronously
+                await asyncio.to_thread(self._reserve_stock, order)
         return order
+
+    def commit_reservations(self, orders: Iterable[OrderLike]) -> int:
+        """Deduct the stock held for accepted orders, in one ledger batch."""
+        if self.stock_ledger is None:
+            return 0
+        reservation_ids = [
+            order.reservation_id for order in orders if order.reservation_id
+        ]
+        return self.stock_ledger.commit(reservation_ids) if reservation_ids else 0
+
+    def release_reservation(self, order: OrderLike) -> bool:
+        """Return the stock held for an order that was rejected or failed."""
+        if self.stock_ledger is None or not order.reservation_id:
+            return False
+        return self.stock_ledger.release(order.reservation_id)
+
+    def _parse(self, email_text: str) -> OrderRecord:
+        """Parse into a record, converting once if the parser only returns models."""
+        parse_email_record = getattr(self.parser, "parse_email_record", None)
+        if parse_email_record is not None:
+            return parse_email_record(email_text)
+        return OrderRecord.from_model(self.parser.parse_email(email_text))
+
+    def _reserve_stock(self, order: OrderRecord):
+        """Reserve stock for valid items, re-validating if another order won a race."""
+        for _ in range(MAX_RESERVATION_ATTEMPTS):
+            quantities = Counter()
+            for item in order.items:
+                if item.valid:
+                    quantities[normalize_sku(item.sku)] += item.quantity
+            if not quantities:
+                return
+
+            try:
+                reservation = self.stock_ledger.reserve(quantities)
+                order.reservation_id = reservation.reservation_id
+                return
+            except StockReservationError:
+                self._validate(order)
+
+        raise StockReservationError(
+            f"Could not reserve stock after {MAX_RESERVATION_ATTEMPTS} attempts", {}
+        )
+
+    def _validate(self, order: OrderLike):
+        """Copy order-level validation results onto the order items."""
+        apply_validation_results(order, self.validator.validate_order(order))
+
+    async def _avalidate(self, order: OrderLike):
+        """Async variant of ``_validate``."""
+        avalidate_order = getattr(self.validator, "avalidate_order", None)
+        if avalidate_order is None:
+            await asyncio.to_thread(self._validate, order)
+            return
+        apply_validation_results(order, await avalidate_order(order))
+
+
+def apply_validation_results(order: OrderLike, results: list[ValidationResult]):
+    """Copy per-item validation results onto the order items.
+
+    Records receive the notes template and arguments, so notes are only
+    formatted for orders that are serialized or displayed.
+    """
+    for item, validation_result in zip(order.items, results):
+        item.valid = validation_result.is_valid
+        if isinstance(item, OrderItemRecord):
+            item.set_notes(
+                validation_result.notes_template, validation_result.notes_args
+            )
+        else:
+            item.notes = validation_result.notes
+        item.suggestions = list(validation_result.suggestions)
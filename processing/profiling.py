@@ -0,0 +1,262 @@
+"""Opt-in per-request profiling with flamegraph export.
+
+Profiling is off unless ``ORDER_PROFILE_EVERY`` is set to N, which profiles
+one request in N, or a caller asks for a profile explicitly. Profiles are
+written to ``ORDER_PROFILE_DIR`` as collapsed stacks (for ``flamegraph.pl``
+and most flamegraph viewers) and as speedscope JSON
+(https://www.speedscope.app).
+"""
+
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_SAMPLE_INTERVAL = 0.005
+SAMPLING = "sampling"
+TRACING = "tracing"
+
+# Stacks are tuples of frame labels, outermost first
+Stack = tuple[str, ...]
+
+
+def frame_label(frame: FrameType) -> str:
+    """Label a frame as ``function (file:line)``."""
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def frame_stack(
+    frame: Optional[FrameType], stop: Optional[FrameType]
+) -> Optional[Stack]:
+    """Get the labels from ``frame`` up to, but excluding, ``stop``.
+
+    Returns None for stacks inside the profiler itself, e.g. while stopping.
+    """
+    labels = []
+    while frame is not None and frame is not stop:
+        if frame.f_code.co_filename == __file__:
+            return None
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread.
+
+    Captures wall-clock time, including time blocked on the network, at a
+    cost that depends on the interval rather than on the code profiled.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.weights: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, root: FrameType):
+        """Start sampling the calling thread below its ``root`` frame."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(), root.f_back),
+            name="request-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _sample(self, thread_id: int, stop_frame: Optional[FrameType]):
+        """Record the elapsed time since the previous sample against each stack."""
+        previous = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                stack = frame_stack(frame, stop_frame)
+                if stack:
+                    self.weights[stack] += int((now - previous) * 1_000_000)
+            previous = now
+
+
+class TracingProfiler:
+    """Records every Python call on the calling thread with ``sys.setprofile``.
+
+    Exact, but slows pure-Python code several times over; meant for
+    one-off investigations rather than production sampling.
+    """
+
+    def __init__(self):
+        self.weights: Counter = Counter()
+        self._stack: list[str] = []
+        self._entered: list[float] = []
+        self._child_time: list[float] = []
+
+    def start(self, root: FrameType):
+        """Start tracing calls made below the ``root`` frame."""
+        sys.setprofile(self._event)
+
+    def stop(self):
+        """Stop tracing."""
+        sys.setprofile(None)
+        # Calls still open, e.g. the profiler's own caller, are discarded
+        self._stack.clear()
+
+    def _event(self, frame: FrameType, event: str, arg):
+        """Attribute self time to the stack when a function returns."""
+        if event == "call":
+            self._stack.append(frame_label(frame))
+            self._entered.append(time.perf_counter())
+            self._child_time.append(0.0)
+        elif event == "return" and self._stack:
+            elapsed = time.perf_counter() - self._entered.pop()
+            child_time = self._child_time.pop()
+            self.weights[tuple(self._stack)] += int((elapsed - child_time) * 1_000_000)
+            self._stack.pop()
+            if self._child_time:
+                self._child_time[-1] += elapsed
+
+
+def write_collapsed(weights: Counter, path: str):
+    """Write ``frame;frame;frame microseconds`` lines."""
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, weight in sorted(weights.items()):
+            if weight > 0:
+                f.write(f"{';'.join(stack)} {weight}\n")
+
+
+def write_speedscope(weights: Counter, name: str, path: str):
+    """Write a speedscope sampled profile weighted in microseconds."""
+    frame_indexes: dict[str, int] = {}
+    samples = []
+    sample_weights = []
+    for stack, weight in weights.items():
+        if weight <= 0:
+            continue
+        samples.append(
+            [frame_indexes.setdefault(label, len(frame_indexes)) for label in stack]
+        )
+        sample_weights.append(weight)
+
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "smart-order-intake",
+        "shared": {"frames": [{"name": label} for label in frame_indexes]},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "microseconds",
+                "startValue": 0,
+                "endValue": sum(sample_weights),
+                "samples": samples,
+                "weights": sample_weights,
+            }
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f)
+
+
+class RequestProfiler:
+    """Decides which requests to profile and writes their profiles.
+
+    ``every`` profiles one request in N; 0 profiles only requests that ask
+    for it. ``mode`` is ``sampling`` (low overhead, wall-clock) or
+    ``tracing`` (every call, high overhead).
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_PROFILE_DIR,
+        every: int = 0,
+        mode: str = SAMPLING,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ):
+        if mode not in (SAMPLING, TRACING):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.directory = directory
+        self.every = every
+        self.mode = mode
+        self.interval = interval
+        self._requests = itertools.count(1)
+        self._profiles = itertools.count(1)
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        """Create a profiler configured by ``ORDER_PROFILE_*`` variables."""
+        return cls(
+            directory=os.getenv("ORDER_PROFILE_DIR", DEFAULT_PROFILE_DIR),
+            every=int(os.getenv("ORDER_PROFILE_EVERY", "0")),
+            mode=os.getenv("ORDER_PROFILE_MODE", SAMPLING),
+            interval=float(
+                os.getenv("ORDER_PROFILE_INTERVAL", str(DEFAULT_SAMPLE_INTERVAL))
+            ),
+        )
+
+    def should_profile(self, force: bool = False) -> bool:
+        """Decide whether to profile the next request."""
+        if force:
+            return True
+        return self.every > 0 and next(self._requests) % self.every == 0
+
+    @contextmanager
+    def session(self, name: str, force: bool = False) -> Iterator[Optional[str]]:
+        """Profile the block if this request is selected.
+
+        Yields the path prefix the profile files will be written to, or None
+        when the request is not profiled.
+        """
+        if not self.should_profile(force):
+            yield None
+            return
+
+        prefix = self._path_prefix(name)
+        profiler = (
+            SamplingProfiler(self.interval)
+            if self.mode == SAMPLING
+            else TracingProfiler()
+        )
+        started = time.perf_counter()
+        profiler.start(sys._getframe(2))
+        try:
+            yield prefix
+        finally:
+            profiler.stop()
+            elapsed = time.perf_counter() - started
+            self._write(profiler.weights, name, prefix)
+            logger.info("Profiled %s in %.3fs: %s.*", name, elapsed, prefix)
+
+    def _path_prefix(self, name: str) -> str:
+        """Get a unique file name prefix for a profile."""
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        file_name = f"{timestamp}-{name}-{os.getpid()}-{next(self._profiles)}"
+        return os.path.join(self.directory, file_name)
+
+    def _write(self, weights: Counter, name: str, prefix: str):
+        """Write the profile in both formats, never failing the request."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write_collapsed(weights, f"{prefix}.collapsed.txt")
+            write_speedscope(weights, name, f"{prefix}.speedscope.json")
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", prefix, e)
@@ -0,0 +1,139 @@
+"""Vectorized pricing of order lines with bulk-tier discounts."""
+
+import copy
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from core.records import OrderLike
+from data_sources.lookup import normalize_sku
+
+# (minimum quantity, discount rate) pairs in ascending quantity order
+DEFAULT_BULK_TIERS = ((1, 0.0), (5, 0.02), (10, 0.04), (25, 0.07), (50, 0.10))
+
+
+@dataclass(frozen=True)
+class LineQuotes:
+    """Prices for a batch of order lines as parallel arrays.
+
+    Lines whose SKU is unknown or unpriced have ``priced`` set to False and
+    contribute zero to every total.
+    """
+
+    unit_prices: np.ndarray
+    discount_rates: np.ndarray
+    line_totals: np.ndarray
+    priced: np.ndarray
+
+
+@dataclass(frozen=True)
+class BatchQuote:
+    """Line-level and order-level prices for a batch of orders."""
+
+    lines: LineQuotes
+    order_indexes: np.ndarray
+    order_totals: np.ndarray
+
+    def order_lines(self, order_index: int) -> list[dict[str, Any]]:
+        """Get the priced lines of one order as dictionaries."""
+        positions = np.flatnonzero(self.order_indexes == order_index)
+        return [
+            {
+                "unit_price": float(self.lines.unit_prices[i]),
+                "discount_rate": float(self.lines.discount_rates[i]),
+                "line_total": float(self.lines.line_totals[i]),
+                "priced": bool(self.lines.priced[i]),
+            }
+            for i in positions
+        ]
+
+
+class QuoteEngine:
+    """Prices order lines in one vectorized pass over NumPy arrays.
+
+    Catalog prices are packed into an array once; each batch maps SKUs to
+    array positions and computes unit prices, tier discounts, line totals and
+    per-order totals without per-line Python arithmetic.
+    """
+
+    def __init__(
+        self,
+        products: Mapping[str, dict[str, Any]],
+        bulk_tiers: Sequence[tuple[int, float]] = DEFAULT_BULK_TIERS,
+    ):
+        self.bulk_tiers = tuple(bulk_tiers)
+        self._sku_positions = {sku: i for i, sku in enumerate(products)}
+        # The trailing NaN is the position every unknown SKU maps to
+        self._unknown_position = len(self._sku_positions)
+        self._prices = np.array(
+            [
+                *(
+                    np.nan if details.get("price") is None else details["price"]
+                    for details in products.values()
+                ),
+                np.nan,
+            ],
+            dtype=np.float64,
+        )
+        self._tier_quantities = np.array([tier[0] for tier in bulk_tiers])
+        self._tier_rates = np.array([tier[1] for tier in bulk_tiers], dtype=np.float64)
+
+    @classmethod
+    def from_catalog(cls, catalog_source, **kwargs) -> "QuoteEngine":
+        """Create an engine from a catalog data source's products."""
+        return cls(catalog_source.get_all_products(), **kwargs)
+
+    def reprice(
+        self, products: Mapping[str, dict[str, Any]], skus: Iterable[str]
+    ) -> "QuoteEngine":
+        """Get an engine with the prices of ``skus`` taken from ``products``.
+
+        SKU positions are shared and only the price array is copied, so an
+        update does not rebuild the engine unless it names a new SKU.
+        """
+        engine = copy.copy(self)
+        engine._prices = self._prices.copy()
+        for sku in skus:
+            position = self._sku_positions.get(sku)
+            if position is None:
+                return QuoteEngine(products, self.bulk_tiers)
+            price = products[sku].get("price")
+            engine._prices[position] = np.nan if price is None else price
+        return engine
+
+    def quote_lines(self, skus: Sequence[str], quantities: Sequence[int]) -> LineQuotes:
+        """Price a batch of (SKU, quantity) lines."""
+        positions = np.fromiter(
+            (self._sku_positions.get(sku, self._unknown_position) for sku in skus),
+            dtype=np.int64,
+            count=len(skus),
+        )
+        quantities = np.asarray(quantities, dtype=np.int64)
+
+        unit_prices = self._prices[positions]
+        priced = ~np.isnan(unit_prices)
+        unit_prices = np.where(priced, unit_prices, 0.0)
+
+        discount_rates = self.discount_rates(quantities)
+        line_totals = quantities * unit_prices * (1.0 - discount_rates)
+        return LineQuotes(unit_prices, discount_rates, line_totals, priced)
+
+    def quote_orders(self, orders: Sequence[OrderLike]) -> BatchQuote:
+        """Price every line of a batch of orders and total them per order."""
+        line_counts = [len(order.items) for order in orders]
+        skus = [normalize_sku(item.sku) for order in orders for item in order.items]
+        quantities = [item.quantity for order in orders for item in order.items]
+
+        lines = self.quote_lines(skus, quantities)
+        order_indexes = np.repeat(np.arange(len(orders)), line_counts)
+        order_totals = np.bincount(
+            order_indexes, weights=lines.line_totals, minlength=len(orders)
+        )
+        return BatchQuote(lines, order_indexes, order_totals)
+
+    def discount_rates(self, quantities: np.ndarray) -> np.ndarray:
+        """Get the bulk-tier discount rate for each quantity."""
+        tiers = np.searchsorted(self._tier_quantities, quantities, side="right") - 1
+        return np.where(tiers >= 0, self._tier_rates[np.maximum(tiers, 0)], 0.0)
@@ -46,3 +46,45 @@ Provide a clear, professional response explaining any issues and suggested solut
         return PromptTemplate(
             template=template, input_variables=["order_details", "validation_issues"]
         )
+
+    @staticmethod
+    def create_revision_prompt() -> PromptTemplate:
+        """Create prompt template for revising a prior extraction from an email diff."""
+        template = """You previously extracted order information from a customer email.
+The customer has sent a new email that is nearly identical to the earlier one.
+
+Previous extraction:
+{previous_extraction}
+
+Changes between the earlier email and the new email (unified diff, "-" lines were removed, "+" lines were added):
+{email_diff}
+
+Apply the changes to the previous extraction and return the complete, updated extraction. Keep every field that the changes do not affect.
+
+{format_instructions}"""
+
+        return PromptTemplate(
+            template=template,
+            input_variables=["previous_extraction", "email_diff"],
+            partial_variables={"format_instructions": "{format_instructions}"},
+        )
+
+    @staticmethod
+    def create_completion_prompt() -> PromptTemplate:
+        """Create prompt template asking only for the fields an extraction is missing."""
+        template = """An earlier extraction of order information from the customer email below was incomplete.
+
+Already extracted:
+{extracted}
+
+Return a JSON object containing only these fields: {missing_fields}.
+Use the field names customer_name, delivery_address, delivery_date (YYYY-MM-DD) and items.
+If items are requested, list only the ordered items, each with "sku" and "quantity", that are not already extracted.
+
+Email text:
+{email_text}"""
+
+        return PromptTemplate(
+            template=template,
+            input_variables=["extracted", "missing_fields", "email_text"],
+        )
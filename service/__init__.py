@@ -0,0 +1,6 @@
+"""Headless HTTP service for order processing."""
+
+from .order_service import OrderService
+from .server import OrderHttpServer
+
+__all__ = ["OrderService", "OrderHttpServer"]
@@ -0,0 +1,75 @@
+"""Run the order processing HTTP service.
+
+Example, load-testable without API keys::
+
+    python -m service --provider fake --port 8080
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+
+from processing.bootstrap import create_processor
+from processing.fake_llm import register_fake_provider
+from sinks.jsonl_sink import JsonlResultSink
+
+from .order_service import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_REQUEST_TIMEOUT,
+    OrderService,
+)
+from .server import DEFAULT_SHUTDOWN_GRACE, OrderHttpServer
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Order processing HTTP service")
+    parser.add_argument("--host", default=os.getenv("SERVICE_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("SERVICE_PORT", "8080"))
+    )
+    parser.add_argument(
+        "--provider", default=os.getenv("DEFAULT_LLM_PROVIDER", "openai")
+    )
+    parser.add_argument("--catalog", default=None, help="Product catalog CSV path")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument(
+        "--request-timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT
+    )
+    parser.add_argument("--shutdown-grace", type=float, default=DEFAULT_SHUTDOWN_GRACE)
+    parser.add_argument("--results", default=None, help="JSON Lines output path")
+    return parser.parse_args()
+
+
+async def serve(args: argparse.Namespace):
+    """Build the warm processor once and serve until SIGINT or SIGTERM."""
+    processor = create_processor(args.provider, args.catalog)
+    result_sink = JsonlResultSink(args.results) if args.results else None
+    service = OrderService(
+        processor, args.max_concurrency, args.request_timeout, result_sink
+    )
+    server = OrderHttpServer(
+        service, args.host, args.port, shutdown_grace=args.shutdown_grace
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    await server.serve_until(stop)
+
+
+def main():
+    """Run the service."""
+    register_fake_provider()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    asyncio.run(serve(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
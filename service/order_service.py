@@ -0,0 +1,184 @@
+"""Asynchronous facade over a shared, warm order processor."""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from core.metrics import REGISTRY
+from processing.order_processor import SmartOrderProcessor
+from sinks.buffered import BufferedResultSink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_REQUEST_TIMEOUT = 60.0
+
+ORDERS_IN_FLIGHT = REGISTRY.gauge(
+    "service_orders_in_flight", "Orders holding a processing slot."
+)
+
+
+class OrderService:
+    """Runs the blocking order pipeline for async callers.
+
+    One processor (and so one parser, LLM client and validator) is shared by
+    every request. At most ``max_concurrency`` orders are processed at once;
+    further requests wait for a slot, and the wait counts towards their
+    timeout. A timed-out order's worker thread is not interrupted, but its
+    slot is held until the thread finishes so the bound stays accurate.
+    With a ``result_sink``, each order is committed to it before the
+    response is sent. Reserved stock is deducted once the order is written,
+    and released if writing it fails. Orders whose request has already timed
+    out are neither written nor committed, since the client may retry them.
+    """
+
+    def __init__(
+        self,
+        processor: SmartOrderProcessor,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        result_sink: Optional[BufferedResultSink] = None,
+    ):
+        if result_sink is not None and not result_sink.durable_writes:
+            raise ValueError(
+                f"{type(result_sink).__name__} cannot commit orders durably"
+            )
+        self.processor = processor
+        self.result_sink = result_sink
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        # Created on first use so it binds to the serving event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="order-worker"
+        )
+        self._in_flight = 0
+        # Orders running on worker threads, which may still write to the sink
+        self._running = 0
+        self._idle = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of orders currently holding a processing slot."""
+        return self._in_flight
+
+    async def process(
+        self, email_text: str, timeout: Optional[float] = None
+    ) -> dict[str, Any]:
+        """Process one email and return the validated order as a dictionary.
+
+        Raises ``asyncio.TimeoutError`` if the order is not finished within
+        the timeout, including time spent waiting for a slot.
+        """
+        return await asyncio.wait_for(
+            self._process_in_slot(email_text),
+            timeout=self.request_timeout if timeout is None else timeout,
+        )
+
+    async def process_batch(
+        self, emails: list[str], timeout: Optional[float] = None
+    ) -> list[dict[str, Any]]:
+        """Process emails concurrently, returning one outcome per email.
+
+        Each outcome holds either ``order`` or ``error``, so one failing email
+        does not fail the batch.
+        """
+        outcomes = await asyncio.gather(
+            *(self.process(email, timeout) for email in emails),
+            return_exceptions=True,
+        )
+        return [
+            {"error": describe_error(outcome)}
+            if isinstance(outcome, BaseException)
+            else {"order": outcome}
+            for outcome in outcomes
+        ]
+
+    async def _process_in_slot(self, email_text: str) -> dict[str, Any]:
+        """Wait for a slot and run the processor on a worker thread."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        await self._slots.acquire()
+        self._in_flight += 1
+        ORDERS_IN_FLIGHT.inc()
+        abandoned = threading.Event()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, self._process_to_dict, email_text, abandoned
+        )
+        future.add_done_callback(self._release_slot)
+        try:
+            # Shielded so a timeout abandons the result but keeps the slot held
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            abandoned.set()
+            raise
+
+    def _release_slot(self, _future: asyncio.Future):
+        """Free the slot once the worker thread has finished."""
+        self._in_flight -= 1
+        ORDERS_IN_FLIGHT.dec()
+        self._slots.release()
+
+    def _process_to_dict(
+        self, email_text: str, abandoned: Optional[threading.Event] = None
+    ) -> Optional[dict[str, Any]]:
+        """Process an email and serialize the record without building models."""
+        with self._idle:
+            self._running += 1
+        try:
+            return self._process_and_write(email_text, abandoned)
+        finally:
+            with self._idle:
+                self._running -= 1
+                self._idle.notify_all()
+
+    def _process_and_write(
+        self, email_text: str, abandoned: Optional[threading.Event] = None
+    ) -> Optional[dict[str, Any]]:
+        """Process an email and write it to the sink, settling its reservation.
+
+        Returns None without writing, releasing the reservation, once the
+        request is ``abandoned``.
+        """
+        order = self.processor.process_order_record(email_text)
+        if abandoned is not None and abandoned.is_set():
+            self.processor.release_reservation(order)
+            return None
+        if self.result_sink is not None:
+            try:
+                self.result_sink.write(order, durable=True)
+            except BaseException:
+                self.processor.release_reservation(order)
+                raise
+        self.processor.commit_reservations([order])
+        return order.to_dict()
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Shut down the worker threads, then close the result sink.
+
+        Queued orders are cancelled and running ones are waited for, at most
+        ``timeout`` seconds if given. If any is still running then, the sink
+        is left open for it and False is returned.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._idle:
+            drained = self._idle.wait_for(lambda: self._running == 0, timeout)
+        if not drained:
+            logger.warning(
+                "Closing with %d orders still running; result sink left open",
+                self._running,
+            )
+            return False
+        if self.result_sink is not None:
+            self.result_sink.close()
+        return True
+
+
+def describe_error(error: BaseException) -> str:
+    """Describe a processing failure for a response body."""
+    if isinstance(error, asyncio.TimeoutError):
+        return "Timed out processing order"
+    return str(error) or type(error).__name__
@@ -0,0 +1,319 @@
+"""Minimal asyncio HTTP/1.1 server exposing the order service."""
+
+import asyncio
+import json
+import logging
+from http import HTTPStatus
+from typing import Any, Optional, Union
+
+from core.exceptions import OrderProcessingError, StockReservationError
+from core.metrics import OPENMETRICS_CONTENT_TYPE, REGISTRY, MetricsRegistry
+
+from .order_service import OrderService, describe_error
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 16 * 1024
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+DEFAULT_MAX_BATCH_SIZE = 100
+KEEP_ALIVE_TIMEOUT = 15.0
+DEFAULT_SHUTDOWN_GRACE = 30.0
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests",
+    "HTTP requests answered, by route and status code.",
+    ("route", "status"),
+)
+
+
+class HttpError(Exception):
+    """Error that maps directly to an HTTP error response."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class OrderHttpServer:
+    """Serves ``POST /orders``, ``POST /orders:batch``, ``GET /health``
+    and ``GET /metrics``.
+
+    Connections are kept alive between requests. On shutdown the server stops
+    accepting connections, reports itself unhealthy, lets in-flight requests
+    finish for up to ``shutdown_grace`` seconds and then closes every
+    connection. ``/metrics`` serves ``registry`` in OpenMetrics text format.
+    """
+
+    def __init__(
+        self,
+        service: OrderService,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        shutdown_grace: float = DEFAULT_SHUTDOWN_GRACE,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        self.service = service
+        self.registry = registry or REGISTRY
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.max_batch_size = max_batch_size
+        self.shutdown_grace = shutdown_grace
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set[asyncio.Task] = set()
+        self._busy_connections: set[asyncio.Task] = set()
+        self._draining = False
+        self._routes = {
+            ("POST", "/orders"): self._handle_order,
+            ("POST", "/orders:batch"): self._handle_batch,
+            ("GET", "/health"): self._handle_health,
+            ("GET", "/metrics"): self._handle_metrics,
+        }
+
+    @property
+    def bound_port(self) -> int:
+        """Port the server is listening on, useful when started on port 0."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        """Start listening for connections."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        logger.info("Listening on http://%s:%d", self.host, self.bound_port)
+
+    async def serve_until(self, stop: asyncio.Event):
+        """Serve until ``stop`` is set, then shut down gracefully."""
+        await self.start()
+        await stop.wait()
+        await self.shutdown()
+
+    async def shutdown(self):
+        """Stop accepting connections and drain in-flight requests."""
+        self._draining = True
+        deadline = asyncio.get_running_loop().time() + self.shutdown_grace
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        if self._busy_connections:
+            logger.info("Draining %d in-flight requests", len(self._busy_connections))
+            await asyncio.wait(set(self._busy_connections), timeout=self.shutdown_grace)
+
+        # Idle keep-alive connections and requests past the grace period
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        # Timed-out orders keep running on worker threads; the sink is only
+        # closed once they are done writing to it
+        remaining = max(0.0, deadline - asyncio.get_running_loop().time())
+        await asyncio.to_thread(self.service.close, remaining)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Serve requests on one connection until it closes."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            keep_alive = True
+            while keep_alive and not self._draining:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), timeout=KEEP_ALIVE_TIMEOUT
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write_response(
+                        writer,
+                        HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                        {"error": "Request headers too large"},
+                        keep_alive=False,
+                    )
+                    break
+
+                self._busy_connections.add(task)
+                try:
+                    keep_alive = await self._handle_request(head, reader, writer)
+                finally:
+                    self._busy_connections.discard(task)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _handle_request(
+        self,
+        head: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> bool:
+        """Read, route and answer one request, returning whether to keep alive."""
+        try:
+            method, path, version, headers = parse_request_head(head)
+        except HttpError as e:
+            await self._write_response(
+                writer, e.status, {"error": str(e)}, keep_alive=False
+            )
+            return False
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = (
+            connection != "close"
+            if version == "HTTP/1.1"
+            else connection == "keep-alive"
+        )
+
+        body = None
+        route = path.split("?", 1)[0]
+        try:
+            body = await self._read_body(headers, reader)
+            handler = self._routes.get((method, route))
+            if handler is None:
+                # Arbitrary paths would make the route label unbounded
+                route = "unmatched"
+                raise HttpError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+            status, payload = await handler(body)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+            # An unread body would be parsed as the next request
+            keep_alive = keep_alive and body is not None
+
+        keep_alive = keep_alive and not self._draining
+        HTTP_REQUESTS.labels(route, str(status.value)).inc()
+        await self._write_response(writer, status, payload, keep_alive)
+        return keep_alive
+
+    async def _read_body(
+        self, headers: dict[str, str], reader: asyncio.StreamReader
+    ) -> bytes:
+        """Read a Content-Length delimited request body."""
+        if "transfer-encoding" in headers:
+            raise HttpError(
+                HTTPStatus.LENGTH_REQUIRED, "Chunked bodies are not supported"
+            )
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from e
+        if length < 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise HttpError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Body exceeds {self.max_body_bytes} bytes",
+            )
+        return await reader.readexactly(length) if length else b""
+
+    async def _handle_order(self, body: bytes) -> tuple[HTTPStatus, dict[str, Any]]:
+        """Process a single email."""
+        email = parse_json_body(body).get("email")
+        if not isinstance(email, str) or not email.strip():
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "'email' must be a non-empty string"
+            )
+
+        try:
+            order = await self.service.process(email)
+        except asyncio.TimeoutError as e:
+            raise HttpError(HTTPStatus.GATEWAY_TIMEOUT, describe_error(e)) from e
+        except StockReservationError as e:
+            raise HttpError(HTTPStatus.CONFLICT, describe_error(e)) from e
+        except OrderProcessingError as e:
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, describe_error(e)) from e
+        except Exception as e:
+            logger.exception("Unexpected error processing order")
+            raise HttpError(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal error") from e
+        return HTTPStatus.OK, {"order": order}
+
+    async def _handle_batch(self, body: bytes) -> tuple[HTTPStatus, dict[str, Any]]:
+        """Process several emails, reporting success or failure per email."""
+        emails = parse_json_body(body).get("emails")
+        if not isinstance(emails, list) or not all(
+            isinstance(email, str) for email in emails
+        ):
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "'emails' must be a list of strings"
+            )
+        if len(emails) > self.max_batch_size:
+            raise HttpError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Batch exceeds {self.max_batch_size} emails",
+            )
+
+        results = await self.service.process_batch(emails)
+        return HTTPStatus.OK, {"results": results}
+
+    async def _handle_health(self, _body: bytes) -> tuple[HTTPStatus, dict[str, Any]]:
+        """Report whether the server accepts work."""
+        if self._draining:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"status": "draining"}
+        return HTTPStatus.OK, {
+            "status": "ok",
+            "in_flight": self.service.in_flight,
+            "max_concurrency": self.service.max_concurrency,
+        }
+
+    async def _handle_metrics(self, _body: bytes) -> tuple[HTTPStatus, str]:
+        """Export the metrics registry."""
+        return HTTPStatus.OK, self.registry.render()
+
+    @staticmethod
+    async def _write_response(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        payload: Union[dict[str, Any], str],
+        keep_alive: bool,
+    ):
+        """Write a JSON response, or OpenMetrics text for a string payload."""
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), OPENMETRICS_CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def parse_request_head(head: bytes) -> tuple[str, str, str, dict[str, str]]:
+    """Parse the request line and headers, lower-casing header names."""
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, version = lines[0].split(" ")
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line") from e
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        raise HttpError(
+            HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"Unsupported version {version}"
+        )
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, separator, value = line.partition(":")
+        if not separator:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+    return method, path, version, headers
+
+
+def parse_json_body(body: bytes) -> dict[str, Any]:
+    """Decode a JSON object request body."""
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Body must be valid JSON") from e
+    if not isinstance(payload, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+    return payload
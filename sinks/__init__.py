@@ -0,0 +1,12 @@
+"""Append-only outputs for processed orders."""
+
+from .buffered import BufferedResultSink
+from .jsonl_sink import JsonlResultSink, read_jsonl_results
+from .parquet_sink import ParquetResultSink
+
+__all__ = [
+    "BufferedResultSink",
+    "JsonlResultSink",
+    "ParquetResultSink",
+    "read_jsonl_results",
+]
@@ -0,0 +1,204 @@
+"""Buffered, append-only output of processed orders with group commit."""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from core.exceptions import ResultSinkError
+from core.records import OrderLike, OrderRecord
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def order_dict(order: OrderLike) -> dict[str, Any]:
+    """Get an order as a JSON-compatible dictionary."""
+    if isinstance(order, OrderRecord):
+        return order.to_dict()
+    return order.model_dump(mode="json")
+
+
+class BufferedResultSink(ABC):
+    """Buffers encoded orders and writes them to storage in batches.
+
+    A batch is written once it holds ``max_batch_records`` entries or
+    ``max_batch_bytes`` bytes, or once its oldest entry has waited
+    ``flush_interval`` seconds. Writers asking for durability block until
+    their entry's batch is committed. One of them commits everything
+    buffered while the others wait, and writers arriving during a commit
+    join the next one, so concurrent writers share each sync to disk.
+    Writers that fill the buffer also wait for a commit, which bounds
+    memory when storage falls behind.
+
+    Sinks whose committed batches do not survive a crash set
+    ``durable_writes`` to False and reject durable writes.
+    """
+
+    durable_writes = True
+
+    def __init__(
+        self,
+        max_batch_records: int,
+        max_batch_bytes: int,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_batch_records = max_batch_records
+        self.max_batch_bytes = max_batch_bytes
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.batches_written = 0
+        self._lock = threading.Lock()
+        self._committed = threading.Condition(self._lock)
+        self._buffer: list[Any] = []
+        self._buffer_bytes = 0
+        self._buffered_since: Optional[float] = None
+        # Orders are numbered as they are written; all up to the durable
+        # sequence have been committed
+        self._sequence = 0
+        self._durable_sequence = 0
+        self._committing = False
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def write(
+        self, order: OrderLike, source_id: Optional[str] = None, durable: bool = False
+    ) -> int:
+        """Buffer a processed order, returning its sequence number.
+
+        With ``durable`` the call returns only once the order is committed.
+        """
+        if durable and not self.durable_writes:
+            raise ResultSinkError(
+                f"{type(self).__name__} does not support durable writes"
+            )
+        entries, size = self._encode(
+            order_dict(order), source_id, datetime.now(timezone.utc)
+        )
+        with self._lock:
+            self._check_usable()
+            self._buffer.extend(entries)
+            self._buffer_bytes += size
+            self._sequence += 1
+            sequence = self._sequence
+            if self._buffered_since is None:
+                self._buffered_since = self.clock()
+            self._start_flusher()
+            full = (
+                len(self._buffer) >= self.max_batch_records
+                or self._buffer_bytes >= self.max_batch_bytes
+            )
+            if durable or full:
+                self._commit_until(sequence)
+        return sequence
+
+    def flush(self):
+        """Commit every order written so far."""
+        with self._lock:
+            self._check_usable()
+            self._commit_until(self._sequence)
+
+    def close(self):
+        """Commit buffered orders, stop the flusher and close the output."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            with self._lock:
+                if self._error is None:
+                    self._commit_until(self._sequence)
+        finally:
+            with self._lock:
+                self._committed.notify_all()
+            if self._flusher is not None:
+                self._flusher.join()
+            self._close_output()
+
+    @abstractmethod
+    def _encode(
+        self, order: dict[str, Any], source_id: Optional[str], processed_at: datetime
+    ) -> tuple[list[Any], int]:
+        """Encode an order into buffer entries and their approximate size."""
+
+    @abstractmethod
+    def _write_batch(self, entries: list[Any]):
+        """Write and sync a batch of entries; called by one thread at a time."""
+
+    @abstractmethod
+    def _close_output(self):
+        """Release the underlying storage."""
+
+    def _check_usable(self):
+        """Raise if the sink is closed or a previous commit failed."""
+        if self._closed:
+            raise ResultSinkError("Result sink is closed")
+        self._check_failed()
+
+    def _commit_until(self, sequence: int):
+        """Block, holding the lock on entry and exit, until ``sequence`` is durable."""
+        while self._durable_sequence < sequence:
+            self._check_failed()
+            if self._committing:
+                self._committed.wait()
+            else:
+                self._commit_locked()
+
+    def _check_failed(self):
+        """Raise if a previous commit failed."""
+        if self._error is not None:
+            raise ResultSinkError(f"Result sink failed: {self._error}") from self._error
+
+    def _commit_locked(self):
+        """Write the buffer, releasing the lock during I/O."""
+        batch, last_sequence = self._buffer, self._sequence
+        self._buffer, self._buffer_bytes, self._buffered_since = [], 0, None
+        self._committing = True
+        self._lock.release()
+        try:
+            if batch:
+                self._write_batch(batch)
+        except BaseException as e:
+            self._lock.acquire()
+            self._error = e
+            self._committing = False
+            self._committed.notify_all()
+            raise ResultSinkError(f"Result sink failed: {e}") from e
+        self._lock.acquire()
+        self._committing = False
+        if batch:
+            self.batches_written += 1
+        self._durable_sequence = last_sequence
+        self._committed.notify_all()
+
+    def _start_flusher(self):
+        """Start the background thread that commits batches that are due."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="result-sink-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _run_flusher(self):
+        """Commit the buffer whenever its oldest entry reaches the flush interval."""
+        with self._lock:
+            while not self._closed and self._error is None:
+                if self._buffered_since is None or self._committing:
+                    self._committed.wait(self.flush_interval)
+                    continue
+                remaining = self._buffered_since + self.flush_interval - self.clock()
+                if remaining > 0:
+                    self._committed.wait(remaining)
+                    continue
+                try:
+                    self._commit_locked()
+                except ResultSinkError:
+                    return
@@ -0,0 +1,88 @@
+"""Append-only JSON Lines output of processed orders."""
+
+import json
+import os
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any, Optional
+
+from .buffered import DEFAULT_FLUSH_INTERVAL, BufferedResultSink
+
+DEFAULT_MAX_BATCH_RECORDS = 1000
+DEFAULT_MAX_BATCH_BYTES = 1 << 20
+
+
+class JsonlResultSink(BufferedResultSink):
+    """Appends one JSON object per processed order to a file.
+
+    Each line holds ``source_id``, ``processed_at`` and the ``order``. Batches
+    are written with a single ``write`` call and made durable with one
+    ``fsync``, so a crash loses at most the unsynced tail; a partial last
+    line left by a crash is truncated when the file is reopened.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch_records: int = DEFAULT_MAX_BATCH_RECORDS,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        fsync: bool = True,
+    ):
+        super().__init__(max_batch_records, max_batch_bytes, flush_interval)
+        self.path = path
+        self.fsync = fsync
+        truncate_partial_line(path)
+        self._file = open(path, "ab")
+
+    def _encode(
+        self, order: dict[str, Any], source_id: Optional[str], processed_at: datetime
+    ) -> tuple[list[Any], int]:
+        line = json.dumps(
+            {
+                "source_id": source_id,
+                "processed_at": processed_at.isoformat(),
+                "order": order,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return [line + b"\n"], len(line) + 1
+
+    def _write_batch(self, entries: list[Any]):
+        self._file.write(b"".join(entries))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _close_output(self):
+        self._file.close()
+
+
+def truncate_partial_line(path: str):
+    """Drop an unterminated last line, as left by a crash mid-write."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(position, 4096)
+            f.seek(position - step)
+            chunk = f.read(step)
+            if position == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(position - step + newline + 1)
+                return
+            position -= step
+        f.truncate(0)
+
+
+def read_jsonl_results(path: str) -> Iterator[dict[str, Any]]:
+    """Read the lines written by a ``JsonlResultSink``, skipping a partial tail."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                yield json.loads(line)
@@ -0,0 +1,192 @@
+"""Columnar Parquet output with one row per order item."""
+
+import json
+import os
+import time
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Optional
+
+from core.exceptions import ResultSinkError
+
+from .buffered import BufferedResultSink
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+DEFAULT_MAX_BATCH_ROWS = 65536
+DEFAULT_MAX_BATCH_BYTES = 32 << 20
+DEFAULT_PARQUET_FLUSH_INTERVAL = 30.0
+DEFAULT_ROWS_PER_FILE = 1_000_000
+IN_PROGRESS_SUFFIX = ".inprogress"
+
+# Column names in row order; suggestions are kept as JSON text because their
+# keys differ between unknown-SKU, MOQ and stock suggestions
+COLUMNS = (
+    "source_id",
+    "processed_at",
+    "customer",
+    "address",
+    "delivery_date",
+    "reservation_id",
+    "line",
+    "sku",
+    "quantity",
+    "valid",
+    "notes",
+    "suggestion_count",
+    "suggestions",
+)
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for Parquet output."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ResultSinkError("pyarrow package is required for Parquet output") from e
+    return pyarrow, pyarrow.parquet
+
+
+def order_schema() -> "pa.Schema":
+    """Get the Arrow schema of the item rows."""
+    pa, _ = _import_pyarrow()
+    return pa.schema(
+        [
+            ("source_id", pa.string()),
+            ("processed_at", pa.timestamp("ms", tz="UTC")),
+            ("customer", pa.string()),
+            ("address", pa.string()),
+            ("delivery_date", pa.date32()),
+            ("reservation_id", pa.string()),
+            ("line", pa.int32()),
+            ("sku", pa.string()),
+            ("quantity", pa.int64()),
+            ("valid", pa.bool_()),
+            ("notes", pa.string()),
+            ("suggestion_count", pa.int32()),
+            ("suggestions", pa.string()),
+        ]
+    )
+
+
+class ParquetResultSink(BufferedResultSink):
+    """Writes processed orders to Parquet files in a directory.
+
+    Every order item becomes a row carrying the order's fields, its
+    validation status and its suggestions, so analytics can scan the
+    ``valid`` or ``sku`` columns alone. Each committed batch is one row
+    group. Files are written under an ``.inprogress`` name and renamed to
+    ``part-*.parquet`` once they reach ``rows_per_file`` rows or the sink is
+    closed, since Parquet files are unreadable until their footer is
+    written; readers should only open the renamed files. Row groups of the
+    ``.inprogress`` file are lost in a crash, so durable writes are rejected
+    and the sink suits analytics copies rather than the record of results.
+    """
+
+    durable_writes = False
+
+    def __init__(
+        self,
+        directory: str,
+        max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        flush_interval: float = DEFAULT_PARQUET_FLUSH_INTERVAL,
+        rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+        compression: str = "zstd",
+    ):
+        self._pa, self._pq = _import_pyarrow()
+        super().__init__(max_batch_rows, max_batch_bytes, flush_interval)
+        self.directory = directory
+        self.rows_per_file = rows_per_file
+        self.compression = compression
+        self.schema = order_schema()
+        self.files_written: list[str] = []
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._file_path: Optional[str] = None
+        self._file_rows = 0
+        self._file_count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _encode(
+        self, order: dict[str, Any], source_id: Optional[str], processed_at: datetime
+    ) -> tuple[list[Any], int]:
+        head = (
+            source_id,
+            processed_at,
+            order["customer"],
+            order["address"],
+            date.fromisoformat(order["delivery_date"]),
+            order.get("reservation_id"),
+        )
+        size = sum(len(value) for value in head if isinstance(value, str))
+        # An order without items still gets a row so it is counted
+        items = order["items"] or [None]
+        rows = []
+        for line, item in enumerate(items, start=1):
+            if item is None:
+                rows.append(head + (None,) * (len(COLUMNS) - len(head)))
+                continue
+            suggestions = item.get("suggestions") or []
+            suggestions_json = json.dumps(suggestions) if suggestions else None
+            rows.append(
+                head
+                + (
+                    line,
+                    item["sku"],
+                    item["quantity"],
+                    item["valid"],
+                    item.get("notes"),
+                    len(suggestions),
+                    suggestions_json,
+                )
+            )
+            size += 32 + len(item["sku"]) + len(item.get("notes") or "")
+            size += len(suggestions_json or "")
+        return rows, size
+
+    def _write_batch(self, entries: list[Any]):
+        columns = list(zip(*entries))
+        table = self._pa.Table.from_arrays(
+            [
+                self._pa.array(column, type=field.type)
+                for column, field in zip(columns, self.schema)
+            ],
+            schema=self.schema,
+        )
+        start = 0
+        while start < table.num_rows:
+            writer = self._open_writer()
+            count = min(table.num_rows - start, self.rows_per_file - self._file_rows)
+            writer.write_table(table.slice(start, count))
+            self._file_rows += count
+            start += count
+            if self._file_rows >= self.rows_per_file:
+                self._finish_file()
+
+    def _close_output(self):
+        self._finish_file()
+
+    def _open_writer(self) -> "pq.ParquetWriter":
+        """Get the writer of the current file, starting a new file if needed."""
+        if self._writer is None:
+            name = f"part-{time.time_ns()}-{os.getpid()}-{self._file_count:05d}.parquet"
+            self._file_path = os.path.join(self.directory, name)
+            self._writer = self._pq.ParquetWriter(
+                self._file_path + IN_PROGRESS_SUFFIX,
+                self.schema,
+                compression=self.compression,
+            )
+            self._file_rows = 0
+            self._file_count += 1
+        return self._writer
+
+    def _finish_file(self):
+        """Write the footer of the current file and publish it under its final name."""
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._file_path + IN_PROGRESS_SUFFIX, self._file_path)
+        self.files_written.append(self._file_path)
+        self._writer = None
@@ -0,0 +1 @@
+"""Test suite for the order processing system."""
@@ -3,6 +3,9 @@
 import os
 import sys
 
+import pandas as pd
+import pytest
+
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -11,3 +14,45 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 def pytest_configure(config):
     """Configure pytest."""
     config.addinivalue_line("markers", "integration: mark test as integration test")
+
+
+CATALOG_ROWS = [
+    ("CHR-0001", "Chair STRASUND 1", 40, 8),
+    ("CHR-0002", "Chair TRANLUND 2", 30, 4),
+    ("SFA-0001", "Sofa VIKTMARK 1", 12, 1),
+]
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    """Write a small CSV catalog of chairs and a sofa."""
+    path = tmp_path / "catalog.csv"
+    pd.DataFrame(
+        [
+            {
+                "Product_Code": sku,
+                "Product_Name": name,
+                "Price": 10.0,
+                "Available_in_Stock": stock,
+                "Min_Order_Quantity": moq,
+                "Description": "",
+            }
+            for sku, name, stock, moq in CATALOG_ROWS
+        ]
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+DELTA_CATALOG = """Product_Code,Product_Name,Price,Available_in_Stock,Min_Order_Quantity,Description
+DSK-0001,Desk ONE,100.0,10,2,A desk
+DSK-0002,Desk TWO,150.0,5,1,"Another desk, wider"
+CHR-0001,Chair ONE,50.0,20,4,A chair
+"""
+
+
+@pytest.fixture
+def delta_catalog_path(tmp_path):
+    """Write a small catalog CSV of desks and a chair, for catalog updates."""
+    path = tmp_path / "catalog.csv"
+    path.write_text(DELTA_CATALOG, encoding="utf-8")
+    return str(path)
@@ -0,0 +1,89 @@
+"""Tests for multiprocess batch validation and bundling."""
+
+import gc
+
+from processing import batch_runner
+from processing.batch_runner import BatchOrderRunner, chunked
+
+
+def make_orders(count: int) -> list[dict]:
+    """Create orders with valid, MOQ-violating and unknown lines."""
+    return [
+        {
+            "customer": f"Customer {n}",
+            "address": "1 Main St",
+            "delivery_date": "2025-06-20",
+            "items": [
+                {"sku": "CHR-0001", "quantity": 2 + n % 10},
+                {"sku": "CHR-0002", "quantity": 1},
+                {"sku": "CHR-9999", "quantity": 1},
+            ],
+        }
+        for n in range(count)
+    ]
+
+
+def test_chunked_splits_lazily():
+    """Test that chunks cover the input in order."""
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_in_process_run_validates_and_bundles(catalog_path):
+    """Test the single-process pipeline output."""
+    with BatchOrderRunner(catalog_path, processes=1) as runner:
+        [result] = runner.run(make_orders(1))
+
+    items = result["order"]["items"]
+    assert [item["valid"] for item in items] == [False, False, False]
+    assert items[2]["notes"] == "SKU CHR-9999 not found in catalog"
+    assert result["bundles"]["summary"]["invalid_items"] == 3
+
+
+def test_process_pool_matches_in_process_results(catalog_path):
+    """Test that chunked multiprocess runs return the same results in order."""
+    orders = make_orders(50)
+    with BatchOrderRunner(catalog_path, processes=1) as runner:
+        expected = list(runner.run(orders))
+
+    with BatchOrderRunner(catalog_path, processes=2, chunk_size=7) as runner:
+        actual = list(runner.run(orders))
+
+    assert actual == expected
+
+
+def test_worker_without_inherited_catalog_loads_it(catalog_path, monkeypatch):
+    """Test the initializer used when workers cannot fork from the parent."""
+    monkeypatch.setattr(batch_runner, "_worker_pipeline", None)
+
+    batch_runner._init_worker(catalog_path)
+    [result] = batch_runner._process_chunk(make_orders(1))
+
+    assert result["order"]["customer"] == "Customer 0"
+
+
+def test_consolidated_run_merges_orders_for_one_delivery(catalog_path):
+    """Test that a batch's orders for one delivery come out merged."""
+    orders = make_orders(3)
+    orders[2]["customer"] = "customer 0"
+    orders[2]["items"] = [{"sku": " chr-0001", "quantity": 6}]
+
+    with BatchOrderRunner(catalog_path, processes=1) as runner:
+        results = runner.run_consolidated(orders)
+
+    assert [result["sources"] for result in results] == [[0, 2], [1]]
+    merged = results[0]["order"]["items"][0]
+    assert (merged["sku"], merged["quantity"], merged["valid"]) == (
+        "CHR-0001",
+        8,
+        True,
+    )
+    assert results[0]["resolved_skus"] == ["CHR-0001"]
+    assert results[0]["bundles"]["summary"]["invalid_items"] == 2
+
+
+def test_parent_garbage_collection_is_restored(catalog_path):
+    """Test that freezing for forked workers does not outlive their start."""
+    with BatchOrderRunner(catalog_path, processes=2) as runner:
+        list(runner.run(make_orders(3)))
+
+        assert gc.get_freeze_count() == 0
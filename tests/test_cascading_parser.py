@@ -0,0 +1,121 @@
+"""Tests for the cheap-then-strong cascading parser."""
+
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from core.exceptions import ParsingError
+from core.records import OrderItemRecord, OrderRecord
+from parsing.cascading_parser import CascadingEmailParser
+
+CATALOG = {"DSK-0001": {"sku": "DSK-0001", "moq": 1, "stock": 10}}
+
+
+def make_record(*items: tuple[str, int]) -> OrderRecord:
+    """Create an order record with the given SKU and quantity lines."""
+    return OrderRecord(
+        "Jane",
+        "1 Main St",
+        date(2025, 6, 20),
+        [OrderItemRecord(sku, quantity) for sku, quantity in items],
+    )
+
+
+def make_parser(result) -> Mock:
+    """Create a parser stub returning ``result``, or raising it if an error."""
+    parser = Mock(spec=["parse_email_record", "aparse_email_record"])
+    parser.parse_email_record.side_effect = (
+        result if isinstance(result, Exception) else lambda _text: result
+    )
+    parser.aparse_email_record = AsyncMock(side_effect=parser.parse_email_record)
+    return parser
+
+
+def make_cascade(cheap_result, strong_result) -> CascadingEmailParser:
+    """Create a cascade over parser stubs and a one-product catalog."""
+    catalog = Mock(spec=["get_product_details"])
+    catalog.get_product_details.side_effect = CATALOG.get
+    return CascadingEmailParser(
+        make_parser(cheap_result),
+        make_parser(strong_result),
+        catalog,
+        cheap_cost=0.001,
+        strong_cost=0.01,
+    )
+
+
+def test_cheap_answer_is_accepted_when_it_checks_out():
+    """Test that a valid cheap extraction never reaches the strong model."""
+    cascade = make_cascade(make_record(("DSK-0001", 2)), make_record())
+
+    record = cascade.parse_email_record("email")
+
+    assert record.items[0].sku == "DSK-0001"
+    cascade.strong_parser.parse_email_record.assert_not_called()
+    assert cascade.stats.escalation_rate == 0.0
+    assert cascade.stats.mean_cost == pytest.approx(0.001)
+
+
+@pytest.mark.parametrize(
+    ("cheap_result", "reason"),
+    [
+        (make_record(("DSK-9999", 2)), "unknown_sku"),
+        (make_record(("DSK-0001", 0)), "non_positive_quantity"),
+        (make_record(), "no_items"),
+        (ParsingError("Failed to parse email: bad date"), "parse_error"),
+    ],
+)
+def test_rejected_cheap_answers_escalate(cheap_result, reason):
+    """Test each escalation reason and the blended cost it incurs."""
+    strong_record = make_record(("DSK-0001", 3))
+    cascade = make_cascade(cheap_result, strong_record)
+
+    assert cascade.parse_email_record("email") is strong_record
+    assert cascade.stats.escalation_reasons == {reason: 1}
+    assert cascade.stats.mean_cost == pytest.approx(0.011)
+
+
+def test_rates_are_blended_over_emails():
+    """Test the escalation rate across accepted and escalated emails."""
+    cascade = make_cascade(make_record(("DSK-0001", 2)), make_record(("DSK-0001", 2)))
+    for _ in range(3):
+        cascade.parse_email_record("email")
+    cascade.cheap_parser.parse_email_record.side_effect = ParsingError("bad")
+    cascade.strong_parser.parse_email_record.side_effect = ParsingError("bad")
+
+    with pytest.raises(ParsingError):
+        asyncio.run(cascade.aparse_email_record("email"))
+
+    summary = cascade.stats.summary()
+    assert summary["emails"] == 4
+    assert summary["escalation_rate"] == 0.25
+    assert summary["failures"] == 1
+    assert summary["mean_cost"] == pytest.approx((4 * 0.001 + 0.01) / 4)
+
+
+class AsyncOnlyCatalog:
+    """Catalog whose lookups may only be awaited."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def get_product_details(self, sku: str):
+        raise AssertionError("blocking lookup on the async path")
+
+    async def aget_many(self, skus):
+        self.batches.append(list(skus))
+        return {sku: CATALOG.get(sku) for sku in skus}
+
+
+def test_async_path_uses_async_catalog_lookups():
+    """Test that the async cascade checks SKUs without blocking lookups."""
+    cascade = make_cascade(make_record(("DSK-9999", 2)), make_record(("DSK-0001", 1)))
+    cascade.catalog_source = AsyncOnlyCatalog()
+
+    record = asyncio.run(cascade.aparse_email_record("email"))
+
+    assert record.items[0].quantity == 1
+    assert cascade.catalog_source.batches == [["DSK-9999"]]
+    assert cascade.stats.escalation_reasons == {"unknown_sku": 1}
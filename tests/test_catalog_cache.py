@@ -0,0 +1,188 @@
+"""Tests for the read-through catalog cache."""
+
+import threading
+from typing import Optional
+
+from core.interfaces import CatalogDataSource
+from data_sources.caching import CachingCatalogDataSource
+from data_sources.catalog_csv import CsvCatalogDataSource
+from data_sources.catalog_delta import CatalogDelta
+from data_sources.http_inventory import HttpInventoryDataSource
+
+from .test_http_inventory import StubInventory, serve
+
+PRODUCTS = {"DSK-0001": {"name": "Desk", "stock": 10, "moq": 1}}
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class DictCatalog(CatalogDataSource):
+    """Catalog answering from a copy of ``PRODUCTS``, recording each batch."""
+
+    def __init__(self):
+        self.products = dict(PRODUCTS)
+        self.batches: list[list[str]] = []
+        self.similar_calls = 0
+        self.error: Optional[Exception] = None
+        self.release: Optional[threading.Event] = None
+
+    def get_product_details(self, sku: str) -> Optional[dict]:
+        return self.get_many([sku])[sku]
+
+    def get_many(self, skus) -> dict[str, Optional[dict]]:
+        self.batches.append(list(skus))
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return {sku: self.products.get(sku) for sku in skus}
+
+    def find_similar_products(self, sku: str) -> list[dict]:
+        self.similar_calls += 1
+        return [{"sku": "DSK-0001"}]
+
+
+def test_fresh_entries_are_served_from_cache():
+    """Test that misses are fetched together and hits skip the source."""
+    source = DictCatalog()
+    cache = CachingCatalogDataSource(source, ttl=60, clock=FakeClock())
+
+    first = cache.get_many(["DSK-0001", "DSK-0001", "TYPO-1"])
+    second = cache.get_many(["TYPO-1", "DSK-0001"])
+
+    assert first == second == {"DSK-0001": PRODUCTS["DSK-0001"], "TYPO-1": None}
+    assert source.batches == [["DSK-0001", "TYPO-1"]]
+    assert (cache.stats.misses, cache.stats.hits, cache.stats.negative_hits) == (
+        2,
+        1,
+        1,
+    )
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_unknown_skus_expire_after_negative_ttl():
+    """Test that typos are cached, including their suggestions, then retried."""
+    clock = FakeClock()
+    source = DictCatalog()
+    cache = CachingCatalogDataSource(
+        source, ttl=60, stale_ttl=0, negative_ttl=5, clock=clock
+    )
+
+    for _ in range(3):
+        assert cache.get_product_details("TYPO-1") is None
+        assert cache.find_similar_products("TYPO-1") == [{"sku": "DSK-0001"}]
+    clock.now = 6
+    cache.get_product_details("TYPO-1")
+    cache.find_similar_products("TYPO-1")
+
+    assert len(source.batches) == 2
+    assert source.similar_calls == 2
+
+
+def test_stale_entries_are_served_while_refreshed():
+    """Test stale-while-revalidate with a slow source."""
+    clock = FakeClock()
+    source = DictCatalog()
+    cache = CachingCatalogDataSource(source, ttl=60, stale_ttl=300, clock=clock)
+    cache.get_product_details("DSK-0001")
+
+    source.release = threading.Event()
+    source.products["DSK-0001"] = {"name": "Desk", "stock": 3, "moq": 1}
+    clock.now = 100
+    stale = [cache.get_product_details("DSK-0001") for _ in range(3)]
+    source.release.set()
+    assert cache.wait_for_refreshes(5)
+
+    assert [product["stock"] for product in stale] == [10, 10, 10]
+    assert cache.get_product_details("DSK-0001")["stock"] == 3
+    assert len(source.batches) == 2
+    assert (cache.stats.stale_hits, cache.stats.refreshes) == (3, 1)
+    cache.close()
+
+
+def test_failed_refresh_keeps_serving_until_expiry():
+    """Test that a refresh error leaves the stale entry in place."""
+    clock = FakeClock()
+    source = DictCatalog()
+    cache = CachingCatalogDataSource(source, ttl=60, stale_ttl=300, clock=clock)
+    cache.get_product_details("DSK-0001")
+
+    source.error = RuntimeError("backend down")
+    clock.now = 100
+    assert cache.get_product_details("DSK-0001")["stock"] == 10
+    assert cache.wait_for_refreshes(5)
+
+    assert cache.stats.refresh_errors == 1
+    assert cache.get_product_details("DSK-0001")["stock"] == 10
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted():
+    """Test the capacity bound."""
+    source = DictCatalog()
+    cache = CachingCatalogDataSource(source, capacity=2, clock=FakeClock())
+
+    cache.get_many(["A", "B"])
+    cache.get_product_details("A")
+    cache.get_product_details("C")
+    cache.get_many(["A", "C"])
+    cache.get_product_details("B")
+
+    assert cache.stats.evictions == 2
+    assert source.batches == [
+        ["A", "B"],
+        ["C"],
+        ["B"],
+    ]
+
+
+def test_csv_updates_invalidate_cached_products(delta_catalog_path):
+    """Test that wrapping a CSV catalog follows its stock deltas."""
+    catalog = CsvCatalogDataSource(delta_catalog_path)
+    cache = CachingCatalogDataSource(catalog, ttl=3600)
+    assert cache.get_product_details("DSK-0001")["stock"] == 10
+
+    catalog.apply_deltas([CatalogDelta("DSK-0001", stock_change=-4)])
+
+    assert cache.get_product_details("DSK-0001")["stock"] == 6
+    assert cache.get_category_index().get("DSK") is not None
+
+
+def test_unknown_skus_are_not_served_stale():
+    """Test that negative entries are fetched again once they expire."""
+    clock = FakeClock()
+    source = DictCatalog()
+    cache = CachingCatalogDataSource(
+        source, ttl=60, stale_ttl=300, negative_ttl=5, clock=clock
+    )
+    cache.get_product_details("NEW-1")
+
+    source.products["NEW-1"] = {"name": "New", "stock": 1, "moq": 1}
+    clock.now = 6
+
+    assert cache.get_product_details("NEW-1")["stock"] == 1
+    assert cache.stats.stale_hits == 0
+
+
+def test_updates_reach_the_cache_through_the_inventory_adapter(
+    delta_catalog_path,
+):
+    """Test that CSV deltas invalidate a cache over the HTTP inventory source."""
+    with serve(StubInventory()) as url:
+        catalog = CsvCatalogDataSource(delta_catalog_path)
+        inventory = HttpInventoryDataSource(catalog, url)
+        cache = CachingCatalogDataSource(inventory, ttl=3600)
+        assert cache.get_product_details("DSK-0001")["moq"] == 2
+
+        catalog.apply_deltas([CatalogDelta("DSK-0001", moq=3)])
+
+        assert cache.get_product_details("DSK-0001")["moq"] == 3
+        inventory.close()
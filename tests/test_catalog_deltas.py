@@ -0,0 +1,156 @@
+"""Tests for incremental catalog updates."""
+
+import pytest
+
+from core.exceptions import CatalogError
+from core.models import OrderItem
+from data_sources.catalog_csv import CsvCatalogDataSource
+from data_sources.catalog_delta import CatalogDelta
+from validation.catalog_validator import CatalogValidator
+
+
+def test_deltas_publish_a_new_snapshot(delta_catalog_path):
+    """Test that old snapshots stay unchanged while the catalog moves on."""
+    catalog = CsvCatalogDataSource(delta_catalog_path)
+    before = catalog.snapshot()
+
+    after = catalog.apply_deltas(
+        [
+            CatalogDelta("DSK-0001", stock_change=-3),
+            CatalogDelta("DSK-0001", stock_change=-1, price=90.0),
+            CatalogDelta("CHR-0001", moq=2),
+        ]
+    )
+
+    assert after.version == before.version + 1 == catalog.version
+    assert before.products["DSK-0001"]["stock"] == 10
+    assert catalog.get_product_details("DSK-0001")["stock"] == 6
+    assert catalog.get_product_details("DSK-0001")["price"] == 90.0
+    assert catalog.get_product_details("CHR-0001")["moq"] == 2
+    # Unchanged products are shared, not copied
+    assert after.products["DSK-0002"] is before.products["DSK-0002"]
+    assert catalog.get_category_index().get("DSK").total_stock == 11
+    # Only categories whose stock changed are copied
+    assert before.category_index.get("DSK").total_stock == 15
+    assert after.category_index.get("CHR") is before.category_index.get("CHR")
+
+
+def test_invalid_batch_changes_nothing(delta_catalog_path):
+    """Test that a batch with any invalid delta is rejected as a whole."""
+    catalog = CsvCatalogDataSource(delta_catalog_path)
+
+    with pytest.raises(CatalogError, match="UNKNOWN-1.*DSK-0002"):
+        catalog.apply_deltas(
+            [
+                CatalogDelta("DSK-0001", stock_change=-1),
+                CatalogDelta("UNKNOWN-1", stock_change=1),
+                CatalogDelta("DSK-0002", stock_change=-6),
+            ]
+        )
+
+    assert catalog.version == 0
+    assert catalog.get_product_details("DSK-0001")["stock"] == 10
+
+
+def test_delta_log_is_replayed_and_compacted(delta_catalog_path, tmp_path):
+    """Test that logged updates survive a restart and fold into the CSV."""
+    log_path = str(tmp_path / "catalog.deltas")
+    catalog = CsvCatalogDataSource(delta_catalog_path, delta_log_path=log_path)
+    catalog.apply_deltas([CatalogDelta("DSK-0001", stock_change=-3)])
+    catalog.apply_deltas([CatalogDelta("DSK-0002", stock=8, price=140.5)])
+    catalog.close()
+
+    restarted = CsvCatalogDataSource(delta_catalog_path, delta_log_path=log_path)
+    assert restarted.version == 2
+    assert restarted.get_product_details("DSK-0001")["stock"] == 7
+    assert restarted.get_product_details("DSK-0002")["stock"] == 8
+
+    restarted.compact()
+    restarted.close()
+    reloaded = CsvCatalogDataSource(delta_catalog_path)
+
+    assert reloaded.get_all_products() == restarted.get_all_products()
+    assert reloaded.get_product_details("DSK-0002")["price"] == 140.5
+    with open(log_path, "rb") as f:
+        assert f.read() == b""
+
+
+def test_compaction_keeps_missing_descriptions_empty(tmp_path):
+    """Test that empty description cells are not written back as NaN."""
+    path = tmp_path / "catalog.csv"
+    path.write_text(
+        "Product Code,Product Name,Price,Available Stock,Minimum Order Quantity,"
+        "Description\nDSK-0001,Desk ONE,,10,2,\n",
+        encoding="utf-8",
+    )
+    catalog = CsvCatalogDataSource(str(path))
+    assert catalog.get_product_details("DSK-0001")["description"] == ""
+
+    catalog.compact()
+
+    assert (
+        path.read_text(encoding="utf-8").splitlines()[1] == "DSK-0001,Desk ONE,,10,2,"
+    )
+
+
+def test_replaying_a_compacted_log_is_harmless(delta_catalog_path, tmp_path):
+    """Test a crash between rewriting the CSV and resetting the log."""
+    log_path = str(tmp_path / "catalog.deltas")
+    catalog = CsvCatalogDataSource(delta_catalog_path, delta_log_path=log_path)
+    catalog.apply_deltas([CatalogDelta("DSK-0001", stock_change=-3)])
+    catalog.close()
+    with open(log_path, "rb") as f:
+        log = f.read()
+    catalog = CsvCatalogDataSource(delta_catalog_path, delta_log_path=log_path)
+    catalog.compact()
+    catalog.close()
+    with open(log_path, "wb") as f:
+        f.write(log + b'{"version": 2, "prod')
+
+    restarted = CsvCatalogDataSource(delta_catalog_path, delta_log_path=log_path)
+
+    assert restarted.get_product_details("DSK-0001")["stock"] == 7
+
+
+def test_log_is_compacted_automatically(delta_catalog_path, tmp_path):
+    """Test compaction once the log reaches its entry limit."""
+    log_path = str(tmp_path / "catalog.deltas")
+    catalog = CsvCatalogDataSource(
+        delta_catalog_path, delta_log_path=log_path, compact_every=2
+    )
+    for _ in range(3):
+        catalog.apply_deltas([CatalogDelta("CHR-0001", stock_change=-1)])
+
+    assert (
+        CsvCatalogDataSource(delta_catalog_path).get_product_details("CHR-0001")[
+            "stock"
+        ]
+        == 18
+    )
+    assert catalog.get_product_details("CHR-0001")["stock"] == 17
+
+
+def test_stock_ledger_follows_catalog_updates(delta_catalog_path):
+    """Test that a validator's ledger sees stock deltas."""
+    validator = CatalogValidator.from_csv(delta_catalog_path, use_stock_ledger=True)
+    validator.stock_ledger.reserve({"DSK-0002": 2})
+
+    validator.catalog_source.apply_deltas([CatalogDelta("DSK-0002", stock_change=5)])
+
+    assert validator.stock_ledger.available("DSK-0002") == 8
+    assert validator.validate_item(OrderItem(sku="DSK-0002", quantity=8)).is_valid
+
+
+def test_catalog_updates_keep_committed_stock_deducted(delta_catalog_path):
+    """Test that price-only and stock deltas do not undo ledger commits."""
+    validator = CatalogValidator.from_csv(delta_catalog_path, use_stock_ledger=True)
+    ledger = validator.stock_ledger
+    catalog = validator.catalog_source
+    ledger.commit([ledger.reserve({"CHR-0001": 15}).reservation_id])
+
+    catalog.apply_deltas([CatalogDelta("CHR-0001", price=45.0)])
+    assert ledger.available("CHR-0001") == 5
+
+    catalog.apply_deltas([CatalogDelta("CHR-0001", stock_change=10)])
+    catalog.apply_deltas([CatalogDelta("CHR-0001", stock=25)])
+    assert ledger.available("CHR-0001") == 10
@@ -0,0 +1,123 @@
+"""Tests for background batch processing of uploaded emails."""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+from core.exceptions import ParsingError
+from parsing.email_parser import LangChainEmailParser
+from processing.email_batch import CANCELLED, DONE, FAILED, RUNNING, EmailBatch
+from processing.fake_llm import FakeProvider
+from processing.order_processor import SmartOrderProcessor
+from validation.result import ValidationResult
+
+EMAIL = """Hi,
+
+Please send 3 x DSK-0001.
+Ship to: 1 Main St
+Delivery by 2025-06-20.
+
+Jane Doe
+"""
+
+
+def make_processor(latency: float = 0.0) -> SmartOrderProcessor:
+    """Create a processor over the fake model that accepts every item."""
+    validator = Mock(spec=["validate_order"])
+    validator.validate_order.side_effect = lambda order, held=None: [
+        ValidationResult(True, "ok") for _ in order.items
+    ]
+    parser = LangChainEmailParser(FakeProvider().create_llm(latency=latency))
+    return SmartOrderProcessor(parser, validator)
+
+
+def test_batch_records_each_outcome():
+    """Test that orders and failures are kept per email, in upload order."""
+    processor = make_processor()
+    batch = EmailBatch(
+        processor,
+        [
+            ("a.txt", EMAIL),
+            ("b.txt", EMAIL.replace("2025-06-20", "2025-13-45")),
+            ("c.txt", EMAIL),
+        ],
+    )
+
+    batch.start()
+
+    assert batch.wait(5)
+    assert [item.status for item in batch.items] == [DONE, FAILED, DONE]
+    assert batch.items[0].order["items"][0] == {
+        "sku": "DSK-0001",
+        "quantity": 3,
+        "valid": True,
+        "notes": "ok",
+        "suggestions": [],
+    }
+    assert batch.items[1].error
+    assert batch.progress() == {DONE: 2, FAILED: 1}
+
+
+def test_cancel_interrupts_in_flight_llm_calls():
+    """Test that cancelling does not wait for slow model calls to return."""
+    batch = EmailBatch(
+        make_processor(latency=30),
+        [(f"{n}.txt", EMAIL) for n in range(20)],
+        max_concurrency=4,
+    )
+    batch.start()
+    deadline = time.monotonic() + 5
+    while batch.progress()[RUNNING] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    batch.cancel()
+
+    assert batch.wait(5)
+    assert batch.cancelled
+    assert batch.progress() == {CANCELLED: 20}
+
+
+def test_sync_parsers_run_off_the_event_loop():
+    """Test the async processor path for parsers without an async method."""
+    parser = Mock(spec=["parse_email_record"])
+    parser.parse_email_record.side_effect = ParsingError("Failed to parse email")
+    processor = SmartOrderProcessor(parser, Mock(spec=["validate_order"]))
+    batch = EmailBatch(processor, [("a.txt", "text")])
+
+    batch.start()
+
+    assert batch.wait(5)
+    assert batch.items[0].status == FAILED
+    assert batch.items[0].error == "Failed to parse email"
+
+
+def test_async_processing_matches_sync_processing():
+    """Test that both processor entry points produce the same order."""
+    processor = make_processor()
+
+    record = asyncio.run(processor.aprocess_order_record(EMAIL))
+
+    assert record.to_dict() == processor.process_order_record(EMAIL).to_dict()
+
+
+def test_finished_batch_combines_orders_for_one_delivery():
+    """Test that done emails for the same delivery are merged."""
+    batch = EmailBatch(
+        make_processor(),
+        [
+            ("a.txt", EMAIL),
+            ("b.txt", EMAIL.replace("2025-06-20", "2025-13-45")),
+            ("c.txt", EMAIL.replace("3 x", "2 x")),
+        ],
+    )
+    assert batch.consolidated() == []
+
+    batch.start()
+    assert batch.wait(5)
+    (delivery,) = batch.consolidated()
+
+    assert delivery.sources == [0, 2]
+    assert [(item.sku, item.quantity) for item in delivery.order.items] == [
+        ("DSK-0001", 5)
+    ]
+    assert batch.consolidated() is batch.consolidated()
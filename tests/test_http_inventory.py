@@ -0,0 +1,169 @@
+"""Tests for batched catalog lookups and the HTTP inventory adapter."""
+
+import json
+import threading
+from contextlib import contextmanager
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from unittest.mock import Mock
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from core.exceptions import CatalogError
+from core.models import Order, OrderItem
+from data_sources.http_inventory import HttpInventoryDataSource
+from validation.catalog_validator import CatalogValidator
+
+PRODUCTS = {
+    f"DSK-{n:04d}": {"name": f"Desk {n}", "moq": 1, "stock": 0} for n in range(250)
+}
+
+
+class StubInventory:
+    """Inventory service stub recording each request's SKUs and connection."""
+
+    def __init__(self, status: int = 200, gate: Optional[threading.Semaphore] = None):
+        self.status = status
+        self.gate = gate
+        self.requests: list[list[str]] = []
+        self.connections: set[tuple[str, int]] = set()
+        self.received = threading.Semaphore(0)
+
+    def handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                skus = parse_qs(url.query)["skus"][0].split(",")
+                stub.requests.append(skus)
+                stub.connections.add(self.client_address)
+                stub.received.release()
+                if stub.gate is not None:
+                    stub.gate.acquire(timeout=5)
+                # Every SKU has ten units except DSK-0002, which is omitted
+                stock = {sku: 10 for sku in skus if sku != "DSK-0002"}
+                body = json.dumps({"stock": stock}).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@contextmanager
+def serve(stub: StubInventory):
+    """Run the stub on an ephemeral port, yielding its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_catalog() -> Mock:
+    """Create a catalog stub that only supports single-SKU lookups."""
+    catalog = Mock(spec=["get_product_details", "find_similar_products"])
+    catalog.get_product_details.side_effect = PRODUCTS.get
+    catalog.find_similar_products.return_value = [
+        {"sku": "DSK-0003", "name": "Desk 3", "moq": 1, "stock": 0}
+    ]
+    return catalog
+
+
+def test_lookups_are_batched_over_one_kept_alive_connection():
+    """Test batching by size and reuse of the pooled connection."""
+    stub = StubInventory()
+    with serve(stub) as url:
+        source = HttpInventoryDataSource(make_catalog(), url, batch_size=100)
+        skus = list(PRODUCTS) + ["NOPE-1"]
+
+        first = source.get_many(skus)
+        second = source.get_many(skus)
+        source.close()
+
+    assert first == second
+    assert first["NOPE-1"] is None
+    assert first["DSK-0001"] == {"name": "Desk 1", "moq": 1, "stock": 10}
+    assert first["DSK-0002"]["stock"] == 0
+    assert [len(skus) for skus in stub.requests] == [100, 100, 50] * 2
+    assert len(stub.connections) == 1
+    assert source.pool.connections_opened == 1
+
+
+def test_concurrent_requests_for_a_sku_are_coalesced():
+    """Test that a SKU already being fetched is not requested again."""
+    stub = StubInventory(gate=threading.Semaphore(0))
+    with serve(stub) as url:
+        source = HttpInventoryDataSource(make_catalog(), url)
+        results = {}
+        first = threading.Thread(
+            target=lambda: results.update(a=source.get_many(["DSK-0001", "DSK-0004"]))
+        )
+        first.start()
+        assert stub.received.acquire(timeout=5)
+
+        second = threading.Thread(
+            target=lambda: results.update(b=source.get_many(["DSK-0004", "DSK-0005"]))
+        )
+        second.start()
+        assert stub.received.acquire(timeout=5)
+        stub.gate.release(2)
+        first.join(5)
+        second.join(5)
+        source.close()
+
+    assert sorted(stub.requests) == [["DSK-0001", "DSK-0004"], ["DSK-0005"]]
+    assert results["a"]["DSK-0004"] == results["b"]["DSK-0004"]
+    assert results["b"]["DSK-0005"]["stock"] == 10
+
+
+def test_validator_fetches_an_order_in_one_request():
+    """Test that the validator and suggestions use live stock."""
+    stub = StubInventory()
+    with serve(stub) as url:
+        validator = CatalogValidator(HttpInventoryDataSource(make_catalog(), url))
+        order = Order(
+            customer="Jane Doe",
+            address="1 Main St",
+            delivery_date=date(2025, 6, 20),
+            items=[
+                OrderItem(sku="DSK-0001", quantity=4),
+                OrderItem(sku="DSK-0002", quantity=1),
+                OrderItem(sku="DSK-0001", quantity=4),
+                OrderItem(sku="XYZ-9999", quantity=1),
+            ],
+        )
+
+        results = validator.validate_order(order)
+
+    assert [result.is_valid for result in results] == [True, False, True, False]
+    assert stub.requests[0] == ["DSK-0001", "DSK-0002"]
+    assert results[3].suggestions == [
+        {"sku": "DSK-0003", "name": "Desk 3", "moq": 1, "stock": 10}
+    ]
+
+
+def test_service_errors_raise_catalog_errors():
+    """Test that failed requests surface as catalog errors."""
+    with serve(StubInventory(status=503)) as url:
+        source = HttpInventoryDataSource(make_catalog(), url)
+        with pytest.raises(CatalogError, match="HTTP 503"):
+            source.get_product_details("DSK-0001")
+
+    source = HttpInventoryDataSource(make_catalog(), url, timeout=1)
+    with pytest.raises(CatalogError, match="unreachable"):
+        source.get_many(["DSK-0001"])
+    assert source.get_many(["NOPE-1"]) == {"NOPE-1": None}
@@ -0,0 +1,59 @@
+"""Import-time regression tests."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time allowed for ``core`` plus ``validation``, measured
+# at roughly 150ms (mostly Pydantic) on a development machine
+IMPORT_BUDGET_US = 400_000
+
+HEAVY_MODULES = ("pandas", "numpy", "langchain_openai", "langchain_core", "streamlit")
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter in the project root."""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def top_level_import_times(importtime_output: str) -> dict[str, int]:
+    """Get the cumulative microseconds of each top-level import."""
+    times = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented beyond the single separating space
+        name = name[1:]
+        if cumulative.strip().isdigit() and not name.startswith(" "):
+            times[name] = int(cumulative)
+    return times
+
+
+def test_core_and_validation_import_within_budget():
+    """Test that importing core and validation stays under the startup budget."""
+    result = run_python("-X", "importtime", "-c", "import core, validation")
+
+    times = top_level_import_times(result.stderr)
+
+    assert times["core"] + times["validation"] < IMPORT_BUDGET_US
+
+
+def test_packages_do_not_import_heavy_dependencies():
+    """Test that package imports defer pandas, NumPy, LLM SDKs and Streamlit."""
+    code = (
+        "import sys, core, validation, processing, data_sources, ui\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+
+    result = run_python("-c", code)
+
+    assert result.stdout.strip() == ""
@@ -0,0 +1,213 @@
+"""Tests for incremental mailbox ingestion."""
+
+import mailbox
+from email.message import EmailMessage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pytest
+
+from ingestion.checkpoint import IngestionCheckpoint
+from ingestion.ingestor import MailboxIngestor
+from ingestion.mime_text import message_text
+from ingestion.sources import MaildirSource, MboxSource, parse_message
+from jobs.sqlite_queue import SqliteJobQueue
+
+
+def make_message(body: str, message_id: str, subject: str = "Order") -> EmailMessage:
+    """Create a plain-text message."""
+    message = EmailMessage()
+    message["From"] = "john@example.com"
+    message["Subject"] = subject
+    message["Message-ID"] = message_id
+    message.set_content(body)
+    return message
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    """Create a checkpoint database."""
+    return IngestionCheckpoint(str(tmp_path / "checkpoint.db"))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """Create a job queue database."""
+    return SqliteJobQueue(str(tmp_path / "jobs.db"))
+
+
+def drain(queue: SqliteJobQueue) -> list[str]:
+    """Lease and complete every job, returning the payloads."""
+    payloads = []
+    while jobs := queue.lease():
+        payloads.append(jobs[0].payload)
+        queue.complete(jobs[0])
+    return payloads
+
+
+def test_plain_part_is_preferred_over_html():
+    """Test that the plain alternative is chosen and attachments are ignored."""
+    message = MIMEMultipart("mixed")
+    alternative = MIMEMultipart("alternative")
+    alternative.attach(MIMEText("<p>html body</p>", "html"))
+    alternative.attach(MIMEText("2 x DSK-0001", "plain"))
+    message.attach(alternative)
+    attachment = MIMEText("not the body", "plain")
+    attachment.add_header("Content-Disposition", "attachment", filename="a.txt")
+    message.attach(attachment)
+    message["Subject"] = "Order"
+
+    text = message_text(parse_message(message.as_bytes()))
+
+    assert text == "Subject: Order\n\n2 x DSK-0001"
+
+
+def test_html_only_message_is_converted_to_text():
+    """Test that HTML bodies are reduced to their visible text."""
+    message = MIMEText(
+        "<html><style>p {}</style><p>Hello</p><ul><li>3 x CHR-0002</li></ul></html>",
+        "html",
+    )
+
+    assert message_text(parse_message(message.as_bytes())) == "Hello\n3 x CHR-0002"
+
+
+def test_charsets_are_decoded_with_fallback():
+    """Test declared charsets, and mislabelled bytes that fail to decode."""
+    latin = MIMEText("Königstraße 45", "plain", "iso-8859-1")
+    mislabelled = parse_message(
+        b"Content-Type: text/plain; charset=utf-8\n\nK\xf6nigstra\xdfe 45\n"
+    )
+    unknown = parse_message(
+        b"Content-Type: text/plain; charset=x-unknown\n\nplain ascii\n"
+    )
+
+    assert message_text(parse_message(latin.as_bytes())) == "Königstraße 45"
+    assert message_text(mislabelled) == "Königstraße 45"
+    assert message_text(unknown) == "plain ascii"
+
+
+def test_mbox_is_ingested_incrementally(tmp_path, checkpoint, queue):
+    """Test that only messages appended since the last poll are enqueued."""
+    path = str(tmp_path / "orders.mbox")
+    box = mailbox.mbox(path)
+    box.add(make_message("first", "<1@example.com>"))
+    box.add(make_message("From the warehouse: second", "<2@example.com>"))
+    box.flush()
+    ingestor = MailboxIngestor(MboxSource(path), checkpoint, queue, batch_size=1)
+
+    # The last message waits for the next separator or a second poll
+    assert ingestor.poll() == 1
+    assert ingestor.poll() == 1
+    assert ingestor.poll() == 0
+    box.add(make_message("third", "<3@example.com>"))
+    box.flush()
+    assert ingestor.poll() == 0
+    assert ingestor.poll() == 1
+
+    payloads = drain(queue)
+    assert [payload.rsplit("\n", 1)[-1] for payload in payloads] == [
+        "first",
+        "From the warehouse: second",
+        "third",
+    ]
+
+
+def test_mbox_resumes_from_checkpoint_offset(tmp_path, checkpoint, queue, mocker):
+    """Test that a restarted ingestor does not re-read processed messages."""
+    path = str(tmp_path / "orders.mbox")
+    box = mailbox.mbox(path)
+    for n in range(3):
+        box.add(make_message(f"order {n}", f"<{n}@example.com>"))
+    box.flush()
+    ingestor = MailboxIngestor(MboxSource(path), checkpoint, queue)
+    assert ingestor.poll() + ingestor.poll() == 3
+
+    parse = mocker.spy(MboxSource, "_iter_raw")
+    restarted = MailboxIngestor(MboxSource(path), checkpoint, queue)
+
+    assert restarted.poll() == 0
+    assert list(parse.spy_return) == []
+
+
+def test_maildir_skips_processed_messages_without_opening_them(
+    tmp_path, checkpoint, queue, mocker
+):
+    """Test that Maildir messages are checkpointed by their unique name."""
+    box = mailbox.Maildir(str(tmp_path / "Maildir"))
+    box.add(make_message("first", "<1@example.com>"))
+    ingestor = MailboxIngestor(
+        MaildirSource(str(tmp_path / "Maildir")), checkpoint, queue
+    )
+    assert ingestor.poll() == 1
+
+    # A mail client moving the message to cur/ does not make it new again
+    key = next(iter(box.keys()))
+    moved = box[key]
+    moved.set_subdir("cur")
+    box[key] = moved
+    box.add(make_message("second", "<2@example.com>"))
+    opened = mocker.spy(MaildirSource, "_read_new")
+
+    assert ingestor.poll() == 1
+    assert len(drain(queue)) == 2
+    assert opened.call_count == 1
+
+
+def test_full_queue_pauses_without_losing_messages(tmp_path, checkpoint):
+    """Test that messages rejected by a full queue are enqueued on a later poll."""
+    path = str(tmp_path / "orders.mbox")
+    box = mailbox.mbox(path)
+    for n in range(5):
+        box.add(make_message(f"order {n}", f"<{n}@example.com>"))
+    box.flush()
+    queue = SqliteJobQueue(str(tmp_path / "jobs.db"), max_depth=2)
+    ingestor = MailboxIngestor(MboxSource(path), checkpoint, queue, batch_size=2)
+
+    assert ingestor.poll() == 2
+    drain(queue)
+    assert ingestor.poll() == 2
+    drain(queue)
+    assert ingestor.poll() == 1
+
+
+def test_mbox_message_being_appended_is_not_split(tmp_path, checkpoint, queue):
+    """Test that a trailing message is read only once its size is stable."""
+    path = tmp_path / "orders.mbox"
+    path.write_bytes(
+        b"From a@example.com Mon Jun 16 10:00:00 2025\n"
+        b"Message-ID: <1@example.com>\n\nfirst line\n"
+    )
+    ingestor = MailboxIngestor(MboxSource(str(path)), checkpoint, queue)
+
+    assert ingestor.poll() == 0
+    with open(path, "ab") as f:
+        f.write(b"second line\n")
+    assert ingestor.poll() == 0
+    assert ingestor.poll() == 1
+
+    assert drain(queue) == ["first line\nsecond line"]
+
+
+def test_checkpoint_filters_large_id_sets(checkpoint):
+    """Test lookups spanning several query chunks."""
+    checkpoint.record(f"id-{n}" for n in range(0, 2000, 2))
+
+    new = checkpoint.filter_new(f"id-{n}" for n in range(2000))
+
+    assert new == [f"id-{n}" for n in range(1, 2000, 2)]
+
+
+def test_one_shot_runs_read_the_last_mbox_message(tmp_path, checkpoint, queue):
+    """Test that the size seen by one run completes the last message in the next."""
+    path = str(tmp_path / "orders.mbox")
+    box = mailbox.mbox(path)
+    box.add(make_message("first", "<1@example.com>"))
+    box.add(make_message("second", "<2@example.com>"))
+    box.flush()
+
+    counts = [
+        MailboxIngestor(MboxSource(path), checkpoint, queue).poll() for _ in range(3)
+    ]
+
+    assert counts == [1, 1, 0]
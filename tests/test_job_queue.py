@@ -0,0 +1,228 @@
+"""Tests for the durable SQLite job queue and its worker pool."""
+
+import threading
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+
+from core.exceptions import ParsingError, QueueFullError
+from core.records import OrderItemRecord, OrderRecord
+from jobs.sqlite_queue import SqliteJobQueue
+from jobs.worker_pool import QueueWorkerPool
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Create a controllable clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    """Create a small queue in a temporary database."""
+    return SqliteJobQueue(
+        str(tmp_path / "jobs.db"),
+        max_depth=3,
+        visibility_timeout=30,
+        max_attempts=2,
+        backoff_base=10,
+        clock=clock,
+    )
+
+
+def make_record(email_text: str) -> OrderRecord:
+    """Create an order record for an email."""
+    return OrderRecord(
+        email_text, "1 Main St", date(2025, 6, 20), [OrderItemRecord("DSK-0001", 1)]
+    )
+
+
+def test_leased_job_is_hidden_until_visibility_timeout(queue, clock):
+    """Test that an unfinished lease makes the job visible again."""
+    queue.enqueue("email")
+    [job] = queue.lease()
+
+    assert queue.lease() == []
+    clock.now += 31
+    [retry] = queue.lease()
+    assert retry.job_id == job.job_id
+    assert retry.attempts == 2
+
+
+def test_completed_job_is_removed(queue):
+    """Test that completing a job removes it from the queue."""
+    queue.enqueue("email")
+    [job] = queue.lease()
+
+    assert queue.complete(job)
+    assert queue.stats().depth == 0
+
+
+def test_stale_lease_cannot_complete(queue, clock):
+    """Test that a worker whose lease expired cannot complete the job."""
+    queue.enqueue("email")
+    [stale] = queue.lease()
+    clock.now += 31
+    [current] = queue.lease()
+
+    assert not queue.complete(stale)
+    assert queue.complete(current)
+
+
+def test_failed_job_retries_with_backoff_then_dead_letters(queue, clock):
+    """Test that failures back off and end in the dead-letter table."""
+    queue.enqueue("email")
+    [job] = queue.lease()
+    queue.fail(job, "LLM unavailable")
+
+    assert queue.lease() == []
+    assert queue.stats().delayed == 1
+    clock.now += 10
+    [job] = queue.lease()
+    queue.fail(job, "LLM unavailable")
+
+    stats = queue.stats()
+    assert (stats.depth, stats.dead_letters) == (0, 1)
+    [dead] = queue.dead_letters()
+    assert (dead.payload, dead.attempts, dead.last_error) == (
+        "email",
+        2,
+        "LLM unavailable",
+    )
+
+
+def test_dead_letter_can_be_requeued(queue, clock):
+    """Test that a dead-lettered job can be put back with fresh attempts."""
+    job_id = queue.enqueue("email")
+    for _ in range(2):
+        [job] = queue.lease()
+        queue.fail(job, "boom")
+        clock.now += 10
+
+    assert queue.requeue_dead_letter(job_id)
+    [job] = queue.lease()
+    assert (job.job_id, job.attempts) == (job_id, 1)
+    assert queue.stats().dead_letters == 0
+
+
+def test_enqueue_applies_backpressure(queue):
+    """Test that enqueueing beyond max_depth is rejected as a whole."""
+    queue.enqueue_many(["a", "b"])
+
+    with pytest.raises(QueueFullError) as exc_info:
+        queue.enqueue_many(["c", "d"])
+
+    assert exc_info.value.depth == 2
+    assert queue.stats().depth == 2
+
+
+def test_stats_report_age_of_oldest_ready_job(queue, clock):
+    """Test queue depth and age metrics."""
+    queue.enqueue("old")
+    clock.now += 5
+    queue.enqueue("new")
+    queue.enqueue("later", delay=60)
+
+    stats = queue.stats()
+
+    assert (stats.depth, stats.ready, stats.delayed) == (3, 2, 1)
+    assert stats.oldest_ready_age == 5
+
+
+def test_jobs_survive_reopening_the_database(tmp_path):
+    """Test that queued jobs are durable across queue instances."""
+    path = str(tmp_path / "jobs.db")
+    SqliteJobQueue(path).enqueue("email")
+
+    [job] = SqliteJobQueue(path).lease()
+
+    assert job.payload == "email"
+
+
+def test_worker_pool_completes_successes_and_fails_errors(queue):
+    """Test that workers hand results over and retry only transient errors."""
+
+    def process_order_record(email_text: str) -> OrderRecord:
+        if email_text == "bad":
+            raise ParsingError("Failed to parse email")
+        if email_text == "flaky":
+            raise ParsingError("Failed to parse email") from ConnectionResetError()
+        return make_record(email_text)
+
+    processor = Mock(
+        spec=["process_order_record", "commit_reservations", "release_reservation"]
+    )
+    processor.process_order_record.side_effect = process_order_record
+    results = []
+    pool = QueueWorkerPool(
+        queue, processor, result_handler=lambda job, order: results.append(order)
+    )
+    queue.enqueue_many(["good", "bad", "flaky"])
+
+    pool.run_until_empty()
+
+    assert [order.customer for order in results] == ["good"]
+    processor.commit_reservations.assert_called_once_with(results)
+    stats = queue.stats()
+    assert (stats.depth, stats.delayed, stats.dead_letters) == (1, 1, 1)
+    assert [letter.payload for letter in queue.dead_letters()] == ["bad"]
+
+
+def test_handler_failure_releases_reserved_stock(queue):
+    """Test that an order the handler rejects gives its stock back."""
+    processor = Mock(
+        spec=["process_order_record", "commit_reservations", "release_reservation"]
+    )
+    processor.process_order_record.side_effect = make_record
+
+    def reject(job, order):
+        raise OSError("disk full")
+
+    pool = QueueWorkerPool(queue, processor, result_handler=reject)
+    queue.enqueue("email")
+
+    pool.run_until_empty()
+
+    (order,) = processor.release_reservation.call_args[0]
+    assert order.customer == "email"
+    processor.commit_reservations.assert_not_called()
+    assert queue.stats().delayed == 1
+
+
+def test_worker_threads_drain_the_queue(tmp_path):
+    """Test that background workers process every job exactly once."""
+    queue = SqliteJobQueue(str(tmp_path / "jobs.db"))
+    processor = Mock(
+        spec=["process_order_record", "commit_reservations", "release_reservation"]
+    )
+    processor.process_order_record.side_effect = make_record
+    seen = []
+    lock = threading.Lock()
+
+    def handle(job, order):
+        with lock:
+            seen.append(order.customer)
+
+    queue.enqueue_many(f"email {n}" for n in range(40))
+    pool = QueueWorkerPool(
+        queue, processor, workers=4, result_handler=handle, poll_interval=0.01
+    )
+    pool.start()
+    for _ in range(500):
+        if queue.stats().depth == 0:
+            break
+        threading.Event().wait(0.01)
+    pool.stop()
+
+    assert sorted(seen) == sorted(f"email {n}" for n in range(40))
@@ -0,0 +1,106 @@
+"""Tests for local repair of malformed LLM replies."""
+
+import json
+
+import pytest
+
+from core.exceptions import ParsingError
+from parsing.email_parser import LangChainEmailParser
+from parsing.json_repair import repair_json, salvage_reply
+
+HEADER = (
+    '{"customer_name": "Jane Doe", "delivery_address": "1 Main St", '
+    '"delivery_date": "2025-06-20", '
+)
+ITEMS = (
+    '"items": [{"sku": "DSK-0001", "quantity": 2}, {"sku": "CHR-0002", "quantity": 12}'
+)
+COMPLETE_REPLY = HEADER + ITEMS + "]}"
+
+
+def make_llm(*replies: str):
+    """Create a chat model stub answering with ``replies`` in turn."""
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    prompts = []
+
+    def respond(prompt_value):
+        prompts.append(prompt_value.to_string())
+        return AIMessage(content=replies[len(prompts) - 1])
+
+    return RunnableLambda(respond), prompts
+
+
+def test_prose_fences_and_trailing_commas_are_repaired():
+    """Test that a wrapped object with trailing commas is fully recovered."""
+    reply = f"Here is the order:\n```json\n{HEADER}{ITEMS},],}}\n```\nLet me know!"
+
+    salvaged = salvage_reply(reply)
+
+    assert salvaged.missing == []
+    assert salvaged.fields == json.loads(COMPLETE_REPLY)
+
+
+def test_truncated_reply_keeps_only_complete_elements():
+    """Test that a cut-off item is dropped rather than misread."""
+    data, truncated = repair_json(HEADER + ITEMS[:-2])
+
+    assert truncated
+    assert data["items"] == [{"sku": "DSK-0001", "quantity": 2}, {"sku": "CHR-0002"}]
+
+    salvaged = salvage_reply(HEADER + ITEMS[:-2])
+    assert salvaged.fields["items"] == [{"sku": "DSK-0001", "quantity": 2}]
+    assert salvaged.missing == ["items"]
+    assert salvage_reply("I could not find an order in this email.") is None
+
+
+def test_parser_repairs_reply_without_another_call():
+    """Test that a locally repairable reply costs no extra LLM call."""
+    llm, prompts = make_llm(f"Sure!\n{HEADER}{ITEMS},]}}")
+    parser = LangChainEmailParser(llm)
+
+    record = parser.parse_email_record("email")
+
+    assert [item.quantity for item in record.items] == [2, 12]
+    assert len(prompts) == 1
+    assert parser.repair_stats.calls_avoided == 1
+    assert parser.repair_stats.repair_rate == 1.0
+
+
+def test_parser_asks_only_for_missing_items():
+    """Test that a truncated reply is completed by a targeted follow-up."""
+    followup = '{"items": [{"sku": "CHR-0002", "quantity": 12}]}'
+    llm, prompts = make_llm(HEADER + ITEMS[:-2], followup)
+    parser = LangChainEmailParser(llm)
+
+    record = parser.parse_email_record("email")
+
+    assert [(item.sku, item.quantity) for item in record.items] == [
+        ("DSK-0001", 2),
+        ("CHR-0002", 12),
+    ]
+    assert "containing only these fields: items" in prompts[1]
+    assert '"DSK-0001"' in prompts[1]
+    assert parser.repair_stats.completed == 1
+    assert parser.repair_stats.followup_calls == 1
+
+
+def test_unusable_reply_still_fails():
+    """Test that replies with nothing to salvage raise a parsing error."""
+    llm, _ = make_llm("No order here.")
+    parser = LangChainEmailParser(llm)
+
+    with pytest.raises(ParsingError):
+        parser.parse_email_record("email")
+    assert parser.repair_stats.failed == 1
+
+
+@pytest.mark.parametrize("sku", ["12345", "null", '""', "true"])
+def test_non_string_skus_are_parsing_errors(sku):
+    """Test that SKUs of the wrong type fail parsing instead of validation."""
+    llm, _ = make_llm(HEADER + f'"items": [{{"sku": {sku}, "quantity": 2}}]}}')
+    parser = LangChainEmailParser(llm)
+
+    with pytest.raises(ParsingError):
+        parser.parse_email_record("email")
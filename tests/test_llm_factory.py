@@ -0,0 +1,61 @@
+"""Tests for the LLM provider registry."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from core.exceptions import LLMError
+from core.interfaces import LLMProvider
+from processing.fake_llm import FakeProvider, register_fake_provider
+from processing.llm_factory import LLMFactory
+
+
+class StubProvider(LLMProvider):
+    """Provider returning a fixed model."""
+
+    def create_llm(self, **kwargs):
+        return ("stub-llm", kwargs)
+
+    def get_default_config(self) -> dict:
+        return {}
+
+
+@pytest.fixture(autouse=True)
+def restore_registry(monkeypatch):
+    """Isolate registry changes made by each test."""
+    monkeypatch.setattr(LLMFactory, "_providers", dict(LLMFactory._providers))
+    monkeypatch.setattr(LLMFactory, "_instances", {})
+
+
+def test_factory_is_instantiated_once_on_first_use():
+    """Test that a registered factory is called lazily and its provider reused."""
+    factory = Mock(side_effect=StubProvider)
+    LLMFactory.register_provider("stub", factory)
+
+    factory.assert_not_called()
+    assert LLMFactory.create_llm("stub", model="m") == ("stub-llm", {"model": "m"})
+    LLMFactory.create_llm("stub")
+    factory.assert_called_once_with()
+
+
+def test_registering_an_instance_still_works():
+    """Test that provider instances can be registered directly."""
+    provider = StubProvider()
+    LLMFactory.register_provider("stub", provider)
+
+    assert LLMFactory.get_provider("stub") is provider
+
+
+def test_unknown_provider_raises():
+    """Test that unknown providers raise LLMError."""
+    with pytest.raises(LLMError, match="Unknown provider"):
+        LLMFactory.create_llm("missing")
+
+
+def test_fake_provider_is_only_registered_on_request():
+    """Test that the offline provider stays out of the app's provider list."""
+    assert "fake" not in LLMFactory.get_available_providers()
+
+    register_fake_provider()
+
+    assert isinstance(LLMFactory.get_provider("fake"), FakeProvider)
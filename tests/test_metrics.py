@@ -0,0 +1,146 @@
+"""Tests for the metrics registry and its OpenMetrics export."""
+
+import asyncio
+import json
+
+import pytest
+
+from core.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    OVERFLOW_LABEL_VALUE,
+    Metric,
+    MetricsRegistry,
+    TextfileExporter,
+)
+from parsing.email_parser import LLM_TOKENS, LangChainEmailParser
+from service.order_service import OrderService
+from service.server import OrderHttpServer
+
+from .test_service import make_processor
+
+
+def test_openmetrics_text_format():
+    """Test the exported text of each metric type."""
+    registry = MetricsRegistry()
+    orders = registry.counter("orders", "Orders seen.", ("outcome",))
+    in_flight = registry.gauge("in_flight", "Orders in flight.")
+    latency = registry.histogram(
+        "latency_seconds", "Latency.", buckets=(0.1, 1), unit="seconds"
+    )
+
+    orders.labels("ok").inc()
+    orders.labels(outcome="ok").inc(2)
+    in_flight.inc()
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+
+    assert registry.render() == (
+        "# TYPE in_flight gauge\n"
+        "# HELP in_flight Orders in flight.\n"
+        "in_flight 1.0\n"
+        "# TYPE latency_seconds histogram\n"
+        "# UNIT latency_seconds seconds\n"
+        "# HELP latency_seconds Latency.\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1.0"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_count 3\n"
+        "latency_seconds_sum 5.55\n"
+        "# TYPE orders counter\n"
+        "# HELP orders Orders seen.\n"
+        'orders_total{outcome="ok"} 3.0\n'
+        "# EOF\n"
+    )
+
+
+def test_label_sets_beyond_the_cap_share_one_series(tmp_path):
+    """Test that unbounded label values cannot grow the series count."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests.", ("path",), max_series=2)
+
+    for n in range(10):
+        requests.labels(f"/path/{n}").inc()
+
+    values = {labels: series.value for labels, series in requests.series()}
+    assert values == {
+        ("/path/0",): 1.0,
+        ("/path/1",): 1.0,
+        (OVERFLOW_LABEL_VALUE,): 8.0,
+    }
+    assert registry.counter("requests", "Requests.", ("path",)) is requests
+
+    exporter = TextfileExporter(str(tmp_path / "orders.prom"), registry)
+    exporter.stop()
+    assert (tmp_path / "orders.prom").read_text().endswith("# EOF\n")
+
+
+def test_incomplete_metric_types_cannot_be_created():
+    """Test that metric subclasses must implement the series hooks."""
+
+    class Incomplete(Metric):
+        type_name = "unknown"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Missing hooks.")
+
+
+def test_parser_records_token_usage():
+    """Test that usage metadata on the model reply is counted."""
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    reply = {
+        "customer_name": "Jane",
+        "delivery_address": "1 Main St",
+        "delivery_date": "2025-06-20",
+        "items": [{"sku": "DSK-0001", "quantity": 2}],
+    }
+    llm = RunnableLambda(
+        lambda _prompt: AIMessage(
+            content=json.dumps(reply),
+            usage_metadata={
+                "input_tokens": 120,
+                "output_tokens": 30,
+                "total_tokens": 150,
+            },
+        )
+    )
+    input_tokens = LLM_TOKENS.labels("extract", "input")
+    before = input_tokens.value
+
+    record = LangChainEmailParser(llm).parse_email_record("email")
+
+    assert record.items[0].sku == "DSK-0001"
+    assert input_tokens.value - before == 120
+
+
+def test_service_serves_metrics():
+    """Test the /metrics endpoint after a request."""
+
+    async def get(port: int, method: str, path: str, body: bytes = b"") -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode()
+            + body
+        )
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def main():
+        server = OrderHttpServer(OrderService(make_processor()), port=0)
+        await server.start()
+        try:
+            await get(server.bound_port, "POST", "/orders", b'{"email": "hi"}')
+            return await get(server.bound_port, "GET", "/metrics")
+        finally:
+            await server.shutdown()
+
+    head, _, body = asyncio.run(main()).partition(b"\r\n\r\n")
+    text = body.decode()
+
+    assert f"Content-Type: {OPENMETRICS_CONTENT_TYPE}".encode() in head
+    assert 'http_requests_total{route="/orders",status="200"}' in text
+    assert "service_orders_in_flight 0.0" in text
+    assert text.endswith("# EOF\n")
@@ -0,0 +1,102 @@
+"""Tests for the MOQ redistribution solver."""
+
+import itertools
+import random
+import time
+
+import pytest
+
+from processing.moq_solver import MoqRedistributionSolver, RedistributionLine
+
+
+def brute_force(lines):
+    """Find the best (satisfied count, deviation) by enumerating all splits."""
+    total = min(
+        sum(line.requested for line in lines), sum(line.stock for line in lines)
+    )
+    best = None
+    for quantities in itertools.product(*(range(line.stock + 1) for line in lines)):
+        if sum(quantities) != total:
+            continue
+        satisfied = sum(q >= line.moq for q, line in zip(quantities, lines))
+        deviation = sum(abs(q - line.requested) for q, line in zip(quantities, lines))
+        if best is None or (satisfied, -deviation) > (best[0], -best[1]):
+            best = (satisfied, deviation)
+    return best
+
+
+@pytest.fixture
+def solver():
+    """Create a solver with generous limits."""
+    return MoqRedistributionSolver(time_limit=5, node_limit=1_000_000)
+
+
+def test_greedy_counterexample(solver):
+    """Test a case where satisfying the highest MOQ first is suboptimal."""
+    lines = [
+        RedistributionLine("CHR-0001", requested=4, moq=8, stock=50),
+        RedistributionLine("CHR-0002", requested=3, moq=4, stock=50),
+        RedistributionLine("CHR-0003", requested=2, moq=4, stock=50),
+    ]
+
+    plan = solver.solve(lines)
+
+    assert plan.satisfied == [False, True, True]
+    assert sum(plan.quantities) == 9
+    assert plan.quantities == [1, 4, 4]
+    assert plan.optimal
+
+
+def test_respects_stock_caps(solver):
+    """Test that suggestions never exceed stock."""
+    lines = [
+        RedistributionLine("DSK-0001", requested=1, moq=5, stock=6),
+        RedistributionLine("DSK-0002", requested=9, moq=10, stock=3),
+    ]
+
+    plan = solver.solve(lines)
+
+    assert plan.quantities[1] <= 3
+    assert plan.satisfied == [True, False]
+
+
+def test_matches_brute_force_on_small_cases(solver):
+    """Test optimality against exhaustive search."""
+    rng = random.Random(7)
+    for _ in range(60):
+        lines = [
+            RedistributionLine(
+                f"SKU-{i}",
+                requested=rng.randint(1, 6),
+                moq=rng.randint(1, 8),
+                stock=rng.randint(0, 8),
+            )
+            for i in range(rng.randint(2, 4))
+        ]
+        plan = solver.solve(lines)
+        expected = brute_force(lines)
+
+        assert (plan.satisfied_count, plan.deviation) == expected
+
+
+def test_large_orders_stay_within_time_limit():
+    """Test that 150-line groups return promptly with a usable plan."""
+    rng = random.Random(3)
+    lines = [
+        RedistributionLine(
+            f"SKU-{i}",
+            requested=rng.randint(1, 9),
+            moq=rng.randint(2, 12),
+            stock=rng.randint(5, 40),
+        )
+        for i in range(150)
+    ]
+    solver = MoqRedistributionSolver(time_limit=0.05)
+
+    start = time.perf_counter()
+    plan = solver.solve(lines)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert plan.satisfied_count > 0
+    assert sum(plan.quantities) == sum(line.requested for line in lines)
@@ -0,0 +1,232 @@
+"""Tests for near-duplicate email detection."""
+
+import asyncio
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+
+from core.models import Order, OrderItem
+from core.records import OrderRecord
+from parsing.dedup_parser import NearDuplicateEmailParser
+from parsing.simhash_index import (
+    MAX_STORED_TEXT_CHARS,
+    SimHashIndex,
+    clean_email_body,
+    simhash,
+    strip_header_block,
+)
+
+REORDER_EMAIL = """
+From: John Smith <john.smith@email.com>
+Subject: Weekly reorder
+
+Hi team,
+
+Please send our usual weekly restock to the showroom:
+
+- 9 x Coffee STRADAL 620 (CFT-0151)
+- 2 x Loveseat HEMNHOLM 512 (LVS-0426)
+- 10 x Sofa VIKTMARK 446 (SFA-0126)
+- 8 x Wardrobe LUNDLUND 757 (WRD-0251)
+- 4 x Ottoman TRANSUND 415 (OTM-0451)
+- 6 x Console KALLSTA 405 (CST-0476)
+
+Ship to: John Smith, 123 Maple Street, Springfield, IL 62704
+Delivery by June 20, 2025 if possible.
+
+Let me know if anything is out of stock, and thanks again for the quick turnaround
+on the last shipment. The showroom team was very happy with it.
+
+Thanks,
+John Smith
+"""
+
+CHANGED_EMAIL = REORDER_EMAIL.replace("10 x Sofa", "12 x Sofa")
+
+UNRELATED_EMAIL = """
+Hello,
+
+Could you quote three recliners and a bar stool for our new office lounge?
+We need them delivered to 9 Harbour Road, Portsmouth before the end of August.
+
+Regards,
+Jane Doe
+"""
+
+
+@pytest.fixture
+def previous_order():
+    """Create the extraction for the original email."""
+    return Order(
+        customer="John Smith",
+        address="123 Maple Street, Springfield, IL 62704",
+        delivery_date=date(2025, 6, 20),
+        items=[OrderItem(sku="SFA-0126", quantity=10)],
+    )
+
+
+def test_clean_email_body_drops_headers_and_quotes():
+    """Test that headers, quoted replies and case differences are removed."""
+    cleaned = clean_email_body("Subject: Hi\n\n> quoted\n  Please   SEND  \n")
+    assert cleaned == "please send"
+
+
+def test_only_the_leading_header_block_is_stripped():
+    """Test that header-like lines in the body are kept."""
+    email = "From: a@b.c\nSubject: Reorder\n  continued\n\nDate: July 1\nTo: shop"
+
+    assert strip_header_block(email) == "Date: July 1\nTo: shop"
+    assert strip_header_block("Date: July 1\nTo: shop") == "Date: July 1\nTo: shop"
+    assert strip_header_block("Note: urgent\n\nBody") == "Note: urgent\n\nBody"
+
+
+def test_simhash_is_close_for_small_edits():
+    """Test that a one-token edit flips far fewer bits than an unrelated email."""
+    original = simhash(clean_email_body(REORDER_EMAIL))
+    changed = simhash(clean_email_body(CHANGED_EMAIL))
+    unrelated = simhash(clean_email_body(UNRELATED_EMAIL))
+
+    assert bin(original ^ changed).count("1") <= 8
+    assert bin(original ^ unrelated).count("1") > 16
+
+
+def test_index_finds_near_duplicate(previous_order):
+    """Test lookup of a near-duplicate email."""
+    index = SimHashIndex()
+    index.add(REORDER_EMAIL, previous_order.model_dump(mode="json"))
+
+    match = index.find(CHANGED_EMAIL)
+    assert match is not None
+    assert match.similarity >= 1 - 8 / 64
+    assert match.payload["customer"] == "John Smith"
+    assert index.find(UNRELATED_EMAIL) is None
+
+
+def test_index_is_bounded():
+    """Test least recently used eviction."""
+    index = SimHashIndex(max_entries=2, max_distance=0)
+    index.add("first email about desks", {"n": 1})
+    index.add("second email about sofas", {"n": 2})
+    index.find("first email about desks")
+    index.add("third email about chairs", {"n": 3})
+
+    assert len(index) == 2
+    assert index.find("second email about sofas") is None
+    assert index.find("first email about desks").payload == {"n": 1}
+
+
+def test_index_persistence(tmp_path, previous_order):
+    """Test saving and reloading the index."""
+    path = str(tmp_path / "index.json")
+    index = SimHashIndex(path)
+    index.add(REORDER_EMAIL, previous_order.model_dump(mode="json"))
+    index.save()
+
+    reloaded = SimHashIndex(path)
+    assert len(reloaded) == 1
+    assert reloaded.find(REORDER_EMAIL) is not None
+
+
+def test_parser_sends_only_diff_for_near_duplicate(tmp_path, previous_order):
+    """Test that near-duplicates use the revision path with a diff."""
+    inner = Mock()
+    inner.parse_email_record.return_value = OrderRecord.from_model(previous_order)
+    inner.revise_order.return_value = previous_order
+    parser = NearDuplicateEmailParser(inner, SimHashIndex(str(tmp_path / "idx.json")))
+
+    parser.parse_email(REORDER_EMAIL)
+    parser.parse_email(CHANGED_EMAIL)
+
+    inner.parse_email_record.assert_called_once_with(REORDER_EMAIL)
+    _, email_diff = inner.revise_order.call_args.args
+    assert "-- 10 x Sofa VIKTMARK 446 (SFA-0126)" in email_diff
+    assert "+- 12 x Sofa VIKTMARK 446 (SFA-0126)" in email_diff
+    assert "Wardrobe" not in email_diff
+    assert "Subject" not in email_diff
+
+
+def test_changed_date_line_is_revised(previous_order):
+    """Test that a body line shaped like a header still reaches the diff."""
+    inner = Mock()
+    inner.parse_email_record.return_value = OrderRecord.from_model(previous_order)
+    inner.revise_order.return_value = previous_order
+    parser = NearDuplicateEmailParser(inner, SimHashIndex())
+    email = REORDER_EMAIL.replace("Delivery by June 20", "Date: June 20")
+
+    parser.parse_email(email)
+    parser.parse_email(email.replace("Date: June 20", "Date: July 1"))
+
+    _, email_diff = inner.revise_order.call_args.args
+    assert email_diff.splitlines() == [
+        "-Date: June 20, 2025 if possible.",
+        "+Date: July 1, 2025 if possible.",
+    ]
+
+
+def test_parser_reuses_exact_duplicate_without_llm(previous_order):
+    """Test that identical emails do not reach the LLM."""
+    inner = Mock()
+    inner.parse_email_record.return_value = OrderRecord.from_model(previous_order)
+    parser = NearDuplicateEmailParser(inner, SimHashIndex())
+
+    parser.parse_email(REORDER_EMAIL)
+    order = parser.parse_email(REORDER_EMAIL)
+
+    assert inner.parse_email_record.call_count == 1
+    inner.revise_order.assert_not_called()
+    assert order.items[0].sku == "SFA-0126"
+
+
+def test_index_is_saved_in_batches_and_on_close(tmp_path, previous_order):
+    """Test that parses do not each rewrite the index file."""
+    inner = Mock()
+    inner.parse_email_record.return_value = OrderRecord.from_model(previous_order)
+    inner.revise_order.return_value = previous_order
+    index = SimHashIndex(str(tmp_path / "idx.json"))
+    index.save = Mock()
+    parser = NearDuplicateEmailParser(inner, index, save_every=2)
+
+    parser.parse_email(REORDER_EMAIL)
+    parser.parse_email(UNRELATED_EMAIL)
+    parser.parse_email(CHANGED_EMAIL)
+    assert index.save.call_count == 1
+
+    parser.close()
+    parser.close()
+    assert index.save.call_count == 2
+
+
+def test_long_near_duplicates_are_diffed_within_the_stored_text(previous_order):
+    """Test that truncating the stored body does not add a spurious diff."""
+    inner = Mock()
+    inner.parse_email_record.return_value = OrderRecord.from_model(previous_order)
+    parser = NearDuplicateEmailParser(inner, SimHashIndex())
+    email = REORDER_EMAIL + "\n".join(
+        f"Terms line {n} of the standing order." for n in range(1_500)
+    )
+    assert len(email) > MAX_STORED_TEXT_CHARS
+
+    parser.parse_email(email)
+    parser.parse_email(email)
+
+    inner.revise_order.assert_not_called()
+
+
+def test_async_parse_uses_the_wrapped_async_parser(previous_order):
+    """Test that new emails are parsed with the cancellable async path."""
+    record = OrderRecord.from_model(previous_order)
+    inner = Mock()
+
+    async def aparse_email_record(email_text):
+        return record
+
+    inner.aparse_email_record = aparse_email_record
+    parser = NearDuplicateEmailParser(inner, SimHashIndex())
+
+    first = asyncio.run(parser.aparse_email_record(REORDER_EMAIL))
+    again = asyncio.run(parser.aparse_email_record(REORDER_EMAIL))
+
+    assert first is record
+    assert again.items[0].sku == "SFA-0126"
+    inner.parse_email_record.assert_not_called()
@@ -0,0 +1,151 @@
+"""Tests for order bundling and the category index."""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from core.models import Order, OrderItem
+from data_sources.catalog_csv import CsvCatalogDataSource
+from data_sources.catalog_delta import CatalogDelta
+from data_sources.category_index import CategoryIndex
+from processing.order_bundler import OrderBundler
+from processing.quote_engine import QuoteEngine
+
+CATALOG_ROWS = [
+    ("CHR-0001", "Desk STRASUND 1", 40, 8),
+    ("CHR-0002", "Desk TRANLUND 2", 30, 4),
+    ("CHR-0003", "Desk VALLSKAR 3", 50, 4),
+    ("SFA-0001", "Sofa VIKTMARK 1", 12, 1),
+    ("XYZ-0001", "Widget NORD 1", 3, 1),
+]
+
+
+@pytest.fixture
+def catalog_source(tmp_path):
+    """Create a CSV catalog in the Product_Code column format."""
+    catalog_file = tmp_path / "catalog.csv"
+    pd.DataFrame(
+        [
+            {
+                "Product_Code": sku,
+                "Product_Name": name,
+                "Price": 10.0,
+                "Available_in_Stock": stock,
+                "Min_Order_Quantity": moq,
+                "Description": "",
+            }
+            for sku, name, stock, moq in CATALOG_ROWS
+        ]
+    ).to_csv(catalog_file, index=False)
+    return CsvCatalogDataSource(str(catalog_file))
+
+
+def make_order(*lines: tuple[str, int]) -> Order:
+    """Create an order from (sku, quantity) pairs."""
+    return Order(
+        customer="John Smith",
+        address="123 Main Street",
+        delivery_date=date(2025, 6, 20),
+        items=[OrderItem(sku=sku, quantity=quantity) for sku, quantity in lines],
+    )
+
+
+def test_category_index_from_catalog(catalog_source):
+    """Test category names, members and aggregate stock."""
+    index = catalog_source.get_category_index()
+
+    chairs = index.get("CHR")
+    assert chairs.name == "Chair"
+    assert chairs.skus == ["CHR-0001", "CHR-0002", "CHR-0003"]
+    assert chairs.total_stock == 120
+    assert index.name_for("XYZ") == "Widget"
+    assert index.name_for("NOPE") == "NOPE"
+    assert len(index) == 3
+
+
+def test_category_index_handles_short_skus():
+    """Test category codes for SKUs with shorter prefixes."""
+    index = CategoryIndex.from_products({"MD-001": {"name": "Modern Desk", "stock": 4}})
+    assert index.get("MD").total_stock == 4
+
+
+def test_bundles_for_chair_order(catalog_source):
+    """Test MOQ and category bundles for lines in one category."""
+    bundler = OrderBundler(catalog_source)
+    order = make_order(("CHR-0001", 4), ("CHR-0002", 3), ("CHR-0003", 2))
+
+    bundles = bundler.analyze_and_suggest_bundles(order)
+
+    moq_bundle = bundles["moq_bundles"][0]
+    assert moq_bundle["current_total"] == 9
+    assert [r["suggested"] for r in moq_bundle["suggested_redistribution"]] == [1, 4, 4]
+    category_bundle = bundles["category_bundles"][0]
+    assert category_bundle["category_name"] == "Chair"
+    assert category_bundle["category_stock"] == 120
+    assert bundles["summary"]["categories_represented"] == 1
+
+
+def test_unknown_skus_do_not_break_bundling(catalog_source):
+    """Test that SKUs missing from the catalog are skipped, not swallowed as errors."""
+    bundler = OrderBundler(catalog_source)
+    order = make_order(("NOPE-1", 2), ("SFA-0001", 4))
+
+    bundles = bundler.analyze_and_suggest_bundles(order)
+
+    assert bundles["bulk_discounts"][0]["sku"] == "SFA-0001"
+    assert bundles["bulk_discounts"][0]["suggested_quantity"] == 5
+    assert bundles["summary"]["total_items"] == 2
+
+
+def test_each_sku_is_looked_up_once(catalog_source, mocker):
+    """Test that the bundler fetches the distinct SKUs in one lookup."""
+    spy = mocker.spy(catalog_source, "get_many")
+    bundler = OrderBundler(catalog_source)
+
+    bundler.analyze_and_suggest_bundles(
+        make_order(("CHR-0001", 1), ("CHR-0001", 1), ("SFA-0001", 1))
+    )
+
+    assert spy.call_count == 1
+    assert list(spy.call_args.args[0]) == ["CHR-0001", "SFA-0001"]
+
+
+def test_bulk_suggestions_show_savings(catalog_source):
+    """Test that a quote engine adds priced savings to bulk suggestions."""
+    engine = QuoteEngine.from_catalog(catalog_source, bulk_tiers=((1, 0.0), (5, 0.1)))
+    bundler = OrderBundler(catalog_source, quote_engine=engine)
+
+    bundles = bundler.analyze_and_suggest_bundles(make_order(("SFA-0001", 4)))
+
+    suggestion = bundles["bulk_discounts"][0]
+    assert suggestion["current_total"] == 40.0
+    assert suggestion["suggested_total"] == 45.0
+    assert suggestion["unit_savings"] == 1.0
+    assert suggestion["savings"] == 5.0
+
+
+def test_price_updates_reach_bulk_savings(catalog_source):
+    """Test that a bundler following the catalog reprices after deltas."""
+    bundler = OrderBundler(
+        catalog_source, quote_engine=QuoteEngine({}, ((1, 0.0), (5, 0.1)))
+    )
+    bundler.follow_prices(catalog_source)
+    catalog_source.apply_deltas([CatalogDelta("SFA-0001", price=20.0)])
+
+    bundles = bundler.analyze_and_suggest_bundles(make_order(("SFA-0001", 4)))
+
+    assert bundles["bulk_discounts"][0]["current_total"] == 80.0
+    assert bundles["bulk_discounts"][0]["suggested_total"] == 90.0
+
+
+def test_category_stock_follows_catalog_updates(catalog_source):
+    """Test that category bundles use the index of the current snapshot."""
+    bundler = OrderBundler(catalog_source)
+    catalog_source.apply_deltas([CatalogDelta("CHR-0001", stock_change=-30)])
+
+    bundles = bundler.analyze_and_suggest_bundles(
+        make_order(("CHR-0001", 4), ("CHR-0002", 4))
+    )
+
+    assert bundles["category_bundles"][0]["category_stock"] == 90
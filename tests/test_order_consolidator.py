@@ -0,0 +1,117 @@
+"""Tests for consolidating orders across emails."""
+
+from datetime import date
+from unittest.mock import Mock
+
+from core.models import Order, OrderItem
+from core.records import OrderItemRecord, OrderRecord
+from data_sources.catalog_csv import CsvCatalogDataSource
+from processing.order_consolidator import OrderConsolidator, normalize_address
+from processing.order_processor import apply_validation_results
+from validation.catalog_validator import CatalogValidator
+
+JUNE_20 = date(2025, 6, 20)
+
+
+def make_record(
+    customer: str, address: str, *lines: tuple[str, int], delivery_date=JUNE_20
+) -> OrderRecord:
+    """Create an order record from (sku, quantity) pairs."""
+    items = [OrderItemRecord(sku, quantity) for sku, quantity in lines]
+    return OrderRecord(customer, address, delivery_date, items)
+
+
+def processed(validator: CatalogValidator, *orders: OrderRecord) -> list[OrderRecord]:
+    """Validate orders individually, as the pipeline does before consolidation."""
+    for order in orders:
+        apply_validation_results(order, validator.validate_order(order))
+    return list(orders)
+
+
+def test_orders_for_one_delivery_meet_moq_combined(catalog_path):
+    """Test that three emails below MOQ are merged into one valid order."""
+    validator = CatalogValidator(CsvCatalogDataSource(catalog_path))
+    orders = processed(
+        validator,
+        make_record("Jane Doe", "1 Main Street", ("CHR-0001", 3), ("SFA-0001", 1)),
+        make_record(
+            "Jane Doe", "1 Main St", ("CHR-0001", 3), delivery_date=date(2025, 7, 1)
+        ),
+        make_record("jane  doe", "1, MAIN ST.", ("CHR-0001", 3)),
+        make_record("JANE DOE", "1 Main Street", ("CHR-0001", 2), ("CHR-0002", 1)),
+    )
+    assert not orders[0].items[0].valid
+
+    consolidated = OrderConsolidator(validator).consolidate(orders)
+
+    assert [c.sources for c in consolidated] == [[0, 2, 3], [1]]
+    merged = consolidated[0].order
+    assert [(item.sku, item.quantity, item.valid) for item in merged.items] == [
+        ("CHR-0001", 8, True),
+        ("SFA-0001", 1, True),
+        ("CHR-0002", 1, False),
+    ]
+    assert merged.customer == "Jane Doe"
+    assert consolidated[0].resolved_skus == ["CHR-0001"]
+    assert consolidated[1].order is orders[1]
+    assert not consolidated[1].merged
+
+
+def test_combined_quantities_are_checked_against_stock(catalog_path):
+    """Test that merging can reveal a stock shortfall."""
+    validator = CatalogValidator(CsvCatalogDataSource(catalog_path))
+    orders = processed(
+        validator,
+        make_record("Acme", "5 Oak Avenue", ("SFA-0001", 7)),
+        make_record("ACME", "5 oak ave", ("SFA-0001", 7)),
+    )
+    assert all(order.items[0].valid for order in orders)
+
+    (consolidated,) = OrderConsolidator(validator).consolidate(orders)
+
+    assert not consolidated.order.items[0].valid
+    assert consolidated.order.items[0].suggestions[0]["available_quantity"] == 12
+    assert consolidated.resolved_skus == []
+
+
+def test_stock_the_orders_reserved_counts_toward_the_merged_order(catalog_path):
+    """Test that merging only needs stock beyond the originals' reservations."""
+    validator = CatalogValidator.from_csv(catalog_path, use_stock_ledger=True)
+    ledger = validator.stock_ledger
+    orders = processed(
+        validator,
+        make_record("Acme", "5 Oak Avenue", ("CHR-0002", 20)),
+        make_record("Acme", "5 Oak Avenue", ("CHR-0002", 2)),
+    )
+    assert [order.items[0].valid for order in orders] == [True, False]
+    reservation = ledger.reserve({"CHR-0002": 20})
+    orders[0].reservation_id = reservation.reservation_id
+    ledger.commit([reservation.reservation_id])
+    assert ledger.available("CHR-0002") == 10
+
+    (consolidated,) = OrderConsolidator(validator).consolidate(orders)
+
+    assert consolidated.order.items[0].valid
+    assert consolidated.resolved_skus == ["CHR-0002"]
+
+
+def test_orders_without_known_recipient_are_not_merged():
+    """Test that placeholders never group and single orders skip validation."""
+    validator = Mock(spec=["validate_order"])
+    orders = [
+        make_record("Unknown", "1 Main St", ("CHR-0001", 1)),
+        make_record("Unknown", "1 Main St", ("CHR-0001", 1)),
+        Order(
+            customer="Jane Doe",
+            address="N/A",
+            delivery_date=JUNE_20,
+            items=[OrderItem(sku="CHR-0001", quantity=1)],
+        ),
+    ]
+
+    consolidated = OrderConsolidator(validator).consolidate(iter(orders))
+
+    assert [c.sources for c in consolidated] == [[0], [1], [2]]
+    assert isinstance(consolidated[2].order, OrderRecord)
+    validator.validate_order.assert_not_called()
+    assert normalize_address("12 North Main Street, Suite 4") == "12 n main st ste 4"
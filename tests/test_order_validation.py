@@ -0,0 +1,135 @@
+"""Tests for order-level validation of repeated SKUs."""
+
+import asyncio
+from datetime import date
+from typing import Optional
+from unittest.mock import Mock
+
+import pytest
+
+from core.interfaces import CatalogDataSource
+from core.models import Order, OrderItem
+from processing.order_processor import SmartOrderProcessor
+from validation.catalog_validator import CatalogValidator
+
+from .test_data import SAMPLE_CATALOG
+
+SAMPLE_PRODUCTS = {
+    row["Product Code"]: {
+        "name": row["Product Name"],
+        "stock": row["Available Stock"],
+        "moq": row["Minimum Order Quantity"],
+    }
+    for row in SAMPLE_CATALOG
+}
+
+
+class AsyncOnlyCatalog(CatalogDataSource):
+    """Catalog that fails blocking lookups, recording each async batch."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def get_product_details(self, sku: str) -> Optional[dict]:
+        raise AssertionError("blocking lookup")
+
+    def get_many(self, skus) -> dict[str, Optional[dict]]:
+        raise AssertionError("blocking lookup")
+
+    async def aget_many(self, skus) -> dict[str, Optional[dict]]:
+        self.batches.append(list(skus))
+        return {sku: SAMPLE_PRODUCTS.get(sku) for sku in self.batches[-1]}
+
+    def find_similar_products(self, sku: str) -> list[dict]:
+        return []
+
+
+@pytest.fixture
+def catalog_source():
+    """Create a mock catalog backed by the sample catalog."""
+    source = Mock()
+    source.get_product_details.side_effect = SAMPLE_PRODUCTS.get
+    source.find_similar_products.return_value = []
+    return source
+
+
+def make_order(*lines: tuple[str, int]) -> Order:
+    """Create an order from (sku, quantity) pairs."""
+    return Order(
+        customer="John Smith",
+        address="123 Main Street",
+        delivery_date=date(2025, 6, 20),
+        items=[OrderItem(sku=sku, quantity=quantity) for sku, quantity in lines],
+    )
+
+
+def test_repeated_sku_is_checked_against_combined_stock(catalog_source):
+    """Test that lines which fit individually fail when their total exceeds stock."""
+    validator = CatalogValidator(catalog_source)
+    order = make_order(("MD-001", 4), ("DT-002", 1), ("MD-001", 4), ("MD-001", 4))
+
+    results = validator.validate_order(order)
+
+    assert [result.is_valid for result in results] == [False, True, False, False]
+    assert results[0].notes == (
+        "Combined quantity 12 across 3 lines exceeds available stock of 10"
+    )
+    assert results[0].suggestions[0]["available_quantity"] == 10
+
+
+def test_repeated_sku_meets_moq_when_combined(catalog_source):
+    """Test that MOQ is checked against the combined quantity."""
+    validator = CatalogValidator(catalog_source)
+    order = make_order(("BS-003", 1), ("BS-003", 1))
+
+    results = validator.validate_order(order)
+
+    assert all(result.is_valid for result in results)
+
+
+def test_one_catalog_lookup_per_distinct_sku(catalog_source):
+    """Test that repeated SKUs are looked up once."""
+    validator = CatalogValidator(catalog_source)
+    order = make_order(("MD-001", 1), ("MD-001", 1), ("DT-002", 1), ("MD-001", 1))
+
+    validator.validate_order(order)
+
+    assert catalog_source.get_product_details.call_count == 2
+
+
+def test_single_lines_keep_item_notes(catalog_source):
+    """Test that non-repeated SKUs produce the same notes as validate_item."""
+    validator = CatalogValidator(catalog_source)
+    order = make_order(("DT-002", 6), ("BS-003", 1))
+
+    results = validator.validate_order(order)
+
+    assert results[0].notes == "Requested quantity 6 exceeds available stock of 5"
+    assert results[1].notes == "Quantity 1 is below minimum order quantity of 2"
+
+
+def test_processor_fans_results_out_to_items(catalog_source):
+    """Test that the processor applies aggregate results to every line."""
+    parser = Mock(spec=["parse_email"])
+    parser.parse_email.return_value = make_order(("TVS-002", 2), ("TVS-002", 2))
+    processor = SmartOrderProcessor(parser, CatalogValidator(catalog_source))
+
+    order = processor.process_order("email")
+
+    assert [item.valid for item in order.items] == [False, False]
+    assert all("Combined quantity 4" in item.notes for item in order.items)
+
+
+def test_async_processing_validates_without_blocking_lookups():
+    """Test that the async path fetches the order's SKUs with aget_many."""
+    catalog = AsyncOnlyCatalog()
+    parser = Mock(spec=["parse_email"])
+    parser.parse_email.return_value = make_order(
+        ("MD-001", 4), ("XX-999", 1), ("MD-001", 4)
+    )
+    processor = SmartOrderProcessor(parser, CatalogValidator(catalog))
+
+    order = asyncio.run(processor.aprocess_order_record("email"))
+
+    assert [item.valid for item in order.items] == [True, False, True]
+    assert catalog.batches == [["MD-001", "XX-999"]]
@@ -0,0 +1,110 @@
+"""Tests for the opt-in request profiler."""
+
+import json
+import os
+import time
+from datetime import date
+from unittest.mock import Mock
+
+from core.records import OrderItemRecord, OrderRecord
+from processing.order_processor import SmartOrderProcessor
+from processing.profiling import TRACING, RequestProfiler
+from validation.result import ValidationResult
+
+
+def wait_for_network():
+    """Stand in for a blocking LLM call."""
+    time.sleep(0.1)
+
+
+def parse_output():
+    """Stand in for CPU-bound output parsing."""
+    return sum(n * n for n in range(20_000))
+
+
+def handle_request():
+    """Simulate a request dominated by network time."""
+    wait_for_network()
+    parse_output()
+
+
+def read_collapsed(prefix: str) -> dict[str, int]:
+    """Read a collapsed-stack file into a stack-to-weight mapping."""
+    with open(f"{prefix}.collapsed.txt", encoding="utf-8") as f:
+        return {
+            stack: int(weight)
+            for stack, weight in (line.rsplit(" ", 1) for line in f if line.strip())
+        }
+
+
+def time_in(stacks: dict[str, int], function: str) -> int:
+    """Sum the weight of stacks whose leaf frame is ``function``."""
+    return sum(
+        weight
+        for stack, weight in stacks.items()
+        if stack.split(";")[-1].startswith(f"{function} ")
+    )
+
+
+def test_sampling_profile_attributes_wall_clock_time(tmp_path):
+    """Test that time blocked in a call shows up under that call."""
+    profiler = RequestProfiler(str(tmp_path), interval=0.002)
+
+    with profiler.session("request", force=True) as prefix:
+        handle_request()
+
+    stacks = read_collapsed(prefix)
+    assert all(
+        "handle_request" in stack for stack in stacks if "wait_for_network" in stack
+    )
+    assert time_in(stacks, "wait_for_network") > 50_000
+    with open(f"{prefix}.speedscope.json", encoding="utf-8") as f:
+        document = json.load(f)
+    frames = [frame["name"] for frame in document["shared"]["frames"]]
+    assert any(name.startswith("wait_for_network ") for name in frames)
+    assert sum(document["profiles"][0]["weights"]) == sum(stacks.values())
+
+
+def test_tracing_profile_records_every_call(tmp_path):
+    """Test exact self time per call stack in tracing mode."""
+    profiler = RequestProfiler(str(tmp_path), mode=TRACING)
+
+    with profiler.session("request", force=True) as prefix:
+        handle_request()
+
+    stacks = read_collapsed(prefix)
+    network = [stack for stack in stacks if "wait_for_network" in stack]
+    assert network and all(stack.startswith("handle_request ") for stack in network)
+    assert time_in(stacks, "parse_output") > 0
+
+
+def test_one_in_n_requests_is_profiled(tmp_path):
+    """Test sampling of requests and the per-request override."""
+    profiler = RequestProfiler(str(tmp_path), every=3)
+
+    selected = [profiler.should_profile() for _ in range(6)]
+
+    assert selected == [False, False, True, False, False, True]
+    assert RequestProfiler(str(tmp_path)).should_profile() is False
+    assert RequestProfiler(str(tmp_path)).should_profile(force=True) is True
+
+
+def test_processor_profiles_on_request(tmp_path, monkeypatch):
+    """Test the processor hook and its environment configuration."""
+    monkeypatch.setenv("ORDER_PROFILE_DIR", str(tmp_path))
+    parser = Mock(spec=["parse_email_record"])
+    parser.parse_email_record.side_effect = lambda text: OrderRecord(
+        "Jane", "1 Main St", date(2025, 6, 20), [OrderItemRecord("DSK-0001", 2)]
+    )
+    validator = Mock(spec=["validate_order"])
+    validator.validate_order.return_value = [ValidationResult(True, "ok")]
+    processor = SmartOrderProcessor(parser, validator)
+
+    processor.process_order("email")
+    assert os.listdir(tmp_path) == []
+
+    processor.process_order("email", profile=True)
+    assert sorted(name.rsplit(".", 2)[-2] for name in os.listdir(tmp_path)) == [
+        "collapsed",
+        "speedscope",
+    ]
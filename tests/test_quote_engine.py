@@ -0,0 +1,92 @@
+"""Tests for the vectorized quote engine."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from core.models import Order, OrderItem
+from processing.quote_engine import QuoteEngine
+
+PRODUCTS = {
+    "DSK-0001": {"name": "Desk", "stock": 100, "moq": 1, "price": 100.0},
+    "CHR-0001": {"name": "Chair", "stock": 100, "moq": 1, "price": 20.0},
+    "SFA-0001": {"name": "Sofa", "stock": 5, "moq": 1, "price": None},
+}
+
+
+@pytest.fixture
+def engine():
+    """Create an engine with simple tiers."""
+    return QuoteEngine(PRODUCTS, bulk_tiers=((1, 0.0), (10, 0.1), (50, 0.2)))
+
+
+def test_quote_lines_applies_tiers(engine):
+    """Test unit prices, tier discounts and line totals."""
+    quotes = engine.quote_lines(["DSK-0001", "CHR-0001", "CHR-0001"], [2, 10, 60])
+
+    np.testing.assert_allclose(quotes.unit_prices, [100.0, 20.0, 20.0])
+    np.testing.assert_allclose(quotes.discount_rates, [0.0, 0.1, 0.2])
+    np.testing.assert_allclose(quotes.line_totals, [200.0, 180.0, 960.0])
+    assert quotes.priced.all()
+
+
+def test_unknown_and_unpriced_skus(engine):
+    """Test that unknown or unpriced SKUs are flagged and total zero."""
+    quotes = engine.quote_lines(["NOPE-1", "SFA-0001"], [3, 3])
+
+    assert not quotes.priced.any()
+    np.testing.assert_allclose(quotes.line_totals, [0.0, 0.0])
+
+
+def test_quote_orders_totals_per_order(engine):
+    """Test per-order totals across a batch."""
+    orders = [
+        Order(
+            customer="A",
+            address="1 Street",
+            delivery_date=date(2025, 6, 20),
+            items=[
+                OrderItem(sku="DSK-0001", quantity=1),
+                OrderItem(sku="CHR-0001", quantity=10),
+            ],
+        ),
+        Order(
+            customer="B",
+            address="2 Street",
+            delivery_date=date(2025, 6, 20),
+            items=[OrderItem(sku="NOPE-1", quantity=1)],
+        ),
+        Order(
+            customer="C",
+            address="3 Street",
+            delivery_date=date(2025, 6, 20),
+            items=[OrderItem(sku="DSK-0001", quantity=50)],
+        ),
+    ]
+
+    quote = engine.quote_orders(orders)
+
+    np.testing.assert_allclose(quote.order_totals, [280.0, 0.0, 4000.0])
+    assert [line["line_total"] for line in quote.order_lines(0)] == [100.0, 180.0]
+
+
+def test_empty_catalog():
+    """Test that an empty catalog prices nothing without failing."""
+    quotes = QuoteEngine({}).quote_lines(["DSK-0001"], [1])
+    assert not quotes.priced.any()
+
+
+def test_reprice_leaves_the_original_engine_unchanged(engine):
+    """Test that repricing copies prices and keeps the tiers."""
+    products = {**PRODUCTS, "SFA-0001": {**PRODUCTS["SFA-0001"], "price": 300.0}}
+
+    repriced = engine.reprice(products, ["SFA-0001"])
+
+    np.testing.assert_allclose(
+        repriced.quote_lines(["SFA-0001"], [10]).line_totals, [2700.0]
+    )
+    assert not engine.quote_lines(["SFA-0001"], [10]).priced.any()
+    assert engine.reprice({"NEW-1": {"price": 1.0}}, ["NEW-1"]).bulk_tiers == (
+        engine.bulk_tiers
+    )
@@ -0,0 +1,158 @@
+"""Tests for the JSON Lines and Parquet result sinks."""
+
+import os
+import threading
+import time
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+
+from core.exceptions import ResultSinkError
+from core.records import OrderItemRecord, OrderRecord
+from service.order_service import OrderService
+from sinks.jsonl_sink import JsonlResultSink, read_jsonl_results
+from sinks.parquet_sink import ParquetResultSink
+
+
+def make_order(customer: str = "John Smith") -> OrderRecord:
+    """Create an order with one valid and one invalid item."""
+    return OrderRecord(
+        customer,
+        "123 Main St",
+        date(2025, 6, 20),
+        [
+            OrderItemRecord("DSK-0001", 2),
+            OrderItemRecord(
+                "CHR-0002",
+                1,
+                valid=False,
+                notes="Below MOQ",
+                suggestions=[{"sku": "CHR-0002", "suggested_quantity": 4}],
+            ),
+        ],
+    )
+
+
+def test_jsonl_round_trip(tmp_path):
+    """Test that flushed orders are read back with their source IDs."""
+    path = str(tmp_path / "orders.jsonl")
+    with JsonlResultSink(path) as sink:
+        sink.write(make_order("A"), "job-1")
+        sink.write(make_order("B").to_model(), "job-2")
+
+    results = list(read_jsonl_results(path))
+
+    assert [result["source_id"] for result in results] == ["job-1", "job-2"]
+    assert [result["order"]["customer"] for result in results] == ["A", "B"]
+    assert results[0]["order"] == make_order("A").to_dict()
+
+
+def test_full_batch_is_written_without_flush(tmp_path):
+    """Test that reaching the batch size commits the buffer."""
+    path = str(tmp_path / "orders.jsonl")
+    sink = JsonlResultSink(path, max_batch_records=3, flush_interval=60)
+
+    for _ in range(3):
+        sink.write(make_order())
+
+    assert len(list(read_jsonl_results(path))) == 3
+    assert sink.batches_written == 1
+    sink.close()
+
+
+def test_buffer_is_flushed_after_interval(tmp_path):
+    """Test that the background flusher commits a partial batch."""
+    path = str(tmp_path / "orders.jsonl")
+    sink = JsonlResultSink(path, flush_interval=0.05)
+    sink.write(make_order())
+
+    deadline = time.monotonic() + 5
+    while not list(read_jsonl_results(path)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(list(read_jsonl_results(path))) == 1
+    sink.close()
+
+
+def test_durable_writers_share_fsyncs(tmp_path, mocker):
+    """Test that concurrent durable writes are group-committed."""
+    fsync = mocker.patch(
+        "sinks.jsonl_sink.os.fsync", side_effect=lambda _: time.sleep(0.01)
+    )
+    path = str(tmp_path / "orders.jsonl")
+    sink = JsonlResultSink(path, flush_interval=60)
+
+    def write_orders():
+        for _ in range(10):
+            sink.write(make_order(), durable=True)
+
+    threads = [threading.Thread(target=write_orders) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(list(read_jsonl_results(path))) == 80
+    assert fsync.call_count == sink.batches_written < 80
+    sink.close()
+
+
+def test_partial_last_line_is_truncated_on_reopen(tmp_path):
+    """Test that a line torn by a crash is dropped before appending."""
+    path = str(tmp_path / "orders.jsonl")
+    with JsonlResultSink(path) as sink:
+        sink.write(make_order("A"))
+    with open(path, "ab") as f:
+        f.write(b'{"source_id":null,"order":{"cust')
+
+    with JsonlResultSink(path) as sink:
+        sink.write(make_order("B"))
+
+    results = list(read_jsonl_results(path))
+    assert [result["order"]["customer"] for result in results] == ["A", "B"]
+
+
+def test_failed_commit_breaks_the_sink(tmp_path, mocker):
+    """Test that write errors surface to the writer and later calls."""
+    path = str(tmp_path / "orders.jsonl")
+    sink = JsonlResultSink(path)
+    mocker.patch("sinks.jsonl_sink.os.fsync", side_effect=OSError("disk full"))
+
+    with pytest.raises(ResultSinkError, match="disk full"):
+        sink.write(make_order(), durable=True)
+    with pytest.raises(ResultSinkError):
+        sink.write(make_order())
+    sink.close()
+
+
+def test_parquet_has_one_row_per_item(tmp_path):
+    """Test the item rows and rolling of files at the row limit."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    directory = str(tmp_path / "orders")
+    with ParquetResultSink(directory, max_batch_rows=4, rows_per_file=3) as sink:
+        for n in range(3):
+            sink.write(make_order(f"Customer {n}"), f"job-{n}")
+
+    files = sorted(os.listdir(directory))
+    table = pq.read_table(directory).sort_by([("source_id", "ascending")])
+
+    assert len(files) == 2
+    assert all(name.endswith(".parquet") for name in files)
+    assert table.num_rows == 6
+    assert table.column("sku").to_pylist()[:2] == ["DSK-0001", "CHR-0002"]
+    assert table.column("valid").to_pylist()[:2] == [True, False]
+    assert table.column("suggestion_count").to_pylist()[:2] == [0, 1]
+    assert table.column("delivery_date").to_pylist()[0] == date(2025, 6, 20)
+
+
+def test_parquet_rejects_durable_writes(tmp_path):
+    """Test that the Parquet sink never reports an unsynced order as durable."""
+    pytest.importorskip("pyarrow")
+    with ParquetResultSink(str(tmp_path / "orders")) as sink:
+        with pytest.raises(ResultSinkError, match="durable"):
+            sink.write(make_order(), durable=True)
+        sink.write(make_order())
+
+        with pytest.raises(ValueError):
+            OrderService(Mock(), result_sink=sink)
@@ -0,0 +1,243 @@
+"""Tests for the asyncio HTTP order service."""
+
+import asyncio
+import json
+import threading
+from datetime import date
+from typing import Optional
+from unittest.mock import Mock
+
+from core.exceptions import ParsingError
+from core.records import OrderItemRecord, OrderRecord
+from processing.fake_llm import extract_order_fields
+from service.order_service import OrderService
+from service.server import OrderHttpServer
+
+
+def make_processor(
+    delay: float = 0.0, release: Optional[threading.Event] = None
+) -> Mock:
+    """Create a processor stub that turns 'fail' emails into parsing errors."""
+
+    def process_order_record(email_text: str) -> OrderRecord:
+        if release is not None:
+            release.wait(5)
+        elif delay:
+            threading.Event().wait(delay)
+        if email_text == "fail":
+            raise ParsingError("Failed to parse email: no items")
+        return OrderRecord(
+            "Jane Doe", "1 Main St", date(2025, 6, 20), [OrderItemRecord("DSK-0001", 2)]
+        )
+
+    processor = Mock(
+        spec=["process_order_record", "commit_reservations", "release_reservation"]
+    )
+    processor.process_order_record.side_effect = process_order_record
+    return processor
+
+
+async def request(port: int, method: str, path: str, payload=None):
+    """Send one request and return the status code and decoded JSON body."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode()
+        + body
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, response_body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(response_body)
+
+
+def run_with_server(scenario, processor, **service_options):
+    """Run a scenario coroutine against a server on an ephemeral port."""
+
+    async def main():
+        service = OrderService(processor, **service_options)
+        server = OrderHttpServer(service, port=0)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_health():
+    """Test that the health endpoint reports capacity."""
+
+    async def scenario(server):
+        return await request(server.bound_port, "GET", "/health")
+
+    status, body = run_with_server(scenario, make_processor(), max_concurrency=4)
+
+    assert status == 200
+    assert body == {"status": "ok", "in_flight": 0, "max_concurrency": 4}
+
+
+def test_single_order():
+    """Test that a single email returns the processed order."""
+
+    async def scenario(server):
+        return await request(server.bound_port, "POST", "/orders", {"email": "hi"})
+
+    status, body = run_with_server(scenario, make_processor())
+
+    assert status == 200
+    assert body["order"]["delivery_date"] == "2025-06-20"
+    assert body["order"]["items"][0]["sku"] == "DSK-0001"
+
+
+def test_parsing_failure_is_unprocessable():
+    """Test that processing errors map to 422."""
+
+    async def scenario(server):
+        return await request(server.bound_port, "POST", "/orders", {"email": "fail"})
+
+    status, body = run_with_server(scenario, make_processor())
+
+    assert status == 422
+    assert "no items" in body["error"]
+
+
+def test_batch_reports_each_email():
+    """Test that one failing email does not fail the batch."""
+
+    async def scenario(server):
+        return await request(
+            server.bound_port, "POST", "/orders:batch", {"emails": ["a", "fail", "b"]}
+        )
+
+    status, body = run_with_server(scenario, make_processor())
+
+    assert status == 200
+    assert ["order" in result for result in body["results"]] == [True, False, True]
+
+
+def test_bad_requests():
+    """Test malformed bodies and unknown routes."""
+
+    async def scenario(server):
+        return [
+            await request(server.bound_port, "POST", "/orders", {"email": 3}),
+            await request(server.bound_port, "POST", "/orders:batch", {"emails": "x"}),
+            await request(server.bound_port, "GET", "/missing"),
+        ]
+
+    statuses = [status for status, _ in run_with_server(scenario, make_processor())]
+
+    assert statuses == [400, 400, 404]
+
+
+def test_request_timeout():
+    """Test that slow orders time out with 504."""
+
+    async def scenario(server):
+        return await request(server.bound_port, "POST", "/orders", {"email": "hi"})
+
+    status, _ = run_with_server(
+        scenario, make_processor(delay=0.5), request_timeout=0.05
+    )
+
+    assert status == 504
+
+
+def test_concurrency_is_bounded():
+    """Test that no more than max_concurrency orders run at once."""
+    release = threading.Event()
+    processor = make_processor(release=release)
+
+    async def scenario(server):
+        pending = [
+            asyncio.ensure_future(
+                request(server.bound_port, "POST", "/orders", {"email": "hi"})
+            )
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.2)
+        in_flight = server.service.in_flight
+        release.set()
+        await asyncio.gather(*pending)
+        return in_flight
+
+    assert run_with_server(scenario, processor, max_concurrency=2) == 2
+
+
+def test_shutdown_drains_in_flight_requests():
+    """Test that shutdown lets an in-flight request finish."""
+
+    async def main():
+        server = OrderHttpServer(OrderService(make_processor(delay=0.2)), port=0)
+        await server.start()
+        pending = asyncio.ensure_future(
+            request(server.bound_port, "POST", "/orders", {"email": "hi"})
+        )
+        await asyncio.sleep(0.05)
+        await server.shutdown()
+        return await pending
+
+    status, _ = asyncio.run(main())
+
+    assert status == 200
+
+
+def test_shutdown_closes_the_sink_after_timed_out_orders_finish():
+    """Test that orders still running at shutdown settle before the sink closes."""
+    sink = Mock(spec=["write", "close", "durable_writes"])
+    processor = make_processor(delay=0.3)
+    sink.close.side_effect = lambda: processor.release_reservation.assert_called_once()
+
+    async def main():
+        service = OrderService(processor, request_timeout=0.05, result_sink=sink)
+        server = OrderHttpServer(service, port=0)
+        await server.start()
+        status, _ = await request(server.bound_port, "POST", "/orders", {"email": "hi"})
+        await server.shutdown()
+        return status
+
+    assert asyncio.run(main()) == 504
+    assert [call[0] for call in sink.method_calls] == ["close"]
+
+
+def test_timed_out_order_is_not_written_before_a_retry():
+    """Test that a retry after a timeout writes and commits the order once."""
+    sink = Mock(spec=["write", "close", "durable_writes"])
+    release = threading.Event()
+    processor = make_processor(release=release)
+
+    async def scenario(server):
+        timed_out = await request(server.bound_port, "POST", "/orders", {"email": "hi"})
+        release.set()
+        retried = await request(server.bound_port, "POST", "/orders", {"email": "hi"})
+        return timed_out[0], retried[0]
+
+    statuses = run_with_server(
+        scenario, processor, request_timeout=0.1, result_sink=sink
+    )
+
+    assert statuses == (504, 200)
+    assert sink.write.call_count == 1
+    assert processor.commit_reservations.call_count == 1
+    assert processor.release_reservation.call_count == 1
+
+
+def test_fake_llm_extracts_closest_quantities():
+    """Test that the fake provider pairs each SKU with its nearest quantity."""
+    fields = extract_order_fields(
+        "Send 3 x DSK-0001 and DSK-0002 qty 7 by 2025-06-20\n"
+        "Ship to: 1 Main St\n\nThanks,\nJane Doe"
+    )
+
+    assert fields == {
+        "customer_name": "Jane Doe",
+        "delivery_address": "1 Main St",
+        "delivery_date": "2025-06-20",
+        "items": [
+            {"sku": "DSK-0001", "quantity": 3},
+            {"sku": "DSK-0002", "quantity": 7},
+        ],
+    }
@@ -0,0 +1,72 @@
+"""Tests for the per-session order result store."""
+
+from datetime import date
+
+import pytest
+
+from core.models import Order, OrderItem
+from processing.fake_llm import FakeProvider
+from processing.llm_factory import LLMFactory
+from processing.order_processor import SmartOrderProcessor
+from ui.session_store import SessionResultStore, email_key
+
+EMAIL = "Please send 3 x DSK-0001.\nShip to: 1 Main St\nDelivery by 2025-06-20.\nJane"
+
+
+def make_order(items: int = 1) -> Order:
+    """Create an order with the given number of lines."""
+    return Order(
+        customer="Jane",
+        address="1 Main St",
+        delivery_date=date(2025, 6, 20),
+        items=[OrderItem(sku=f"DSK-{n:04d}", quantity=1) for n in range(items)],
+    )
+
+
+def test_orders_are_keyed_by_email_and_provider():
+    """Test lookups by email hash, ignoring surrounding whitespace."""
+    store = SessionResultStore({})
+    order = make_order()
+    store.put(EMAIL, "openai", order)
+
+    assert store.get(f"  {EMAIL}\n", "openai") is order
+    assert store.get(EMAIL, "anthropic") is None
+    assert store.current(EMAIL, "openai") is order
+    assert email_key(EMAIL, "openai") != email_key(EMAIL + "!", "openai")
+
+
+def test_least_recently_used_orders_are_evicted():
+    """Test the bound on stored orders."""
+    store = SessionResultStore({}, max_results=2)
+    store.put("a", "fake", make_order())
+    store.put("b", "fake", make_order())
+    store.get("a", "fake")
+    store.put("c", "fake", make_order())
+
+    assert store.get("a", "fake") is not None
+    assert store.get("b", "fake") is None
+
+
+def test_reruns_render_stored_order_without_processing(mocker, monkeypatch):
+    """Test that widget reruns and resubmits do not call the processor again."""
+    testing = pytest.importorskip("streamlit.testing.v1")
+    import streamlit as st
+
+    monkeypatch.setenv("DEFAULT_LLM_PROVIDER", "fake")
+    monkeypatch.setitem(LLMFactory._providers, "fake", FakeProvider)
+    st.cache_resource.clear()
+    process_order = mocker.patch.object(
+        SmartOrderProcessor, "process_order", return_value=make_order(120)
+    )
+    app = testing.AppTest.from_file("../main.py", default_timeout=30)
+    app.run()
+
+    app.text_area[0].set_value(EMAIL)
+    next(b for b in app.button if b.label == "Process Order").click().run()
+    app.number_input(key="order-items").set_value(3).run()
+    next(b for b in app.button if b.label == "Process Order").click().run()
+
+    assert not app.exception
+    assert process_order.call_count == 1
+    # Only one page of the 120 items is sent to the browser
+    assert len(app.dataframe[0].value) == 20
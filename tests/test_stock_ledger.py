@@ -0,0 +1,159 @@
+"""Tests for the stock reservation ledger."""
+
+import threading
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+
+from core.exceptions import StockReservationError
+from core.models import OrderItem
+from core.records import OrderItemRecord, OrderRecord
+from processing.order_processor import SmartOrderProcessor
+from validation.catalog_validator import CatalogValidator
+from validation.stock_ledger import StockLedger
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Create a controllable clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def ledger(clock):
+    """Create a ledger with a few SKUs."""
+    return StockLedger({"MD-001": 10, "DT-002": 5}, default_ttl=60, clock=clock)
+
+
+def test_reserve_reduces_availability(ledger):
+    """Test that reservations hold stock."""
+    ledger.reserve({"MD-001": 4, "DT-002": 5})
+
+    assert ledger.available("MD-001") == 6
+    assert ledger.available("DT-002") == 0
+    assert ledger.available("UNKNOWN") is None
+
+
+def test_reserve_is_all_or_nothing(ledger):
+    """Test that a failing line leaves the other lines untouched."""
+    with pytest.raises(StockReservationError) as exc_info:
+        ledger.reserve({"MD-001": 4, "DT-002": 6})
+
+    assert exc_info.value.available == {"DT-002": 5}
+    assert ledger.available("MD-001") == 10
+
+
+def test_release_and_commit(ledger):
+    """Test releasing and bulk committing reservations."""
+    first = ledger.reserve({"MD-001": 3})
+    second = ledger.reserve({"MD-001": 2, "DT-002": 1})
+    third = ledger.reserve({"DT-002": 2})
+
+    assert ledger.release(third.reservation_id)
+    assert not ledger.release(third.reservation_id)
+    assert ledger.commit([first.reservation_id, second.reservation_id]) == 2
+
+    assert ledger.available("MD-001") == 5
+    assert ledger.available("DT-002") == 4
+
+
+def test_expired_reservations_are_released(ledger, clock):
+    """Test time-to-live based release."""
+    ledger.reserve({"MD-001": 10}, ttl=5)
+    clock.now = 6
+
+    reservation = ledger.reserve({"MD-001": 10})
+    assert reservation.quantities == {"MD-001": 10}
+    assert ledger.commit([reservation.reservation_id]) == 1
+    assert ledger.available("MD-001") == 0
+
+
+def test_concurrent_reservations_never_oversell():
+    """Test that concurrent orders cannot reserve more than on-hand stock."""
+    ledger = StockLedger({f"SKU-{i}": 100 for i in range(20)}, stripes=8)
+    successes = []
+
+    def worker(offset: int):
+        for n in range(200):
+            skus = {f"SKU-{(offset + n) % 20}": 1, f"SKU-{(offset + n + 7) % 20}": 2}
+            try:
+                ledger.reserve(skus)
+                successes.append(skus)
+            except StockReservationError:
+                pass
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i in range(20):
+        sku = f"SKU-{i}"
+        reserved = sum(skus.get(sku, 0) for skus in successes)
+        assert reserved <= 100
+        assert ledger.available(sku) == 100 - reserved
+
+
+def test_validator_consults_ledger(ledger):
+    """Test that the validator checks stock net of reservations."""
+    catalog = Mock()
+    catalog.get_product_details.return_value = {"name": "Desk", "stock": 10, "moq": 1}
+    validator = CatalogValidator(catalog, stock_ledger=ledger)
+    ledger.reserve({"MD-001": 8})
+
+    result = validator.validate_item(OrderItem(sku="MD-001", quantity=3))
+
+    assert not result.is_valid
+    assert result.suggestions[0]["available_quantity"] == 2
+
+
+def test_processor_commits_accepted_and_releases_failed_orders(ledger):
+    """Test settling the reservations the processor takes."""
+    catalog = Mock()
+    catalog.get_product_details.return_value = {"name": "Desk", "stock": 10, "moq": 1}
+    parser = Mock(spec=["parse_email_record"])
+    parser.parse_email_record.side_effect = lambda text: OrderRecord(
+        "Jane Doe", "1 Main St", date(2025, 6, 20), [OrderItemRecord("MD-001", 4)]
+    )
+    processor = SmartOrderProcessor(
+        parser, CatalogValidator(catalog, stock_ledger=ledger), ledger
+    )
+
+    accepted = processor.process_order_record("first")
+    failed = processor.process_order_record("second")
+    assert ledger.available("MD-001") == 2
+
+    assert processor.release_reservation(failed)
+    assert processor.commit_reservations([accepted, failed]) == 1
+    assert ledger.available("MD-001") == 6
+    assert not processor.release_reservation(accepted)
+
+
+def test_processor_reserves_skus_as_the_validator_looks_them_up(ledger):
+    """Test that an order validated by its normalized SKU also reserves it."""
+    catalog = Mock()
+    catalog.get_product_details.return_value = {"name": "Desk", "stock": 10, "moq": 1}
+    parser = Mock(spec=["parse_email_record"])
+    parser.parse_email_record.return_value = OrderRecord(
+        "Jane Doe", "1 Main St", date(2025, 6, 20), [OrderItemRecord(" md-001", 4)]
+    )
+    processor = SmartOrderProcessor(
+        parser, CatalogValidator(catalog, stock_ledger=ledger), ledger
+    )
+
+    record = processor.process_order_record("email")
+
+    assert record.items[0].valid
+    assert ledger.available("MD-001") == 6
@@ -0,0 +1,162 @@
+"""Tests for prompt token budgeting."""
+
+import json
+import re
+from datetime import date
+from unittest.mock import Mock
+
+from core.records import OrderItemRecord, OrderRecord
+from parsing.email_parser import LangChainEmailParser
+from parsing.token_budget import (
+    BudgetedEmailParser,
+    ModelBudget,
+    TokenEstimator,
+    split_email,
+    trim_email,
+)
+
+PROMPT_OVERHEAD = "x" * 400
+
+
+def make_tier(model: str, context_tokens: int) -> tuple[ModelBudget, Mock]:
+    """Create a budget with a parser stub that returns one item per SKU line."""
+
+    def parse_email_record(email_text: str) -> OrderRecord:
+        items = [
+            OrderItemRecord(line.split()[0], int(line.split()[1]))
+            for line in email_text.splitlines()
+            if line.startswith("DSK-")
+        ]
+        return OrderRecord("Jane", "1 Main St", date(2025, 6, 20), items)
+
+    parser = Mock(spec=["render_prompt", "parse_email_record"])
+    parser.render_prompt.side_effect = lambda text: PROMPT_OVERHEAD + text
+    parser.parse_email_record.side_effect = parse_email_record
+    return ModelBudget(model, context_tokens, output_tokens=100), parser
+
+
+def order_email(lines: int) -> str:
+    """Create an email ordering ``lines`` different SKUs."""
+    body = "\n".join(f"DSK-{n:04d} {n + 1} units please" for n in range(lines))
+    return f"Hi,\n{body}\nThanks,\nJane"
+
+
+def test_estimator_calibrates_to_reported_counts():
+    """Test that reported counts pull later estimates towards them."""
+    estimator = TokenEstimator(use_tokenizer=False)
+    text = "a" * 400
+    assert estimator.estimate(text) == 100
+
+    for _ in range(30):
+        estimator.record(estimator.estimate(text), 130)
+
+    assert 125 <= estimator.estimate(text) <= 131
+    assert estimator.samples == 30
+    assert estimator.error_ratio > 1.0
+
+
+def test_smallest_model_that_fits_is_chosen():
+    """Test routing by prompt size between a small and a large context."""
+    small, large = make_tier("small", 400), make_tier("large", 4000)
+    parser = BudgetedEmailParser([large, small], TokenEstimator(use_tokenizer=False))
+
+    parser.parse_email_record(order_email(3))
+    parser.parse_email_record(order_email(60))
+
+    assert small[1].parse_email_record.call_count == 1
+    assert large[1].parse_email_record.call_count == 1
+
+
+def test_quoted_history_is_trimmed_before_chunking():
+    """Test that dropping reply history can make an email fit."""
+    history = "\n".join(f"> earlier message line {n}" for n in range(200))
+    email = f"{order_email(2)}\n\nOn Mon, Jane Doe wrote:\n{history}"
+    tier = make_tier("small", 400)
+    parser = BudgetedEmailParser([tier], TokenEstimator(use_tokenizer=False))
+
+    record = parser.parse_email_record(email)
+
+    assert len(record.items) == 2
+    sent = tier[1].parse_email_record.call_args.args[0]
+    assert "earlier message" not in sent
+    assert trim_email("Order\n\n\n\nDSK-0001 x2\n-- \nJane\nSales") == (
+        "Order\n\nDSK-0001 x2"
+    )
+
+
+def test_email_too_long_for_every_model_is_chunked():
+    """Test that chunks fit the budget and their items are merged in order."""
+    estimator = TokenEstimator(use_tokenizer=False)
+    tier = make_tier("small", 400)
+    parser = BudgetedEmailParser([tier], estimator)
+
+    record = parser.parse_email_record(order_email(40))
+
+    assert [item.sku for item in record.items] == [f"DSK-{n:04d}" for n in range(40)]
+    chunks = [call.args[0] for call in tier[1].parse_email_record.call_args_list]
+    assert len(chunks) > 1
+    limit = 400 - 100 - estimator.estimate(PROMPT_OVERHEAD)
+    assert all(estimator.estimate(chunk) <= limit for chunk in chunks)
+    assert split_email("one two three four", 2, lambda text: len(text.split())) == [
+        "one",
+        "two",
+        "three",
+        "four",
+    ]
+
+
+def test_parser_records_estimated_and_reported_tokens():
+    """Test that each call compares the estimate with reported usage."""
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    reply = {
+        "customer_name": "Jane",
+        "delivery_address": "1 Main St",
+        "delivery_date": "2025-06-20",
+        "items": [{"sku": "DSK-0001", "quantity": 2}],
+    }
+    llm = RunnableLambda(
+        lambda _prompt: AIMessage(
+            content=json.dumps(reply),
+            usage_metadata={
+                "input_tokens": 500,
+                "output_tokens": 40,
+                "total_tokens": 540,
+            },
+        )
+    )
+    estimator = TokenEstimator(use_tokenizer=False)
+    parser = LangChainEmailParser(llm, estimator)
+    expected = estimator.estimate(parser.render_prompt("DSK-0001 x2"))
+
+    parser.parse_email_record("DSK-0001 x2")
+
+    assert estimator.samples == 1
+    assert (estimator.total_estimated, estimator.total_actual) == (expected, 500)
+    assert estimator.estimate(parser.render_prompt("DSK-0001 x2")) > expected
+
+
+def test_chunked_email_takes_the_date_from_the_chunk_that_mentions_it():
+    """Test that chunks without a date do not decide the delivery date."""
+
+    def parse_email_record(email_text: str) -> OrderRecord:
+        # Like the model, guess today when the text gives no date
+        mentioned = re.search(r"\d{4}-\d{2}-\d{2}", email_text)
+        return OrderRecord(
+            "Jane",
+            "1 Main St",
+            date.fromisoformat(mentioned.group(0)) if mentioned else date.today(),
+            [],
+        )
+
+    budget, parser = make_tier("small", 400)
+    parser.parse_email_record.side_effect = parse_email_record
+    email = order_email(40) + "\nPlease deliver by 2031-03-14."
+
+    record = BudgetedEmailParser(
+        [(budget, parser)], TokenEstimator(use_tokenizer=False)
+    ).parse_email_record(email)
+
+    assert parser.parse_email_record.call_count > 1
+    assert record.delivery_date == date(2031, 3, 14)
@@ -0,0 +1,84 @@
+"""Tests for slotted validation results."""
+
+from datetime import date
+
+import pytest
+
+from core.records import OrderItemRecord, OrderRecord
+from processing.order_processor import apply_validation_results
+from validation.result import ValidationResult, valid_result
+
+
+def test_result_has_no_instance_dict():
+    """Test that results are slotted."""
+    result = ValidationResult(is_valid=True, notes="ok")
+
+    assert not hasattr(result, "__dict__")
+
+
+class CountingTemplate(str):
+    """Notes template that counts how often it is formatted."""
+
+    calls = 0
+
+    def format(self, *args, **kwargs):
+        CountingTemplate.calls += 1
+        return super().format(*args, **kwargs)
+
+
+def test_notes_are_formatted_on_first_read():
+    """Test that templated notes are formatted lazily and only once."""
+    CountingTemplate.calls = 0
+    result = ValidationResult(
+        is_valid=False,
+        notes=CountingTemplate("SKU {0} not found in catalog"),
+        notes_args=("XX-1",),
+    )
+
+    assert CountingTemplate.calls == 0
+    assert result.notes == "SKU XX-1 not found in catalog"
+    assert result.notes == "SKU XX-1 not found in catalog"
+    assert CountingTemplate.calls == 1
+
+
+def test_records_format_notes_only_when_serialized():
+    """Test that applying results to records defers formatting to to_dict."""
+    CountingTemplate.calls = 0
+    order = OrderRecord(
+        "Jane", "1 Main St", date(2025, 6, 20), [OrderItemRecord("XX-1", 1)]
+    )
+    result = ValidationResult(
+        is_valid=False,
+        notes=CountingTemplate("SKU {0} not found in catalog"),
+        notes_args=("XX-1",),
+    )
+
+    apply_validation_results(order, [result])
+    assert CountingTemplate.calls == 0
+
+    assert order.to_dict()["items"][0]["notes"] == "SKU XX-1 not found in catalog"
+    assert order.items[0].to_dict()["notes"] == "SKU XX-1 not found in catalog"
+    assert CountingTemplate.calls == 1
+
+
+def test_plain_notes_are_returned_unchanged():
+    """Test that notes without arguments are not formatted."""
+    result = ValidationResult(is_valid=False, notes="Brace {0} kept")
+
+    assert result.notes == "Brace {0} kept"
+
+
+def test_valid_results_are_shared():
+    """Test that valid results with the same limits are one shared instance."""
+    first = valid_result(2, 10)
+
+    assert valid_result(2, 10) is first
+    assert valid_result(2, 11) is not first
+    assert first.suggestions == ()
+    assert dict(first.metadata) == {"min_quantity": 2, "available_stock": 10}
+
+
+def test_shared_metadata_is_read_only():
+    """Test that the metadata of shared results cannot be mutated."""
+    with pytest.raises(TypeError):
+        valid_result(2, 10).metadata["available_stock"] = 0
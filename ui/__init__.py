@@ -1,6 +1,33 @@
-"""UI module for Streamlit interface."""
+"""UI module for Streamlit interface.
 
-from .config import ConfigurationDisplay
-from .display import OrderDisplay
+Submodules are imported on first attribute access so that importing the
+package does not load Streamlit.
+"""
 
-__all__ = ["OrderDisplay", "ConfigurationDisplay"]
+import importlib
+
+_EXPORTS = {
+    "OrderDisplay": ".display",
+    "ConfigurationDisplay": ".config",
+    "BatchUploadDisplay": ".batch",
+    "SessionResultStore": ".session_store",
+}
+
+__all__ = [
+    "OrderDisplay",
+    "ConfigurationDisplay",
+    "BatchUploadDisplay",
+    "SessionResultStore",
+]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
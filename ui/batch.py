@@ -0,0 +1,129 @@
+"""Batch upload components for Streamlit UI."""
+
+from typing import Optional
+
+import streamlit as st
+
+from core.models import Order
+from ingestion.mime_text import message_text
+from ingestion.sources import parse_message
+from processing.email_batch import CANCELLED, DONE, FAILED, EmailBatch
+from processing.order_processor import SmartOrderProcessor
+
+from .display import OrderDisplay
+
+BATCH_STATE_KEY = "email_batch"
+RESULTS_PER_PAGE = 20
+PROGRESS_REFRESH_SECONDS = 1.0
+STATUS_ICONS = {DONE: "✅", FAILED: "❌", CANCELLED: "⏹️"}
+
+
+def uploaded_email_text(name: str, data: bytes) -> str:
+    """Get the text to process from an uploaded ``.txt`` or ``.eml`` file."""
+    if name.lower().endswith(".eml"):
+        return message_text(parse_message(data))
+    return data.decode("utf-8", errors="replace")
+
+
+class BatchUploadDisplay:
+    """Handles uploading, background processing and review of many emails.
+
+    The batch runs on its own thread and is kept in the session state. Only
+    the progress fragment reruns while it is in flight, so the rest of the
+    page stays interactive.
+    """
+
+    @staticmethod
+    def show(processor: SmartOrderProcessor):
+        """Display the batch tab."""
+        files = st.file_uploader(
+            "Upload customer emails:",
+            type=["txt", "eml"],
+            accept_multiple_files=True,
+        )
+        batch: Optional[EmailBatch] = st.session_state.get(BATCH_STATE_KEY)
+        running = batch is not None and not batch.finished
+
+        if st.button("Process Batch", type="primary", disabled=running or not files):
+            batch = EmailBatch(
+                processor,
+                [(f.name, uploaded_email_text(f.name, f.getvalue())) for f in files],
+            )
+            batch.start()
+            st.session_state[BATCH_STATE_KEY] = batch
+
+        if batch is None:
+            return
+        if batch.finished:
+            BatchUploadDisplay._show_progress(batch)
+        else:
+            BatchUploadDisplay._show_live_progress()
+
+    @staticmethod
+    @st.fragment(run_every=PROGRESS_REFRESH_SECONDS)
+    def _show_live_progress():
+        """Rerun the progress display on its own until the batch finishes."""
+        batch: EmailBatch = st.session_state[BATCH_STATE_KEY]
+        if batch.finished:
+            # Rerun the page once so it re-renders without the timer
+            st.rerun()
+        BatchUploadDisplay._show_progress(batch)
+
+    @staticmethod
+    def _show_progress(batch: EmailBatch):
+        """Display progress, the cancel button and results."""
+        counts = batch.progress()
+        total = len(batch.items)
+        finished = counts[DONE] + counts[FAILED] + counts[CANCELLED]
+
+        st.progress(
+            finished / total if total else 1.0,
+            text=f"{finished}/{total} processed, {counts[FAILED]} failed",
+        )
+        if not batch.finished:
+            if st.button("Cancel", disabled=batch.cancelled):
+                batch.cancel()
+        elif counts[CANCELLED]:
+            st.info(f"Cancelled {counts[CANCELLED]} emails")
+
+        BatchUploadDisplay._show_results(batch)
+        BatchUploadDisplay._show_combined_deliveries(batch)
+
+    @staticmethod
+    def _show_results(batch: EmailBatch):
+        """Display finished emails one page at a time."""
+        results = [item for item in batch.items if item.status in (DONE, FAILED)]
+        if not results:
+            return
+        pages = (len(results) - 1) // RESULTS_PER_PAGE + 1
+        page = st.number_input(
+            "Page", min_value=1, max_value=pages, value=1, key="batch_results_page"
+        )
+        start = (page - 1) * RESULTS_PER_PAGE
+
+        for index, item in enumerate(results[start : start + RESULTS_PER_PAGE], start):
+            with st.expander(f"{STATUS_ICONS[item.status]} {item.name}"):
+                if item.status == FAILED:
+                    st.error(item.error)
+                    continue
+                order = Order.model_validate(item.order)
+                OrderDisplay.show_validation_results(order, key=f"batch-{index}")
+                OrderDisplay.show_processing_summary(order)
+
+    @staticmethod
+    def _show_combined_deliveries(batch: EmailBatch):
+        """Display orders merged across emails for the same delivery."""
+        merged = [delivery for delivery in batch.consolidated() if delivery.merged]
+        if not merged:
+            return
+        st.subheader("Combined Deliveries")
+        for index, delivery in enumerate(merged):
+            names = ", ".join(batch.items[i].name for i in delivery.sources)
+            with st.expander(f"📦 {delivery.order.customer}: {names}"):
+                if delivery.resolved_skus:
+                    st.success(
+                        "Valid once combined: " + ", ".join(delivery.resolved_skus)
+                    )
+                order = delivery.order.to_model()
+                OrderDisplay.show_validation_results(order, key=f"combined-{index}")
+                OrderDisplay.show_processing_summary(order)
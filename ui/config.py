@@ -24,6 +24,9 @@ class ConfigurationDisplay:
         st.sidebar.write(
             f"**Model:** {os.getenv('DEFAULT_MODEL', 'gpt-4-turbo-preview')}"
         )
+        cascade_model = os.getenv("CASCADE_MODEL")
+        if cascade_model:
+            st.sidebar.write(f"**Cascade Model:** {cascade_model} first")
         st.sidebar.write(f"**Temperature:** {os.getenv('TEMPERATURE', '0.0')}")
 
         # Provider selection
@@ -2,37 +2,87 @@
 
 import streamlit as st
 
-from core.models import Order
+from core.models import Order, OrderItem
+
+ITEMS_PER_PAGE = 50
+VALIDATION_ITEMS_PER_PAGE = 20
 
 
 class OrderDisplay:
-    """Handles the display of order information."""
+    """Handles the display of order information.
+
+    Item lists are shown one page at a time, so rerun cost does not grow
+    with the size of the order. ``key`` keeps the widgets of several orders
+    on one page apart.
+    """
 
     @staticmethod
-    def show_order_details(order: Order):
+    def show_order_details(order: Order, key: str = "order"):
         """Display order details."""
         st.subheader("Order Details")
-        st.json(order.model_dump())
+        col1, col2, col3 = st.columns([2, 3, 1])
+        col1.write(f"**Customer:** {order.customer}")
+        col2.write(f"**Address:** {order.address}")
+        col3.write(f"**Delivery:** {order.delivery_date.isoformat()}")
+
+        with st.expander(f"Items ({len(order.items)})", expanded=True):
+            items = OrderDisplay._page(order.items, ITEMS_PER_PAGE, f"{key}-items")
+            st.dataframe(
+                [
+                    {
+                        "SKU": item.sku,
+                        "Quantity": item.quantity,
+                        "Valid": item.valid,
+                        "Notes": item.notes,
+                    }
+                    for item in items
+                ],
+                hide_index=True,
+            )
+
+        # The full JSON is only serialized when asked for
+        if st.toggle("Show raw JSON", key=f"{key}-raw-json"):
+            st.json(order.model_dump(mode="json"))
 
     @staticmethod
-    def show_validation_results(order: Order):
-        """Display validation results with suggestions."""
+    def show_validation_results(order: Order, key: str = "order"):
+        """Display validation results with suggestions, invalid items first."""
         st.subheader("Validation Results")
 
-        for item in order.items:
-            col1, col2 = st.columns([1, 3])
+        items = sorted(order.items, key=lambda item: item.valid)
+        for item in OrderDisplay._page(
+            items, VALIDATION_ITEMS_PER_PAGE, f"{key}-validation"
+        ):
+            OrderDisplay._show_item_result(item)
 
-            with col1:
-                status = "✅" if item.valid else "❌"
-                st.write(f"{status} {item.sku}")
-                st.write(f"Quantity: {item.quantity}")
+    @staticmethod
+    def _show_item_result(item: OrderItem):
+        """Display the validation result of one item."""
+        col1, col2 = st.columns([1, 3])
+
+        with col1:
+            status = "✅" if item.valid else "❌"
+            st.write(f"{status} {item.sku}")
+            st.write(f"Quantity: {item.quantity}")
 
-            with col2:
-                st.write(f"Status: {item.notes}")
+        with col2:
+            st.write(f"Status: {item.notes}")
 
-                if not item.valid and item.suggestions:
-                    st.write("Suggestions:")
-                    OrderDisplay._display_suggestions(item.suggestions)
+            if not item.valid and item.suggestions:
+                st.write("Suggestions:")
+                OrderDisplay._display_suggestions(item.suggestions)
+
+    @staticmethod
+    def _page(items: list, per_page: int, key: str) -> list:
+        """Show a page selector when needed and return the selected page."""
+        pages = (len(items) - 1) // per_page + 1
+        if pages <= 1:
+            return items
+        page = st.number_input(
+            f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key
+        )
+        start = (page - 1) * per_page
+        return items[start : start + per_page]
 
     @staticmethod
     def _display_suggestions(suggestions: list):
@@ -0,0 +1,67 @@
+"""Per-session store of processed orders, surviving Streamlit reruns."""
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Optional
+
+from core.models import Order
+
+RESULTS_STATE_KEY = "order_results"
+CURRENT_RESULT_STATE_KEY = "current_order_result"
+DEFAULT_MAX_RESULTS = 50
+
+
+def email_key(email_text: str, provider: str) -> str:
+    """Hash an email, ignoring surrounding whitespace, with the provider that read it."""
+    digest = hashlib.sha256(email_text.strip().encode("utf-8"))
+    digest.update(b"\0" + provider.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SessionResultStore:
+    """Keeps processed orders in session state, keyed by email hash.
+
+    Any widget interaction reruns the script; reading the order from here
+    instead of processing the email again avoids a new LLM call. The
+    ``max_results`` most recently used orders are kept. ``state`` is
+    ``st.session_state`` in the app and any mapping in tests.
+    """
+
+    def __init__(
+        self,
+        state: MutableMapping[str, Any],
+        max_results: int = DEFAULT_MAX_RESULTS,
+    ):
+        self.state = state
+        self.max_results = max_results
+        if RESULTS_STATE_KEY not in state:
+            state[RESULTS_STATE_KEY] = OrderedDict()
+
+    @property
+    def _results(self) -> "OrderedDict[str, Order]":
+        return self.state[RESULTS_STATE_KEY]
+
+    def get(self, email_text: str, provider: str) -> Optional[Order]:
+        """Get the stored order for an email, if it was processed this session."""
+        key = email_key(email_text, provider)
+        order = self._results.get(key)
+        if order is not None:
+            self._results.move_to_end(key)
+        return order
+
+    def put(self, email_text: str, provider: str, order: Order):
+        """Store an order and make it the one currently shown."""
+        key = email_key(email_text, provider)
+        self._results[key] = order
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        self.state[CURRENT_RESULT_STATE_KEY] = key
+
+    def current(self, email_text: str, provider: str) -> Optional[Order]:
+        """Get the order shown last, if it still belongs to this email."""
+        key = email_key(email_text, provider)
+        if self.state.get(CURRENT_RESULT_STATE_KEY) != key:
+            return None
+        return self._results.get(key)
@@ -2,5 +2,6 @@
 
 from .catalog_validator import CatalogValidator
 from .result import ValidationResult
+from .stock_ledger import StockLedger, StockReservation
 
-__all__ = ["ValidationResult", "CatalogValidator"]
+__all__ = ["ValidationResult", "CatalogValidator", "StockLedger", "StockReservation"]
@@ -1,68 +1,187 @@
 """Catalog-based order validation."""
 
-from typing import Any
+import asyncio
+from collections.abc import Mapping
+from typing import Any, Callable, Optional
 
 from core.interfaces import CatalogDataSource, OrderValidator
+from core.metrics import REGISTRY
 from core.models import OrderItem
+from core.records import OrderLike
 from data_sources.catalog_csv import CsvCatalogDataSource
+from data_sources.lookup import (
+    Products,
+    afetch_products,
+    fetch_products,
+    normalize_sku,
+)
 
-from .result import ValidationResult
+from .result import ValidationResult, valid_result
+from .stock_ledger import StockLedger
+
+# Note templates formatted lazily with (quantity, limit, line_count)
+MOQ_NOTES = "Quantity {0} is below minimum order quantity of {1}"
+COMBINED_MOQ_NOTES = (
+    "Combined quantity {0} across {2} lines is below minimum order quantity of {1}"
+)
+STOCK_NOTES = "Requested quantity {0} exceeds available stock of {1}"
+COMBINED_STOCK_NOTES = (
+    "Combined quantity {0} across {2} lines exceeds available stock of {1}"
+)
+
+VALIDATION_RESULTS = REGISTRY.counter(
+    "validation_results",
+    "Validated SKUs by result: valid, invalid_sku, moq or stock.",
+    ("result",),
+)
+# Bound once so the per-SKU update skips the label lookup
+VALID_SKUS = VALIDATION_RESULTS.labels("valid")
+INVALID_SKUS = VALIDATION_RESULTS.labels("invalid_sku")
+MOQ_VIOLATIONS = VALIDATION_RESULTS.labels("moq")
+STOCK_VIOLATIONS = VALIDATION_RESULTS.labels("stock")
+
+
+def sku_totals(order: OrderLike) -> tuple[dict[str, int], dict[str, int]]:
+    """Sum the quantity and count the lines of each normalized SKU in an order."""
+    totals: dict[str, int] = {}
+    line_counts: dict[str, int] = {}
+    for item in order.items:
+        sku = normalize_sku(item.sku)
+        totals[sku] = totals.get(sku, 0) + item.quantity
+        line_counts[sku] = line_counts.get(sku, 0) + 1
+    return totals, line_counts
 
 
 class CatalogValidator(OrderValidator):
     """Validates orders against product catalog."""
 
-    def __init__(self, catalog_source: CatalogDataSource):
+    def __init__(
+        self,
+        catalog_source: CatalogDataSource,
+        stock_ledger: Optional[StockLedger] = None,
+    ):
         self.catalog_source = catalog_source
+        self.stock_ledger = stock_ledger
 
     @classmethod
-    def from_csv(cls, catalog_path: str) -> "CatalogValidator":
+    def from_csv(
+        cls, catalog_path: str, use_stock_ledger: bool = False
+    ) -> "CatalogValidator":
         """Create validator from CSV file."""
         catalog_source = CsvCatalogDataSource(catalog_path)
-        return cls(catalog_source)
+        stock_ledger = None
+        if use_stock_ledger:
+            stock_ledger = StockLedger.from_catalog(catalog_source)
+            stock_ledger.follow_updates(catalog_source)
+        return cls(catalog_source, stock_ledger)
 
     def validate_item(self, item: OrderItem) -> ValidationResult:
         """Validate order item against catalog."""
-        product = self.catalog_source.get_product_details(item.sku)
+        return self._validate_quantity(normalize_sku(item.sku), item.quantity)
 
-        if not product:
-            return self._handle_invalid_sku(item)
+    def validate_order(
+        self, order: OrderLike, held: Optional[Mapping[str, int]] = None
+    ) -> list[ValidationResult]:
+        """Validate all items, checking repeated SKUs against their combined quantity.
 
-        if item.quantity < product["moq"]:
-            return self._handle_moq_violation(item, product)
+        The distinct SKUs are fetched in one ``get_many`` call and each result
+        is shared by every line that orders it. CSV catalogs are read at one
+        snapshot version for the whole order. Stock in ``held``, already
+        reserved for this order in the ledger, is added back to what is
+        available.
+        """
+        totals, line_counts = sku_totals(order)
+        products = fetch_products(self.catalog_source, totals)
+        return self._validate_lines(order, totals, line_counts, products, held)
 
-        if item.quantity > product["stock"]:
-            return self._handle_stock_violation(item, product)
+    async def avalidate_order(self, order: OrderLike) -> list[ValidationResult]:
+        """Async variant of ``validate_order`` that fetches with ``aget_many``.
 
-        return ValidationResult(
-            is_valid=True,
-            notes="Order item is valid",
-            metadata={
-                "min_quantity": product["moq"],
-                "available_stock": product["stock"],
-            },
+        Suggestions for unknown SKUs are looked up synchronously, so orders
+        with one are finished on a worker thread.
+        """
+        totals, line_counts = sku_totals(order)
+        products = await afetch_products(self.catalog_source, totals)
+        if all(products.values()):
+            return self._validate_lines(order, totals, line_counts, products)
+        return await asyncio.to_thread(
+            self._validate_lines, order, totals, line_counts, products
         )
 
-    def _handle_invalid_sku(self, item: OrderItem) -> ValidationResult:
+    def _validate_lines(
+        self,
+        order: OrderLike,
+        totals: dict[str, int],
+        line_counts: dict[str, int],
+        products: Products,
+        held: Optional[Mapping[str, int]] = None,
+    ) -> list[ValidationResult]:
+        """Validate each distinct SKU once and share its result between lines."""
+        held = held or {}
+        results = {
+            sku: self._validate_quantity(
+                sku, quantity, line_counts[sku], products.get, held.get(sku, 0)
+            )
+            for sku, quantity in totals.items()
+        }
+        return [results[normalize_sku(item.sku)] for item in order.items]
+
+    def _validate_quantity(
+        self,
+        sku: str,
+        quantity: int,
+        line_count: int = 1,
+        lookup: Optional[Callable[[str], Optional[dict[str, Any]]]] = None,
+        held: int = 0,
+    ) -> ValidationResult:
+        """Validate a quantity of one SKU, possibly summed over several lines."""
+        product = (lookup or self.catalog_source.get_product_details)(sku)
+
+        if not product:
+            INVALID_SKUS.inc()
+            return self._handle_invalid_sku(sku)
+
+        if quantity < product["moq"]:
+            MOQ_VIOLATIONS.inc()
+            return self._handle_moq_violation(quantity, line_count, product)
+
+        available_stock = self._available_stock(sku, product, held)
+        if quantity > available_stock:
+            STOCK_VIOLATIONS.inc()
+            return self._handle_stock_violation(quantity, line_count, available_stock)
+
+        VALID_SKUS.inc()
+        return valid_result(product["moq"], available_stock)
+
+    def _available_stock(self, sku: str, product: dict[str, Any], held: int = 0) -> int:
+        """Get stock not yet reserved by in-flight orders, plus ``held`` units."""
+        if self.stock_ledger is None:
+            return product["stock"]
+        available = self.stock_ledger.available(sku)
+        return product["stock"] if available is None else available + held
+
+    def _handle_invalid_sku(self, sku: str) -> ValidationResult:
         """Handle case when SKU is not found."""
-        similar_products = self.catalog_source.find_similar_products(item.sku)
+        similar_products = self.catalog_source.find_similar_products(sku)
         return ValidationResult(
             is_valid=False,
-            notes=f"SKU {item.sku} not found in catalog",
+            notes="SKU {0} not found in catalog",
+            notes_args=(sku,),
             suggestions=similar_products,
         )
 
     def _handle_moq_violation(
-        self, item: OrderItem, product: dict[str, Any]
+        self, quantity: int, line_count: int, product: dict[str, Any]
     ) -> ValidationResult:
         """Handle minimum order quantity violation."""
         return ValidationResult(
             is_valid=False,
-            notes=f"Quantity {item.quantity} is below minimum order quantity of {product['moq']}",
+            notes=MOQ_NOTES if line_count == 1 else COMBINED_MOQ_NOTES,
+            notes_args=(quantity, product["moq"], line_count),
             suggestions=[
                 {
                     "type": "quantity_adjustment",
-                    "current_quantity": item.quantity,
+                    "current_quantity": quantity,
                     "suggested_quantity": product["moq"],
                     "reason": f"To meet minimum order quantity of {product['moq']}",
                 }
@@ -71,19 +190,20 @@ class CatalogValidator(OrderValidator):
         )
 
     def _handle_stock_violation(
-        self, item: OrderItem, product: dict[str, Any]
+        self, quantity: int, line_count: int, available_stock: int
     ) -> ValidationResult:
         """Handle stock availability violation."""
         return ValidationResult(
             is_valid=False,
-            notes=f"Requested quantity {item.quantity} exceeds available stock of {product['stock']}",
+            notes=STOCK_NOTES if line_count == 1 else COMBINED_STOCK_NOTES,
+            notes_args=(quantity, available_stock, line_count),
             suggestions=[
                 {
                     "type": "stock_limit",
-                    "current_quantity": item.quantity,
-                    "available_quantity": product["stock"],
+                    "current_quantity": quantity,
+                    "available_quantity": available_stock,
                     "reason": "Limited by current stock levels",
                 }
             ],
-            metadata={"available_stock": product["stock"]},
+            metadata={"available_stock": available_stock},
         )
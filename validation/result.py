@@ -1,19 +1,74 @@
 """Validation result data class."""
 
-from typing import Any
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Optional
+
+VALID_ITEM_NOTES = "Order item is valid"
+
+# Shared by every result without suggestions or metadata
+_NO_SUGGESTIONS: tuple = ()
+_NO_METADATA: Mapping[str, Any] = MappingProxyType({})
 
 
 class ValidationResult:
-    """Data class for validation results."""
+    """Data class for validation results.
+
+    ``notes`` may be a ``str.format`` template with ``notes_args``; it is
+    formatted the first time it is read, so results whose notes are never
+    displayed never build the string.
+    """
+
+    __slots__ = ("is_valid", "_notes", "_notes_args", "suggestions", "metadata")
 
     def __init__(
         self,
         is_valid: bool,
         notes: str,
-        suggestions: list[dict[str, Any]] | None = None,
-        metadata: dict[str, Any] | None = None,
+        suggestions: Optional[Sequence[dict[str, Any]]] = None,
+        metadata: Optional[Mapping[str, Any]] = None,
+        notes_args: tuple = (),
     ):
         self.is_valid = is_valid
-        self.notes = notes
-        self.suggestions = suggestions or []
-        self.metadata = metadata or {}
+        self._notes = notes
+        self._notes_args = notes_args
+        self.suggestions = suggestions or _NO_SUGGESTIONS
+        self.metadata = metadata or _NO_METADATA
+
+    @property
+    def notes_template(self) -> str:
+        """Get the notes template, or the notes once they have been formatted."""
+        return self._notes
+
+    @property
+    def notes_args(self) -> tuple:
+        """Get the arguments still to be formatted into ``notes_template``."""
+        return self._notes_args
+
+    @property
+    def notes(self) -> str:
+        """Get the validation notes, formatting them on first access."""
+        if self._notes_args:
+            self._notes = self._notes.format(*self._notes_args)
+            self._notes_args = ()
+        return self._notes
+
+    def __repr__(self) -> str:
+        return f"ValidationResult(is_valid={self.is_valid!r}, notes={self.notes!r})"
+
+
+@lru_cache(maxsize=4096)
+def valid_result(min_quantity: int, available_stock: int) -> ValidationResult:
+    """Get the shared result for a valid item with the given limits.
+
+    Results are cached per (MOQ, stock) pair and their metadata is read-only,
+    so callers must not mutate them.
+    """
+    return ValidationResult(
+        is_valid=True,
+        notes=VALID_ITEM_NOTES,
+        metadata=MappingProxyType(
+            {"min_quantity": min_quantity, "available_stock": available_stock}
+        ),
+    )
@@ -0,0 +1,236 @@
+"""Thread-safe in-process stock reservation ledger."""
+
+import heapq
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from core.exceptions import StockReservationError
+
+DEFAULT_STRIPES = 64
+DEFAULT_RESERVATION_TTL = 300.0
+
+
+@dataclass(frozen=True)
+class StockReservation:
+    """Units held for one order until committed, released or expired."""
+
+    reservation_id: str
+    quantities: Mapping[str, int]
+    expires_at: float
+
+
+class StockLedger:
+    """Tracks on-hand and reserved stock with lock striping by SKU.
+
+    Each SKU maps to one of ``stripes`` locks. An order's reservation takes the
+    locks of all its SKUs in stripe order, so concurrent orders only contend
+    when they share a stripe and can never deadlock. Reservations either cover
+    every line of the order or none of them.
+    """
+
+    def __init__(
+        self,
+        on_hand: Mapping[str, int],
+        stripes: int = DEFAULT_STRIPES,
+        default_ttl: float = DEFAULT_RESERVATION_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._stripe_locks = [threading.Lock() for _ in range(stripes)]
+        self._on_hand = dict(on_hand)
+        self._reserved: dict[str, int] = dict.fromkeys(self._on_hand, 0)
+        self._reservations: dict[str, StockReservation] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._registry_lock = threading.Lock()
+
+    @classmethod
+    def from_catalog(cls, catalog_source, **kwargs) -> "StockLedger":
+        """Create a ledger seeded with the stock levels of a catalog."""
+        products = catalog_source.get_all_products()
+        return cls(
+            {sku: details["stock"] for sku, details in products.items()}, **kwargs
+        )
+
+    def follow_updates(self, catalog_source):
+        """Apply the stock changes of the updates a catalog publishes.
+
+        Each change is applied as the difference from the stock the catalog
+        last published for the SKU, so units committed here, which the
+        catalog never sees, stay deducted and price or MOQ updates leave
+        stock alone. An update older than one already applied to a SKU is
+        skipped, since listeners of concurrent updates may run out of order.
+        """
+        snapshot = catalog_source.snapshot()
+        published = {
+            sku: (snapshot.version, details["stock"])
+            for sku, details in snapshot.products.items()
+        }
+        published_lock = threading.Lock()
+
+        def apply_update(snapshot, skus: frozenset):
+            changes = {}
+            with published_lock:
+                for sku in skus:
+                    version, previous = published.get(sku, (-1, 0))
+                    if snapshot.version <= version:
+                        continue
+                    stock = snapshot.products[sku]["stock"]
+                    published[sku] = (snapshot.version, stock)
+                    if stock != previous:
+                        changes[sku] = stock - previous
+            if changes:
+                self.adjust_on_hand(changes)
+
+        catalog_source.add_update_listener(apply_update)
+
+    def available(self, sku: str) -> Optional[int]:
+        """Get unreserved units for a SKU, or None if the ledger does not track it.
+
+        The read is lock-free and therefore advisory; ``reserve`` re-checks
+        availability under the SKU's stripe lock.
+        """
+        on_hand = self._on_hand.get(sku)
+        if on_hand is None:
+            return None
+        return on_hand - self._reserved[sku]
+
+    def reserve(
+        self, quantities: Mapping[str, int], ttl: Optional[float] = None
+    ) -> StockReservation:
+        """Atomically reserve all quantities or raise StockReservationError."""
+        self.release_expired()
+        totals = self._totals([quantities])
+
+        locks = self._locks_for(totals)
+        for lock in locks:
+            lock.acquire()
+        try:
+            short = {}
+            for sku, quantity in totals.items():
+                available = self._on_hand[sku] - self._reserved[sku]
+                if available < quantity:
+                    short[sku] = available
+            if short:
+                raise StockReservationError(
+                    f"Insufficient stock for {', '.join(sorted(short))}", short
+                )
+            for sku, quantity in totals.items():
+                self._reserved[sku] += quantity
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        reservation = StockReservation(
+            reservation_id=uuid.uuid4().hex,
+            quantities=totals,
+            expires_at=self._clock() + (ttl if ttl is not None else self.default_ttl),
+        )
+        with self._registry_lock:
+            self._reservations[reservation.reservation_id] = reservation
+            heapq.heappush(
+                self._expiry_heap, (reservation.expires_at, reservation.reservation_id)
+            )
+        return reservation
+
+    def release(self, reservation_id: str) -> bool:
+        """Return reserved units to the available pool."""
+        reservations = self._claim([reservation_id])
+        self._apply(reservations, commit=False)
+        return bool(reservations)
+
+    def commit(self, reservation_ids: Iterable[str]) -> int:
+        """Deduct reserved units from on-hand stock for a batch of reservations."""
+        reservations = self._claim(reservation_ids)
+        self._apply(reservations, commit=True)
+        return len(reservations)
+
+    def release_expired(self) -> int:
+        """Release every reservation whose time-to-live has elapsed."""
+        now = self._clock()
+        with self._registry_lock:
+            if not self._expiry_heap or self._expiry_heap[0][0] > now:
+                return 0
+            expired = []
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, reservation_id = heapq.heappop(self._expiry_heap)
+                reservation = self._reservations.pop(reservation_id, None)
+                if reservation is not None:
+                    expired.append(reservation)
+
+        self._apply(expired, commit=False)
+        return len(expired)
+
+    def set_on_hand(self, levels: Mapping[str, int]):
+        """Replace on-hand stock, e.g. after an inventory update, keeping reservations."""
+        locks = self._locks_for(levels)
+        for lock in locks:
+            lock.acquire()
+        try:
+            for sku, quantity in levels.items():
+                self._reserved.setdefault(sku, 0)
+                self._on_hand[sku] = quantity
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def adjust_on_hand(self, changes: Mapping[str, int]):
+        """Add signed quantities to on-hand stock, e.g. a delivery or a recount."""
+        locks = self._locks_for(changes)
+        for lock in locks:
+            lock.acquire()
+        try:
+            for sku, change in changes.items():
+                self._reserved.setdefault(sku, 0)
+                self._on_hand[sku] = self._on_hand.get(sku, 0) + change
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _claim(self, reservation_ids: Iterable[str]) -> list[StockReservation]:
+        """Remove reservations from the registry so only one caller settles them."""
+        with self._registry_lock:
+            claimed = [self._reservations.pop(rid, None) for rid in reservation_ids]
+        return [reservation for reservation in claimed if reservation is not None]
+
+    def _apply(self, reservations: list[StockReservation], commit: bool):
+        """Settle claimed reservations, taking each stripe lock once."""
+        if not reservations:
+            return
+        totals = self._totals(r.quantities for r in reservations)
+
+        locks = self._locks_for(totals)
+        for lock in locks:
+            lock.acquire()
+        try:
+            for sku, quantity in totals.items():
+                self._reserved[sku] -= quantity
+                if commit:
+                    self._on_hand[sku] -= quantity
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _locks_for(self, skus: Iterable[str]) -> list[threading.Lock]:
+        """Get the distinct stripe locks for SKUs in a global acquisition order."""
+        indexes = sorted({hash(sku) % len(self._stripe_locks) for sku in skus})
+        return [self._stripe_locks[index] for index in indexes]
+
+    def _totals(self, quantity_maps: Iterable[Mapping[str, int]]) -> dict[str, int]:
+        """Sum quantities per SKU, rejecting SKUs the ledger does not track."""
+        totals: dict[str, int] = defaultdict(int)
+        for quantities in quantity_maps:
+            for sku, quantity in quantities.items():
+                totals[sku] += quantity
+
+        unknown = {sku: 0 for sku in totals if sku not in self._on_hand}
+        if unknown:
+            raise StockReservationError(
+                f"Unknown SKUs: {', '.join(sorted(unknown))}", unknown
+            )
+        return dict(totals)